@@ -0,0 +1,307 @@
+"""오래된 토론 주제 보관 (압축 스냅샷 + 읽기 통과)
+
+선거 공약(`pledge`)처럼 시간이 지나면 거의 읽히지 않는 주제를, 마지막 활동 후
+ARCHIVE_AFTER_DAYS일이 지나면 주제 하나를 통째로 압축 스냅샷으로 옮깁니다.
+
+- 스냅샷: `debate_export.iter_topic_records`의 NDJSON(주장, 반박 트리, 근거, 최종 투표 수)을
+  zlib으로 압축해 `topic_archives`에 저장합니다.
+- 옮긴 주장/반박/근거/투표 행은 라이브 테이블에서 삭제하고, 주장/반박 id -> 주제 id는
+  `archived_items`에 남겨서 id로 조회하는 API도 보관본을 찾을 수 있게 합니다.
+- 주제 행은 남기고 `archived_at`만 표시하므로 주제 목록은 그대로 동작합니다.
+- 조회 라우터는 라이브 테이블에 없을 때 `load()`로 보관본을 읽습니다. 압축을 푼 결과는
+  최근 주제 몇 개만 메모리에 둡니다.
+
+삭제된 행이 차지하던 페이지는 SQLite가 재사용하며, 파일 크기를 줄이려면 VACUUM이 필요합니다.
+"""
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, func, insert, or_, select
+
+from app import models, user_stats
+from app.database import SessionLocal, begin_immediate
+from app.debate_export import iter_topic_records
+from app.scheduler import periodic
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_TOPIC_TYPES = [t for t in os.getenv("ARCHIVE_TOPIC_TYPES", "pledge").split(",") if t]
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "86400"))
+COMPRESSION_LEVEL = 9
+# 압축을 풀어 메모리에 둘 보관 주제 수
+CACHE_TOPICS = int(os.getenv("ARCHIVE_CACHE_TOPICS", "32"))
+
+
+class ArchivedTopic:
+    """압축을 푼 보관 주제. 레코드는 debate_export의 dict 형식 그대로입니다."""
+
+    def __init__(self, records):
+        self.topic: Optional[dict] = None
+        self.claims: List[dict] = []
+        self.rebuttals: Dict[int, dict] = {}
+        self.rebuttals_by_claim: Dict[int, List[dict]] = {}
+        self.claim_evidence: Dict[int, List[dict]] = {}
+        self.rebuttal_evidence: Dict[int, List[dict]] = {}
+        for record in records:
+            kind = record["kind"]
+            if kind == "topic":
+                self.topic = record
+            elif kind == "claim":
+                self.claims.append(record)
+            elif kind == "rebuttal":
+                self.rebuttals[record["id"]] = record
+                self.rebuttals_by_claim.setdefault(record["claim_id"], []).append(record)
+            elif kind == "evidence":
+                if record["claim_id"] is not None:
+                    self.claim_evidence.setdefault(record["claim_id"], []).append(record)
+                else:
+                    self.rebuttal_evidence.setdefault(record["rebuttal_id"], []).append(record)
+        self._claims_by_id = {c["id"]: c for c in self.claims}
+        for claim in self.claims:
+            claim["rebuttal_count"] = len(self.rebuttals_by_claim.get(claim["id"], ()))
+
+    def claim(self, claim_id: int) -> Optional[dict]:
+        return self._claims_by_id.get(claim_id)
+
+
+class _ArchiveCache:
+    def __init__(self, size: int):
+        self.size = size
+        self._items: "OrderedDict[int, ArchivedTopic]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, topic_id: int) -> Optional[ArchivedTopic]:
+        with self._lock:
+            archived = self._items.get(topic_id)
+            if archived is not None:
+                self._items.move_to_end(topic_id)
+            return archived
+
+    def put(self, topic_id: int, archived: ArchivedTopic):
+        with self._lock:
+            self._items[topic_id] = archived
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_cache = _ArchiveCache(CACHE_TOPICS)
+
+
+_SORT_KEYS = {
+    "new": lambda c: (c["created_at"] or "", c["id"]),
+    "best": lambda c: (c["rebuttal_count"], c["id"]),
+}
+
+
+def claim_list(archived: ArchivedTopic, sort_by: str, side: Optional[str] = None,
+               skip: int = 0, limit: Optional[int] = None) -> List[dict]:
+    """보관된 주장 목록을 라이브 목록과 같은 규칙(진영별 페이지)으로 정렬/자름
+
+    보관된 주제는 더 이상 변하지 않으므로 trend는 최종 votes 순으로 대신합니다.
+    """
+    key = _SORT_KEYS.get(sort_by, lambda c: (c["votes"] or 0, c["id"]))
+    ordered = sorted(archived.claims, key=key, reverse=True)
+    end = None if limit is None else skip + limit
+    if side:
+        result = [c for c in ordered if c["type"] == side][skip:end]
+    elif limit is not None:
+        result = []
+        for claim_side in ("pro", "con"):
+            result.extend([c for c in ordered if c["type"] == claim_side][skip:end])
+    else:
+        result = ordered[skip:]
+    return [dict(c, user_vote=None) for c in result]
+
+
+def rebuttal_dict(archived: ArchivedTopic, rebuttal: dict) -> dict:
+    return dict(rebuttal, user_vote=None, evidence=archived.rebuttal_evidence.get(rebuttal["id"], []))
+
+
+def decompress(snapshot: bytes) -> List[dict]:
+    return [json.loads(line) for line in zlib.decompress(snapshot).decode("utf-8").splitlines() if line]
+
+
+def iter_snapshot(snapshot: bytes, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """스냅샷 NDJSON을 전부 풀지 않고 조각 단위로 풀어서 반환"""
+    decompressor = zlib.decompressobj()
+    for start in range(0, len(snapshot), chunk_size):
+        chunk = decompressor.decompress(snapshot[start:start + chunk_size])
+        if chunk:
+            yield chunk
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def load(db, topic_id: int) -> Optional[ArchivedTopic]:
+    """보관된 주제를 반환합니다. 보관되지 않았으면 None"""
+    archived = _cache.get(topic_id)
+    if archived is not None:
+        return archived
+    snapshot = db.query(models.TopicArchive.snapshot).filter(models.TopicArchive.topic_id == topic_id).scalar()
+    if snapshot is None:
+        return None
+    archived = ArchivedTopic(decompress(snapshot))
+    _cache.put(topic_id, archived)
+    return archived
+
+
+def topic_of(db, kind: str, item_id: int) -> Optional[int]:
+    """보관된 주장(kind="claim") 또는 반박(kind="rebuttal")이 속한 주제 id"""
+    return db.query(models.ArchivedItem.topic_id).filter(
+        models.ArchivedItem.kind == kind, models.ArchivedItem.item_id == item_id
+    ).scalar()
+
+
+def load_item(db, kind: str, item_id: int) -> Optional[ArchivedTopic]:
+    topic_id = topic_of(db, kind, item_id)
+    return load(db, topic_id) if topic_id is not None else None
+
+
+# 보관 -----------------------------------------------------------------
+
+
+def cold_topic_ids(db, inactive_days: float = ARCHIVE_AFTER_DAYS, topic_types=None) -> List[int]:
+    """마지막 활동(주제 생성, 주장 작성, 반박/투표로 갱신된 주장 활동)이 오래된 주제 id"""
+    topic_types = ARCHIVE_TOPIC_TYPES if topic_types is None else topic_types
+    before = datetime.utcnow() - timedelta(days=inactive_days)
+    last_activity = db.query(
+        models.Claim.topic_id.label("topic_id"),
+        func.max(models.Claim.last_activity_at).label("last_activity_at"),
+    ).group_by(models.Claim.topic_id).subquery()
+    rows = db.query(models.Topic.id).outerjoin(
+        last_activity, last_activity.c.topic_id == models.Topic.id
+    ).filter(
+        models.Topic.topic_type.in_(topic_types),
+        models.Topic.archived_at.is_(None),
+        models.Topic.created_at < before,
+        or_(last_activity.c.last_activity_at.is_(None), last_activity.c.last_activity_at < before),
+    ).order_by(models.Topic.id)
+    return [topic_id for (topic_id,) in rows]
+
+
+def archive_topic(db, topic_id: int) -> Optional[dict]:
+    """주제 하나를 스냅샷으로 옮기고 라이브 행을 삭제합니다. 보관한 결과 요약을 반환합니다.
+
+    스냅샷을 읽기 전에 쓰기 잠금을 잡으므로, 읽는 동안 들어온 반박/투표가 스냅샷 없이 지워지지 않습니다.
+    (그동안 다른 쓰기는 잠금이 풀릴 때까지 기다림) 삭제도 스냅샷에 넣은 주장/반박 id로만 합니다.
+    """
+    begin_immediate(db)
+    topic = db.query(models.Topic).filter(models.Topic.id == topic_id).first()
+    if topic is None or topic.archived_at is not None:
+        db.rollback()
+        return None
+
+    lines = []
+    claim_ids: List[int] = []
+    rebuttal_ids: List[int] = []
+    vote_sum = 0
+    last_activity = topic.created_at
+    for record in iter_topic_records(db, topic):
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if record["kind"] == "claim":
+            claim_ids.append(record["id"])
+            vote_sum += record["votes"] or 0
+        elif record["kind"] == "rebuttal":
+            rebuttal_ids.append(record["id"])
+    raw = ("\n".join(lines) + "\n").encode("utf-8")
+    snapshot = zlib.compress(raw, COMPRESSION_LEVEL)
+    # iter_topic_records가 identity map을 비우므로 주제를 다시 읽음
+    topic = db.query(models.Topic).filter(models.Topic.id == topic_id).first()
+    last_claim_activity = db.query(func.max(models.Claim.last_activity_at)).filter(
+        models.Claim.topic_id == topic_id
+    ).scalar()
+    if last_claim_activity and (last_activity is None or last_claim_activity > last_activity):
+        last_activity = last_claim_activity
+
+    now = datetime.utcnow()
+    db.add(models.TopicArchive(
+        topic_id=topic_id,
+        archived_at=now,
+        last_activity_at=last_activity,
+        claim_count=len(claim_ids),
+        rebuttal_count=len(rebuttal_ids),
+        vote_sum=vote_sum,
+        raw_bytes=len(raw),
+        snapshot=snapshot,
+    ))
+
+    # 스냅샷에 넣은 id를 먼저 남기고, 아래 삭제는 모두 이 목록으로 범위를 정함
+    items = models.ArchivedItem.__table__
+    archived_rows = [{"kind": "claim", "item_id": item_id, "topic_id": topic_id} for item_id in claim_ids]
+    archived_rows += [{"kind": "rebuttal", "item_id": item_id, "topic_id": topic_id} for item_id in rebuttal_ids]
+    if archived_rows:
+        db.execute(insert(items), archived_rows)
+    archived_claims = select(items.c.item_id).where(items.c.topic_id == topic_id, items.c.kind == "claim")
+    archived_rebuttals = select(items.c.item_id).where(items.c.topic_id == topic_id, items.c.kind == "rebuttal")
+
+    # 보관한 글과 투표는 작성자 통계에서 뺌 (통계는 라이브 테이블 기준)
+    user_stats.remove(db, models.Claim.id.in_(archived_claims))
+    db.execute(delete(models.Vote).where(
+        or_(models.Vote.claim_id.in_(archived_claims), models.Vote.rebuttal_id.in_(archived_rebuttals))
+    ))
+    ledger = models.VoteLedger
+    db.execute(delete(ledger).where(or_(
+        (ledger.kind == ledger.CLAIM) & ledger.target_id.in_(archived_claims),
+        (ledger.kind == ledger.REBUTTAL) & ledger.target_id.in_(archived_rebuttals),
+    )))
+    db.execute(delete(models.Evidence).where(
+        or_(models.Evidence.claim_id.in_(archived_claims), models.Evidence.rebuttal_id.in_(archived_rebuttals))
+    ))
+    db.execute(delete(models.ClaimPartyVote).where(models.ClaimPartyVote.claim_id.in_(archived_claims)))
+    db.execute(delete(models.ActivityRollup).where(
+        models.ActivityRollup.scope == "claim", models.ActivityRollup.target_id.in_(archived_claims)
+    ))
+    db.execute(delete(models.ClaimSignature).where(models.ClaimSignature.claim_id.in_(archived_claims)))
+    db.execute(delete(models.Rebuttal).where(models.Rebuttal.id.in_(archived_rebuttals)))
+    db.execute(delete(models.Claim).where(models.Claim.id.in_(archived_claims)))
+    topic.archived_at = now
+    db.commit()
+
+    # 메모리 색인에서도 내림 (다른 워커에는 무효화 버스로 전달)
+    from app.similarity import index as similarity_index
+
+    similarity_index.drop(topic_id)
+    return {
+        "topic_id": topic_id,
+        "claims": len(claim_ids),
+        "rebuttals": len(rebuttal_ids),
+        "raw_bytes": len(raw),
+        "compressed_bytes": len(snapshot),
+    }
+
+
+def archive_cold_topics(db, inactive_days: float = ARCHIVE_AFTER_DAYS, topic_types=None) -> List[dict]:
+    """오래된 주제를 하나씩(주제마다 커밋) 보관합니다."""
+    results = []
+    for topic_id in cold_topic_ids(db, inactive_days, topic_types):
+        try:
+            result = archive_topic(db, topic_id)
+        except Exception:
+            # 다른 워커가 같은 주제를 먼저 보관한 경우 등
+            db.rollback()
+            logger.exception("topic %s archival failed", topic_id)
+            continue
+        if result:
+            results.append(result)
+    return results
+
+
+@periodic("topic-archival", ARCHIVE_INTERVAL_SECONDS, run_on_start=False, single=True)
+def archive_job():
+    db = SessionLocal()
+    try:
+        archive_cold_topics(db)
+    finally:
+        db.close()
@@ -0,0 +1,330 @@
+"""주장별 반박 트리 지표 (배열 기반 그래프)
+
+주장 하나의 반박 트리 전체를 `array` 몇 개로 메모리에 유지하고, 트리 전체 지표(답이 없는
+반박 수, 가장 깊은 반박 사슬, 찬반 순지지 등)를 ORM 객체 없이 계산합니다.
+
+- 노드는 반박 id 오름차순으로 저장합니다. 부모는 항상 자식보다 먼저 작성되므로 부모의
+  위치가 자식보다 앞에 오고, 앞에서 뒤로 한 번(깊이), 뒤에서 앞으로 한 번(서브트리 합계)
+  훑으면 모든 지표가 나옵니다.
+- 노드 하나에 17바이트: id(q), 부모 위치(i, 주장에 직접 단 반박은 -1), votes(i), 종류(b).
+- 처음 조회할 때 (id, parent_id, votes, type) 네 컬럼만 한 번에 읽어 만들고, 이후에는
+  반박 작성/삭제/투표 때 증분으로 고칩니다. 다른 워커의 변경은 무효화 버스
+  (app/invalidation.py)로 받고, MAX_AGE_SECONDS가 지나면 DB에서 다시 읽습니다.
+- 삭제는 종류 칸에 표시만 하고(O(log n)), 삭제된 노드가 4분의 1을 넘으면 배열을 한 번에 당겨
+  정리합니다. 부모가 삭제된 반박은 주장에 직접 단 반박으로 봅니다(다시 읽어도 같은 결과).
+
+찬반은 깊이로 정합니다. 주장에 직접 단 반박(깊이 1)은 반대, 그 재반박(깊이 2)은 주장 편,
+이후 번갈아 가며, 노드마다 1 + max(votes, 0)만큼의 무게를 가집니다.
+"""
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app import archive, models
+from app.invalidation import bus
+
+# 메모리에 유지할 주장 그래프 수 (오래 쓰이지 않은 주장부터 내림)
+MAX_CLAIMS = int(os.getenv("ARGUMENT_GRAPH_CLAIMS", "256"))
+MAX_AGE_SECONDS = float(os.getenv("ARGUMENT_GRAPH_MAX_AGE_SECONDS", "600"))
+
+KINDS = ("rebuttal", "counter")
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+_DELETED = -2  # kinds 배열에서 삭제된 노드 표시
+
+Row = Tuple[int, Optional[int], Optional[int], Optional[str]]
+
+
+class ClaimGraph:
+    """주장 하나의 반박 트리"""
+
+    def __init__(self, rows: Iterable[Row] = ()):
+        self.ids = array("q")
+        self.parents = array("i")
+        self.votes = array("i")
+        self.kinds = array("b")
+        self.loaded_at = time.monotonic()
+        self.deleted = 0
+        self._metrics: Optional[dict] = None
+        self._lock = threading.Lock()
+        for rebuttal_id, parent_id, votes, kind in sorted(rows, key=lambda row: row[0]):
+            self.ids.append(rebuttal_id)
+            self.parents.append(self._position(parent_id, len(self.ids) - 1))
+            self.votes.append(votes or 0)
+            self.kinds.append(_KIND_CODES.get(kind, -1))
+
+    def __len__(self):
+        return len(self.ids) - self.deleted
+
+    def __contains__(self, rebuttal_id: int) -> bool:
+        return self._find(rebuttal_id) >= 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(a) * a.itemsize for a in (self.ids, self.parents, self.votes, self.kinds))
+
+    def _find(self, rebuttal_id: int) -> int:
+        pos = bisect_left(self.ids, rebuttal_id)
+        if pos < len(self.ids) and self.ids[pos] == rebuttal_id and self.kinds[pos] != _DELETED:
+            return pos
+        return -1
+
+    def _position(self, parent_id: Optional[int], child_pos: int) -> int:
+        """부모의 위치. 부모가 없거나(삭제됨) 자식보다 뒤에 있으면 -1"""
+        if parent_id is None:
+            return -1
+        pos = self._find(parent_id)
+        return pos if pos < child_pos else -1
+
+    def add(self, rebuttal_id: int, parent_id: Optional[int], votes: int = 0, kind: Optional[str] = None) -> bool:
+        with self._lock:
+            pos = bisect_left(self.ids, rebuttal_id)
+            if pos < len(self.ids) and self.ids[pos] == rebuttal_id:
+                return False
+            if pos < len(self.ids):
+                # 다른 워커의 더 작은 id가 늦게 도착한 경우: 뒤쪽 노드의 부모 위치를 한 칸씩 밀어 줌
+                parents = self.parents
+                for i in range(pos, len(parents)):
+                    if parents[i] >= pos:
+                        parents[i] += 1
+            self.ids.insert(pos, rebuttal_id)
+            self.parents.insert(pos, self._position(parent_id, pos))
+            self.votes.insert(pos, votes or 0)
+            self.kinds.insert(pos, _KIND_CODES.get(kind, -1))
+            self._metrics = None
+            return True
+
+    def remove(self, rebuttal_id: int) -> bool:
+        with self._lock:
+            pos = self._find(rebuttal_id)
+            if pos < 0:
+                return False
+            self.kinds[pos] = _DELETED
+            self.deleted += 1
+            if self.deleted * 4 > len(self.ids):
+                self._compact()
+            self._metrics = None
+            return True
+
+    def _compact(self):
+        """삭제 표시된 노드를 빼고 배열을 다시 만듦. 부모가 빠진 노드의 부모 위치는 -1"""
+        keep = [i for i, kind in enumerate(self.kinds) if kind != _DELETED]
+        moved = array("i", [-1]) * len(self.ids)
+        for new, old in enumerate(keep):
+            moved[old] = new
+        parents = self.parents
+        self.parents = array("i", [moved[parents[i]] if parents[i] >= 0 else -1 for i in keep])
+        self.ids = array("q", [self.ids[i] for i in keep])
+        self.votes = array("i", [self.votes[i] for i in keep])
+        self.kinds = array("b", [self.kinds[i] for i in keep])
+        self.deleted = 0
+
+    def set_votes(self, rebuttal_id: int, votes: int) -> bool:
+        with self._lock:
+            pos = self._find(rebuttal_id)
+            if pos < 0 or self.votes[pos] == votes:
+                return False
+            self.votes[pos] = votes
+            self._metrics = None
+            return True
+
+    def metrics(self) -> dict:
+        """트리 전체 지표. 변경이 없으면 이전 결과를 그대로 반환합니다."""
+        with self._lock:
+            if self._metrics is None:
+                self._metrics = self._compute()
+            return self._metrics
+
+    def _compute(self) -> dict:
+        n = len(self.ids)
+        parents, votes, kinds = self.parents, self.votes, self.kinds
+        depth = array("i", bytes(4 * n))  # 삭제된 노드는 0
+        # 서브트리 합계: 크기, 순지지, 가장 깊은 노드까지의 높이, 직접 달린 재반박 수
+        size = array("i", [1]) * n
+        net = array("q", bytes(8 * n))
+        height = array("i", [1]) * n
+        replies = array("i", bytes(4 * n))
+
+        support = opposition = 0
+        max_depth = 0
+        for i in range(n):
+            if kinds[i] == _DELETED:
+                continue
+            p = parents[i]
+            d = depth[i] = 1 if p < 0 or not depth[p] else depth[p] + 1
+            if d > max_depth:
+                max_depth = d
+            v = votes[i]
+            weight = 1 + v if v > 0 else 1
+            if d & 1:
+                opposition += weight
+                net[i] = -weight
+            else:
+                support += weight
+                net[i] = weight
+
+        roots = []
+        for i in range(n - 1, -1, -1):
+            if not depth[i]:
+                continue
+            p = parents[i]
+            if p < 0 or not depth[p]:
+                roots.append(i)
+                continue
+            size[p] += size[i]
+            net[p] += net[i]
+            if height[i] >= height[p]:
+                height[p] = height[i] + 1
+            replies[p] += 1
+
+        kinds: Dict[str, int] = {}
+        for code, kind in enumerate(KINDS):
+            count = self.kinds.count(code)
+            if count:
+                kinds[kind] = count
+        unanswered = replies.count(0) - self.deleted
+        roots.reverse()
+        threads = [
+            {"rebuttal_id": self.ids[i], "size": size[i], "depth": height[i],
+             "net_support": net[i], "unanswered": replies[i] == 0}
+            for i in roots
+        ]
+        threads.sort(key=lambda t: (-t["size"], t["rebuttal_id"]))
+        return {
+            "rebuttals": n - self.deleted,
+            "direct_rebuttals": len(roots),
+            "unanswered": unanswered,
+            "unanswered_direct": sum(1 for i in roots if replies[i] == 0),
+            "max_depth": max_depth,
+            "support": support,
+            "opposition": opposition,
+            "net_support": support - opposition,
+            "types": kinds,
+            "threads": threads,
+        }
+
+
+def load_rows(db, claim_id: int) -> List[Row]:
+    """반박 트리에 필요한 네 컬럼만 읽습니다. 보관된 주장이면 보관본에서 읽습니다."""
+    table = models.Rebuttal.__table__
+    rows = db.execute(
+        select(table.c.id, table.c.parent_id, table.c.votes, table.c.type)
+        .where(table.c.claim_id == claim_id).order_by(table.c.id)
+    ).all()
+    if rows:
+        return [tuple(row) for row in rows]
+    archived = archive.load_item(db, "claim", claim_id)
+    if archived is None:
+        return []
+    return [
+        (r["id"], r["parent_id"], r["votes"], r["type"])
+        for r in archived.rebuttals_by_claim.get(claim_id, [])
+    ]
+
+
+class ArgumentGraphs:
+    """주장별 그래프를 필요할 때 읽어 두는 LRU 캐시"""
+
+    def __init__(self, max_claims: int = MAX_CLAIMS, max_age: float = MAX_AGE_SECONDS):
+        self.max_claims = max_claims
+        self.max_age = max_age
+        self._graphs: "OrderedDict[int, ClaimGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def graph(self, db, claim_id: int) -> ClaimGraph:
+        with self._lock:
+            graph = self._graphs.get(claim_id)
+            if graph is not None and time.monotonic() - graph.loaded_at < self.max_age:
+                self._graphs.move_to_end(claim_id)
+                return graph
+        # 큰 트리를 읽는 동안 다른 주장의 조회를 막지 않도록 잠금 밖에서 읽음
+        graph = ClaimGraph(load_rows(db, claim_id))
+        with self._lock:
+            self._graphs[claim_id] = graph
+            self._graphs.move_to_end(claim_id)
+            while len(self._graphs) > self.max_claims:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def metrics(self, db, claim_id: int, threads: int = 10) -> dict:
+        result = dict(self.graph(db, claim_id).metrics())
+        result["claim_id"] = claim_id
+        result["threads"] = result["threads"][:threads]
+        return result
+
+    def _cached(self, claim_id: int) -> Optional[ClaimGraph]:
+        with self._lock:
+            return self._graphs.get(claim_id)
+
+    def add(self, claim_id: int, rebuttal_id: int, parent_id: Optional[int], votes: int = 0,
+            kind: Optional[str] = None, broadcast: bool = True):
+        if broadcast:
+            bus.publish("argument_graph.add", {
+                "claim_id": claim_id, "rebuttal_id": rebuttal_id, "parent_id": parent_id,
+                "votes": votes, "kind": kind,
+            })
+        graph = self._cached(claim_id)
+        if graph is None:
+            return
+        if parent_id is not None and parent_id not in graph:
+            # 부모를 모르는 그래프는 다른 워커의 이벤트를 아직 못 받은 것: 다음 조회 때 다시 읽음
+            self.drop(claim_id, broadcast=False)
+        else:
+            graph.add(rebuttal_id, parent_id, votes, kind)
+
+    def remove(self, claim_id: int, rebuttal_id: int, broadcast: bool = True):
+        if broadcast:
+            bus.publish("argument_graph.remove", {"claim_id": claim_id, "rebuttal_id": rebuttal_id})
+        graph = self._cached(claim_id)
+        if graph is not None:
+            graph.remove(rebuttal_id)
+
+    def set_votes(self, claim_id: int, rebuttal_id: int, votes: int, broadcast: bool = True):
+        if broadcast:
+            bus.publish("argument_graph.votes", {"claim_id": claim_id, "rebuttal_id": rebuttal_id, "votes": votes})
+        graph = self._cached(claim_id)
+        if graph is not None:
+            graph.set_votes(rebuttal_id, votes)
+
+    def drop(self, claim_id: int, broadcast: bool = True):
+        if broadcast:
+            bus.publish("argument_graph.drop", {"claim_id": claim_id})
+        with self._lock:
+            self._graphs.pop(claim_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+
+
+graphs = ArgumentGraphs()
+
+
+@bus.on("argument_graph.add")
+def _apply_remote_add(data: dict):
+    graphs.add(data["claim_id"], data["rebuttal_id"], data["parent_id"], data["votes"], data["kind"], broadcast=False)
+
+
+@bus.on("argument_graph.remove")
+def _apply_remote_remove(data: dict):
+    graphs.remove(data["claim_id"], data["rebuttal_id"], broadcast=False)
+
+
+@bus.on("argument_graph.votes")
+def _apply_remote_votes(data: dict):
+    graphs.set_votes(data["claim_id"], data["rebuttal_id"], data["votes"], broadcast=False)
+
+
+@bus.on("argument_graph.drop")
+def _apply_remote_drop(data: dict):
+    graphs.drop(data["claim_id"], broadcast=False)
+
+
+@bus.on_gap
+def _clear_after_gap():
+    graphs.clear()
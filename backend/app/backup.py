@@ -0,0 +1,370 @@
+"""온라인 백업 (전체 스냅샷 + 페이지 증분)
+
+서비스를 멈추지 않고 SQLite DB를 백업합니다.
+
+- 복사: SQLite 온라인 백업 API로 STEP_PAGES 페이지씩 복사하고 단계 사이에 잠깐 쉽니다.
+  WAL 모드에서는 백업이 읽기 트랜잭션만 잡으므로 쓰기를 막지 않습니다. 다른 연결의 쓰기가
+  들어오면 SQLite가 단계 복사를 처음부터 다시 시작하는데, MAX_RESTARTS번 넘게 다시 시작되면
+  한 단계로(읽기 스냅샷 하나로) 나머지를 복사합니다.
+- 검사: 복사본마다 `PRAGMA quick_check`(BACKUP_CHECK=full이면 integrity_check)를 실행하고
+  실패하면 스냅샷을 저장하지 않습니다.
+- 증분: 스냅샷마다 페이지별 해시를 남기고, 다음 스냅샷은 이전 스냅샷과 달라진 페이지만
+  `.delta` 파일(zlib)로 저장합니다. SQLite는 페이지를 제자리에서 고치므로 마지막 스냅샷 이후
+  WAL로 들어온 쓰기가 닿은 페이지만 담기게 됩니다. FULL_EVERY개마다 전체 스냅샷을 새로 만듭니다.
+- 복원: 전체 스냅샷에 증분을 순서대로 적용하고, 페이지 해시와 무결성을 확인한 뒤
+  대상 파일을 원자적으로 교체합니다.
+
+BACKUP_DIR을 지정하면 BACKUP_INTERVAL_SECONDS마다 주기 작업으로 실행됩니다.
+`python manage.py backup`, `python manage.py restore --to <경로>`로 직접 실행할 수도 있습니다.
+"""
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime
+from hashlib import blake2b
+from typing import List, Optional
+
+from app.scheduler import periodic
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = os.getenv("BACKUP_DIR", "")
+BACKUP_INTERVAL_SECONDS = float(os.getenv("BACKUP_INTERVAL_SECONDS", "3600"))
+# 이 개수의 스냅샷마다 전체 스냅샷 (나머지는 증분)
+FULL_EVERY = int(os.getenv("BACKUP_FULL_EVERY", "24"))
+# 남겨 둘 전체 스냅샷 체인 수
+KEEP_CHAINS = int(os.getenv("BACKUP_KEEP_CHAINS", "2"))
+STEP_PAGES = int(os.getenv("BACKUP_STEP_PAGES", "1024"))
+STEP_SLEEP_SECONDS = float(os.getenv("BACKUP_STEP_SLEEP_SECONDS", "0.005"))
+MAX_RESTARTS = int(os.getenv("BACKUP_MAX_RESTARTS", "3"))
+CHECK = os.getenv("BACKUP_CHECK", "quick")  # quick, full
+
+MANIFEST = "manifest.json"
+LOCK_FILE = ".lock"
+_DELTA_RECORD = struct.Struct(">I")  # 페이지 번호 (뒤에 page_size 바이트)
+_lock = threading.Lock()
+
+
+class BackupError(Exception):
+    pass
+
+
+class _Restarted(Exception):
+    pass
+
+
+def database_path() -> str:
+    from app.database import engine
+
+    return engine.url.database
+
+
+# 복사/검사 --------------------------------------------------------------
+
+
+def online_copy(source_path: str, dest_path: str, step_pages: int = STEP_PAGES,
+                sleep: float = STEP_SLEEP_SECONDS, max_restarts: int = MAX_RESTARTS) -> dict:
+    """source를 dest로 온라인 복사합니다. 단계 수와 다시 시작한 횟수를 반환합니다."""
+    stats = {"steps": 0, "restarts": 0, "single_step": False}
+    previous = [None]
+
+    def progress(status, remaining, total):
+        stats["steps"] += 1
+        # 남은 페이지 수가 늘었으면 다른 연결의 쓰기 때문에 처음부터 다시 시작한 것
+        if previous[0] is not None and remaining > previous[0]:
+            stats["restarts"] += 1
+            if stats["restarts"] > max_restarts:
+                raise _Restarted()
+        previous[0] = remaining
+
+    source = sqlite3.connect(source_path)
+    try:
+        dest = sqlite3.connect(dest_path)
+        try:
+            try:
+                source.backup(dest, pages=step_pages, progress=progress, sleep=sleep)
+            except _Restarted:
+                stats["single_step"] = True
+                source.backup(dest, pages=-1)
+        finally:
+            dest.close()
+    finally:
+        source.close()
+    return stats
+
+
+def check(path: str, mode: str = CHECK) -> None:
+    """무결성 검사. 문제가 있으면 BackupError"""
+    pragma = "integrity_check" if mode == "full" else "quick_check"
+    conn = sqlite3.connect(path)
+    try:
+        rows = [row[0] for row in conn.execute(f"PRAGMA {pragma}")]
+    finally:
+        conn.close()
+    if rows != ["ok"]:
+        raise BackupError(f"{pragma} 실패: {'; '.join(rows[:5])}")
+
+
+def _page_size(path: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _finalize(path: str) -> None:
+    """복사본을 WAL 없는 단일 파일로 만듦 (페이지 비교와 복원이 파일 하나만 다루도록)"""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        conn.close()
+
+
+def page_hashes(path: str, page_size: int) -> array:
+    hashes = array("Q")
+    with open(path, "rb") as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                break
+            hashes.append(int.from_bytes(blake2b(page, digest_size=8).digest(), "little"))
+    return hashes
+
+
+# 스냅샷 -----------------------------------------------------------------
+
+
+def _load_manifest(directory: str) -> List[dict]:
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(directory: str, snapshots: List[dict]) -> None:
+    path = os.path.join(directory, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshots, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _write_hashes(path: str, hashes: array) -> None:
+    with open(path, "wb") as f:
+        hashes.tofile(f)
+
+
+def _read_hashes(path: str) -> array:
+    hashes = array("Q")
+    with open(path, "rb") as f:
+        hashes.frombytes(f.read())
+    return hashes
+
+
+def list_snapshots(directory: Optional[str] = None) -> List[dict]:
+    return _load_manifest(directory or BACKUP_DIR)
+
+
+def snapshot(directory: Optional[str] = None, source_path: Optional[str] = None, full: bool = False,
+             min_interval: float = 0) -> Optional[dict]:
+    """스냅샷 하나를 만듭니다. 이전 스냅샷이 있으면 증분, 없거나 full이면 전체
+
+    min_interval초 안에 만든 스냅샷이 이미 있으면 만들지 않고 None을 반환합니다. (잠금을 잡은 뒤 확인)
+    """
+    directory = directory or BACKUP_DIR
+    if not directory:
+        raise BackupError("BACKUP_DIR이 설정되지 않았습니다")
+    source_path = source_path or database_path()
+    os.makedirs(directory, exist_ok=True)
+
+    with _lock, open(os.path.join(directory, LOCK_FILE), "w") as lock_file:
+        # 같은 디렉터리를 쓰는 다른 워커 프로세스와 동시에 만들지 않음
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        snapshots = _load_manifest(directory)
+        previous = snapshots[-1] if snapshots else None
+        if previous is not None and min_interval and _elapsed(previous) < min_interval:
+            # 잠금을 기다리는 동안 다른 워커가 이미 만듦
+            return None
+        chain_length = 0
+        for s in reversed(snapshots):
+            chain_length += 1
+            if s["kind"] == "full":
+                break
+        if previous is None or chain_length >= FULL_EVERY:
+            full = True
+
+        snapshot_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+        started = time.perf_counter()
+        fd, copy_path = tempfile.mkstemp(prefix="snapshot-", suffix=".db", dir=directory)
+        os.close(fd)
+        try:
+            copy_stats = online_copy(source_path, copy_path)
+            copy_seconds = time.perf_counter() - started
+            _finalize(copy_path)
+            check(copy_path)
+            page_size = _page_size(copy_path)
+            hashes = page_hashes(copy_path, page_size)
+
+            entry = {
+                "id": snapshot_id,
+                "created_at": datetime.utcnow().isoformat(),
+                "page_size": page_size,
+                "page_count": len(hashes),
+                "copy_seconds": round(copy_seconds, 3),
+                "copy_restarts": copy_stats["restarts"],
+                "single_step": copy_stats["single_step"],
+                "hashes": f"{snapshot_id}.hashes",
+            }
+            if full or previous["page_size"] != page_size:
+                entry.update(kind="full", parent=None, file=f"{snapshot_id}.db", pages=len(hashes))
+                os.replace(copy_path, os.path.join(directory, entry["file"]))
+            else:
+                previous_hashes = _read_hashes(os.path.join(directory, previous["hashes"]))
+                entry.update(kind="incremental", parent=previous["id"], file=f"{snapshot_id}.delta")
+                entry["pages"] = _write_delta(
+                    copy_path, os.path.join(directory, entry["file"]), page_size, hashes, previous_hashes
+                )
+                os.remove(copy_path)
+        except Exception:
+            if os.path.exists(copy_path):
+                os.remove(copy_path)
+            raise
+        _write_hashes(os.path.join(directory, entry["hashes"]), hashes)
+        entry["bytes"] = os.path.getsize(os.path.join(directory, entry["file"]))
+        entry["seconds"] = round(time.perf_counter() - started, 3)
+        snapshots.append(entry)
+        _prune(directory, snapshots)
+        _save_manifest(directory, snapshots)
+    return entry
+
+
+def _write_delta(copy_path: str, delta_path: str, page_size: int, hashes: array, previous: array) -> int:
+    """이전 스냅샷과 해시가 다른 페이지만 기록합니다. 기록한 페이지 수를 반환합니다."""
+    written = 0
+    compressor = zlib.compressobj(6)
+    with open(copy_path, "rb") as src, open(delta_path, "wb") as out:
+        for number, digest in enumerate(hashes):
+            if number < len(previous) and previous[number] == digest:
+                continue
+            src.seek(number * page_size)
+            out.write(compressor.compress(_DELTA_RECORD.pack(number) + src.read(page_size)))
+            written += 1
+        out.write(compressor.flush())
+    return written
+
+
+def _iter_delta(path: str, page_size: int):
+    record = _DELTA_RECORD.size + page_size
+    decompressor = zlib.decompressobj()
+    buffer = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            buffer += decompressor.decompress(chunk) if chunk else decompressor.flush()
+            offset = 0
+            while len(buffer) - offset >= record:
+                (number,) = _DELTA_RECORD.unpack_from(buffer, offset)
+                yield number, buffer[offset + _DELTA_RECORD.size:offset + record]
+                offset += record
+            buffer = buffer[offset:]
+            if not chunk:
+                return
+
+
+def _prune(directory: str, snapshots: List[dict]) -> None:
+    """가장 최근 KEEP_CHAINS개 체인(전체 스냅샷과 그 증분)만 남깁니다."""
+    full_indexes = [i for i, s in enumerate(snapshots) if s["kind"] == "full"]
+    if len(full_indexes) <= KEEP_CHAINS:
+        return
+    cut = full_indexes[-KEEP_CHAINS]
+    for s in snapshots[:cut]:
+        for name in (s["file"], s["hashes"]):
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+    del snapshots[:cut]
+
+
+# 복원 -----------------------------------------------------------------
+
+
+def restore(dest_path: str, snapshot_id: Optional[str] = None, directory: Optional[str] = None) -> dict:
+    """스냅샷(기본: 가장 최근)을 dest_path로 복원합니다. 실행 중인 DB 파일에는 쓰지 마세요."""
+    directory = directory or BACKUP_DIR
+    snapshots = {s["id"]: s for s in _load_manifest(directory)}
+    if not snapshots:
+        raise BackupError("복원할 스냅샷이 없습니다")
+    target = snapshots.get(snapshot_id) if snapshot_id else list(snapshots.values())[-1]
+    if target is None:
+        raise BackupError(f"스냅샷 {snapshot_id}을 찾을 수 없습니다")
+
+    chain = [target]
+    while chain[-1]["kind"] != "full":
+        parent = snapshots.get(chain[-1]["parent"])
+        if parent is None:
+            raise BackupError(f"스냅샷 {chain[-1]['id']}의 이전 스냅샷이 없습니다")
+        chain.append(parent)
+    chain.reverse()
+
+    started = time.perf_counter()
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    fd, tmp_path = tempfile.mkstemp(prefix="restore-", suffix=".db", dir=dest_dir)
+    os.close(fd)
+    try:
+        with open(os.path.join(directory, chain[0]["file"]), "rb") as src, open(tmp_path, "wb") as out:
+            while True:
+                chunk = src.read(1024 * 1024)
+                if not chunk:
+                    break
+                out.write(chunk)
+        page_size = target["page_size"]
+        with open(tmp_path, "r+b") as out:
+            for delta in chain[1:]:
+                for number, page in _iter_delta(os.path.join(directory, delta["file"]), page_size):
+                    out.seek(number * page_size)
+                    out.write(page)
+                out.truncate(delta["page_count"] * page_size)
+        if page_hashes(tmp_path, page_size) != _read_hashes(os.path.join(directory, target["hashes"])):
+            raise BackupError("복원한 페이지가 스냅샷과 다릅니다")
+        check(tmp_path)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(dest_path + suffix):
+                os.remove(dest_path + suffix)
+        os.replace(tmp_path, dest_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {"snapshot": target["id"], "chain": len(chain), "seconds": round(time.perf_counter() - started, 3)}
+
+
+def _elapsed(entry: dict) -> float:
+    return (datetime.utcnow() - datetime.fromisoformat(entry["created_at"])).total_seconds()
+
+
+def snapshot_if_due(directory: Optional[str] = None, interval: float = BACKUP_INTERVAL_SECONDS) -> Optional[dict]:
+    """마지막 스냅샷 후 interval초가 지났을 때만 만듭니다. (여러 프로세스가 불러도 간격마다 한 번만 실행)"""
+    snapshots = _load_manifest(directory or BACKUP_DIR)
+    if snapshots and _elapsed(snapshots[-1]) < interval * 0.9:
+        return None
+    return snapshot(directory, min_interval=interval * 0.9)
+
+
+if BACKUP_DIR:
+    @periodic("backup", BACKUP_INTERVAL_SECONDS, run_on_start=False, single=True)
+    def backup_job():
+        try:
+            snapshot_if_due()
+        except BackupError:
+            logger.exception("backup failed")
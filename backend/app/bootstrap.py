@@ -0,0 +1,82 @@
+"""스키마 마이그레이션과 초기 데이터 시드
+
+모듈 import 시점이 아니라 `python manage.py migrate` / `seed-admin` 명령이나
+앱 lifespan(AUTO_MIGRATE=1)에서 명시적으로 호출됩니다.
+"""
+import os
+from typing import List
+
+from sqlalchemy import inspect, text
+
+from app import models
+from app.database import engine, SessionLocal
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "1234qwer!")
+
+
+def _column_ddl(column) -> str:
+    ddl = f"{column.name} {column.type.compile(dialect=engine.dialect)}"
+    default = column.default
+    if default is not None and default.is_scalar:
+        value = default.arg
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            ddl += f" DEFAULT {value}"
+        else:
+            ddl += " DEFAULT '" + str(value).replace("'", "''") + "'"
+    return ddl
+
+
+def migrate() -> List[str]:
+    """누락된 테이블/컬럼/인덱스를 생성하고 수행한 작업 목록을 반환합니다.
+
+    create_all은 기존 테이블에 컬럼을 추가하지 않으므로, 모델에 새로 추가된 컬럼은
+    ALTER TABLE ADD COLUMN으로 보충합니다. (컬럼 삭제/타입 변경은 다루지 않음)
+    """
+    actions = []
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    models.Base.metadata.create_all(bind=engine)
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            actions.append(f"create table {table.name}")
+            continue
+        existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        with engine.begin() as conn:
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column)}"))
+                actions.append(f"add column {table.name}.{column.name}")
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=engine, checkfirst=True)
+                actions.append(f"create index {index.name}")
+    return actions
+
+
+def seed_admin() -> bool:
+    """관리자 계정이 없으면 생성합니다. 새로 만들었으면 True를 반환합니다."""
+    db = SessionLocal()
+    try:
+        admin_user = db.query(models.User).filter(models.User.username == ADMIN_USERNAME).first()
+        if admin_user:
+            return False
+        # bcrypt 해시가 필요할 때만 auth 모듈을 불러옴
+        from app.routers.auth import get_password_hash
+
+        admin = models.User(
+            username=ADMIN_USERNAME,
+            password_hash=get_password_hash(ADMIN_PASSWORD),
+            political_party="None",
+            level=999  # 관리자 레벨
+        )
+        db.add(admin)
+        db.commit()
+        return True
+    finally:
+        db.close()
@@ -1,13 +1,38 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.models import Base
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./debate_community.db")
+# WAL 모드에서는 읽기(온라인 백업 포함)와 쓰기가 서로 막지 않음
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if engine.dialect.name != "sqlite" or not SQLITE_JOURNAL_MODE:
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    if SQLITE_SYNCHRONOUS:
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.close()
+
+def begin_immediate(db):
+    """세션의 SQLite 연결에서 쓰기 잠금을 먼저 잡고 트랜잭션을 시작합니다.
+
+    pysqlite는 SELECT를 트랜잭션 밖(자동 커밋)에서 실행하므로, 읽은 내용을 근거로 지우거나 고치는 작업은
+    이 함수를 먼저 호출해 커밋할 때까지 다른 쓰기가 끼어들지 못하게 합니다. (이미 트랜잭션 안이면 그대로 둠)
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    connection = db.connection()
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
 def init_db():
     Base.metadata.create_all(bind=engine)
 
@@ -0,0 +1,145 @@
+"""주제 하나의 토론 전체(주장, 반박 트리, 근거, 투표 수)를 레코드 단위로 스트리밍
+
+전체를 메모리에 올리지 않도록 주장을 id 순서로 배치 단위로 읽고, 각 배치에 속한
+반박/근거/투표 집계만 추가로 조회합니다. 각 레코드는 `kind` 필드를 가진 dict입니다.
+"""
+from typing import Dict, Iterator, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from app import models, vote_log
+
+BATCH_SIZE = 200
+
+
+def _author(user) -> dict:
+    if user is None:
+        return None
+    return {
+        "name": user.username,
+        "affiliation": user.affiliation or user.political_party or "",
+        "level": user.level,
+    }
+
+
+def _vote_counts(db, column, kind: int, ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """{대상 id: {vote_type: 수}} (votes와 압축된 vote_ledger 합계)"""
+    counts: Dict[int, Dict[str, int]] = {}
+    if not ids:
+        return counts
+    ledger = models.VoteLedger
+    rows = db.query(column, models.Vote.vote_type, func.count(models.Vote.id)).filter(
+        column.in_(ids)
+    ).group_by(column, models.Vote.vote_type)
+    archived = db.query(ledger.target_id, vote_log.ledger_vote_type, func.count()).filter(
+        ledger.kind == kind, ledger.target_id.in_(ids)
+    ).group_by(ledger.target_id, vote_log.ledger_vote_type)
+    for target_id, vote_type, count in list(rows) + list(archived):
+        by_type = counts.setdefault(target_id, {})
+        by_type[vote_type] = by_type.get(vote_type, 0) + count
+    return counts
+
+
+def _evidence_record(e: models.Evidence) -> dict:
+    return {
+        "kind": "evidence",
+        "id": e.id,
+        "claim_id": e.claim_id,
+        "rebuttal_id": e.rebuttal_id,
+        "source": e.source,
+        "publisher": e.publisher,
+        "text": e.text,
+        "summary": e.summary,
+        "url": e.url,
+        "created_at": e.created_at.isoformat() if e.created_at else None,
+    }
+
+
+def iter_topic_records(db, topic: models.Topic, batch_size: int = BATCH_SIZE) -> Iterator[dict]:
+    yield {
+        "kind": "topic",
+        "id": topic.id,
+        "title": topic.title,
+        "category": topic.category,
+        "region": topic.region,
+        "district": topic.district,
+        "topic_type": topic.topic_type,
+        "created_at": topic.created_at.isoformat() if topic.created_at else None,
+    }
+
+    last_id = 0
+    while True:
+        claims = db.query(models.Claim).options(joinedload(models.Claim.user)).filter(
+            models.Claim.topic_id == topic.id, models.Claim.id > last_id
+        ).order_by(models.Claim.id).limit(batch_size).all()
+        if not claims:
+            break
+        last_id = claims[-1].id
+        claim_ids = [c.id for c in claims]
+        claim_votes = _vote_counts(db, models.Vote.claim_id, models.VoteLedger.CLAIM, claim_ids)
+        for claim in claims:
+            counts = claim_votes.get(claim.id, {})
+            yield {
+                "kind": "claim",
+                "id": claim.id,
+                "topic_id": claim.topic_id,
+                "user_id": claim.user_id,
+                "author": _author(claim.user),
+                "title": claim.title,
+                "content": claim.content,
+                "type": claim.type,
+                "votes": claim.votes,
+                "likes": counts.get("like", 0),
+                "dislikes": counts.get("dislike", 0),
+                "sticker": claim.sticker,
+                "created_at": claim.created_at.isoformat() if claim.created_at else None,
+            }
+        for e in db.query(models.Evidence).filter(models.Evidence.claim_id.in_(claim_ids)).order_by(
+            models.Evidence.id
+        ).yield_per(batch_size):
+            yield _evidence_record(e)
+
+        # 반박은 id 순서(부모가 자식보다 먼저)로 내보내므로 읽는 쪽에서 트리를 바로 재구성할 수 있음
+        rebuttal_rows = db.query(models.Rebuttal.id).filter(models.Rebuttal.claim_id.in_(claim_ids)).order_by(
+            models.Rebuttal.id
+        )
+        pending: List[int] = []
+        for (rebuttal_id,) in rebuttal_rows.yield_per(batch_size):
+            pending.append(rebuttal_id)
+            if len(pending) >= batch_size:
+                yield from _iter_rebuttals(db, pending)
+                pending = []
+        if pending:
+            yield from _iter_rebuttals(db, pending)
+        # 배치 사이에 세션의 identity map을 비워서 메모리 사용량을 일정하게 유지
+        db.expunge_all()
+
+
+def _iter_rebuttals(db, rebuttal_ids: List[int]) -> Iterator[dict]:
+    rebuttals = db.query(models.Rebuttal).options(joinedload(models.Rebuttal.user)).filter(
+        models.Rebuttal.id.in_(rebuttal_ids)
+    ).order_by(models.Rebuttal.id).all()
+    votes = _vote_counts(db, models.Vote.rebuttal_id, models.VoteLedger.REBUTTAL, rebuttal_ids)
+    evidence: Dict[int, List[models.Evidence]] = {}
+    for e in db.query(models.Evidence).filter(models.Evidence.rebuttal_id.in_(rebuttal_ids)):
+        evidence.setdefault(e.rebuttal_id, []).append(e)
+    for rebuttal in rebuttals:
+        counts = votes.get(rebuttal.id, {})
+        yield {
+            "kind": "rebuttal",
+            "id": rebuttal.id,
+            "claim_id": rebuttal.claim_id,
+            "parent_id": rebuttal.parent_id,
+            "user_id": rebuttal.user_id,
+            "author": _author(rebuttal.user),
+            "title": rebuttal.title,
+            "content": rebuttal.content,
+            "type": rebuttal.type,
+            "votes": rebuttal.votes,
+            "likes": counts.get("like", 0),
+            "dislikes": counts.get("dislike", 0),
+            "created_at": rebuttal.created_at.isoformat() if rebuttal.created_at else None,
+        }
+        for e in sorted(evidence.get(rebuttal.id, []), key=lambda e: e.id):
+            yield _evidence_record(e)
@@ -5,7 +5,7 @@ from jose import jwt, JWTError
 from typing import Optional
 import os
 from app.database import get_db
-from app import models
+from app import models, sessions
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
@@ -34,6 +34,10 @@ async def get_current_user(
     except JWTError:
         return None
     
+    # 로그아웃/강제 로그아웃된 세션의 토큰 (메모리 블룸 필터로 확인, 양성일 때만 DB 조회)
+    if sessions.revocations.is_revoked(db, payload):
+        return None
+    
     user = db.query(models.User).filter(models.User.username == username).first()
     if user is None:
         return None
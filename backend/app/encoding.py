@@ -0,0 +1,239 @@
+"""응답 인코딩 (orjson, MessagePack, 압축, 작성자 표)
+
+- JSON: response_model이 있는 라우터는 FastAPI가 pydantic으로 바로 바이트를 만들고(가장 빠름),
+  dict를 그대로 돌려주는 라우터는 `CompactResponse`가 orjson으로 직렬화합니다.
+  (`FastAPI(default_response_class=Default(CompactResponse))`로 지정해야 앞의 경로가 유지됨)
+- MessagePack: `Accept: application/msgpack`이면 JSON 본문을 MessagePack으로 바꿔 보냅니다.
+  msgpack 패키지가 없으면 JSON으로 응답합니다.
+- 압축: COMPRESS_MIN_BYTES 이상인 응답을 `Accept-Encoding`에 따라 brotli(패키지가 있을 때) 또는
+  gzip으로 압축합니다.
+- 작성자 표: `X-Author-Table: 1`을 보내면 행마다 반복되는 `author` 객체를 본문 앞의 표로 모으고
+  각 행에는 표의 번호만 남깁니다. 응답은 `{"authors": [...], "data": 원래 본문}` 모양이 됩니다.
+
+변환은 `CompactEncodingMiddleware`가 JSON 응답 본문에 대해 한 번에 처리하고, 이미
+Content-Encoding이 있는 응답(미리 압축한 스냅샷 파일)과 스트리밍 응답(NDJSON, SSE)은 그대로 보냅니다.
+"""
+import contextvars
+import gzip
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from fastapi.responses import JSONResponse
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성: 없으면 JSON으로만 응답
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 gzip만 사용
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPE = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+VARY = (b"vary", b"Accept, Accept-Encoding, X-Author-Table")
+
+
+@dataclass(frozen=True)
+class Negotiation:
+    format: str = "json"  # json, msgpack
+    compression: Optional[str] = None  # br, gzip
+    authors: bool = False
+
+    @property
+    def plain(self) -> bool:
+        return self.format == "json" and not self.authors
+
+
+PLAIN = Negotiation()
+_current: contextvars.ContextVar[Negotiation] = contextvars.ContextVar("encoding", default=PLAIN)
+
+
+def _qualities(header: str) -> Dict[str, float]:
+    """`a/b;q=0.5, c` -> {"a/b": 0.5, "c": 1.0}"""
+    result = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        result[name.strip().lower()] = q
+    return result
+
+
+def negotiate(accept: str = "", accept_encoding: str = "", author_table: str = "") -> Negotiation:
+    fmt = "json"
+    if msgpack is not None and accept:
+        types = _qualities(accept)
+        q_msgpack = max((types.get(t, 0.0) for t in MSGPACK_TYPES), default=0.0)
+        q_json = max(types.get(JSON_TYPE, 0.0), types.get("*/*", 0.0))
+        if q_msgpack > 0 and q_msgpack >= q_json:
+            fmt = "msgpack"
+    compression = None
+    if accept_encoding:
+        encodings = _qualities(accept_encoding)
+        if brotli is not None and encodings.get("br", 0.0) > 0:
+            compression = "br"
+        elif encodings.get("gzip", 0.0) > 0:
+            compression = "gzip"
+    return Negotiation(fmt, compression, author_table.strip() in ("1", "true"))
+
+
+def current() -> Negotiation:
+    """지금 처리 중인 요청이 받기로 한 인코딩 (미들웨어 밖에서는 기본값)"""
+    return _current.get()
+
+
+def dedupe_authors(payload: Any) -> dict:
+    """반복되는 author 객체를 표로 모음. 행의 author는 표의 번호로 바뀜"""
+    table = []
+    index: Dict[Tuple, int] = {}
+
+    def walk(value):
+        if isinstance(value, list):
+            for item in value:
+                walk(item)
+        elif isinstance(value, dict):
+            author = value.get("author")
+            if isinstance(author, dict):
+                key = tuple(author.items())
+                if key not in index:
+                    index[key] = len(table)
+                    table.append(author)
+                value["author"] = index[key]
+            for item in value.values():
+                if isinstance(item, (list, dict)):
+                    walk(item)
+
+    walk(payload)
+    return {"authors": table, "data": payload}
+
+
+def compress(body: bytes, compression: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """(본문, Content-Encoding). 작은 응답은 압축하지 않음"""
+    if compression is None or len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    if compression == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+
+
+def encode(body: bytes, negotiation: Negotiation) -> Tuple[bytes, str]:
+    """JSON 본문을 요청한 형식으로 바꿈. (본문, Content-Type)"""
+    if negotiation.plain:
+        return body, JSON_TYPE
+    payload = orjson.loads(body)
+    if negotiation.authors:
+        payload = dedupe_authors(payload)
+    if negotiation.format == "msgpack":
+        return msgpack.packb(payload), MSGPACK_TYPE
+    return orjson.dumps(payload), JSON_TYPE
+
+
+class CompactResponse(JSONResponse):
+    """orjson으로 직렬화하는 JSON 응답"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class CompactEncodingMiddleware:
+    """JSON 응답을 요청에 맞게 MessagePack/작성자 표로 바꾸고 압축하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {}
+        for name, value in scope["headers"]:
+            if name in (b"accept", b"accept-encoding", b"x-author-table"):
+                headers[name] = value.decode("latin-1")
+        negotiation = negotiate(
+            headers.get(b"accept", ""), headers.get(b"accept-encoding", ""), headers.get(b"x-author-table", "")
+        )
+        token = _current.set(negotiation)
+        try:
+            if scope["method"] == "HEAD":
+                await self.app(scope, receive, send)
+            else:
+                await self.app(scope, receive, _EncodingSend(send, negotiation))
+        finally:
+            _current.reset(token)
+
+
+class _EncodingSend:
+    """응답 시작 메시지를 보고 변환할 응답이면 본문을 모아 한 번에 변환해서 보냄"""
+
+    def __init__(self, send, negotiation: Negotiation):
+        self.send = send
+        self.negotiation = negotiation
+        self.start = None
+        self.chunks = []
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if self.passthrough:
+            await self.send(message)
+            return
+        if message["type"] == "http.response.start":
+            headers = {name.lower(): value for name, value in message.get("headers", [])}
+            content_type = headers.get(b"content-type", b"")
+            if (
+                not content_type.startswith(JSON_TYPE.encode())
+                or b"content-encoding" in headers
+                or message["status"] in (204, 304)
+            ):
+                self.passthrough = True
+                await self.send(message)
+                return
+            if self.negotiation == PLAIN:
+                # 바꿀 것이 없는 요청: 캐시가 표현을 구분하도록 Vary만 붙임
+                self.passthrough = True
+                if b"vary" not in headers:
+                    message = {**message, "headers": [*message.get("headers", []), VARY]}
+                await self.send(message)
+                return
+            self.start = message
+            return
+        if message["type"] == "http.response.pathsend":
+            # 파일 응답을 서버가 직접 보내려는 경우(pathsend 확장): 변환해야 하므로 읽어서 보냄
+            with open(message["path"], "rb") as f:
+                self.chunks.append(f.read())
+        elif message["type"] == "http.response.body":
+            self.chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+        else:
+            await self.send(message)
+            return
+        body, content_type = encode(b"".join(self.chunks), self.negotiation)
+        body, content_encoding = compress(body, self.negotiation.compression)
+        headers = [
+            (name, value) for name, value in self.start.get("headers", [])
+            if name.lower() not in (b"content-length", b"content-type", b"vary")
+        ]
+        headers.append((b"content-type", content_type.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+        headers.append(VARY)
+        if content_encoding:
+            headers.append((b"content-encoding", content_encoding.encode()))
+        await self.send({**self.start, "headers": headers})
+        await self.send({"type": "http.response.body", "body": body})
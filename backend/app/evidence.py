@@ -0,0 +1,90 @@
+"""근거 자료 요약 저장
+
+근거 행(`evidence`)의 요약은 저장할 때 한 번 만들어 `summary`에 넣고, 조회 API는 저장된 요약을 그대로 보냅니다.
+
+- `summarize_rows`: 새 근거 행들을 한 번에 요약합니다(주장/반박 작성 후의 근거 저장 작업, 일괄 가져오기).
+  같은 기사를 여러 글이 인용하는 경우가 많으므로, 본문 해시(`summary_key`)가 같은 기존 행의 요약을 먼저
+  DB에서 찾아 쓰고 나머지만 `summarizer.summarize_many`로 계산합니다.
+- `backfill`: 요약이 없거나 이전 버전 알고리즘으로 만든 행(본문이 빈 행 제외)을 id 순서로 SUMMARY_BATCH개씩 채웁니다.
+  EVIDENCE_SUMMARY_INTERVAL_SECONDS마다 주기 작업으로 돌고, `python manage.py summarize-evidence`로도 실행합니다.
+"""
+import os
+from typing import Dict, Iterable, List, Set
+
+from app import models, snapshots, summarizer
+from app.database import SessionLocal
+from app.scheduler import periodic
+
+SUMMARY_BATCH = int(os.getenv("SUMMARY_BATCH", "256"))
+BACKFILL_INTERVAL_SECONDS = float(os.getenv("EVIDENCE_SUMMARY_INTERVAL_SECONDS", "300"))
+
+
+def _stored(db, keys: Iterable[str]) -> Dict[str, str]:
+    """이미 요약된 같은 본문의 {키: 요약}"""
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    rows = db.query(models.Evidence.summary_key, models.Evidence.summary).filter(
+        models.Evidence.summary_key.in_(keys), models.Evidence.summary.is_not(None)
+    ).distinct()
+    return {key: summary for key, summary in rows}
+
+
+def summarize_rows(db, rows: List[models.Evidence]) -> None:
+    """근거 행들의 summary/summary_key를 채웁니다. (커밋은 호출자가 수행)"""
+    keys = [summarizer.key(row.text) if row.text else None for row in rows]
+    summaries = summarizer.summarize_many(
+        [row.text for row in rows], known=_stored(db, [key for key in keys if key])
+    )
+    for row, key, summary in zip(rows, keys, summaries):
+        row.summary_key = key
+        row.summary = summary
+
+
+def _topic_ids(db, rows: List[models.Evidence]) -> Set[int]:
+    claim_ids = {row.claim_id for row in rows if row.claim_id}
+    rebuttal_ids = {row.rebuttal_id for row in rows if row.rebuttal_id}
+    topic_ids = set()
+    if rebuttal_ids:
+        claim_ids |= {claim_id for (claim_id,) in db.query(models.Rebuttal.claim_id).filter(
+            models.Rebuttal.id.in_(rebuttal_ids)
+        )}
+    if claim_ids:
+        topic_ids = {topic_id for (topic_id,) in db.query(models.Claim.topic_id).filter(
+            models.Claim.id.in_(claim_ids)
+        ).distinct()}
+    return topic_ids
+
+
+def backfill(db, batch: int = SUMMARY_BATCH, limit: int = 0) -> int:
+    """요약이 없거나 오래된 근거 행을 채웁니다. limit개(0이면 전부)까지 처리하고 처리한 행 수를 반환합니다."""
+    current = f"{summarizer.SUMMARY_VERSION}:%"
+    done, last_id = 0, 0
+    while not limit or done < limit:
+        size = min(batch, limit - done) if limit else batch
+        rows = db.query(models.Evidence).filter(
+            models.Evidence.id > last_id,
+            # 빈 본문은 요약할 것이 없어 summary_key가 계속 비어 있으므로 제외
+            models.Evidence.text.is_not(None), models.Evidence.text != "",
+            (models.Evidence.summary_key.is_(None)) | (models.Evidence.summary_key.not_like(current)),
+        ).order_by(models.Evidence.id).limit(size).all()
+        if not rows:
+            break
+        summarize_rows(db, rows)
+        topic_ids = _topic_ids(db, rows)
+        db.commit()
+        # 요약도 토론 화면 스냅샷에 들어가므로 주제를 다시 만들도록 알림
+        for topic_id in topic_ids:
+            snapshots.publisher.mark(topic_id)
+        done += len(rows)
+        last_id = rows[-1].id
+    return done
+
+
+@periodic("evidence-summaries", BACKFILL_INTERVAL_SECONDS, single=True)
+def backfill_summaries():
+    db = SessionLocal()
+    try:
+        backfill(db, limit=SUMMARY_BATCH * 8)
+    finally:
+        db.close()
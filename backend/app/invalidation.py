@@ -0,0 +1,287 @@
+"""워커 프로세스 간 캐시 무효화 버스
+
+uvicorn 워커를 여러 개 띄우면 메모리 캐시(주제 랭킹, 유사 주장 색인 등)는 쓰기를 처리한
+워커에서만 갱신됩니다. 쓰기 경로에서 `bus.publish(채널, data)`로 이벤트를 보내면 다른 워커가
+같은 채널에 등록된 핸들러로 자기 캐시를 고칩니다.
+
+- 이벤트에는 전송 계층이 매기는 단조 증가 버전이 붙고, 워커는 마지막으로 적용한 버전
+  (`bus.version`)부터 이어서 읽습니다. 자기가 보낸 이벤트는 이미 적용했으므로 건너뜁니다.
+- publish는 메모리에 모아 두기만 하고, 주기 작업(`pump`)이 POLL_INTERVAL_SECONDS마다 모인
+  이벤트를 한 번에 보내고 새 이벤트를 받아 적용합니다. 요청 경로에는 쓰기가 추가되지 않습니다.
+- 오래된 이벤트는 RETENTION_SECONDS 뒤 지워집니다. 그보다 오래 멈췄던 워커는 놓친 구간을
+  감지하고(`on_gap` 핸들러) 캐시 전체를 다시 읽습니다. 워커가 죽어서 보내지 못한 이벤트도
+  각 캐시의 주기적 전체 갱신으로 결국 맞춰집니다.
+
+전송 계층은 INVALIDATION_TRANSPORT로 고릅니다.
+
+- `sqlite` (기본값): 같은 DB의 `invalidation_log` 테이블. 한 호스트(같은 DB 파일)의 워커용
+- `memory`: 프로세스 하나 안에서만 전달 (워커 1개, 벤치마크)
+- `패키지.모듈:팩토리`: Redis 등 공유 브로커 어댑터. 팩토리는 `Transport`를 반환하면 됩니다.
+"""
+import abc
+import importlib
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+
+from app import models
+from app.scheduler import periodic
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT = os.getenv("INVALIDATION_TRANSPORT", "sqlite")
+POLL_INTERVAL_SECONDS = float(os.getenv("INVALIDATION_POLL_SECONDS", "0.2"))
+RETENTION_SECONDS = float(os.getenv("INVALIDATION_RETENTION_SECONDS", "3600"))
+# 한 번에 받아 적용할 최대 이벤트 수
+BATCH_SIZE = 1000
+
+
+@dataclass
+class Event:
+    version: int
+    channel: str
+    data: dict
+    origin: str
+
+
+class Transport(abc.ABC):
+    """무효화 이벤트 전송 계층 인터페이스"""
+
+    @abc.abstractmethod
+    def send(self, origin: str, events: List[tuple]) -> None:
+        """(channel, data) 목록을 보냅니다. 버전은 전송 계층이 순서대로 매깁니다."""
+
+    @abc.abstractmethod
+    def receive(self, after: int, limit: int) -> List[Event]:
+        """버전이 after보다 큰 이벤트를 버전 순으로 반환"""
+
+    @abc.abstractmethod
+    def head(self) -> int:
+        """지금까지 매긴 가장 큰 버전 (없으면 0)"""
+
+    @abc.abstractmethod
+    def oldest(self) -> Optional[int]:
+        """아직 남아 있는 가장 작은 버전 (없으면 None)"""
+
+    def prune(self, older_than: float) -> int:
+        """older_than초보다 오래된 이벤트를 지우고 지운 수를 반환 (보관 기간이 따로 있으면 그대로 0)"""
+        return 0
+
+
+class MemoryTransport(Transport):
+    def __init__(self):
+        self._events: List[Event] = []
+        self._lock = threading.Lock()
+        self._head = 0
+
+    def send(self, origin, events):
+        with self._lock:
+            for channel, data in events:
+                self._head += 1
+                self._events.append(Event(self._head, channel, data, origin))
+
+    def receive(self, after, limit):
+        with self._lock:
+            return [e for e in self._events if e.version > after][:limit]
+
+    def head(self):
+        return self._head
+
+    def oldest(self):
+        with self._lock:
+            return self._events[0].version if self._events else None
+
+
+class SQLiteTransport(Transport):
+    """`invalidation_log` 테이블을 쓰는 전송 계층. 버전은 AUTOINCREMENT id"""
+
+    def __init__(self, engine=None):
+        self._engine = engine
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from app.database import engine
+
+            self._engine = engine
+        return self._engine
+
+    def send(self, origin, events):
+        table = models.InvalidationEvent.__table__
+        now = datetime.utcnow()
+        with self.engine.begin() as conn:
+            conn.execute(insert(table), [
+                {"channel": channel, "origin": origin, "payload": json.dumps(data, ensure_ascii=False), "created_at": now}
+                for channel, data in events
+            ])
+
+    def receive(self, after, limit):
+        table = models.InvalidationEvent.__table__
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.channel, table.c.payload, table.c.origin)
+                .where(table.c.id > after).order_by(table.c.id).limit(limit)
+            ).all()
+        return [Event(version, channel, json.loads(payload), origin) for version, channel, payload, origin in rows]
+
+    def head(self):
+        table = models.InvalidationEvent.__table__
+        with self.engine.connect() as conn:
+            # 지워진 행의 id도 다시 쓰지 않도록 sqlite_sequence의 값을 우선 사용
+            seq = conn.exec_driver_sql(
+                "SELECT seq FROM sqlite_sequence WHERE name = ?", (table.name,)
+            ).scalar() if self._has_sequence(conn) else None
+            return seq or conn.execute(select(func.max(table.c.id))).scalar() or 0
+
+    @staticmethod
+    def _has_sequence(conn) -> bool:
+        return conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'"
+        ).first() is not None
+
+    def oldest(self):
+        table = models.InvalidationEvent.__table__
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.min(table.c.id))).scalar()
+
+    def prune(self, older_than):
+        table = models.InvalidationEvent.__table__
+        with self.engine.begin() as conn:
+            result = conn.execute(delete(table).where(
+                table.c.created_at < datetime.utcnow() - timedelta(seconds=older_than)
+            ))
+        return result.rowcount
+
+
+_transports: Dict[str, Callable[[], Transport]] = {
+    "sqlite": SQLiteTransport,
+    "memory": MemoryTransport,
+}
+
+
+def register_transport(name: str, factory: Callable[[], Transport]) -> None:
+    _transports[name] = factory
+
+
+def create_transport(name: str = TRANSPORT) -> Transport:
+    if name in _transports:
+        return _transports[name]()
+    module_name, _, attr = name.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+class InvalidationBus:
+    def __init__(self, transport: Optional[Transport] = None):
+        self.transport = transport
+        self.origin = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.version: Optional[int] = None  # 마지막으로 읽은 버전 (None이면 아직 시작 전)
+        self.applied = 0
+        self.gaps = 0
+        self._handlers: Dict[str, List[Callable[[dict], None]]] = {}
+        self._gap_handlers: List[Callable[[], None]] = []
+        self._outbox: List[tuple] = []
+        self._lock = threading.Lock()
+        self._pump_lock = threading.Lock()
+
+    def on(self, channel: str):
+        """채널 이벤트 핸들러 `func(data)`를 등록하는 데코레이터"""
+        def decorator(func):
+            self._handlers.setdefault(channel, []).append(func)
+            return func
+        return decorator
+
+    def on_gap(self, func):
+        """놓친 이벤트가 있을 때 호출할 핸들러 (캐시 전체를 다시 읽어야 함)"""
+        self._gap_handlers.append(func)
+        return func
+
+    def publish(self, channel: str, data: dict) -> None:
+        """다른 워커에 보낼 이벤트를 모아 둡니다. 어느 스레드에서든 호출할 수 있습니다."""
+        with self._lock:
+            self._outbox.append((channel, data))
+
+    def pump(self) -> int:
+        """모인 이벤트를 보내고 다른 워커의 새 이벤트를 적용합니다. 적용한 이벤트 수를 반환합니다."""
+        with self._pump_lock:
+            if self.transport is None:
+                self.transport = create_transport()
+            with self._lock:
+                outgoing, self._outbox = self._outbox, []
+            if self.version is None:
+                # 기동 시점의 캐시는 DB에서 새로 읽으므로 그 이전 이벤트는 필요 없음
+                self.version = self.transport.head()
+            if outgoing:
+                try:
+                    self.transport.send(self.origin, outgoing)
+                except Exception:
+                    with self._lock:
+                        self._outbox = outgoing + self._outbox
+                    raise
+
+            oldest = self.transport.oldest()
+            if oldest is None:
+                # 남은 이벤트가 없어도 그 사이 매겨진 버전이 있으면 전부 지워진 것
+                head = self.transport.head()
+                missed_to = head if head > self.version else None
+            else:
+                missed_to = oldest - 1 if oldest > self.version + 1 else None
+            if missed_to is not None:
+                # 보관 기간보다 오래 멈춰 있었음: 놓친 구간은 캐시 전체를 다시 읽어 메움
+                self.gaps += 1
+                self.version = missed_to
+                for handler in self._gap_handlers:
+                    self._call(handler)
+
+            applied = 0
+            while True:
+                events = self.transport.receive(self.version, BATCH_SIZE)
+                for event in events:
+                    if event.origin != self.origin:
+                        for handler in self._handlers.get(event.channel, ()):
+                            self._call(handler, event.data)
+                        applied += 1
+                    self.version = event.version
+                if len(events) < BATCH_SIZE:
+                    break
+            self.applied += applied
+            return applied
+
+    @staticmethod
+    def _call(handler, *args):
+        try:
+            handler(*args)
+        except Exception:
+            logger.exception("invalidation handler %s failed", getattr(handler, "__name__", handler))
+
+    def status(self) -> dict:
+        head = self.transport.head() if self.transport is not None else None
+        return {
+            "origin": self.origin,
+            "version": self.version,
+            "head": head,
+            "lag": head - self.version if head is not None and self.version is not None else None,
+            "applied": self.applied,
+            "gaps": self.gaps,
+            "pending": len(self._outbox),
+        }
+
+
+bus = InvalidationBus()
+
+
+@periodic("invalidation-bus", POLL_INTERVAL_SECONDS)
+def pump_bus():
+    bus.pump()
+
+
+@periodic("invalidation-prune", 600, run_on_start=False, single=True)
+def prune_bus():
+    if bus.transport is not None:
+        bus.transport.prune(RETENTION_SECONDS)
@@ -0,0 +1,273 @@
+"""SQLite 기반 백그라운드 작업 큐
+
+요청 처리 중에 꼭 같이 끝낼 필요가 없는 부가 작업(알림 생성, 근거 저장 등)을 `jobs` 테이블에
+넣어 두고 워커가 나중에 실행합니다. 별도 브로커 없이 같은 DB를 사용합니다.
+
+- 등록: 라우터 모듈에서 `@handler("이름")`으로 `func(db, payload)`를 등록합니다.
+- 넣기: `enqueue(db, "이름", payload, key=...)`는 호출자의 트랜잭션에 작업 행을 추가하므로
+  본 행과 작업이 함께 커밋되거나 함께 롤백됩니다. 같은 `key`의 작업은 한 번만 들어갑니다.
+- 실행: 워커는 실행할 작업 하나를 UPDATE ... RETURNING 한 문장으로 가져가면서 임대 토큰과
+  `locked_until`(가시성 타임아웃)을 기록합니다. 그 시각까지 끝내지 못한 작업은 다른 워커가 다시
+  가져갑니다. 핸들러의 DB 변경과 완료 표시는 같은 트랜잭션으로 커밋되며, 임대를 잃은 워커의
+  결과는 롤백됩니다.
+- 실패: 지수 백오프(지터 포함)로 다시 시도하고 `max_attempts`를 넘으면 failed로 남깁니다.
+
+워커는 앱 안에서 주기 작업으로 돌거나(JOB_INLINE_WORKER=1, 기본값, 웹 워커 중 하나만 실행)
+`python manage.py worker`로 별도 프로세스로 띄웁니다. 큐가 비어 있으면 읽기만 하고 쓰기 잠금을 잡지 않습니다.
+"""
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from app import models
+from app.database import SessionLocal
+from app.scheduler import periodic
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+VISIBILITY_TIMEOUT_SECONDS = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "60"))
+RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "600"))
+POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "0.5"))
+# 완료된 작업 행을 남겨 두는 시간 (통계용)
+RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+INLINE_WORKER = os.getenv("JOB_INLINE_WORKER", "1") == "1"
+# 통계에서 지연 시간을 계산할 최근 완료 작업 수
+STATS_SAMPLE = 1000
+
+
+@dataclass
+class Handler:
+    name: str
+    func: Callable[..., None]
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    timeout: float = VISIBILITY_TIMEOUT_SECONDS
+
+
+_handlers: Dict[str, Handler] = {}
+
+
+def handler(name: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS, timeout: float = VISIBILITY_TIMEOUT_SECONDS):
+    """작업 핸들러 `func(db, payload)`를 등록하는 데코레이터. 핸들러는 커밋하지 않습니다."""
+    def decorator(func):
+        _handlers[name] = Handler(name, func, max_attempts, timeout)
+        return func
+    return decorator
+
+
+def enqueue(db, name: str, payload: dict, key: Optional[str] = None, delay: float = 0) -> None:
+    """작업을 호출자의 트랜잭션에 추가합니다. (커밋은 호출자가 수행)
+
+    key가 같은 작업이 이미 있으면 아무것도 하지 않습니다.
+    """
+    registered = _handlers.get(name)
+    stmt = insert(models.Job.__table__).values(
+        name=name,
+        payload=json.dumps(payload, ensure_ascii=False),
+        status="queued",
+        attempts=0,
+        max_attempts=registered.max_attempts if registered else DEFAULT_MAX_ATTEMPTS,
+        idempotency_key=key,
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+        created_at=datetime.utcnow(),
+    )
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["idempotency_key"]))
+
+
+def backoff(attempts: int) -> float:
+    """attempts번째 실패 후 다음 시도까지 기다릴 초 (지수 증가, 상한, 0.5~1배 지터)"""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _claim(db, token: str):
+    """실행할 작업 하나를 임대합니다. 없으면 None"""
+    table = models.Job.__table__
+    now = datetime.utcnow()
+    ready = or_(
+        (table.c.status == "queued") & (table.c.run_at <= now),
+        # 가시성 타임아웃이 지난 작업 (워커가 죽었거나 너무 오래 걸림)
+        (table.c.status == "running") & (table.c.locked_until < now),
+    )
+    while True:
+        # 큐가 비어 있을 때는 읽기만 하고 쓰기 잠금을 잡지 않음
+        job_id = db.execute(
+            select(table.c.id).where(ready).order_by(table.c.run_at, table.c.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            return None
+        row = db.execute(
+            update(table).where(table.c.id == job_id, ready).values(
+                status="running",
+                attempts=table.c.attempts + 1,
+                locked_by=token,
+                # 핸들러별 타임아웃은 가져온 뒤에 다시 설정
+                locked_until=now + timedelta(seconds=VISIBILITY_TIMEOUT_SECONDS),
+                started_at=now,
+            ).returning(table.c.id, table.c.name, table.c.payload, table.c.attempts, table.c.max_attempts)
+        ).first()
+        db.commit()
+        if row is not None:
+            return row
+        # 다른 워커가 먼저 가져감: 다음 작업을 다시 고름
+
+
+def _release(db, job_id: int, token: str, **values) -> bool:
+    """임대를 가진 경우에만 작업 상태를 바꿉니다."""
+    table = models.Job.__table__
+    result = db.execute(
+        update(table).where(table.c.id == job_id, table.c.locked_by == token).values(locked_by=None, **values)
+    )
+    return result.rowcount == 1
+
+
+def _extend(db, job_id: int, token: str, seconds: float) -> None:
+    table = models.Job.__table__
+    db.execute(update(table).where(table.c.id == job_id, table.c.locked_by == token).values(
+        locked_until=datetime.utcnow() + timedelta(seconds=seconds)
+    ))
+    db.commit()
+
+
+def run_next(db, worker_id: str = "") -> Optional[str]:
+    """작업 하나를 실행하고 결과(done, queued, failed, lost)를 반환합니다. 실행할 작업이 없으면 None"""
+    token = f"{worker_id or socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    job = _claim(db, token)
+    if job is None:
+        return None
+    job_id, name, payload, attempts, max_attempts = job
+    registered = _handlers.get(name)
+    try:
+        if registered is None:
+            raise LookupError(f"등록되지 않은 작업 핸들러: {name}")
+        if attempts > max_attempts:
+            raise TimeoutError("가시성 타임아웃 안에 끝나지 않았습니다")
+        if registered.timeout != VISIBILITY_TIMEOUT_SECONDS:
+            _extend(db, job_id, token, registered.timeout)
+        registered.func(db, json.loads(payload))
+        # 핸들러의 변경과 완료 표시를 한 트랜잭션으로 커밋
+        if not _release(db, job_id, token, status="done", finished_at=datetime.utcnow(), last_error=None):
+            db.rollback()
+            logger.warning("job %s lease lost; result discarded", job_id)
+            return "lost"
+        db.commit()
+        return "done"
+    except Exception as e:
+        db.rollback()
+        logger.exception("job %s (%s) attempt %s failed", job_id, name, attempts)
+        if attempts >= max_attempts or isinstance(e, TimeoutError):
+            status, run_at = "failed", datetime.utcnow()
+        else:
+            status, run_at = "queued", datetime.utcnow() + timedelta(seconds=backoff(attempts))
+        finished_at = run_at if status == "failed" else None
+        _release(db, job_id, token, status=status, run_at=run_at, finished_at=finished_at,
+                 last_error=f"{type(e).__name__}: {e}"[:2000])
+        db.commit()
+        return status
+
+
+def drain(max_jobs: Optional[int] = None, worker_id: str = "") -> int:
+    """실행할 작업이 없을 때까지(또는 max_jobs개) 실행합니다. 실행한 작업 수를 반환합니다."""
+    db = SessionLocal()
+    count = 0
+    try:
+        while max_jobs is None or count < max_jobs:
+            if run_next(db, worker_id) is None:
+                break
+            count += 1
+    finally:
+        db.close()
+    return count
+
+
+def work(stop: Optional[threading.Event] = None, poll_interval: float = POLL_INTERVAL_SECONDS,
+         worker_id: str = "") -> None:
+    """stop이 설정될 때까지 큐를 비우고 poll_interval마다 다시 확인합니다. (전용 워커 프로세스용)"""
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            if drain(worker_id=worker_id):
+                continue
+        except Exception:
+            logger.exception("job worker loop failed")
+        stop.wait(poll_interval)
+
+
+def cleanup(db, retention_hours: float = RETENTION_HOURS) -> int:
+    """보관 기간이 지난 완료 작업을 지웁니다. 실패한 작업은 확인할 수 있도록 남깁니다."""
+    table = models.Job.__table__
+    result = db.execute(delete(table).where(
+        table.c.status == "done",
+        table.c.finished_at < datetime.utcnow() - timedelta(hours=retention_hours),
+    ))
+    db.commit()
+    return result.rowcount
+
+
+def _pct(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * pct / 100))], 3)
+
+
+def stats(db) -> dict:
+    """큐 길이(이름/상태별), 가장 오래 기다린 작업, 최근 완료 작업의 지연 시간"""
+    table = models.Job.__table__
+    now = datetime.utcnow()
+    by_name: Dict[str, Dict[str, int]] = {}
+    for name, status, count in db.execute(
+        select(table.c.name, table.c.status, func.count()).group_by(table.c.name, table.c.status)
+    ):
+        by_name.setdefault(name, {})[status] = count
+    oldest = db.execute(
+        select(func.min(table.c.run_at)).where(table.c.status == "queued", table.c.run_at <= now)
+    ).scalar()
+    recent = db.execute(
+        select(table.c.created_at, table.c.started_at, table.c.finished_at)
+        .where(table.c.status == "done").order_by(table.c.finished_at.desc()).limit(STATS_SAMPLE)
+    ).all()
+    latency = [(finished - created).total_seconds() for created, _, finished in recent]
+    runtime = [(finished - started).total_seconds() for _, started, finished in recent]
+    totals: Dict[str, int] = {}
+    for counts in by_name.values():
+        for status, count in counts.items():
+            totals[status] = totals.get(status, 0) + count
+    return {
+        "depth": totals.get("queued", 0) + totals.get("running", 0),
+        "statuses": totals,
+        "handlers": [{"name": name, "statuses": counts} for name, counts in sorted(by_name.items())],
+        "oldest_ready_seconds": round((now - oldest).total_seconds(), 3) if oldest else None,
+        "latency_p50_seconds": _pct(latency, 50),
+        "latency_p95_seconds": _pct(latency, 95),
+        "runtime_p50_seconds": _pct(runtime, 50),
+        "runtime_p95_seconds": _pct(runtime, 95),
+        "sample": len(recent),
+    }
+
+
+if INLINE_WORKER:
+    # 웹 워커 중 하나만 큐를 확인 (처리량이 더 필요하면 manage.py worker를 여러 개 띄움)
+    @periodic("job-worker", POLL_INTERVAL_SECONDS, single=True)
+    def inline_worker():
+        drain(worker_id="inline")
+
+
+@periodic("job-cleanup", 3600, run_on_start=False, single=True)
+def cleanup_job():
+    db = SessionLocal()
+    try:
+        cleanup(db)
+    finally:
+        db.close()
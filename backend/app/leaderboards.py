@@ -0,0 +1,311 @@
+"""카테고리/지역별 주제 랭킹 (미리 계산된 정렬 구조)
+
+주제 목록(`GET /api/topics/`)의 `best`/`trend` 정렬을 요청마다 집계하지 않도록,
+필터 조합(category, region, district, topic_type)마다 정렬된 리스트를 메모리에 유지합니다.
+
+- best: 주제에 속한 주장들의 votes 합계
+- trend: 활동(주장/반박/투표)마다 가중치를 더하고 반감기에 따라 감쇠하는 "hot" 점수
+
+백그라운드 작업이 주기적으로 DB에서 전체를 다시 계산하고, 그 사이의 쓰기는
+라우터에서 증분으로 반영합니다. 증분은 무효화 버스(app/invalidation.py)로 다른 워커에도 전달됩니다.
+재계산 도중 들어온 증분은 모아 두었다가 새 정렬 구조에 다시 적용한 뒤 교체합니다.
+"""
+import math
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from app import models
+from app.database import SessionLocal
+from app.invalidation import bus
+from app.scheduler import periodic
+
+REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "60"))
+TREND_HALF_LIFE_HOURS = float(os.getenv("TREND_HALF_LIFE_HOURS", "24"))
+# 반감기의 이 배수보다 오래된 활동은 점수에 거의 기여하지 않으므로 집계에서 제외
+TREND_WINDOW_HALF_LIVES = 10
+
+# 활동 종류별 trend 가중치
+WEIGHT_TOPIC = 1.0
+WEIGHT_CLAIM = 3.0
+WEIGHT_REBUTTAL = 2.0
+WEIGHT_VOTE = 1.0
+
+SORTS = ("best", "trend")
+
+BucketKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+@dataclass
+class TopicEntry:
+    id: int
+    title: str
+    category: Optional[str]
+    region: Optional[str]
+    district: Optional[str]
+    topic_type: Optional[str]
+    created_at: datetime
+    vote_sum: int = 0
+    hot: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "category": self.category,
+            "region": self.region,
+            "district": self.district,
+            "topic_type": self.topic_type,
+            "created_at": self.created_at,
+        }
+
+    def bucket_keys(self) -> List[BucketKey]:
+        """이 주제가 속하는 모든 필터 조합 (각 필드는 값 또는 None=필터 없음)"""
+        fields = (self.category, self.region, self.district, self.topic_type)
+        choices = [(None,) if value is None else (value, None) for value in fields]
+        return list(product(*choices))
+
+
+def bucket_key(category=None, region=None, district=None, topic_type=None) -> BucketKey:
+    return (category or None, region or None, district or None, topic_type or None)
+
+
+class TopicLeaderboard:
+    def __init__(self, half_life_hours: float = TREND_HALF_LIFE_HOURS):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._half_life = half_life_hours * 3600.0
+        self._epoch = time.time()  # hot 점수의 기준 시각
+        self._topics: Dict[int, TopicEntry] = {}
+        # (필터 조합, 정렬) -> [(-점수, -topic_id), ...] 오름차순
+        self._buckets: Dict[Tuple[BucketKey, str], List[Tuple[float, int]]] = {}
+        # 재계산 중이면 그 사이 들어온 증분 [(topic_id, vote_delta, activity, when) 또는 TopicEntry, ...]
+        self._pending: Optional[list] = None
+        self.ready = False
+        self.refreshed_at: Optional[float] = None
+
+    # 점수 계산 ----------------------------------------------------------
+
+    def _weight_at(self, when: datetime, epoch: float) -> float:
+        """`when` 시각의 활동 1단위가 기준 시각 `epoch`에서 갖는 감쇠 가중치"""
+        ts = when.timestamp() if when.tzinfo else (when - datetime(1970, 1, 1)).total_seconds()
+        return math.pow(2.0, (ts - epoch) / self._half_life)
+
+    @staticmethod
+    def _score(entry: TopicEntry, sort: str) -> float:
+        return float(entry.vote_sum) if sort == "best" else entry.hot
+
+    def _insert(self, buckets, entry: TopicEntry):
+        for key in entry.bucket_keys():
+            for sort in SORTS:
+                insort(buckets.setdefault((key, sort), []), (-self._score(entry, sort), -entry.id))
+
+    def _remove(self, entry: TopicEntry):
+        for key in entry.bucket_keys():
+            for sort in SORTS:
+                items = self._buckets.get((key, sort))
+                if not items:
+                    continue
+                item = (-self._score(entry, sort), -entry.id)
+                index = bisect_left(items, item)
+                if index < len(items) and items[index] == item:
+                    del items[index]
+
+    # 전체 재계산 --------------------------------------------------------
+
+    def refresh(self, db) -> None:
+        """DB에서 모든 주제의 점수를 다시 계산하고 정렬 구조를 교체합니다."""
+        with self._refresh_lock:
+            with self._lock:
+                self._pending = []
+            try:
+                self._refresh(db)
+            finally:
+                with self._lock:
+                    self._pending = None
+
+    def _refresh(self, db) -> None:
+        epoch = time.time()
+        now = datetime.utcnow()
+        since = now - timedelta(seconds=self._half_life * TREND_WINDOW_HALF_LIVES)
+
+        topics: Dict[int, TopicEntry] = {}
+        for row in db.query(
+            models.Topic.id, models.Topic.title, models.Topic.category, models.Topic.region,
+            models.Topic.district, models.Topic.topic_type, models.Topic.created_at,
+        ):
+            entry = TopicEntry(*row)
+            if entry.created_at >= since:
+                entry.hot += WEIGHT_TOPIC * self._weight_at(entry.created_at, epoch)
+            topics[entry.id] = entry
+
+        vote_sums = db.query(models.Claim.topic_id, func.coalesce(func.sum(models.Claim.votes), 0)).group_by(
+            models.Claim.topic_id
+        )
+        for topic_id, vote_sum in vote_sums:
+            if topic_id in topics:
+                topics[topic_id].vote_sum = int(vote_sum)
+        # 보관된 주제는 주장이 라이브 테이블에 없으므로 보관 시점의 합계를 사용
+        for topic_id, vote_sum in db.query(models.TopicArchive.topic_id, models.TopicArchive.vote_sum):
+            if topic_id in topics:
+                topics[topic_id].vote_sum += int(vote_sum or 0)
+
+        for topic_id, weight, when in self._recent_activity(db, since):
+            entry = topics.get(topic_id)
+            if entry is not None:
+                entry.hot += weight * self._weight_at(when, epoch)
+
+        buckets: Dict[Tuple[BucketKey, str], List[Tuple[float, int]]] = {}
+        for entry in topics.values():
+            for key in entry.bucket_keys():
+                for sort in SORTS:
+                    buckets.setdefault((key, sort), []).append((-self._score(entry, sort), -entry.id))
+        for items in buckets.values():
+            items.sort()
+
+        with self._lock:
+            self._epoch = epoch
+            self._topics = topics
+            self._buckets = buckets
+            # 읽는 동안 들어온 증분은 새 구조에 다시 적용 (교체로 잃지 않도록)
+            for event in self._pending:
+                if isinstance(event, TopicEntry):
+                    self._apply_entry(event)
+                else:
+                    self._apply(*event)
+            self._pending = None
+            self.ready = True
+            self.refreshed_at = epoch
+
+    @staticmethod
+    def _recent_activity(db, since: datetime):
+        """(topic_id, 가중치, 시각) 형태로 최근 활동을 스트리밍합니다."""
+        claims = db.query(models.Claim.topic_id, models.Claim.created_at).filter(models.Claim.created_at >= since)
+        for topic_id, when in claims.yield_per(5000):
+            yield topic_id, WEIGHT_CLAIM, when
+        rebuttals = db.query(models.Claim.topic_id, models.Rebuttal.created_at).join(
+            models.Claim, models.Rebuttal.claim_id == models.Claim.id
+        ).filter(models.Rebuttal.created_at >= since)
+        for topic_id, when in rebuttals.yield_per(5000):
+            yield topic_id, WEIGHT_REBUTTAL, when
+        claim_votes = db.query(models.Claim.topic_id, models.Vote.created_at).join(
+            models.Claim, models.Vote.claim_id == models.Claim.id
+        ).filter(models.Vote.created_at >= since)
+        for topic_id, when in claim_votes.yield_per(5000):
+            yield topic_id, WEIGHT_VOTE, when
+        rebuttal_votes = db.query(models.Claim.topic_id, models.Vote.created_at).join(
+            models.Rebuttal, models.Vote.rebuttal_id == models.Rebuttal.id
+        ).join(models.Claim, models.Rebuttal.claim_id == models.Claim.id).filter(models.Vote.created_at >= since)
+        for topic_id, when in rebuttal_votes.yield_per(5000):
+            yield topic_id, WEIGHT_VOTE, when
+
+    # 증분 갱신 ----------------------------------------------------------
+
+    def _update(self, topic_id: int, vote_delta: int = 0, activity: float = 0.0,
+                when: Optional[datetime] = None, broadcast: bool = True):
+        when = when or datetime.utcnow()
+        if broadcast:
+            bus.publish("leaderboard", {
+                "topic_id": topic_id, "vote_delta": vote_delta, "activity": activity, "at": when.isoformat(),
+            })
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((topic_id, vote_delta, activity, when))
+            self._apply(topic_id, vote_delta, activity, when)
+
+    def _apply(self, topic_id: int, vote_delta: int, activity: float, when: datetime) -> None:
+        """증분 하나를 현재 구조에 반영 (self._lock을 잡은 상태에서 호출)"""
+        entry = self._topics.get(topic_id)
+        if entry is None:
+            return
+        self._remove(entry)
+        entry.vote_sum += vote_delta
+        if activity:
+            entry.hot += activity * self._weight_at(when, self._epoch)
+        self._insert(self._buckets, entry)
+
+    def _add_entry(self, entry: TopicEntry) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(entry)
+            if self.ready:
+                self._apply_entry(entry)
+
+    def _apply_entry(self, entry: TopicEntry) -> None:
+        """새 주제를 현재 구조에 추가 (self._lock을 잡은 상태에서 호출)"""
+        if entry.id in self._topics:
+            return
+        # 모아 둔 원본은 재계산 후 다시 적용되므로 사본을 넣음
+        entry = replace(entry, hot=WEIGHT_TOPIC * self._weight_at(entry.created_at, self._epoch))
+        self._topics[entry.id] = entry
+        self._insert(self._buckets, entry)
+
+    def add_topic(self, topic: models.Topic) -> None:
+        entry = TopicEntry(
+            topic.id, topic.title, topic.category, topic.region, topic.district, topic.topic_type,
+            topic.created_at,
+        )
+        data = entry.as_dict()
+        data["created_at"] = entry.created_at.isoformat()
+        bus.publish("leaderboard.topic", data)
+        self._add_entry(entry)
+
+    def record_claim(self, topic_id: int) -> None:
+        self._update(topic_id, activity=WEIGHT_CLAIM)
+
+    def record_rebuttal(self, topic_id: int) -> None:
+        self._update(topic_id, activity=WEIGHT_REBUTTAL)
+
+    def record_vote(self, topic_id: int, claim_vote_delta: int = 0) -> None:
+        """투표 반영. 주장에 대한 투표면 votes 변화량을 best 점수에도 반영합니다."""
+        self._update(topic_id, vote_delta=claim_vote_delta, activity=WEIGHT_VOTE)
+
+    def remove_claim(self, topic_id: int, claim_votes: int) -> None:
+        self._update(topic_id, vote_delta=-claim_votes)
+
+    # 조회 ---------------------------------------------------------------
+
+    def top(self, key: BucketKey, sort: str, skip: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """정렬된 주제 목록을 반환합니다. O(skip + limit)"""
+        with self._lock:
+            items = self._buckets.get((key, sort), [])
+            end = len(items) if limit is None else skip + limit
+            return [self._topics[-topic_id].as_dict() for _, topic_id in items[skip:end]]
+
+
+leaderboard = TopicLeaderboard()
+
+
+@bus.on("leaderboard")
+def _apply_remote_update(data: dict):
+    leaderboard._update(
+        data["topic_id"], data["vote_delta"], data["activity"],
+        when=datetime.fromisoformat(data["at"]), broadcast=False,
+    )
+
+
+@bus.on("leaderboard.topic")
+def _apply_remote_topic(data: dict):
+    data = dict(data, created_at=datetime.fromisoformat(data["created_at"]))
+    leaderboard._add_entry(TopicEntry(**data))
+
+
+@bus.on_gap
+def _refresh_after_gap():
+    refresh_leaderboards()
+
+
+@periodic("topic-leaderboards", REFRESH_SECONDS)
+def refresh_leaderboards():
+    db = SessionLocal()
+    try:
+        leaderboard.refresh(db)
+    finally:
+        db.close()
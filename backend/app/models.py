@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import Boolean # Boolean
 
 Base = declarative_base()
@@ -18,6 +18,16 @@ class User(Base):
     level = Column(Integer, default=1)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class Region(Base):
+    """광역(level 1)/기초(level 2) 지역 계층 (app/regions.py)"""
+    __tablename__ = "regions"
+    
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey("regions.id"), nullable=True)  # 기초 지역의 광역 지역
+    code = Column(String, unique=True, nullable=False)  # seoul, seoul/강동구
+    name = Column(String, nullable=False)  # 서울, 강동구
+    level = Column(Integer, nullable=False)
+
 class Topic(Base):
     __tablename__ = "topics"
     
@@ -28,6 +38,13 @@ class Topic(Base):
     district = Column(String)  # 강동구, 고양시, etc.
     topic_type = Column(String)  # topic, region, pledge
     created_at = Column(DateTime, default=datetime.utcnow)
+    archived_at = Column(DateTime, nullable=True)  # 보관된 시각 (app/archive.py)
+    region_id = Column(Integer, ForeignKey("regions.id"), nullable=True)  # 가장 구체적인 지역 (app/regions.py)
+    
+    __table_args__ = (
+        Index("ix_topics_region_district", "region", "district"),
+        Index("ix_topics_region_id", "region_id"),
+    )
     
     claims = relationship("Claim", back_populates="topic")
 
@@ -43,6 +60,21 @@ class Claim(Base):
     votes = Column(Integer, default=0)
     sticker = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # 랭킹용 비정규화 컬럼 (app/ranking.py에서 쓰기 시점과 주기 작업으로 갱신)
+    rebuttal_count = Column(Integer, default=0)
+    last_activity_at = Column(DateTime, default=datetime.utcnow)
+    hot_score = Column(Float, default=0.0)
+    
+    __table_args__ = (
+        Index("ix_claims_topic_hot", "topic_id", "hot_score"),
+        Index("ix_claims_topic_type_hot", "topic_id", "type", "hot_score"),
+        Index("ix_claims_topic_rebuttal_count", "topic_id", "rebuttal_count"),
+        Index("ix_claims_topic_created", "topic_id", "created_at"),
+        # 사용자 활동 피드 (app/routers/users.py)
+        Index("ix_claims_user_created", "user_id", "created_at"),
+        # 최근 활동한 주장만 점수 갱신 (app/ranking.py)
+        Index("ix_claims_last_activity", "last_activity_at"),
+    )
     
     topic = relationship("Topic", back_populates="claims")
     user = relationship("User")
@@ -63,6 +95,12 @@ class Rebuttal(Base):
     votes = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_rebuttals_claim_parent", "claim_id", "parent_id"),
+        Index("ix_rebuttals_parent", "parent_id"),
+        Index("ix_rebuttals_user_created", "user_id", "created_at"),
+    )
+    
     claim = relationship("Claim", back_populates="rebuttals")
     user = relationship("User")
     evidence = relationship("Evidence", back_populates="rebuttal")
@@ -79,6 +117,15 @@ class Evidence(Base):
     text = Column(Text)
     url = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # 저장할 때 만든 추출 요약 (app/evidence.py)
+    summary = Column(Text, nullable=True)
+    summary_key = Column(String, nullable=True)  # "알고리즘 버전:본문 해시", 같은 본문의 요약을 재사용
+    
+    __table_args__ = (
+        Index("ix_evidence_claim", "claim_id"),
+        Index("ix_evidence_rebuttal", "rebuttal_id"),
+        Index("ix_evidence_summary_key", "summary_key"),
+    )
     
     claim = relationship("Claim", back_populates="evidence")
     rebuttal = relationship("Rebuttal", back_populates="evidence")
@@ -93,10 +140,128 @@ class Vote(Base):
     vote_type = Column(String, nullable=False)  # like, dislike
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # 사용자별 투표 조회 (app/vote_store.py)
+    __table_args__ = (
+        Index("ix_votes_user_claim", "user_id", "claim_id"),
+        Index("ix_votes_user_rebuttal", "user_id", "rebuttal_id"),
+        # 대상별 투표 조회 (글을 지울 때 작성자 통계 차감, app/user_stats.py)
+        Index("ix_votes_claim", "claim_id"),
+        Index("ix_votes_rebuttal", "rebuttal_id"),
+    )
+    
     user = relationship("User")
     claim = relationship("Claim")
     rebuttal = relationship("Rebuttal")
 
+class VoteLedger(Base):
+    """오래된 투표의 압축 보관 (app/vote_log.py에서 votes 행을 옮김)
+
+    (대상 종류, 대상 id, 사용자) 키의 WITHOUT ROWID 테이블이라 행 하나가 정수 몇 개로 끝나고
+    별도 인덱스가 없습니다. 시각은 시간 단위(EPOCH 이후 시간 수)로만 남깁니다.
+    """
+    __tablename__ = "vote_ledger"
+    
+    CLAIM, REBUTTAL = 0, 1
+    EPOCH = datetime(2000, 1, 1)
+    
+    kind = Column(Integer, primary_key=True, autoincrement=False)  # 0 주장, 1 반박
+    target_id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    value = Column(Integer, nullable=False)  # 1 like, -1 dislike
+    hour = Column(Integer)
+    
+    __table_args__ = {"sqlite_with_rowid": False}
+    
+    # 투표 라우터가 Vote 행과 같은 방식으로 다룰 수 있도록 맞춘 속성
+    @property
+    def vote_type(self):
+        return "like" if self.value > 0 else "dislike"
+    
+    @vote_type.setter
+    def vote_type(self, vote_type):
+        self.value = 1 if vote_type == "like" else -1
+    
+    @property
+    def created_at(self):
+        return self.EPOCH + timedelta(hours=self.hour) if self.hour is not None else None
+
+class ClaimPartyVote(Base):
+    """주장별/정당별 투표 수 집계 (app/party_votes.py에서 투표와 같은 트랜잭션으로 갱신)"""
+    __tablename__ = "claim_party_votes"
+    
+    claim_id = Column(Integer, ForeignKey("claims.id"), primary_key=True)
+    party = Column(String, primary_key=True)
+    vote_type = Column(String, primary_key=True)  # like, dislike
+    count = Column(Integer, nullable=False, default=0)
+
+class UserStats(Base):
+    """사용자별 작성 수/받은 반응 집계 (app/user_stats.py에서 글/투표와 같은 트랜잭션으로 갱신)"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    claims = Column(Integer, nullable=False, default=0)
+    rebuttals = Column(Integer, nullable=False, default=0)
+    likes_received = Column(Integer, nullable=False, default=0)
+    dislikes_received = Column(Integer, nullable=False, default=0)
+    rebuttals_received = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class ActivityRollup(Base):
+    """주장/주제별 시간·일 단위 활동 집계 (app/rollups.py)"""
+    __tablename__ = "activity_rollups"
+    
+    scope = Column(String, primary_key=True)  # claim, topic
+    target_id = Column(Integer, primary_key=True)
+    granularity = Column(String, primary_key=True)  # hour, day
+    bucket_start = Column(DateTime, primary_key=True)
+    likes = Column(Integer, nullable=False, default=0)
+    dislikes = Column(Integer, nullable=False, default=0)
+    rebuttals = Column(Integer, nullable=False, default=0)
+    claims = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # 기간 내 전체 주제 집계 (트렌드 정렬)
+        Index("ix_rollups_window", "scope", "granularity", "bucket_start"),
+    )
+
+class ClaimSignature(Base):
+    """유사 주장 탐지용 MinHash 서명 (app/similarity.py)"""
+    __tablename__ = "claim_signatures"
+    
+    claim_id = Column(Integer, ForeignKey("claims.id"), primary_key=True)
+    topic_id = Column(Integer, nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_claim_signatures_topic", "topic_id", "claim_id"),
+    )
+
+class TopicArchive(Base):
+    """보관된 주제의 압축 스냅샷 (app/archive.py)"""
+    __tablename__ = "topic_archives"
+    
+    topic_id = Column(Integer, ForeignKey("topics.id"), primary_key=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    last_activity_at = Column(DateTime)
+    claim_count = Column(Integer, default=0)
+    rebuttal_count = Column(Integer, default=0)
+    vote_sum = Column(Integer, default=0)  # 주장 votes 합계 (인기순 정렬용)
+    raw_bytes = Column(Integer, default=0)
+    snapshot = Column(LargeBinary, nullable=False)  # zlib 압축 NDJSON
+
+class ArchivedItem(Base):
+    """보관된 주장/반박 id -> 주제 id"""
+    __tablename__ = "archived_items"
+    
+    kind = Column(String, primary_key=True)  # claim, rebuttal
+    item_id = Column(Integer, primary_key=True)
+    topic_id = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        # 보관할 때 주제의 주장/반박 id 범위로 라이브 행 삭제 (app/archive.py)
+        Index("ix_archived_items_topic", "topic_id", "kind", "item_id"),
+    )
+
 class Report(Base):
     __tablename__ = "reports"
     
@@ -119,4 +284,65 @@ class Notification(Base):
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+class InvalidationEvent(Base):
+    """워커 간 캐시 무효화 이벤트 로그 (app/invalidation.py). id가 이벤트 버전"""
+    __tablename__ = "invalidation_log"
+    
+    id = Column(Integer, primary_key=True)
+    channel = Column(String, nullable=False)
+    origin = Column(String, nullable=False)  # 보낸 워커
+    payload = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    # 지운 이벤트의 id(버전)를 다시 쓰지 않음
+    __table_args__ = {"sqlite_autoincrement": True}
+
+class RefreshToken(Base):
+    """로그인 세션의 리프레시 토큰 (app/sessions.py). 토큰 원문은 저장하지 않고 해시만 저장"""
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    family = Column(String, nullable=False, index=True)  # 로그인 한 번에서 회전으로 이어진 토큰들
+    token_hash = Column(String, unique=True, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    rotated_at = Column(DateTime)  # 새 토큰으로 바꾼 시각 (다시 쓰이면 탈취로 보고 세션 전체를 폐기)
+    revoked_at = Column(DateTime)
+
+class RevokedToken(Base):
+    """폐기된 액세스 토큰/세션 (app/sessions.py). 액세스 토큰이 만료되면 지워도 됨"""
+    __tablename__ = "revoked_tokens"
+    
+    key = Column(String, primary_key=True)  # "jti:<토큰 id>" 또는 "fam:<세션 id>"
+    user_id = Column(Integer, ForeignKey("users.id"))
+    reason = Column(String)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class Job(Base):
+    """백그라운드 작업 큐 (app/jobs.py)"""
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)  # 등록된 핸들러 이름
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    idempotency_key = Column(String, unique=True)  # 같은 키의 작업은 한 번만 등록됨
+    run_at = Column(DateTime, nullable=False)  # 이 시각 이후에 실행 (재시도 대기)
+    locked_by = Column(String)  # 실행 중인 워커의 임대 토큰
+    locked_until = Column(DateTime)  # 이 시각까지 끝내지 못하면 다른 워커가 다시 가져감
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        # 워커가 실행할 작업을 고르는 조회
+        Index("ix_jobs_ready", "status", "run_at"),
+        Index("ix_jobs_finished", "status", "finished_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""정당별 투표 집계
+
+(claim_id, party, vote_type)별 투표 수를 `claim_party_votes` 테이블에 유지합니다.
+투표 라우터가 Vote 행을 바꿀 때 같은 트랜잭션에서 `apply`로 증감하므로, 조회할 때
+votes와 users를 조인해서 그룹핑할 필요가 없습니다. 정당 변경 등으로 어긋난 집계는
+`python manage.py rebuild-party-votes`로 다시 만듭니다. (압축된 투표 `vote_ledger` 포함)
+"""
+from typing import Dict, Iterable, List
+
+from sqlalchemy import delete, func, insert, select, union_all, update
+
+from app import models, vote_log
+
+# 정당 정보가 없는 사용자 (관리자 계정과 같은 표기)
+NO_PARTY = "None"
+
+
+def party_of(user: models.User) -> str:
+    return user.political_party or NO_PARTY
+
+
+def apply(db, claim_id: int, party: str, vote_type: str, delta: int) -> None:
+    """집계를 delta만큼 증감합니다. (커밋은 호출자가 수행)"""
+    table = models.ClaimPartyVote.__table__
+    key = (table.c.claim_id == claim_id) & (table.c.party == party) & (table.c.vote_type == vote_type)
+    result = db.execute(update(table).where(key).values(count=table.c.count + delta))
+    if result.rowcount == 0:
+        # SQLite에서는 위 UPDATE가 쓰기 잠금을 잡으므로 동시에 같은 행을 INSERT하는 경우는 없음
+        db.execute(insert(table).values(claim_id=claim_id, party=party, vote_type=vote_type, count=delta))
+
+
+def breakdown(db, claim_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """{claim_id: [{"party", "like", "dislike"}, ...]} (투표 수가 많은 정당부터)"""
+    claim_ids = list(claim_ids)
+    result: Dict[int, Dict[str, dict]] = {claim_id: {} for claim_id in claim_ids}
+    if not claim_ids:
+        return {}
+    table = models.ClaimPartyVote.__table__
+    rows = db.execute(
+        select(table.c.claim_id, table.c.party, table.c.vote_type, table.c.count)
+        .where(table.c.claim_id.in_(claim_ids), table.c.count > 0)
+    )
+    for claim_id, party, vote_type, count in rows:
+        entry = result[claim_id].setdefault(party, {"party": party, "like": 0, "dislike": 0})
+        entry[vote_type] = count
+    return {
+        claim_id: sorted(parties.values(), key=lambda p: (-(p["like"] + p["dislike"]), p["party"]))
+        for claim_id, parties in result.items()
+    }
+
+
+def remove_claim(db, claim_id: int) -> None:
+    table = models.ClaimPartyVote.__table__
+    db.execute(delete(table).where(table.c.claim_id == claim_id))
+
+
+def rebuild(db) -> int:
+    """votes/vote_ledger와 users에서 집계 전체를 다시 계산합니다. 만든 행 수를 반환합니다."""
+    table = models.ClaimPartyVote.__table__
+    ledger = models.VoteLedger
+    votes = union_all(
+        select(models.Vote.claim_id, models.Vote.user_id, models.Vote.vote_type)
+        .where(models.Vote.claim_id.is_not(None)),
+        select(ledger.target_id, ledger.user_id, vote_log.ledger_vote_type).where(ledger.kind == ledger.CLAIM),
+    ).subquery()
+    party = func.coalesce(func.nullif(models.User.political_party, ""), NO_PARTY)
+    source = (
+        select(votes.c.claim_id, party, votes.c.vote_type, func.count())
+        .join(models.User, models.User.id == votes.c.user_id)
+        .group_by(votes.c.claim_id, party, votes.c.vote_type)
+    )
+    db.execute(delete(table))
+    db.execute(insert(table).from_select(["claim_id", "party", "vote_type", "count"], source))
+    db.commit()
+    return db.query(func.count()).select_from(table).scalar()
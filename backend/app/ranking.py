@@ -0,0 +1,131 @@
+"""주장 "hot" 랭킹 엔진
+
+주장의 투표 수, 반박 활동, 나이를 감쇠 함수로 합쳐 `Claim.hot_score`에 저장합니다.
+점수는 쓰기 시점(투표/반박)에 해당 주장만 다시 계산하고, 시간이 지나며 변하는
+나머지 주장들의 점수는 주기 작업(워커 하나)이 일괄로 갱신합니다. 주기 작업은 마지막 활동이
+RANKING_HORIZON_HOURS 안에 있는 주장만 다시 계산하고, 그보다 오래된 주장은 마지막으로 계산한
+점수를 유지합니다(그때는 이미 충분히 감쇠해 최근 주장보다 아래에 있음). 정렬 조회는
+(topic_id, [type,] hot_score) 인덱스를 타므로 페이지 크기만큼만 읽습니다.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import bindparam, func, select, update
+
+from app import models
+from app.database import SessionLocal
+from app.scheduler import periodic
+
+REFRESH_SECONDS = float(os.getenv("RANKING_REFRESH_SECONDS", "300"))
+# 점수 감쇠 강도 (클수록 오래된 글이 빨리 내려감)
+GRAVITY = float(os.getenv("RANKING_GRAVITY", "1.5"))
+REBUTTAL_WEIGHT = 2.0
+# 주기 갱신 대상: 마지막 활동이 이 시간 안인 주장 (0이면 전체)
+HORIZON_HOURS = float(os.getenv("RANKING_HORIZON_HOURS", "168"))
+BATCH_SIZE = 5000
+
+
+def hot_score(
+    votes: int,
+    rebuttal_count: int,
+    created_at: Optional[datetime],
+    last_activity_at: Optional[datetime] = None,
+    now: Optional[datetime] = None,
+) -> float:
+    """투표/반박 수를 나이에 따라 감쇠시킨 점수
+
+    나이는 작성 시각과 마지막 활동 시각의 평균을 사용하므로, 오래된 주장이라도
+    최근에 반박이 달리면 다시 올라옵니다.
+    """
+    now = now or datetime.utcnow()
+    created_at = created_at or now
+    last_activity_at = last_activity_at or created_at
+    age_hours = max((now - created_at).total_seconds(), 0.0) / 3600.0
+    idle_hours = max((now - last_activity_at).total_seconds(), 0.0) / 3600.0
+    points = (votes or 0) + REBUTTAL_WEIGHT * (rebuttal_count or 0) + 1
+    return points / ((age_hours + idle_hours) / 2.0 + 2.0) ** GRAVITY
+
+
+def rescore(claim: models.Claim, now: Optional[datetime] = None) -> None:
+    claim.hot_score = hot_score(claim.votes, claim.rebuttal_count, claim.created_at, claim.last_activity_at, now)
+
+
+def touch(claim: models.Claim, now: Optional[datetime] = None) -> None:
+    """주장에 활동이 있었음을 기록하고 점수를 다시 계산합니다. (커밋은 호출자가 수행)"""
+    now = now or datetime.utcnow()
+    claim.last_activity_at = now
+    rescore(claim, now)
+
+
+def order_claims(query, sort_by: str):
+    """주장 목록 정렬 - 모두 (topic_id, ...) 인덱스를 타는 저장된 컬럼 기준"""
+    if sort_by == "new":
+        # 최신순
+        return query.order_by(models.Claim.created_at.desc(), models.Claim.id.desc())
+    if sort_by == "best":
+        # 반박(댓글) 많은 순
+        return query.order_by(models.Claim.rebuttal_count.desc(), models.Claim.id.desc())
+    if sort_by == "trend":
+        # 투표/반박 활동을 시간에 따라 감쇠시킨 hot 점수순
+        return query.order_by(models.Claim.hot_score.desc(), models.Claim.id.desc())
+    # 기본값 (votes 순)
+    return query.order_by(models.Claim.votes.desc())
+
+
+def refresh_scores(db, batch_size: int = BATCH_SIZE, horizon_hours: float = HORIZON_HOURS) -> int:
+    """최근 horizon_hours 안에 활동한 주장(0이면 전체)의 점수를 id 순으로 배치 단위 재계산합니다.
+
+    갱신한 행 수를 반환합니다. 활동 시각은 작성 시각 이후이므로 last_activity_at만 보면 됩니다.
+    """
+    now = datetime.utcnow()
+    table = models.Claim.__table__
+    stmt = update(table).where(table.c.id == bindparam("b_id")).values(hot_score=bindparam("b_score"))
+    query = select(table.c.id, table.c.votes, table.c.rebuttal_count, table.c.created_at, table.c.last_activity_at)
+    if horizon_hours:
+        query = query.where(table.c.last_activity_at >= now - timedelta(hours=horizon_hours))
+    last_id = 0
+    total = 0
+    while True:
+        rows = db.execute(query.where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)).all()
+        if not rows:
+            break
+        params = [
+            {"b_id": row[0], "b_score": hot_score(row[1], row[2], row[3], row[4], now)}
+            for row in rows
+        ]
+        db.execute(stmt, params)
+        # 배치마다 커밋해서 쓰기 잠금을 오래 잡지 않음
+        db.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+    return total
+
+
+def rebuild_counters(db) -> None:
+    """rebuttal_count / last_activity_at을 반박 테이블에서 다시 계산합니다."""
+    counts = db.query(
+        models.Rebuttal.claim_id,
+        func.count(models.Rebuttal.id).label("rebuttal_count"),
+        func.max(models.Rebuttal.created_at).label("last_rebuttal_at"),
+    ).group_by(models.Rebuttal.claim_id).subquery()
+    table = models.Claim.__table__
+    db.execute(update(table).values(rebuttal_count=0, last_activity_at=table.c.created_at))
+    db.execute(
+        update(table)
+        .where(table.c.id == counts.c.claim_id)
+        .values(
+            rebuttal_count=counts.c.rebuttal_count,
+            last_activity_at=func.max(table.c.created_at, counts.c.last_rebuttal_at),
+        )
+    )
+    db.commit()
+
+
+@periodic("claim-ranking", REFRESH_SECONDS, run_on_start=False, single=True)
+def refresh_job():
+    db = SessionLocal()
+    try:
+        refresh_scores(db)
+    finally:
+        db.close()
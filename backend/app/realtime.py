@@ -0,0 +1,170 @@
+"""주제별 실시간 채널 허브
+
+주장/반박/투표 쓰기 경로에서 `hub.publish(...)`로 이벤트를 보내면 해당 주제를 구독 중인
+WebSocket/SSE 연결로 전달합니다.
+
+- 프레임은 주제당 한 번만 JSON으로 직렬화되어 모든 구독자가 같은 문자열을 공유합니다.
+- 투표 수 변화는 바로 보내지 않고 대상별 최신 값만 모아 두었다가 VOTE_FLUSH_SECONDS마다
+  하나의 `votes` 프레임으로 묶어 보냅니다.
+- 구독자마다 크기가 제한된 큐를 두고, 큐가 가득 찬 느린 구독자는 끊어서(overflowed)
+  다른 구독자와 쓰기 경로가 영향을 받지 않게 합니다. 클라이언트는 재접속 후 REST로 다시 동기화합니다.
+
+라우터의 쓰기 함수는 스레드풀에서 실행되므로 publish는 이벤트 루프에 스레드 안전하게 넘깁니다.
+
+워커가 여러 개면 구독자는 쓰기를 처리하지 않은 워커에 붙어 있을 수 있습니다. 이벤트는 무효화 버스
+(app/invalidation.py)의 `live` 채널로도 보내고, 투표 수 변화는 flush마다 주제별로 묶어 `live.votes`로
+보냅니다. 다른 워커는 받은 이벤트를 broadcast=False로 자기 구독자에게만 전달합니다.
+"""
+import asyncio
+import json
+import os
+import threading
+from typing import Dict, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from app.invalidation import bus
+
+QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "64"))
+VOTE_FLUSH_SECONDS = float(os.getenv("LIVE_VOTE_FLUSH_SECONDS", "0.5"))
+
+
+class Subscriber:
+    __slots__ = ("topic_id", "queue", "overflowed")
+
+    def __init__(self, topic_id: int, queue_size: int):
+        self.topic_id = topic_id
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+
+class TopicHub:
+    def __init__(self, queue_size: int = QUEUE_SIZE, flush_interval: float = VOTE_FLUSH_SECONDS):
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        # topic_id -> {(대상 종류, 대상 id): 최신 votes}
+        self._pending_votes: Dict[int, Dict[tuple, int]] = {}
+        # 다른 워커로 보낼 투표 수 변화 (구독자 유무와 관계없이 모음)
+        self._outgoing_votes: Dict[int, Dict[tuple, int]] = {}
+        self._votes_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.frames_sent = 0
+        self.dropped_subscribers = 0
+
+    # 수명 주기 ----------------------------------------------------------
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._flush_task = asyncio.create_task(self._flush_loop(), name="live-vote-flush")
+
+    async def stop(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        self._flush_task = None
+        self._loop = None
+
+    # 구독 ---------------------------------------------------------------
+
+    def subscribe(self, topic_id: int) -> Subscriber:
+        subscriber = Subscriber(topic_id, self.queue_size)
+        self._subscribers.setdefault(topic_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self._subscribers.get(subscriber.topic_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[subscriber.topic_id]
+
+    def subscriber_count(self, topic_id: Optional[int] = None) -> int:
+        if topic_id is not None:
+            return len(self._subscribers.get(topic_id, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+    # 발행 ---------------------------------------------------------------
+
+    def publish(self, topic_id: int, event: dict, broadcast: bool = True):
+        """이벤트를 주제 구독자에게 보냅니다. 어느 스레드에서든 호출할 수 있습니다."""
+        if self._loop is None:
+            return
+        event = jsonable_encoder(event)
+        if broadcast:
+            bus.publish("live", {"topic_id": topic_id, "event": event})
+        if topic_id not in self._subscribers:
+            return
+        frame = json.dumps(event, ensure_ascii=False)
+        self._call_in_loop(self._fanout, topic_id, frame)
+
+    def publish_vote(self, topic_id: int, target: str, target_id: int, votes: int, broadcast: bool = True):
+        """투표 수 변화를 기록합니다. 같은 대상의 변화는 다음 flush까지 하나로 합쳐집니다."""
+        if self._loop is None:
+            return
+        with self._votes_lock:
+            if broadcast:
+                self._outgoing_votes.setdefault(topic_id, {})[(target, target_id)] = votes
+            if topic_id in self._subscribers:
+                self._pending_votes.setdefault(topic_id, {})[(target, target_id)] = votes
+
+    def _call_in_loop(self, callback, *args):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def _fanout(self, topic_id: int, frame: str):
+        subscribers = self._subscribers.get(topic_id)
+        if not subscribers:
+            return
+        for subscriber in list(subscribers):
+            try:
+                subscriber.queue.put_nowait(frame)
+                self.frames_sent += 1
+            except asyncio.QueueFull:
+                # 느린 구독자는 끊고 재동기화하게 함
+                subscriber.overflowed = True
+                self.dropped_subscribers += 1
+                self.unsubscribe(subscriber)
+
+    def flush_votes(self):
+        with self._votes_lock:
+            pending, self._pending_votes = self._pending_votes, {}
+            outgoing, self._outgoing_votes = self._outgoing_votes, {}
+        for topic_id, changes in outgoing.items():
+            bus.publish("live.votes", {"topic_id": topic_id, "items": _vote_items(changes)})
+        for topic_id, changes in pending.items():
+            self._fanout(topic_id, json.dumps({"type": "votes", "items": _vote_items(changes)}))
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush_votes()
+
+
+def _vote_items(changes: Dict[tuple, int]) -> list:
+    return [
+        {"target": target, "id": target_id, "votes": votes}
+        for (target, target_id), votes in changes.items()
+    ]
+
+
+hub = TopicHub()
+
+
+@bus.on("live")
+def _apply_remote_event(data):
+    hub.publish(data["topic_id"], data["event"], broadcast=False)
+
+
+@bus.on("live.votes")
+def _apply_remote_votes(data):
+    for item in data["items"]:
+        hub.publish_vote(data["topic_id"], item["target"], item["id"], item["votes"], broadcast=False)
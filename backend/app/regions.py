@@ -0,0 +1,403 @@
+"""지역(광역/기초) 계층과 지역별 집계 색인
+
+지역 게시판의 주제는 `Topic.region`(seoul 등)과 `Topic.district`(강동구 등) 문자열로만
+구분되어, 지역 목록과 지역별 주제/주장 수를 보여 주려면 주제 테이블 전체를 읽어야 했습니다.
+
+- 계층: `regions` 테이블에 광역(level 1)과 그 아래 기초(level 2) 지역을 한 행씩 두고, 주제는
+  `Topic.region_id`로 가장 구체적인 지역을 가리킵니다. 주제를 만들 때 `resolve`가 문자열을
+  정규화해서("서울특별시" -> seoul, "서울 전체" -> 광역) 지역 행을 찾거나 만듭니다.
+- 색인: 지역 노드와 노드별 주제 수, 주장 수, 최근 ACTIVITY_DAYS일 활동 수(새 주장, 반박,
+  주장 투표)를 메모리에 둡니다. 상위 지역의 수는 하위 지역을 포함합니다. 자동완성은 지역
+  이름/코드/"광역 기초" 경로를 정렬한 배열에서 접두어를 이분 탐색합니다.
+- 갱신: 쓰기 라우터가 커밋 뒤 `index.add_topic`/`index.record`로 증분 반영하고, 무효화 버스로
+  다른 워커에도 전달합니다. REFRESH_SECONDS마다 DB에서 전체를 다시 계산해 활동 수의 기간과
+  놓친 변경을 맞춥니다. 색인 계산은 읽기만 하고, 광역 행 생성과 기존 주제 연결(`backfill`)은 워커
+  하나가 도는 주기 작업과 `python manage.py backfill-regions`에서만 합니다. 색인은 기동(lifespan) 때 처음
+  채우고, `GET /api/regions`는 색인만 읽으며 준비되기 전에는 503을 반환합니다.
+- 주제 목록의 지역 필터는 `region_ids`로 같은 정규화를 거쳐 `Topic.region_id`로 찾습니다.
+"""
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.sqlite import insert
+
+from app import models
+from app.database import SessionLocal
+from app.invalidation import bus
+from app.scheduler import periodic
+
+REFRESH_SECONDS = float(os.getenv("REGION_REFRESH_SECONDS", "300"))
+ACTIVITY_DAYS = int(os.getenv("REGION_ACTIVITY_DAYS", "7"))
+# 지역이 지정됐지만 region_id가 비어 있는 기존 주제를 한 번에 채울 수
+BACKFILL_BATCH_SIZE = 1000
+
+# (코드, 짧은 이름, 정식 이름)
+PROVINCES = (
+    ("seoul", "서울", "서울특별시"),
+    ("busan", "부산", "부산광역시"),
+    ("daegu", "대구", "대구광역시"),
+    ("incheon", "인천", "인천광역시"),
+    ("gwangju", "광주", "광주광역시"),
+    ("daejeon", "대전", "대전광역시"),
+    ("ulsan", "울산", "울산광역시"),
+    ("sejong", "세종", "세종특별자치시"),
+    ("gyeonggi", "경기", "경기도"),
+    ("gangwon", "강원", "강원특별자치도"),
+    ("chungbuk", "충북", "충청북도"),
+    ("chungnam", "충남", "충청남도"),
+    ("jeonbuk", "전북", "전북특별자치도"),
+    ("jeonnam", "전남", "전라남도"),
+    ("gyeongbuk", "경북", "경상북도"),
+    ("gyeongnam", "경남", "경상남도"),
+    ("jeju", "제주", "제주특별자치도"),
+)
+_PROVINCE_CODES = {}
+for _code, _short, _full in PROVINCES:
+    for _alias in (_code, _short, _full):
+        _PROVINCE_CODES[_alias] = _code
+_PROVINCE_NAMES = {code: short for code, short, _ in PROVINCES}
+_PROVINCE_FULL_NAMES = {code: full for code, _, full in PROVINCES}
+_SPACES = re.compile(r"\s+")
+
+
+def _clean(value: Optional[str]) -> str:
+    return _SPACES.sub(" ", value or "").strip()
+
+
+def normalize(region: Optional[str], district: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(광역 코드, 기초 지역 이름). 광역이 없으면 (None, None), "서울 전체" 같은 값은 기초 없음"""
+    region = _clean(region)
+    if not region:
+        return None, None
+    code = _PROVINCE_CODES.get(region) or _PROVINCE_CODES.get(region.lower()) or region.lower()
+    district = _clean(district)
+    if not district or district == "전체" or district.endswith(" 전체"):
+        district = None
+    return code, district
+
+
+def region_code(province: str, district: Optional[str] = None) -> str:
+    return f"{province}/{district}" if district else province
+
+
+@dataclass
+class RegionNode:
+    id: int
+    parent_id: Optional[int]
+    code: str
+    name: str
+    level: int
+    topics: int = 0
+    claims: int = 0
+    activity: int = 0
+    path: str = ""  # "서울 강동구"
+    children: List[int] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "code": self.code,
+            "name": self.name,
+            "path": self.path,
+            "level": self.level,
+            "topic_count": self.topics,
+            "claim_count": self.claims,
+            "activity": self.activity,
+        }
+
+
+def _search_keys(node: RegionNode) -> List[str]:
+    keys = {node.name, node.path, node.code}
+    if node.level == 1:
+        keys.add(_PROVINCE_FULL_NAMES.get(node.code, node.name))
+    return [key.lower() for key in keys]
+
+
+class RegionIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes: Dict[int, RegionNode] = {}
+        self._codes: Dict[str, int] = {}
+        self._roots: List[int] = []
+        # 자동완성: (검색어, 노드 id) 오름차순
+        self._keys: List[Tuple[str, int]] = []
+        # 지역 주제 id -> 노드 id (주제 id 오름차순 배열)
+        self._topic_ids = array("q")
+        self._topic_nodes = array("i")
+        self.ready = False
+        self.refreshed_at: Optional[datetime] = None
+
+    # 구조 ---------------------------------------------------------------
+
+    def _add_node(self, node: RegionNode) -> None:
+        if node.id in self._nodes:
+            return
+        self._nodes[node.id] = node
+        self._codes[node.code] = node.id
+        parent = self._nodes.get(node.parent_id) if node.parent_id is not None else None
+        node.path = f"{parent.name} {node.name}" if parent is not None else node.name
+        if parent is not None:
+            parent.children.append(node.id)
+        elif node.parent_id is None:
+            self._roots.append(node.id)
+        for key in _search_keys(node):
+            insort(self._keys, (key, node.id))
+
+    def node_id(self, code: str) -> Optional[int]:
+        with self._lock:
+            return self._codes.get(code)
+
+    def _node_of_topic(self, topic_id: int) -> Optional[int]:
+        pos = bisect_left(self._topic_ids, topic_id)
+        if pos < len(self._topic_ids) and self._topic_ids[pos] == topic_id:
+            return self._topic_nodes[pos]
+        return None
+
+    def _bump(self, node_id: Optional[int], topics: int = 0, claims: int = 0, activity: int = 0) -> None:
+        """노드와 상위 노드의 수를 함께 바꿈"""
+        while node_id is not None:
+            node = self._nodes.get(node_id)
+            if node is None:
+                return
+            node.topics += topics
+            node.claims += claims
+            node.activity += activity
+            node_id = node.parent_id
+
+    # 전체 재계산 --------------------------------------------------------
+
+    def refresh(self, db) -> None:
+        """regions 테이블과 주제별 집계에서 색인을 다시 만듭니다. (DB에 쓰지 않음)"""
+        table = models.Region.__table__
+        fresh = RegionIndex()
+        for row in db.execute(
+            select(table.c.id, table.c.parent_id, table.c.code, table.c.name, table.c.level)
+            .order_by(table.c.level, table.c.id)
+        ):
+            fresh._add_node(RegionNode(*row))
+        fresh._roots.sort(key=lambda node_id: _province_order(fresh._nodes[node_id].code))
+
+        topic_rows = db.execute(
+            select(models.Topic.id, models.Topic.region_id)
+            .where(models.Topic.region_id.isnot(None)).order_by(models.Topic.id)
+        ).all()
+        topic_node = {}
+        for topic_id, node_id in topic_rows:
+            fresh._topic_ids.append(topic_id)
+            fresh._topic_nodes.append(node_id)
+            topic_node[topic_id] = node_id
+            fresh._bump(node_id, topics=1)
+
+        claims = db.query(models.Claim.topic_id, func.count(models.Claim.id)).group_by(models.Claim.topic_id)
+        for topic_id, count in claims:
+            fresh._bump(topic_node.get(topic_id), claims=count)
+        # 보관된 주제의 주장은 라이브 테이블에 없으므로 보관 시점의 수를 더함
+        for topic_id, count in db.query(models.TopicArchive.topic_id, models.TopicArchive.claim_count):
+            fresh._bump(topic_node.get(topic_id), claims=count or 0)
+
+        rollup = models.ActivityRollup
+        since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=ACTIVITY_DAYS - 1)
+        activity = db.query(
+            rollup.target_id, func.sum(rollup.likes + rollup.dislikes + rollup.rebuttals + rollup.claims)
+        ).filter(
+            rollup.scope == "topic", rollup.granularity == "day", rollup.bucket_start >= since
+        ).group_by(rollup.target_id)
+        for topic_id, count in activity:
+            fresh._bump(topic_node.get(topic_id), activity=int(count or 0))
+
+        with self._lock:
+            self._nodes, self._codes, self._roots, self._keys = fresh._nodes, fresh._codes, fresh._roots, fresh._keys
+            self._topic_ids, self._topic_nodes = fresh._topic_ids, fresh._topic_nodes
+            self.ready = True
+            self.refreshed_at = datetime.utcnow()
+
+    # 증분 갱신 ----------------------------------------------------------
+
+    def add_topic(self, topic_id: int, nodes: Optional[List[dict]], broadcast: bool = True) -> None:
+        """새 지역 주제. nodes는 `resolve`가 반환한 [광역, (기초)] 노드 목록"""
+        if not nodes:
+            return
+        if broadcast:
+            bus.publish("regions.topic", {"topic_id": topic_id, "nodes": nodes})
+        with self._lock:
+            if not self.ready:
+                return
+            for data in nodes:
+                self._add_node(RegionNode(data["id"], data["parent_id"], data["code"], data["name"], data["level"]))
+            pos = bisect_left(self._topic_ids, topic_id)
+            if pos < len(self._topic_ids) and self._topic_ids[pos] == topic_id:
+                return
+            self._topic_ids.insert(pos, topic_id)
+            self._topic_nodes.insert(pos, nodes[-1]["id"])
+            self._bump(nodes[-1]["id"], topics=1)
+
+    def record(self, topic_id: int, claims: int = 0, activity: int = 0, broadcast: bool = True) -> None:
+        """주제의 주장 수/활동 수 변화. 지역 주제가 아니면 무시됩니다."""
+        if broadcast:
+            bus.publish("regions", {"topic_id": topic_id, "claims": claims, "activity": activity})
+        with self._lock:
+            self._bump(self._node_of_topic(topic_id), claims=claims, activity=activity)
+
+    # 조회 ---------------------------------------------------------------
+
+    def tree(self) -> List[dict]:
+        """광역 지역 목록 (각각 기초 지역을 children으로 포함)"""
+        with self._lock:
+            result = []
+            for root_id in self._roots:
+                root = self._nodes[root_id]
+                item = root.as_dict()
+                children = sorted((self._nodes[c] for c in root.children), key=lambda n: n.name)
+                item["children"] = [child.as_dict() for child in children]
+                result.append(item)
+            return result
+
+    def search(self, prefix: str, limit: int = 10) -> List[dict]:
+        """이름/코드/경로가 prefix로 시작하는 지역. 주제가 많은 지역부터"""
+        prefix = _clean(prefix).lower()
+        with self._lock:
+            found = set()
+            pos = bisect_left(self._keys, (prefix, -1))
+            while pos < len(self._keys) and self._keys[pos][0].startswith(prefix):
+                found.add(self._keys[pos][1])
+                pos += 1
+            nodes = sorted((self._nodes[node_id] for node_id in found),
+                           key=lambda n: (-n.topics, n.level, n.name))
+            return [node.as_dict() for node in nodes[:limit]]
+
+
+def _province_order(code: str) -> int:
+    for i, (province, _, _) in enumerate(PROVINCES):
+        if province == code:
+            return i
+    return len(PROVINCES)
+
+
+index = RegionIndex()
+
+
+# 계층 테이블 ----------------------------------------------------------
+
+
+def ensure_provinces(db) -> None:
+    """광역 지역 행이 없으면 만듭니다."""
+    table = models.Region.__table__
+    codes = [code for code, _, _ in PROVINCES]
+    if db.execute(select(func.count()).where(table.c.code.in_(codes))).scalar() == len(codes):
+        return
+    db.execute(insert(table).on_conflict_do_nothing(index_elements=["code"]), [
+        {"code": code, "name": short, "level": 1, "parent_id": None} for code, short, _ in PROVINCES
+    ])
+    db.commit()
+
+
+def _get_or_create(db, code: str, name: str, level: int, parent_id: Optional[int]) -> int:
+    table = models.Region.__table__
+    node_id = db.execute(select(table.c.id).where(table.c.code == code)).scalar()
+    if node_id is None:
+        db.execute(insert(table).on_conflict_do_nothing(index_elements=["code"]).values(
+            code=code, name=name, level=level, parent_id=parent_id
+        ))
+        node_id = db.execute(select(table.c.id).where(table.c.code == code)).scalar()
+    return node_id
+
+
+def region_ids(region: Optional[str], district: Optional[str]):
+    """지역 문자열에 해당하는 regions.id 선택문 (광역이면 하위 기초 지역 포함, 조건이 없으면 None)"""
+    table = models.Region
+    province, district = normalize(region, district)
+    if province is None:
+        # 광역 없이 기초 지역 이름만 온 경우 (같은 이름의 기초 지역 모두)
+        name = _clean(district)
+        if not name:
+            return None
+        return select(table.id).where(table.level == 2, table.name == name)
+    if district:
+        return select(table.id).where(table.code == region_code(province, district))
+    province_id = select(table.id).where(table.code == province).scalar_subquery()
+    return select(table.id).where(or_(table.id == province_id, table.parent_id == province_id))
+
+
+def resolve(db, region: Optional[str], district: Optional[str]) -> Optional[List[dict]]:
+    """주제의 지역 문자열에 해당하는 노드를 찾거나 만들고 [광역, (기초)] 노드 목록을 반환합니다.
+
+    지역이 없는 주제면 None. 커밋은 호출자가 수행합니다.
+    """
+    province, district = normalize(region, district)
+    if province is None:
+        return None
+    nodes = []
+    province_id = _get_or_create(db, province, _PROVINCE_NAMES.get(province, _clean(region)), 1, None)
+    nodes.append({"id": province_id, "parent_id": None, "code": province,
+                  "name": _PROVINCE_NAMES.get(province, _clean(region)), "level": 1})
+    if district:
+        code = region_code(province, district)
+        nodes.append({"id": _get_or_create(db, code, district, 2, province_id), "parent_id": province_id,
+                      "code": code, "name": district, "level": 2})
+    return nodes
+
+
+def backfill(db, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """지역이 있지만 region_id가 비어 있는 주제를 채웁니다. 채운 주제 수를 반환합니다."""
+    filled = 0
+    last_id = 0
+    while True:
+        rows = db.query(models.Topic.id, models.Topic.region, models.Topic.district).filter(
+            models.Topic.id > last_id, models.Topic.region_id.is_(None), models.Topic.region.isnot(None)
+        ).order_by(models.Topic.id).limit(batch_size).all()
+        if not rows:
+            return filled
+        for topic_id, region, district in rows:
+            nodes = resolve(db, region, district)
+            if nodes:
+                db.query(models.Topic).filter(models.Topic.id == topic_id).update(
+                    {"region_id": nodes[-1]["id"]}, synchronize_session=False
+                )
+                filled += 1
+        db.commit()
+        last_id = rows[-1][0]
+
+
+@bus.on("regions")
+def _apply_remote_record(data: dict):
+    index.record(data["topic_id"], data["claims"], data["activity"], broadcast=False)
+
+
+@bus.on("regions.topic")
+def _apply_remote_topic(data: dict):
+    index.add_topic(data["topic_id"], data["nodes"], broadcast=False)
+
+
+@bus.on_gap
+def _refresh_after_gap():
+    refresh_regions()
+
+
+# 처음 갱신은 기동 시 main.py lifespan에서 수행
+@periodic("region-index", REFRESH_SECONDS, run_on_start=False)
+def refresh_regions():
+    db = SessionLocal()
+    try:
+        index.refresh(db)
+    finally:
+        db.close()
+
+
+@periodic("region-backfill", REFRESH_SECONDS, single=True)
+def backfill_regions():
+    db = SessionLocal()
+    try:
+        ensure_provinces(db)
+        filled = backfill(db)
+    finally:
+        db.close()
+    if filled:
+        refresh_regions()
@@ -0,0 +1,224 @@
+"""시간 구간별 활동 집계 (추이 차트용)
+
+주장과 주제마다 시간/일 단위 구간의 좋아요, 싫어요, 반박 수, 새 주장 수를
+`activity_rollups` 테이블에 유지합니다.
+
+- 주장: 그 주장에 대한 투표, 그 주장에 달린 반박 (모든 단계)
+- 주제: 주제에 속한 주장들에 대한 투표, 반박, 새 주장
+
+쓰기 라우터가 같은 트랜잭션에서 `record`로 증감합니다. 투표 취소/변경과 삭제는 원래
+행의 created_at 구간에서 빼므로, 집계는 항상 현재 남아 있는 행을 created_at으로
+그룹핑한 결과와 같습니다. 기존 데이터는 `python manage.py backfill-rollups`로 채웁니다.
+(백필하는 동안 쓰기는 잠금을 기다리므로 쓰기가 적은 시간에 실행합니다.)
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+
+from app import models
+from app.database import begin_immediate
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+COUNTERS = ("likes", "dislikes", "rebuttals", "claims")
+BACKFILL_CHUNK_SIZE = 5000
+# 한 번에 조회할 수 있는 최대 구간 수
+MAX_POINTS = 2000
+# 기간을 지정하지 않았을 때 보여줄 구간 수
+DEFAULT_POINTS = {"hour": 48, "day": 30}
+
+RollupKey = Tuple[str, int, str, datetime]  # (scope, target_id, granularity, bucket_start)
+
+
+def bucket_start(when: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return when.replace(minute=0, second=0, microsecond=0)
+    return when.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _keys(topic_id: Optional[int], claim_id: Optional[int], when: datetime) -> Iterator[RollupKey]:
+    for granularity in GRANULARITIES:
+        start = bucket_start(when, granularity)
+        if claim_id is not None:
+            yield "claim", claim_id, granularity, start
+        if topic_id is not None:
+            yield "topic", topic_id, granularity, start
+
+
+def _upsert(db, rows: List[dict]) -> None:
+    """구간 행이 없으면 만들고 있으면 카운터에 더함 (SQLite UPSERT)"""
+    if not rows:
+        return
+    table = models.ActivityRollup.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scope", "target_id", "granularity", "bucket_start"],
+        set_={name: table.c[name] + stmt.excluded[name] for name in COUNTERS},
+    )
+    db.execute(stmt, rows)
+
+
+def _row(key: RollupKey, counts: Dict[str, int]) -> dict:
+    scope, target_id, granularity, start = key
+    row = {"scope": scope, "target_id": target_id, "granularity": granularity, "bucket_start": start}
+    for name in COUNTERS:
+        row[name] = counts.get(name, 0)
+    return row
+
+
+def record(
+    db,
+    topic_id: Optional[int],
+    claim_id: Optional[int] = None,
+    when: Optional[datetime] = None,
+    **deltas: int,
+) -> None:
+    """활동을 주장/주제의 시간·일 구간에 반영합니다. (커밋은 호출자가 수행)
+
+    deltas는 likes, dislikes, rebuttals, claims 중 바꿀 값입니다.
+    """
+    when = when or datetime.utcnow()
+    _upsert(db, [_row(key, deltas) for key in _keys(topic_id, claim_id, when)])
+
+
+def record_vote(db, claim: models.Claim, vote_type: str, delta: int, when: Optional[datetime]) -> None:
+    counter = "likes" if vote_type == "like" else "dislikes"
+    record(db, claim.topic_id, claim.id, when, **{counter: delta})
+
+
+def remove_claim(db, claim: models.Claim) -> None:
+    """삭제되는 주장의 집계를 주제 집계에서 빼고 주장 집계를 지웁니다."""
+    table = models.ActivityRollup.__table__
+    rows = db.execute(
+        select(table).where(table.c.scope == "claim", table.c.target_id == claim.id)
+    ).mappings().all()
+    _upsert(db, [
+        _row(("topic", claim.topic_id, row["granularity"], row["bucket_start"]),
+             {name: -row[name] for name in COUNTERS})
+        for row in rows
+    ])
+    db.execute(delete(table).where(table.c.scope == "claim", table.c.target_id == claim.id))
+    if claim.created_at:
+        record(db, claim.topic_id, when=claim.created_at, claims=-1)
+
+
+# 조회 -----------------------------------------------------------------
+
+
+def series(
+    db, scope: str, target_id: int, granularity: str, since: datetime, until: datetime
+) -> List[dict]:
+    """since와 until이 속한 구간까지 순서대로 반환합니다. 활동이 없는 구간은 0으로 채웁니다."""
+    table = models.ActivityRollup.__table__
+    start, end = bucket_start(since, granularity), bucket_start(until, granularity)
+    rows = db.execute(
+        select(table.c.bucket_start, *(table.c[name] for name in COUNTERS)).where(
+            table.c.scope == scope,
+            table.c.target_id == target_id,
+            table.c.granularity == granularity,
+            table.c.bucket_start >= start,
+            table.c.bucket_start <= end,
+        )
+    )
+    found = {row[0]: row[1:] for row in rows}
+    step = GRANULARITIES[granularity]
+    points = []
+    current = start
+    while current <= end:
+        counts = found.get(current, (0,) * len(COUNTERS))
+        point = {"bucket": current}
+        point.update(zip(COUNTERS, counts))
+        points.append(point)
+        current += step
+    return points
+
+
+def resolve_range(
+    granularity: str, since: Optional[datetime], until: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    """조회 기간을 정하고 검증합니다. 잘못된 요청이면 ValueError"""
+    if granularity not in GRANULARITIES:
+        raise ValueError("granularity는 hour 또는 day여야 합니다")
+    step = GRANULARITIES[granularity]
+    until = until or datetime.utcnow()
+    since = since or until - step * (DEFAULT_POINTS[granularity] - 1)
+    if since > until:
+        raise ValueError("since가 until보다 늦습니다")
+    points = int((bucket_start(until, granularity) - bucket_start(since, granularity)) / step) + 1
+    if points > MAX_POINTS:
+        raise ValueError(f"한 번에 최대 {MAX_POINTS}개 구간까지 조회할 수 있습니다")
+    return since, until
+
+
+# 백필 -----------------------------------------------------------------
+
+
+def _backfill_source(db, query, chunk_size: int, key_size: int = 1) -> Iterator[list]:
+    """키 순서로 chunk_size개씩 행을 읽음 (앞의 key_size개 컬럼이 키, 보통 id 하나)"""
+    key = tuple_(*query.selected_columns[:key_size]) if key_size > 1 else query.selected_columns[0]
+    last = (0,) * key_size
+    while True:
+        bound = tuple_(*last) if key_size > 1 else last[0]
+        rows = db.execute(query.where(key > bound).limit(chunk_size)).all()
+        if not rows:
+            return
+        last = tuple(rows[-1][:key_size])
+        yield rows
+
+
+def backfill(db, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """집계를 비우고 주장/반박/투표 이력에서 다시 채웁니다. 처리한 행 수를 반환합니다.
+
+    이력을 id 순으로 chunk_size개씩 읽어 구간별로 합친 뒤 UPSERT하므로 메모리 사용량은 이력 크기와
+    관계없이 일정합니다. 비우기부터 다시 채우기까지 쓰기 잠금을 잡은 한 트랜잭션으로 처리합니다.
+    중간에 커밋하면 그 사이의 쓰기가 `record`로 더한 값을 이력에서 한 번 더 세게 되기 때문입니다.
+    그동안 쓰기 요청은 잠금을 기다리고, 조회는 커밋 전까지 이전 집계를 그대로 봅니다(WAL).
+    """
+    Claim, Rebuttal, Vote, Ledger = models.Claim, models.Rebuttal, models.Vote, models.VoteLedger
+    sources = [
+        # (쿼리, 행 -> (topic_id, claim_id, 시각, 카운터)[, 키 컬럼 수])
+        (
+            select(Claim.id, Claim.topic_id, Claim.created_at).order_by(Claim.id),
+            lambda row: (row[1], None, row[2], "claims"),
+        ),
+        (
+            select(Rebuttal.id, Claim.topic_id, Rebuttal.claim_id, Rebuttal.created_at)
+            .join(Claim, Rebuttal.claim_id == Claim.id).order_by(Rebuttal.id),
+            lambda row: (row[1], row[2], row[3], "rebuttals"),
+        ),
+        (
+            select(Vote.id, Claim.topic_id, Vote.claim_id, Vote.created_at, Vote.vote_type)
+            .join(Claim, Vote.claim_id == Claim.id).order_by(Vote.id),
+            lambda row: (row[1], row[2], row[3], "likes" if row[4] == "like" else "dislikes"),
+        ),
+        # 압축된 투표는 시간 단위 시각만 남아 있음 (app/vote_log.py)
+        (
+            select(Ledger.target_id, Ledger.user_id, Claim.topic_id, Ledger.hour, Ledger.value)
+            .join(Claim, Ledger.target_id == Claim.id).where(Ledger.kind == Ledger.CLAIM)
+            .order_by(Ledger.target_id, Ledger.user_id),
+            lambda row: (
+                row[2], row[0], Ledger.EPOCH + timedelta(hours=row[3]) if row[3] is not None else None,
+                "likes" if row[4] > 0 else "dislikes",
+            ),
+            2,
+        ),
+    ]
+
+    begin_immediate(db)
+    db.execute(delete(models.ActivityRollup.__table__))
+    total = 0
+    for query, extract, *key_size in sources:
+        for rows in _backfill_source(db, query, chunk_size, *key_size):
+            buckets: Dict[RollupKey, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+            for row in rows:
+                topic_id, claim_id, when, counter = extract(row)
+                if when is None:
+                    continue
+                for key in _keys(topic_id, claim_id, when):
+                    buckets[key][counter] += 1
+            _upsert(db, [_row(key, counts) for key, counts in buckets.items()])
+            total += len(rows)
+    db.commit()
+    return total
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from app import schemas, models, jobs, sessions
+from app.invalidation import bus
+from app.database import get_db
+from app.dependencies import get_current_user
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+def _require_admin(current_user: Optional[models.User]):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
+    if current_user.username != "admin":
+        raise HTTPException(status_code=403, detail="관리자만 조회할 수 있습니다")
+
+@router.get("/jobs", response_model=schemas.JobStats)
+def get_job_stats(
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_user)
+):
+    """백그라운드 작업 큐 길이(핸들러/상태별)와 최근 완료 작업의 지연 시간"""
+    _require_admin(current_user)
+    return jobs.stats(db)
+
+@router.get("/bus", response_model=schemas.BusStatus)
+def get_bus_status(current_user: Optional[models.User] = Depends(get_current_user)):
+    """이 워커의 캐시 무효화 버스 상태 (적용한 버전, 최신 버전과의 차이)"""
+    _require_admin(current_user)
+    return bus.status()
+
+@router.post("/users/{user_id}/revoke-sessions")
+def revoke_user_sessions(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_user)
+):
+    """사용자의 모든 로그인 세션을 강제로 종료 (이미 발급된 액세스 토큰도 바로 거부됨)"""
+    _require_admin(current_user)
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
+    return {"revoked_sessions": sessions.revoke_user(db, user.id)}
@@ -1,20 +1,25 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
-from tavily import TavilyClient
-from dotenv import load_dotenv
+from functools import lru_cache
 import os
-from pathlib import Path
-
-# .env 파일 경로 명시 (backend 디렉토리 기준)
-env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
+from app import summarizer
 
 router = APIRouter(prefix="/api/ai", tags=["ai"])
 
-# Tavily API 키 설정
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
-tavily_client = TavilyClient(api_key=TAVILY_API_KEY) if TAVILY_API_KEY else None
+@lru_cache(maxsize=1)
+def get_tavily_client():
+    """Tavily 클라이언트를 처음 필요할 때 생성합니다.
+
+    tavily 패키지 import는 무거우므로 워커 기동 시점이 아니라 AI 엔드포인트가 처음 호출될 때 수행합니다.
+    (.env는 main.py에서 기동 시 로드)
+    """
+    # Tavily API 키 설정
+    api_key = os.getenv("TAVILY_API_KEY", "")
+    if not api_key:
+        return None
+    from tavily import TavilyClient
+    return TavilyClient(api_key=api_key)
 
 class SearchEvidenceRequest(BaseModel):
     query: str
@@ -35,6 +40,7 @@ class ImproveTextResponse(BaseModel):
 @router.post("/search-evidence", response_model=SearchEvidenceResponse)
 def search_evidence(request: SearchEvidenceRequest):
     """Tavily를 사용하여 AI 근거 찾기"""
+    tavily_client = get_tavily_client()
     if not tavily_client:
         raise HTTPException(
             status_code=500,
@@ -72,6 +78,7 @@ def search_evidence(request: SearchEvidenceRequest):
 @router.post("/improve-text", response_model=ImproveTextResponse)
 def improve_text(request: ImproveTextRequest):
     """AI를 사용하여 글 수정 (다듬기)"""
+    tavily_client = get_tavily_client()
     if not tavily_client:
         raise HTTPException(
             status_code=500,
@@ -79,8 +86,8 @@ def improve_text(request: ImproveTextRequest):
         )
     
     try:
-        # 원본 텍스트를 문장 단위로 분리
-        original_sentences = [s.strip() for s in request.text.split('.') if s.strip()]
+        # 원본 텍스트를 문장 단위로 분리 (소수점, 약어에서는 나누지 않음)
+        original_sentences = summarizer.split_sentences(request.text)
         
         # 글 수정을 위한 검색 쿼리 생성
         # 사용자의 글 내용을 기반으로 관련 정보를 검색하여 개선된 텍스트 생성
@@ -104,12 +111,9 @@ def improve_text(request: ImproveTextRequest):
                 content = result.get("content", "")
                 
                 if content:
-                    # 내용에서 핵심 문장 추출 (첫 2-3문장)
-                    sentences = [s.strip() for s in content.split('.') if s.strip()][:3]
-                    if sentences:
-                        key_info = '. '.join(sentences)
-                        if len(key_info) > 200:
-                            key_info = key_info[:200] + "..."
+                    # 내용에서 핵심 문장 추출 (app/summarizer.py, 최대 3문장/200자)
+                    key_info = summarizer.summarize(content, max_sentences=3, max_chars=200)
+                    if key_info:
                         key_points.append({
                             "title": title,
                             "info": key_info
@@ -129,17 +133,15 @@ def improve_text(request: ImproveTextRequest):
                 # 참고 자료를 자연스럽게 추가
                 if len(key_points) > 0:
                     # 자연스러운 연결 문구 추가
-                    improved_sentences.append("")
                     improved_sentences.append("이러한 주장을 뒷받침하는 자료로는 다음과 같은 내용이 있습니다.")
                     
                     for i, point in enumerate(key_points, 1):
                         if point["title"] and point["info"]:
                             # 자연스러운 문장으로 변환
-                            improved_sentences.append(f"{point['title']}에 따르면, {point['info']}")
+                            info = point["info"] if point["info"].endswith(('.', '!', '?', '…')) else point["info"] + '.'
+                            improved_sentences.append(f"{point['title']}에 따르면, {info}")
                 
-                improved_text = '. '.join(improved_sentences)
-                # 마지막에 불필요한 점이 여러 개 있는 경우 정리
-                improved_text = improved_text.replace('..', '.').replace('...', '...')
+                improved_text = ' '.join(improved_sentences)
         
         return ImproveTextResponse(
             improved_text=improved_text,
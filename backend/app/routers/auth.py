@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import schemas, models
+from app import schemas, models, sessions
 from app.database import get_db
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
+from typing import Optional
 import os
 import hashlib
 import re
+import uuid
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -49,6 +51,28 @@ def get_password_hash(password):
     # bcrypt로 해시 (72바이트 제한 내에서 안전)
     return pwd_context.hash(prehashed)
 
+def create_access_token(username: str, family: Optional[str] = None) -> str:
+    """사용자명으로 JWT 액세스 토큰을 생성합니다. (family: 로그인 세션 id, 세션 단위 폐기에 사용)"""
+    now = datetime.utcnow()
+    to_encode = {
+        "sub": username,
+        "iat": now,
+        "exp": now + timedelta(minutes=sessions.ACCESS_TOKEN_MINUTES),
+        "jti": uuid.uuid4().hex,
+    }
+    if family:
+        to_encode["fam"] = family
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def _token_response(user: models.User, family: str, refresh_token: str) -> dict:
+    return {
+        "access_token": create_access_token(user.username, family),
+        "token_type": "bearer",
+        "expires_in": int(sessions.ACCESS_TOKEN_MINUTES * 60),
+        "refresh_token": refresh_token,
+        "user": schemas.UserResponse.model_validate(user),
+    }
+
 def validate_password(password: str):
     if len(password) < 8:
         raise HTTPException(status_code=400, detail="비밀번호는 최소 8자 이상이어야 합니다.")
@@ -86,10 +110,21 @@ def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
     if not db_user or not verify_password(user.password, db_user.password_hash):
         raise HTTPException(status_code=401, detail="아이디 또는 비밀번호가 잘못되었습니다")
     
-    # Create JWT token
-    access_token_expires = timedelta(hours=24)
-    expire = datetime.utcnow() + access_token_expires
-    to_encode = {"sub": db_user.username, "exp": expire}
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    
-    return {"access_token": encoded_jwt, "token_type": "bearer", "user": schemas.UserResponse.model_validate(db_user)}
+    # 짧은 액세스 토큰 + 리프레시 토큰 (app/sessions.py)
+    family, refresh_token = sessions.start(db, db_user)
+    return _token_response(db_user, family, refresh_token)
+
+@router.post("/refresh")
+def refresh(body: schemas.RefreshRequest, db: Session = Depends(get_db)):
+    """리프레시 토큰으로 새 액세스 토큰과 새 리프레시 토큰을 발급 (이전 리프레시 토큰은 더 쓸 수 없음)"""
+    rotated = sessions.rotate(db, body.refresh_token)
+    if rotated is None or rotated[0] is None:
+        raise HTTPException(status_code=401, detail="세션이 만료되었습니다. 다시 로그인해 주세요")
+    user, family, refresh_token = rotated
+    return _token_response(user, family, refresh_token)
+
+@router.post("/logout")
+def logout(body: schemas.RefreshRequest, db: Session = Depends(get_db)):
+    """세션 종료: 리프레시 토큰과 이 세션에서 발급된 액세스 토큰을 모두 폐기"""
+    sessions.revoke_token(db, body.refresh_token)
+    return {"message": "로그아웃되었습니다"}
@@ -0,0 +1,297 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from tempfile import SpooledTemporaryFile
+from typing import Callable, Iterator, List, Optional, Tuple
+from datetime import datetime
+from collections import Counter
+import csv
+import io
+import json
+from app import schemas, models, ranking, rollups, similarity, archive, regions, snapshots, user_stats
+from app.database import get_db, SessionLocal
+from app.dependencies import get_current_user
+from app.leaderboards import leaderboard
+from app.debate_export import iter_topic_records
+from app.evidence import summarize_rows
+
+router = APIRouter(prefix="/api/bulk", tags=["bulk"])
+
+DEFAULT_CHUNK_SIZE = 500
+# 업로드 본문은 이 크기까지만 메모리에 두고 넘으면 임시 파일로 내려씀
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+def _require_admin(current_user: Optional[models.User]):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
+    if current_user.username != "admin":
+        raise HTTPException(status_code=403, detail="관리자만 일괄 작업을 수행할 수 있습니다")
+
+def _detect_format(format: Optional[str], content_type: str) -> str:
+    if format:
+        if format not in ("ndjson", "csv"):
+            raise HTTPException(status_code=400, detail="format은 ndjson 또는 csv여야 합니다")
+        return format
+    return "csv" if "csv" in (content_type or "") else "ndjson"
+
+async def _spool_body(request: Request) -> SpooledTemporaryFile:
+    """요청 본문을 스트리밍으로 받아 임시 파일에 저장"""
+    spool = SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+def _iter_rows(stream, fmt: str) -> Iterator[Tuple[int, object]]:
+    """(줄 번호, dict 또는 오류) 를 한 줄씩 생성"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            row = {k: (v if v != "" else None) for k, v in row.items() if k}
+            # CSV에서는 근거 목록을 JSON 문자열 컬럼으로 받음
+            if row.get("evidence"):
+                try:
+                    row["evidence"] = json.loads(row["evidence"])
+                except json.JSONDecodeError:
+                    yield reader.line_num, ValueError("evidence 컬럼은 JSON 배열이어야 합니다")
+                    continue
+            else:
+                row.pop("evidence", None)
+            yield reader.line_num, row
+    else:
+        for line_no, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, ValueError(f"JSON 형식 오류: {e.msg}")
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+def _run_import(
+    db: Session,
+    rows: Iterator[Tuple[int, object]],
+    schema,
+    persist: Callable[[Session, list, List[schemas.BulkImportError]], Tuple[int, Callable[[], None]]],
+    chunk_size: int,
+) -> schemas.BulkImportResult:
+    """행을 검증하고 chunk_size개씩 한 트랜잭션으로 저장
+
+    persist는 (저장한 행 수, 커밋 후 실행할 콜백)을 반환합니다.
+    """
+    errors: List[schemas.BulkImportError] = []
+    imported = 0
+    buffer: List[Tuple[int, object]] = []
+
+    def flush():
+        nonlocal imported, buffer
+        if not buffer:
+            return
+        recorded = len(errors)
+        try:
+            count, on_commit = persist(db, buffer, errors)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # persist가 남긴 행별 오류는 되돌린 청크 전체의 저장 실패로 대체 (한 줄에 하나씩)
+            del errors[recorded:]
+            for line_no, _ in buffer:
+                errors.append(schemas.BulkImportError(line=line_no, error=f"저장 실패: {e}"))
+        else:
+            imported += count
+            on_commit()
+        buffer = []
+
+    for line_no, row in rows:
+        if isinstance(row, Exception):
+            errors.append(schemas.BulkImportError(line=line_no, error=str(row)))
+            continue
+        if not isinstance(row, dict):
+            errors.append(schemas.BulkImportError(line=line_no, error="각 줄은 JSON 객체여야 합니다"))
+            continue
+        try:
+            item = schema.model_validate(row)
+        except ValidationError as e:
+            errors.append(schemas.BulkImportError(line=line_no, error=_validation_message(e)))
+            continue
+        buffer.append((line_no, item))
+        if len(buffer) >= chunk_size:
+            flush()
+    flush()
+    errors.sort(key=lambda e: e.line)
+    return schemas.BulkImportResult(imported=imported, failed=len(errors), errors=errors)
+
+def _persist_topics(db: Session, items, errors) -> Tuple[int, Callable[[], None]]:
+    topics = [
+        models.Topic(
+            title=item.title,
+            category=item.category,
+            region=item.region,
+            district=item.district,
+            topic_type=item.topic_type,
+        )
+        for _, item in items
+    ]
+    region_nodes = [regions.resolve(db, topic.region, topic.district) for topic in topics]
+    for topic, nodes in zip(topics, region_nodes):
+        if nodes:
+            topic.region_id = nodes[-1]["id"]
+    db.add_all(topics)
+    db.flush()
+
+    def on_commit():
+        for topic, nodes in zip(topics, region_nodes):
+            leaderboard.add_topic(topic)
+            regions.index.add_topic(topic.id, nodes)
+            snapshots.publisher.mark(topic.id)
+    return len(topics), on_commit
+
+def _persist_claims(db: Session, items, errors, default_user: models.User) -> Tuple[int, Callable[[], None]]:
+    topic_ids = {item.topic_id for _, item in items}
+    # {topic_id: 보관 여부}
+    existing_topics = {
+        topic_id: archived_at is not None
+        for topic_id, archived_at in db.query(models.Topic.id, models.Topic.archived_at).filter(
+            models.Topic.id.in_(topic_ids)
+        )
+    }
+    usernames = {item.username for _, item in items if item.username}
+    users = {
+        user.username: user.id
+        for user in db.query(models.User).filter(models.User.username.in_(usernames))
+    } if usernames else {}
+
+    created = []
+    now = datetime.utcnow()
+    for line_no, item in items:
+        if item.topic_id not in existing_topics:
+            errors.append(schemas.BulkImportError(line=line_no, error=f"존재하지 않는 주제입니다: {item.topic_id}"))
+            continue
+        if existing_topics[item.topic_id]:
+            errors.append(schemas.BulkImportError(line=line_no, error=f"보관된 토론에는 글을 쓸 수 없습니다: {item.topic_id}"))
+            continue
+        if item.username and item.username not in users:
+            errors.append(schemas.BulkImportError(line=line_no, error=f"존재하지 않는 사용자입니다: {item.username}"))
+            continue
+        claim = models.Claim(
+            topic_id=item.topic_id,
+            user_id=users[item.username] if item.username else default_user.id,
+            title=item.title,
+            content=item.content,
+            type=item.type,
+            created_at=now,
+        )
+        ranking.touch(claim, now)
+        db.add(claim)
+        created.append((claim, item))
+    db.flush()
+
+    # 청크 안의 주장은 모두 같은 시간 구간이므로 주제별로 한 번만 집계
+    new_claims = Counter(claim.topic_id for claim, _ in created)
+    for topic_id, count in new_claims.items():
+        rollups.record(db, topic_id, when=now, claims=count)
+    for user_id, count in Counter(claim.user_id for claim, _ in created).items():
+        user_stats.apply(db, user_id, claims=count)
+
+    evidence = []
+    for claim, item in created:
+        # 유사 주장 색인은 다음 조회 때 저장된 서명을 읽어 반영함
+        similarity.store(db, claim)
+        for ev in item.evidence or []:
+            evidence.append(models.Evidence(
+                claim_id=claim.id,
+                source=ev.get('source', ''),
+                publisher=ev.get('publisher', 'User'),
+                text=ev.get('text'),
+                url=ev.get("url")
+            ))
+    # 청크의 근거를 한 번에 요약 (많으면 프로세스 풀에서)
+    summarize_rows(db, evidence)
+    db.add_all(evidence)
+
+    def on_commit():
+        for claim, _ in created:
+            leaderboard.record_claim(claim.topic_id)
+            regions.index.record(claim.topic_id, claims=1, activity=1)
+            snapshots.publisher.mark(claim.topic_id)
+    return len(created), on_commit
+
+@router.post("/topics", response_model=schemas.BulkImportResult)
+async def import_topics(
+    request: Request,
+    format: Optional[str] = None,  # ndjson, csv (없으면 Content-Type으로 판단)
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_user)
+):
+    """주제 일괄 가져오기 (한 줄에 주제 하나)"""
+    _require_admin(current_user)
+    fmt = _detect_format(format, request.headers.get("content-type"))
+    spool = await _spool_body(request)
+    try:
+        return await run_in_threadpool(
+            _run_import, db, _iter_rows(spool, fmt), schemas.TopicCreate, _persist_topics, max(chunk_size, 1)
+        )
+    finally:
+        spool.close()
+
+@router.post("/claims", response_model=schemas.BulkImportResult)
+async def import_claims(
+    request: Request,
+    format: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_user)
+):
+    """주장 일괄 가져오기 (한 줄에 주장 하나, username이 없으면 관리자 명의)"""
+    _require_admin(current_user)
+    fmt = _detect_format(format, request.headers.get("content-type"))
+    spool = await _spool_body(request)
+
+    def persist(session, items, errors):
+        return _persist_claims(session, items, errors, current_user)
+
+    try:
+        return await run_in_threadpool(
+            _run_import, db, _iter_rows(spool, fmt), schemas.ClaimImport, persist, max(chunk_size, 1)
+        )
+    finally:
+        spool.close()
+
+@router.get("/topics/{topic_id}/export")
+def export_topic(
+    topic_id: int,
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_user)
+):
+    """주제의 토론 전체를 NDJSON으로 스트리밍 (topic, claim, rebuttal, evidence 레코드)"""
+    _require_admin(current_user)
+    if not db.query(models.Topic.id).filter(models.Topic.id == topic_id).first():
+        raise HTTPException(status_code=404, detail="토론 주제를 찾을 수 없습니다")
+    headers = {"Content-Disposition": f'attachment; filename="topic-{topic_id}.ndjson"'}
+
+    # 보관된 주제는 저장해 둔 스냅샷이 곧 내보내기 결과
+    snapshot = db.query(models.TopicArchive.snapshot).filter(models.TopicArchive.topic_id == topic_id).scalar()
+    if snapshot is not None:
+        return StreamingResponse(archive.iter_snapshot(snapshot), media_type="application/x-ndjson", headers=headers)
+
+    def generate():
+        # 응답을 보내는 동안 요청 세션과 별개로 세션을 유지
+        session = SessionLocal()
+        try:
+            topic = session.query(models.Topic).filter(models.Topic.id == topic_id).first()
+            for record in iter_topic_records(session, topic):
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+        finally:
+            session.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
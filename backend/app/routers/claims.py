@@ -1,43 +1,98 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, func, desc
 from typing import List, Optional
+from datetime import datetime
 from app import schemas, models
 from app.database import get_db
 from app.dependencies import get_current_user
+from app.leaderboards import leaderboard
+from app import ranking, party_votes, rollups, similarity, archive, jobs, regions, snapshots, user_stats
+from app.evidence import summarize_rows
+from app.argument_graph import graphs
+from app.realtime import hub
+from app.vote_store import viewer_votes
 
 router = APIRouter(prefix="/api/claims", tags=["claims"])
 
+@jobs.handler("evidence.attach")
+def attach_evidence(db: Session, payload: dict):
+    """주장/반박 작성 후 근거를 요약과 함께 저장하는 작업 (payload: claim_id 또는 rebuttal_id, items)"""
+    rows = [
+        models.Evidence(
+            claim_id=payload.get("claim_id"),
+            rebuttal_id=payload.get("rebuttal_id"),
+            source=item.get("source"),
+            publisher=item.get("publisher"),
+            text=item.get("text"),
+            url=item.get("url")
+        )
+        for item in payload["items"]
+    ]
+    summarize_rows(db, rows)
+    db.add_all(rows)
+    # 근거도 토론 화면 스냅샷에 들어가므로 주제를 다시 만들도록 알림
+    if payload.get("claim_id"):
+        claim = db.query(models.Claim).filter(models.Claim.id == payload["claim_id"]).first()
+    else:
+        rebuttal = db.query(models.Rebuttal).filter(models.Rebuttal.id == payload["rebuttal_id"]).first()
+        claim = rebuttal.claim if rebuttal is not None else None
+    if claim is not None:
+        snapshots.publisher.mark(claim.topic_id)
+
 @router.get("/topic/{topic_id}", response_model=List[schemas.ClaimResponse])
 def get_claims_by_topic(
     topic_id: int, 
     sort_by: str = "best",  # 정렬 파라미터 추가 (best, new, trend)
+    side: Optional[str] = None,  # pro, con (없으면 양쪽 모두)
+    skip: int = 0,
+    limit: Optional[int] = None,  # 진영별 페이지 크기
+    include_parties: bool = False,  # 정당별 투표 집계 포함 여부
     db: Session = Depends(get_db),
     current_user: Optional[models.User] = Depends(get_current_user)
 ):
+    # 비로그인 기본 조회는 인기 주제면 미리 만든 스냅샷 파일로 응답 (DB 조회 없음)
+    if current_user is None and (sort_by, side, skip, limit, include_parties) == ("best", None, 0, None, False):
+        cached = snapshots.response(f"claims/{topic_id}")
+        if cached is not None:
+            return cached
+    return list_claims_by_topic(db, topic_id, sort_by, side, skip, limit, include_parties, current_user)
+
+def list_claims_by_topic(
+    db: Session,
+    topic_id: int,
+    sort_by: str = "best",
+    side: Optional[str] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    include_parties: bool = False,
+    current_user: Optional[models.User] = None,
+) -> list:
+    """주제의 주장 목록 (스냅샷 발행에서도 사용)"""
     # 기본 쿼리 생성
     query = db.query(models.Claim).options(joinedload(models.Claim.user)).filter(models.Claim.topic_id == topic_id)
     
-    # 정렬 로직 적용
-    if sort_by == "new":
-        # 최신순
-        query = query.order_by(models.Claim.created_at.desc())
-    elif sort_by == "best":
-        # 반박(댓글) 많은 순
-        # Rebuttal 테이블과 조인하여 개수(count) 기준으로 정렬
-        query = query.outerjoin(models.Rebuttal).group_by(models.Claim.id).order_by(func.count(models.Rebuttal.id).desc())
-    elif sort_by == "trend":
-        # 최근 활동순 (가장 최근에 반박이 달린 주장 우선)
-        # 반박 생성 시간의 최댓값을 기준으로 정렬, 반박이 없으면 주장 생성 시간 기준
-        query = query.outerjoin(models.Rebuttal).group_by(models.Claim.id).order_by(
-            func.coalesce(func.max(models.Rebuttal.created_at), models.Claim.created_at).desc()
-        )
-    else:
-        # 기본값 (votes 순 혹은 id 순)
-        query = query.order_by(models.Claim.votes.desc())
+    # 정렬 로직 적용 (new, best, trend - app/ranking.py)
+    query = ranking.order_claims(query, sort_by)
 
-    claims = query.all()
+    # 찬성/반대 진영은 각각 따로 순위를 매김
+    if side:
+        claims = query.filter(models.Claim.type == side).offset(skip).limit(limit).all()
+    elif limit is not None:
+        claims = []
+        for claim_side in ("pro", "con"):
+            claims.extend(query.filter(models.Claim.type == claim_side).offset(skip).limit(limit).all())
+    else:
+        claims = query.offset(skip).all()
+    
+    # 보관된 주제는 라이브 테이블에 주장이 없으므로 스냅샷에서 읽음
+    if not claims:
+        archived = archive.load(db, topic_id)
+        if archived is not None:
+            return archive.claim_list(archived, sort_by, side, skip, limit)
     
+    # 현재 사용자의 투표는 목록 전체에 대해 한 번에 조회
+    user_votes = viewer_votes(db, current_user.id, [c.id for c in claims])[0] if current_user else {}
+    parties = party_votes.breakdown(db, [c.id for c in claims]) if include_parties else {}
     result = []
     for claim in claims:
         claim_dict = {
@@ -59,19 +114,34 @@ def get_claims_by_topic(
                 "level": claim.user.level
             }
         # 현재 사용자의 투표 정보 추가
-        if current_user:
-            user_vote = db.query(models.Vote).filter(
-                and_(
-                    models.Vote.user_id == current_user.id,
-                    models.Vote.claim_id == claim.id
-                )
-            ).first()
-            claim_dict["user_vote"] = user_vote.vote_type if user_vote else None
-        else:
-            claim_dict["user_vote"] = None
+        claim_dict["user_vote"] = user_votes.get(claim.id)
+        if include_parties:
+            claim_dict["party_votes"] = parties.get(claim.id, [])
         result.append(claim_dict)
     return result
 
+@router.get("/topic/{topic_id}/duplicates", response_model=List[schemas.DuplicateCluster])
+def get_duplicate_clusters(
+    topic_id: int,
+    threshold: float = similarity.THRESHOLD,
+    db: Session = Depends(get_db)
+):
+    """주제 안에서 서로 비슷한 주장끼리 묶은 그룹 (큰 그룹부터)"""
+    groups = similarity.index.clusters(db, topic_id, min(max(threshold, 0.1), 1.0))
+    titles = dict(db.query(models.Claim.id, models.Claim.title).filter(
+        models.Claim.id.in_([claim_id for group in groups for claim_id, _ in group])
+    )) if groups else {}
+    result = []
+    for group in groups:
+        # 색인에 남아 있지만 다른 워커에서 삭제된 주장은 제외
+        claims = [
+            {"id": claim_id, "title": titles[claim_id], "similarity": round(score, 3)}
+            for claim_id, score in group if claim_id in titles
+        ]
+        if len(claims) > 1:
+            result.append({"claims": claims})
+    return result
+
 # ... (create_claim, get_claim, get_claim_evidence 함수는 기존과 동일하게 유지) ...
 @router.post("/", response_model=schemas.ClaimResponse)
 def create_claim(
@@ -82,28 +152,41 @@ def create_claim(
     if not current_user:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다")
     
+    if db.query(models.Topic.archived_at).filter(models.Topic.id == claim.topic_id).scalar():
+        raise HTTPException(status_code=409, detail="보관된 토론에는 글을 쓸 수 없습니다")
+    
+    # 같은 주제의 유사한 기존 주장을 LSH 색인에서 찾음 (주제 전체를 비교하지 않음)
+    signature = similarity.signature(similarity.claim_text(claim.title, claim.content))
+    duplicates = similarity.index.find(db, claim.topic_id, signature)
+    
+    now = datetime.utcnow()
     db_claim = models.Claim(
         topic_id=claim.topic_id,
         user_id=current_user.id,
         title=claim.title,
         content=claim.content,
-        type=claim.type
+        type=claim.type,
+        created_at=now
     )
+    ranking.touch(db_claim, now)
     db.add(db_claim)
+    rollups.record(db, claim.topic_id, when=now, claims=1)
+    user_stats.apply(db, current_user.id, claims=1)
+    db.flush()
+    similarity.store(db, db_claim, signature)
+    # 근거는 작업 큐에서 저장 (주장과 같은 트랜잭션으로 등록)
+    if claim.evidence:
+        items = [
+            {"source": ev.get('source', ''), "publisher": ev.get('publisher', 'User'), "text": ev.get('text'), "url": ev.get("url")}
+            for ev in claim.evidence
+        ]
+        jobs.enqueue(db, "evidence.attach", {"claim_id": db_claim.id, "items": items}, key=f"evidence:claim:{db_claim.id}")
     db.commit()
     db.refresh(db_claim)
-    
-    if claim.evidence:
-        for ev in claim.evidence:
-            db_evidence = models.Evidence(
-                claim_id=db_claim.id,
-                source=ev.get('source', ''),
-                publisher=ev.get('publisher', 'User'),
-                text=ev.get('text'),
-                url=ev.get("url")
-            )
-            db.add(db_evidence)
-        db.commit()
+    leaderboard.record_claim(db_claim.topic_id)
+    regions.index.record(db_claim.topic_id, claims=1, activity=1)
+    snapshots.publisher.mark(db_claim.topic_id)
+    similarity.index.add(db_claim.topic_id, db_claim.id, signature)
     
     db_claim = db.query(models.Claim).options(joinedload(models.Claim.user)).filter(models.Claim.id == db_claim.id).first()
     claim_dict = {
@@ -123,6 +206,8 @@ def create_claim(
             "affiliation": db_claim.user.affiliation or db_claim.user.political_party or "",
             "level": db_claim.user.level
         }
+    hub.publish(db_claim.topic_id, {"type": "claim.created", "claim": claim_dict})
+    claim_dict["duplicates"] = similarity.describe(db, duplicates)
     return claim_dict
 
 @router.get("/{claim_id}", response_model=schemas.ClaimResponse)
@@ -133,6 +218,9 @@ def get_claim(
 ):
     claim = db.query(models.Claim).options(joinedload(models.Claim.user)).filter(models.Claim.id == claim_id).first()
     if not claim:
+        archived = archive.load_item(db, "claim", claim_id)
+        if archived is not None:
+            return dict(archived.claim(claim_id), user_vote=None)
         raise HTTPException(status_code=404, detail="주장을 찾을 수 없습니다")
     
     claim_dict = {
@@ -153,13 +241,8 @@ def get_claim(
             "level": claim.user.level
         }
     if current_user:
-        user_vote = db.query(models.Vote).filter(
-            and_(
-                models.Vote.user_id == current_user.id,
-                models.Vote.claim_id == claim.id
-            )
-        ).first()
-        claim_dict["user_vote"] = user_vote.vote_type if user_vote else None
+        claim_votes, _ = viewer_votes(db, current_user.id, claim_ids=[claim.id])
+        claim_dict["user_vote"] = claim_votes.get(claim.id)
     else:
         claim_dict["user_vote"] = None
     return claim_dict
@@ -167,17 +250,59 @@ def get_claim(
 @router.get("/{claim_id}/evidence", response_model=List[dict])
 def get_claim_evidence(claim_id: int, db: Session = Depends(get_db)):
     evidence = db.query(models.Evidence).filter(models.Evidence.claim_id == claim_id).all()
+    if not evidence:
+        archived = archive.load_item(db, "claim", claim_id)
+        if archived is not None:
+            return archived.claim_evidence.get(claim_id, [])
     return [
         {
             "id": e.id,
             "source": e.source,
             "publisher": e.publisher,
             "text": e.text,
+            "summary": e.summary,
             "url": e.url
         }
         for e in evidence
     ]
 
+@router.get("/{claim_id}/party-votes", response_model=schemas.ClaimPartyVotes)
+def get_claim_party_votes(claim_id: int, db: Session = Depends(get_db)):
+    """주장에 대한 정당별 좋아요/싫어요 수"""
+    if not db.query(models.Claim.id).filter(models.Claim.id == claim_id).first():
+        raise HTTPException(status_code=404, detail="주장을 찾을 수 없습니다")
+    return {"claim_id": claim_id, "parties": party_votes.breakdown(db, [claim_id])[claim_id]}
+
+@router.get("/{claim_id}/metrics", response_model=schemas.ArgumentMetrics)
+def get_claim_metrics(claim_id: int, threads: int = 10, db: Session = Depends(get_db)):
+    """반박 트리 전체 지표 (답이 없는 반박, 가장 깊은 사슬, 찬반 순지지, 큰 스레드)"""
+    exists = db.query(models.Claim.id).filter(models.Claim.id == claim_id).first()
+    if not exists and archive.topic_of(db, "claim", claim_id) is None:
+        raise HTTPException(status_code=404, detail="주장을 찾을 수 없습니다")
+    return graphs.metrics(db, claim_id, threads=max(0, min(threads, 100)))
+
+@router.get("/{claim_id}/timeseries", response_model=schemas.TimeSeriesResponse)
+def get_claim_timeseries(
+    claim_id: int,
+    granularity: str = "hour",  # hour, day
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """주장에 대한 좋아요/싫어요/반박 수 추이 (시간·일 단위 구간)"""
+    try:
+        since, until = rollups.resolve_range(granularity, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not db.query(models.Claim.id).filter(models.Claim.id == claim_id).first():
+        raise HTTPException(status_code=404, detail="주장을 찾을 수 없습니다")
+    return {
+        "scope": "claim",
+        "target_id": claim_id,
+        "granularity": granularity,
+        "points": rollups.series(db, "claim", claim_id, granularity, since, until),
+    }
+
 @router.delete("/{claim_id}")
 def delete_claim(
     claim_id: int,
@@ -197,7 +322,18 @@ def delete_claim(
 
     # 연관된 반박, 투표, 근거 등은 DB 설정(Cascade)에 따라 자동 삭제되거나
     # 수동으로 지워야 할 수 있습니다. 여기서는 글 자체 삭제만 처리합니다.
+    topic_id, claim_votes = claim.topic_id, claim.votes or 0
+    user_stats.remove(db, models.Claim.id == claim_id)
     db.delete(claim)
+    party_votes.remove_claim(db, claim_id)
+    rollups.remove_claim(db, claim)
+    db.query(models.ClaimSignature).filter(models.ClaimSignature.claim_id == claim_id).delete()
     db.commit()
+    similarity.index.remove(topic_id, claim_id)
+    graphs.drop(claim_id)
+    leaderboard.remove_claim(topic_id, claim_votes)
+    regions.index.record(topic_id, claims=-1, activity=-1)
+    snapshots.publisher.mark(topic_id)
+    hub.publish(topic_id, {"type": "claim.deleted", "id": claim_id})
     
     return {"message": "삭제되었습니다"}
\ No newline at end of file
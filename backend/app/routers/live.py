@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+import asyncio
+from app.realtime import hub
+
+router = APIRouter(prefix="/api/live", tags=["live"])
+
+# 끊어진 연결을 정리하고 프록시 타임아웃을 피하기 위한 하트비트 간격
+HEARTBEAT_SECONDS = 25
+# 느린 구독자로 끊을 때 사용하는 종료 코드 (1013: Try Again Later)
+CLOSE_SLOW_CONSUMER = 1013
+
+@router.websocket("/topics/{topic_id}")
+async def topic_channel(websocket: WebSocket, topic_id: int):
+    """주제의 새 주장/반박과 투표 수 변화를 실시간으로 받는 WebSocket 채널
+
+    서버 -> 클라이언트 프레임: claim.created, claim.deleted, rebuttal.created,
+    rebuttal.deleted, votes (묶음)
+    """
+    await websocket.accept()
+    subscriber = hub.subscribe(topic_id)
+
+    async def drain_client():
+        # 클라이언트가 보내는 메시지는 무시하고 연결 종료만 감지
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    receiver = asyncio.create_task(drain_client())
+    try:
+        while not receiver.done():
+            getter = asyncio.ensure_future(subscriber.queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, timeout=HEARTBEAT_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                if receiver in done:
+                    break
+                await websocket.send_text('{"type":"ping"}')
+                continue
+            if subscriber.overflowed:
+                await websocket.close(code=CLOSE_SLOW_CONSUMER)
+                break
+            await websocket.send_text(getter.result())
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(subscriber)
+
+@router.get("/topics/{topic_id}/events")
+async def topic_events(topic_id: int, request: Request):
+    """WebSocket을 쓸 수 없는 클라이언트를 위한 같은 채널의 SSE 버전"""
+    subscriber = hub.subscribe(topic_id)
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if subscriber.overflowed:
+                    break
+                yield f"data: {frame}\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/stats")
+def live_stats():
+    """현재 워커의 구독자 수와 전송 통계"""
+    return {
+        "subscribers": hub.subscriber_count(),
+        "frames_sent": hub.frames_sent,
+        "dropped_subscribers": hub.dropped_subscribers,
+    }
@@ -1,13 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from sqlalchemy import func, update
 from typing import List, Optional
+from datetime import datetime
 from app import schemas, models
 from app.database import get_db
 from app.dependencies import get_current_user
+from app.leaderboards import leaderboard
+from app import ranking, rollups, archive, jobs, regions, snapshots, user_stats
+from app.realtime import hub
+from app.vote_store import viewer_votes
+from app.argument_graph import graphs
 
 router = APIRouter(prefix="/api/rebuttals", tags=["rebuttals"])
 
+@jobs.handler("rebuttal.notify")
+def notify_rebuttal(db: Session, payload: dict):
+    """반박이 달린 글의 작성자에게 알림 (재반박이면 원 반박 작성자, 아니면 주장 작성자)"""
+    rebuttal = db.query(models.Rebuttal).filter(models.Rebuttal.id == payload["rebuttal_id"]).first()
+    if not rebuttal:
+        return  # 그 사이 삭제됨
+    
+    target_user_id = None
+    if rebuttal.parent_id:
+        # 재반박인 경우: 원 댓글 작성자에게 알림
+        parent = db.query(models.Rebuttal).filter(models.Rebuttal.id == rebuttal.parent_id).first()
+        if parent:
+            target_user_id = parent.user_id
+            msg = "내 의견에 재반박이 달렸습니다."
+    elif rebuttal.claim:
+        # 반박인 경우: 주장 작성자에게 알림
+        target_user_id = rebuttal.claim.user_id
+        msg = "내 주장에 반박이 달렸습니다."
+    
+    if target_user_id and target_user_id != rebuttal.user_id: # 본인 글엔 알림 X
+        db.add(models.Notification(user_id=target_user_id, content=msg, link=f"/debate/topic/{rebuttal.claim.topic_id}"))
+
+def _add_rebuttal_count(db: Session, claim: models.Claim, delta: int):
+    """주장의 반박 수를 SQL 식으로 증감하고 갱신된 값을 다시 읽음 (동시에 달린 반박이 서로 덮어쓰지 않게)"""
+    count = func.coalesce(models.Claim.rebuttal_count, 0)
+    db.execute(
+        update(models.Claim)
+        .where(models.Claim.id == claim.id, count + delta >= 0)
+        .values(rebuttal_count=count + delta)
+        .execution_options(synchronize_session=False)
+    )
+    db.refresh(claim, ["rebuttal_count"])
+
 @router.get("/claim/{claim_id}", response_model=List[schemas.RebuttalResponse])
 def get_rebuttals_by_claim(
     claim_id: int, 
@@ -18,7 +57,13 @@ def get_rebuttals_by_claim(
         joinedload(models.Rebuttal.user),
         joinedload(models.Rebuttal.evidence)
     ).filter(models.Rebuttal.claim_id == claim_id).all()
+    if not rebuttals:
+        archived = archive.load_item(db, "claim", claim_id)
+        if archived is not None:
+            return [archive.rebuttal_dict(archived, r) for r in archived.rebuttals_by_claim.get(claim_id, [])]
 
+    # 현재 사용자의 투표는 목록 전체에 대해 한 번에 조회
+    user_votes = viewer_votes(db, current_user.id, rebuttal_ids=[r.id for r in rebuttals])[1] if current_user else {}
     result = []
     for rebuttal in rebuttals:
         rebuttal_dict = {
@@ -39,6 +84,7 @@ def get_rebuttals_by_claim(
                 "source": e.source,
                 "publisher": e.publisher,
                 "text": e.text,
+                "summary": e.summary,
                 "url": e.url
             }
             for e in rebuttal.evidence
@@ -52,16 +98,7 @@ def get_rebuttals_by_claim(
                 "level": rebuttal.user.level
             }
         # 현재 사용자의 투표 정보 추가
-        if current_user:
-            user_vote = db.query(models.Vote).filter(
-                and_(
-                    models.Vote.user_id == current_user.id,
-                    models.Vote.rebuttal_id == rebuttal.id
-                )
-            ).first()
-            rebuttal_dict["user_vote"] = user_vote.vote_type if user_vote else None
-        else:
-            rebuttal_dict["user_vote"] = None
+        rebuttal_dict["user_vote"] = user_votes.get(rebuttal.id)
         result.append(rebuttal_dict)
     return result
 
@@ -74,52 +111,41 @@ def create_rebuttal(
     if not current_user:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다")
     
+    claim = db.query(models.Claim).filter(models.Claim.id == rebuttal.claim_id).first()
+    if not claim:
+        raise HTTPException(status_code=404, detail="주장을 찾을 수 없습니다")
+    
+    now = datetime.utcnow()
     db_rebuttal = models.Rebuttal(
         claim_id=rebuttal.claim_id,
         parent_id=rebuttal.parent_id,
         user_id=current_user.id,
         title=rebuttal.title,
         content=rebuttal.content,
-        type=rebuttal.type
+        type=rebuttal.type,
+        created_at=now
     )
     db.add(db_rebuttal)
-    db.commit()
-    db.refresh(db_rebuttal)
-
+    # 주장의 반박 수와 hot 점수, 시간대별 집계를 같은 트랜잭션에서 갱신
+    _add_rebuttal_count(db, claim, 1)
+    ranking.touch(claim, now)
+    rollups.record(db, claim.topic_id, claim.id, now, rebuttals=1)
+    user_stats.record_rebuttal(db, db_rebuttal, claim, 1)
+    db.flush()
+    # 근거 저장과 알림은 작업 큐에서 처리 (반박과 같은 트랜잭션으로 등록)
     if rebuttal.evidence:
-        for ev in rebuttal.evidence:
-            db_ev = models.Evidence(
-                rebuttal_id=db_rebuttal.id, # 반박 ID에 연결
-                source=ev.get('source', ''),
-                publisher=ev.get('publisher', ''),
-                text=ev.get('text', ''),
-                url=ev.get('url', '')
-            )
-            db.add(db_ev)
-        db.commit()
-
-    target_user_id = None
-    topic_link = f"/debate/topic/{db_rebuttal.claim.topic_id}"
-    
-    if rebuttal.parent_id:
-        # 재반박인 경우: 원 댓글 작성자에게 알림
-        parent = db.query(models.Rebuttal).filter(models.Rebuttal.id == rebuttal.parent_id).first()
-        if parent:
-            target_user_id = parent.user_id
-            msg = "내 의견에 재반박이 달렸습니다."
-    else:
-        # 반박인 경우: 주장 작성자에게 알림
-        claim = db.query(models.Claim).filter(models.Claim.id == rebuttal.claim_id).first()
-        if claim:
-            target_user_id = claim.user_id
-            msg = "내 주장에 반박이 달렸습니다."
-            
-    if target_user_id and target_user_id != current_user.id: # 본인 글엔 알림 X
-        noti = models.Notification(user_id=target_user_id, content=msg, link=topic_link)
-        db.add(noti)
-        db.commit()
+        items = [
+            {"source": ev.get('source', ''), "publisher": ev.get('publisher', ''), "text": ev.get('text', ''), "url": ev.get('url', '')}
+            for ev in rebuttal.evidence
+        ]
+        jobs.enqueue(db, "evidence.attach", {"rebuttal_id": db_rebuttal.id, "items": items}, key=f"evidence:rebuttal:{db_rebuttal.id}")
+    jobs.enqueue(db, "rebuttal.notify", {"rebuttal_id": db_rebuttal.id}, key=f"notify:rebuttal:{db_rebuttal.id}")
+    db.commit()
 
-    db.refresh(db_rebuttal)
+    leaderboard.record_rebuttal(claim.topic_id)
+    regions.index.record(claim.topic_id, activity=1)
+    snapshots.publisher.mark(claim.topic_id)
+    graphs.add(claim.id, db_rebuttal.id, db_rebuttal.parent_id, 0, db_rebuttal.type)
     
     # 사용자 정보를 다시 로드
     db_rebuttal = db.query(models.Rebuttal).options(joinedload(models.Rebuttal.user)).filter(models.Rebuttal.id == db_rebuttal.id).first()
@@ -143,6 +169,7 @@ def create_rebuttal(
             "affiliation": db_rebuttal.user.affiliation or db_rebuttal.user.political_party or "",
             "level": db_rebuttal.user.level
         }
+    hub.publish(claim.topic_id, {"type": "rebuttal.created", "rebuttal": rebuttal_dict})
     return rebuttal_dict
 
 @router.get("/{rebuttal_id}", response_model=schemas.RebuttalResponse)
@@ -151,6 +178,9 @@ def get_rebuttal(rebuttal_id: int, db: Session = Depends(get_db)):
         joinedload(models.Rebuttal.evidence)
     ).filter(models.Rebuttal.id == rebuttal_id).first()
     if not rebuttal:
+        archived = archive.load_item(db, "rebuttal", rebuttal_id)
+        if archived is not None:
+            return archive.rebuttal_dict(archived, archived.rebuttals[rebuttal_id])
         raise HTTPException(status_code=404, detail="반박을 찾을 수 없습니다")
     return rebuttal
 
@@ -171,6 +201,19 @@ def delete_rebuttal(
     if rebuttal.user_id != current_user.id and current_user.level < 999:
         raise HTTPException(status_code=403, detail="삭제 권한이 없습니다")
         
+    claim = rebuttal.claim
+    if claim is not None:
+        _add_rebuttal_count(db, claim, -1)
+        ranking.rescore(claim)
+    if claim is not None and rebuttal.created_at:
+        rollups.record(db, claim.topic_id, claim.id, rebuttal.created_at, rebuttals=-1)
+    if claim is not None:
+        user_stats.remove_rebuttal(db, rebuttal, claim)
     db.delete(rebuttal)
     db.commit()
+    if claim is not None:
+        graphs.remove(claim.id, rebuttal_id)
+        regions.index.record(claim.topic_id, activity=-1)
+        snapshots.publisher.mark(claim.topic_id)
+        hub.publish(claim.topic_id, {"type": "rebuttal.deleted", "id": rebuttal_id, "claim_id": claim.id})
     return {"message": "삭제되었습니다"}
\ No newline at end of file
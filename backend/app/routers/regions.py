@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from app import schemas, regions
+
+router = APIRouter(prefix="/api/regions", tags=["regions"])
+
+@router.get("/", response_model=List[schemas.RegionResponse])
+def get_regions(q: Optional[str] = None, limit: int = 10):
+    """광역/기초 지역 목록과 지역별 주제·주장·최근 활동 수 (메모리 색인에서 응답)
+
+    q가 있으면 이름이나 "광역 기초" 경로가 q로 시작하는 지역을 주제가 많은 순으로 반환합니다(자동완성).
+    """
+    if not regions.index.ready:
+        # 색인은 기동(lifespan) 때 채움. 요청 경로에서는 DB 전체를 읽지 않음
+        raise HTTPException(status_code=503, detail="지역 목록을 준비하는 중입니다", headers={"Retry-After": "5"})
+    if q:
+        return regions.index.search(q, limit=min(max(limit, 1), 50))
+    return regions.index.tree()
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, Request
+from app import snapshots
+
+router = APIRouter(prefix="/api/snapshots", tags=["snapshots"])
+
+@router.get("/{key:path}")
+async def get_snapshot(key: str, request: Request):
+    """미리 만든 JSON 스냅샷 (topics/best, topics/trend, claims/{topic_id}, pages/{topic_id})
+
+    DB를 전혀 읽지 않고 파일을 그대로 보냅니다. If-None-Match가 현재 버전과 같으면 304를 반환합니다.
+    """
+    response = snapshots.response(key, request.headers.get("if-none-match"))
+    if response is None:
+        raise HTTPException(status_code=404, detail="스냅샷이 없습니다")
+    return response
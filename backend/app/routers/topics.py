@@ -5,6 +5,9 @@ from typing import List, Optional
 from app import schemas, models
 from app.database import get_db
 from app.dependencies import get_current_user
+from app.leaderboards import leaderboard, bucket_key
+from app import topic_page, rollups, archive, regions, snapshots
+from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/topics", tags=["topics"])
 
@@ -15,16 +18,23 @@ def get_topics(
     district: Optional[str] = None,
     topic_type: Optional[str] = None,
     sort_by: str = "best",
+    skip: int = 0,
+    limit: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
+    # 인기순/트렌드는 미리 계산된 랭킹에서 바로 응답 (DB 조회 없음)
+    if sort_by in ("best", "trend") and leaderboard.ready:
+        key = bucket_key(category, region, district, topic_type)
+        return leaderboard.top(key, sort_by, skip, limit)
+
     query = db.query(models.Topic)
     
     if category:
         query = query.filter(models.Topic.category == category)
-    if region:
-        query = query.filter(models.Topic.region == region)
-    if district:
-        query = query.filter(models.Topic.district == district)
+    # 지역은 주제를 만들 때와 같이 정규화해서("서울특별시" -> seoul) region_id로 찾음
+    region_ids = regions.region_ids(region, district)
+    if region_ids is not None:
+        query = query.filter(models.Topic.region_id.in_(region_ids))
     if topic_type:
         query = query.filter(models.Topic.topic_type == topic_type)
     
@@ -36,20 +46,27 @@ def get_topics(
         # Claim.votes 컬럼을 명시적으로 참조
         topics = query.outerjoin(models.Claim).group_by(models.Topic.id).order_by(
             desc(func.coalesce(func.sum(models.Claim.__table__.c.votes), 0))
-        ).all()
+        ).offset(skip).limit(limit).all()
     elif sort_by == "trend":
-        # 트렌드: 최근 7일 내 생성된 주제 중 votes 합계가 높은 순
-        from datetime import datetime, timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        topics = query.filter(models.Topic.created_at >= week_ago).outerjoin(models.Claim).group_by(models.Topic.id).order_by(
-            desc(func.coalesce(func.sum(models.Claim.__table__.c.votes), 0))
-        ).all()
+        # 트렌드: 최근 7일간 활동(투표/반박/새 주장)이 많은 순 (랭킹이 아직 준비되지 않았을 때)
+        # 일 단위 집계(app/rollups.py)에서 주제당 최대 8개 구간만 읽음
+        rollup = models.ActivityRollup
+        week_ago = rollups.bucket_start(datetime.utcnow() - timedelta(days=7), "day")
+        activity = db.query(
+            rollup.target_id.label("topic_id"),
+            func.sum(rollup.likes + rollup.dislikes + rollup.rebuttals + rollup.claims).label("activity"),
+        ).filter(
+            rollup.scope == "topic", rollup.granularity == "day", rollup.bucket_start >= week_ago
+        ).group_by(rollup.target_id).subquery()
+        topics = query.outerjoin(activity, activity.c.topic_id == models.Topic.id).order_by(
+            desc(func.coalesce(activity.c.activity, 0)), desc(models.Topic.created_at)
+        ).offset(skip).limit(limit).all()
     elif sort_by == "new":
         # 최신순
-        topics = query.order_by(desc(models.Topic.created_at)).all()
+        topics = query.order_by(desc(models.Topic.created_at)).offset(skip).limit(limit).all()
     else:
         # 기본: 최신순
-        topics = query.order_by(desc(models.Topic.created_at)).all()
+        topics = query.order_by(desc(models.Topic.created_at)).offset(skip).limit(limit).all()
     
     return topics
 
@@ -73,9 +90,16 @@ def create_topic(
         district=topic.district,
         topic_type=topic.topic_type
     )
+    # 지역 계층 노드를 찾거나 만들어 연결 (지역별 집계 색인용)
+    region_nodes = regions.resolve(db, topic.region, topic.district)
+    if region_nodes:
+        db_topic.region_id = region_nodes[-1]["id"]
     db.add(db_topic)
     db.commit()
     db.refresh(db_topic)
+    leaderboard.add_topic(db_topic)
+    regions.index.add_topic(db_topic.id, region_nodes)
+    snapshots.publisher.mark(db_topic.id)
     return db_topic
 
 @router.get("/{topic_id}", response_model=schemas.TopicResponse)
@@ -85,3 +109,60 @@ def get_topic(topic_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="토론 주제를 찾을 수 없습니다")
     return topic
 
+@router.get("/{topic_id}/timeseries", response_model=schemas.TimeSeriesResponse)
+def get_topic_timeseries(
+    topic_id: int,
+    granularity: str = "hour",  # hour, day
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """주제의 좋아요/싫어요/반박/새 주장 수 추이 (시간·일 단위 구간)"""
+    try:
+        since, until = rollups.resolve_range(granularity, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not db.query(models.Topic.id).filter(models.Topic.id == topic_id).first():
+        raise HTTPException(status_code=404, detail="토론 주제를 찾을 수 없습니다")
+    return {
+        "scope": "topic",
+        "target_id": topic_id,
+        "granularity": granularity,
+        "points": rollups.series(db, "topic", topic_id, granularity, since, until),
+    }
+
+@router.get("/{topic_id}/page", response_model=schemas.TopicPageResponse)
+def get_topic_page(
+    topic_id: int,
+    sort_by: str = "best",  # best, new, trend
+    skip: int = 0,
+    limit: int = topic_page.DEFAULT_LIMIT,  # 진영별 주장 수
+    depth: int = topic_page.DEFAULT_DEPTH,  # 함께 불러올 반박 트리 단계 수
+    replies: int = topic_page.DEFAULT_REPLIES,  # 부모 하나당 불러올 반박 수
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_user)
+):
+    """토론 화면 한 장(주제, 주장과 근거, 반박 트리 앞부분, 내 투표)을 한 번에 조회"""
+    # 비로그인 기본 조회는 인기 주제면 미리 만든 스냅샷 파일로 응답 (DB 조회 없음)
+    if current_user is None and (sort_by, skip, limit, depth, replies) == (
+        "best", 0, topic_page.DEFAULT_LIMIT, topic_page.DEFAULT_DEPTH, topic_page.DEFAULT_REPLIES
+    ):
+        cached = snapshots.response(f"pages/{topic_id}")
+        if cached is not None:
+            return cached
+    topic = db.query(models.Topic).filter(models.Topic.id == topic_id).first()
+    if not topic:
+        raise HTTPException(status_code=404, detail="토론 주제를 찾을 수 없습니다")
+    options = dict(
+        sort_by=sort_by,
+        skip=max(skip, 0),
+        limit=min(max(limit, 1), 100),
+        depth=min(max(depth, 1), topic_page.MAX_DEPTH),
+        replies=min(max(replies, 1), 100),
+    )
+    if topic.archived_at:
+        archived = archive.load(db, topic_id)
+        if archived is not None:
+            return topic_page.build_archived_page(archived, topic, **options)
+    return topic_page.build_topic_page(db, topic, current_user, **options)
+
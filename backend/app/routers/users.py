@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from app import schemas, models, user_stats
+from app.database import get_db
+
+router = APIRouter(prefix="/api/users", tags=["users"])
+
+def _get_user(db: Session, user_id: int) -> models.User:
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
+    return user
+
+@router.get("/{user_id}", response_model=schemas.UserProfileResponse)
+def get_user_profile(user_id: int, db: Session = Depends(get_db)):
+    """사용자 프로필과 활동 통계 (쓰기 시점에 갱신한 집계를 읽음)"""
+    user = _get_user(db, user_id)
+    return {
+        "id": user.id,
+        "username": user.username,
+        "political_party": user.political_party,
+        "affiliation": user.affiliation,
+        "level": user.level,
+        "created_at": user.created_at,
+        "stats": user_stats.summary(db, user_id),
+    }
+
+@router.get("/{user_id}/activity", response_model=schemas.ActivityPage)
+def get_user_activity(
+    user_id: int,
+    kind: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = user_stats.FEED_LIMIT,
+    db: Session = Depends(get_db)
+):
+    """사용자가 쓴 주장과 반박 (최신순). 다음 페이지는 응답의 next_cursor를 cursor로 전달"""
+    _get_user(db, user_id)
+    try:
+        return user_stats.feed(db, user_id, kind=kind, cursor=cursor, limit=min(max(limit, 1), 100))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
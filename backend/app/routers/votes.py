@@ -1,122 +1,255 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import Optional
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Dict, Optional, Tuple
+from datetime import datetime
 from app import schemas, models
-from app.database import get_db
+from app.database import begin_immediate, get_db
 from app.dependencies import get_current_user
+from app.leaderboards import leaderboard
+from app import ranking, party_votes, rollups, regions, snapshots, user_stats, vote_log
+from app.realtime import hub
+from app.argument_graph import graphs
+from app.vote_store import viewer_votes
 
 router = APIRouter(prefix="/api/votes", tags=["votes"])
 
+# 일괄 조회/반영 한 번에 받을 수 있는 최대 개수
+MAX_STATE_IDS = 500
+MAX_BATCH_ACTIONS = 100
+VOTE_TYPES = ("like", "dislike")
+
+def _record_vote(target, is_claim: bool, delta: int, activity: int = 0):
+    """투표 결과를 주제 랭킹과 실시간 채널에 반영 (activity: 주장 투표 수 증감, 지역 집계용)"""
+    if is_claim:
+        leaderboard.record_vote(target.topic_id, claim_vote_delta=delta)
+        if activity:
+            regions.index.record(target.topic_id, activity=activity)
+        snapshots.publisher.mark(target.topic_id)
+        hub.publish_vote(target.topic_id, "claim", target.id, target.votes)
+    elif target.claim is not None:
+        leaderboard.record_vote(target.claim.topic_id)
+        graphs.set_votes(target.claim_id, target.id, target.votes)
+        snapshots.publisher.mark(target.claim.topic_id)
+        hub.publish_vote(target.claim.topic_id, "rebuttal", target.id, target.votes)
+
+def _load_target(db, claim_id: Optional[int], rebuttal_id: Optional[int]):
+    """투표 대상과 주장 여부 (잘못된 요청은 HTTPException)"""
+    if not claim_id and not rebuttal_id:
+        raise HTTPException(status_code=400, detail="claim_id 또는 rebuttal_id가 필요합니다")
+    
+    if claim_id and rebuttal_id:
+        raise HTTPException(status_code=400, detail="claim_id와 rebuttal_id를 동시에 지정할 수 없습니다")
+    
+    if claim_id:
+        target = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
+        if not target:
+            raise HTTPException(status_code=404, detail="주장을 찾을 수 없습니다")
+        return target, True
+    target = db.query(models.Rebuttal).filter(models.Rebuttal.id == rebuttal_id).first()
+    if not target:
+        raise HTTPException(status_code=404, detail="반박을 찾을 수 없습니다")
+    return target, False
+
+def _set_vote(db, user: models.User, target, is_claim: bool, existing_vote, vote_type: Optional[str]) -> int:
+    """기존 투표(existing_vote)를 vote_type(None이면 취소)으로 바꾸고 투표 수 증감(activity)을 반환 (커밋은 호출자가 수행)"""
+    old_type = existing_vote.vote_type if existing_vote else None
+    if old_type == vote_type:
+        return 0
+    # 좋아요는 +1, 싫어요는 -1
+    if old_type:
+        target.votes += -1 if old_type == 'like' else 1
+        user_stats.record_vote(db, user.id, target, old_type, -1)
+    if vote_type:
+        target.votes += 1 if vote_type == 'like' else -1
+        user_stats.record_vote(db, user.id, target, vote_type, 1)
+    
+    if existing_vote is None:
+        # 새 투표
+        now = datetime.utcnow()
+        db.add(models.Vote(
+            user_id=user.id,
+            claim_id=target.id if is_claim else None,
+            rebuttal_id=None if is_claim else target.id,
+            vote_type=vote_type,
+            created_at=now
+        ))
+        if is_claim:
+            party_votes.apply(db, target.id, party_votes.party_of(user), vote_type, 1)
+            rollups.record_vote(db, target, vote_type, 1, now)
+            ranking.touch(target, now)
+        return 1
+    
+    # 취소/변경된 투표는 원래 투표 시각의 구간에서 바뀜 (압축된 투표는 vote_ledger 행)
+    if is_claim:
+        party = party_votes.party_of(user)
+        party_votes.apply(db, target.id, party, old_type, -1)
+        rollups.record_vote(db, target, old_type, -1, existing_vote.created_at)
+        if vote_type:
+            party_votes.apply(db, target.id, party, vote_type, 1)
+            rollups.record_vote(db, target, vote_type, 1, existing_vote.created_at)
+        ranking.touch(target)
+    if vote_type is None:
+        _delete_vote(db, existing_vote)
+        return -1
+    existing_vote.vote_type = vote_type
+    return 0
+
+def _delete_vote(db, vote) -> None:
+    """투표 행 삭제. 지울 행이 없으면(그 사이 압축으로 옮겨짐) StaleDataError"""
+    if isinstance(vote, models.VoteLedger):
+        query = db.query(models.VoteLedger).filter(
+            models.VoteLedger.kind == vote.kind,
+            models.VoteLedger.target_id == vote.target_id,
+            models.VoteLedger.user_id == vote.user_id,
+        )
+    else:
+        query = db.query(models.Vote).filter(models.Vote.id == vote.id)
+    if not query.delete(synchronize_session=False):
+        raise StaleDataError("투표 행이 이미 옮겨졌습니다")
+    db.expunge(vote)
+
+def _change_vote(db, user: models.User, target, is_claim: bool, vote_type: Optional[str], toggle: bool = False):
+    """기존 투표를 찾아 vote_type으로 바꾸고 (기존 투표, 최종 vote_type, activity)를 반환 (커밋은 호출자가 수행)
+
+    toggle이면 같은 투표는 취소합니다. 찾은 투표 행이 그 사이 압축(app/vote_log.py)으로 옮겨져 쓰기가
+    빗나가면 세이브포인트를 되돌리고 다시 찾아 한 번 더 반영합니다.
+    """
+    for attempt in range(2):
+        existing_vote = _find_vote(db, user.id, target, is_claim)
+        wanted = vote_type
+        if toggle and existing_vote is not None and existing_vote.vote_type == vote_type:
+            wanted = None
+        try:
+            with db.begin_nested():
+                activity = _set_vote(db, user, target, is_claim, existing_vote, wanted)
+                db.flush()
+            return existing_vote, wanted, activity
+        except StaleDataError:
+            if attempt:
+                raise
+
+def _find_vote(db, user_id: int, target, is_claim: bool):
+    """기존 투표 확인 (압축된 오래된 투표는 vote_ledger 행으로 돌아옴)"""
+    if is_claim:
+        return vote_log.find(db, user_id, claim_id=target.id)
+    return vote_log.find(db, user_id, rebuttal_id=target.id)
+
 @router.post("/", response_model=dict)
 def vote(
     vote_data: schemas.VoteCreate,
     db: Session = Depends(get_db),
     current_user: Optional[models.User] = Depends(get_current_user)
 ):
-    """좋아요/싫어요 투표"""
+    """좋아요/싫어요 투표 (같은 투표면 취소, 다른 투표면 변경)"""
     if not current_user:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다")
     
-    if not vote_data.claim_id and not vote_data.rebuttal_id:
-        raise HTTPException(status_code=400, detail="claim_id 또는 rebuttal_id가 필요합니다")
-    
-    if vote_data.claim_id and vote_data.rebuttal_id:
-        raise HTTPException(status_code=400, detail="claim_id와 rebuttal_id를 동시에 지정할 수 없습니다")
-    
-    # 기존 투표 확인
-    if vote_data.claim_id:
-        existing_vote = db.query(models.Vote).filter(
-            and_(
-                models.Vote.user_id == current_user.id,
-                models.Vote.claim_id == vote_data.claim_id
-            )
-        ).first()
-        target = db.query(models.Claim).filter(models.Claim.id == vote_data.claim_id).first()
-        if not target:
-            raise HTTPException(status_code=404, detail="주장을 찾을 수 없습니다")
+    # 투표 압축 배치와 겹치지 않도록 기존 투표를 읽기 전에 쓰기 잠금을 잡음
+    begin_immediate(db)
+    target, is_claim = _load_target(db, vote_data.claim_id, vote_data.rebuttal_id)
+    votes_before = target.votes
+    existing_vote, vote_type, activity = _change_vote(
+        db, current_user, target, is_claim, vote_data.vote_type, toggle=True
+    )
+    if vote_type is None:
+        message = "투표가 취소되었습니다"
+    elif existing_vote:
+        message = "투표가 변경되었습니다"
     else:
-        existing_vote = db.query(models.Vote).filter(
-            and_(
-                models.Vote.user_id == current_user.id,
-                models.Vote.rebuttal_id == vote_data.rebuttal_id
-            )
-        ).first()
-        target = db.query(models.Rebuttal).filter(models.Rebuttal.id == vote_data.rebuttal_id).first()
-        if not target:
-            raise HTTPException(status_code=404, detail="반박을 찾을 수 없습니다")
+        message = "투표가 완료되었습니다"
+    db.commit()
+    db.refresh(target)
+    _record_vote(target, is_claim, target.votes - votes_before, activity=activity)
+    return {"message": message, "votes": target.votes, "user_vote": vote_type}
+
+@router.post("/state", response_model=schemas.VoteState)
+def get_vote_state(
+    request: schemas.VoteStateRequest,
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_user)
+):
+    """여러 주장/반박에 대한 현재 사용자의 투표를 한 번에 조회 (비로그인이면 모두 null)"""
+    if len(request.claim_ids) > MAX_STATE_IDS or len(request.rebuttal_ids) > MAX_STATE_IDS:
+        raise HTTPException(status_code=400, detail=f"한 번에 조회할 수 있는 id는 종류별 최대 {MAX_STATE_IDS}개입니다")
+    claim_votes, rebuttal_votes = viewer_votes(
+        db, current_user.id if current_user else None, request.claim_ids, request.rebuttal_ids
+    )
+    return {
+        "claims": {claim_id: claim_votes.get(claim_id) for claim_id in request.claim_ids},
+        "rebuttals": {rebuttal_id: rebuttal_votes.get(rebuttal_id) for rebuttal_id in request.rebuttal_ids},
+    }
+
+@router.post("/batch", response_model=schemas.VoteBatchResult)
+def apply_votes(
+    batch: schemas.VoteBatch,
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_user)
+):
+    """투표 여러 개를 한 트랜잭션으로 반영 (오프라인/대기열 동기화용)
+
+    각 항목의 vote_type은 원하는 최종 상태(like, dislike, null이면 취소)이므로 같은 요청을 다시 보내도
+    결과가 같습니다. 항목 하나라도 잘못되면 아무것도 반영하지 않습니다.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
+    if not batch.actions:
+        raise HTTPException(status_code=400, detail="actions가 비어 있습니다")
+    if len(batch.actions) > MAX_BATCH_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BATCH_ACTIONS}개까지 반영할 수 있습니다")
     
-    if existing_vote:
-        # 같은 투표면 취소, 다른 투표면 변경
-        if existing_vote.vote_type == vote_data.vote_type:
-            # 투표 취소
-            if vote_data.claim_id:
-                if existing_vote.vote_type == 'like':
-                    target.votes -= 1
-                else:
-                    target.votes += 1
-            else:
-                if existing_vote.vote_type == 'like':
-                    target.votes -= 1
-                else:
-                    target.votes += 1
-            db.delete(existing_vote)
-            db.commit()
-            db.refresh(target)
-            return {"message": "투표가 취소되었습니다", "votes": target.votes, "user_vote": None}
-        else:
-            # 투표 변경
-            if vote_data.claim_id:
-                if existing_vote.vote_type == 'like':
-                    target.votes -= 2  # like -> dislike
-                else:
-                    target.votes += 2  # dislike -> like
-            else:
-                if existing_vote.vote_type == 'like':
-                    target.votes -= 2
-                else:
-                    target.votes += 2
-            existing_vote.vote_type = vote_data.vote_type
-            db.commit()
-            db.refresh(target)
-            return {"message": "투표가 변경되었습니다", "votes": target.votes, "user_vote": vote_data.vote_type}
-    else:
-        # 새 투표
-        new_vote = models.Vote(
-            user_id=current_user.id,
-            claim_id=vote_data.claim_id,
-            rebuttal_id=vote_data.rebuttal_id,
-            vote_type=vote_data.vote_type
-        )
-        db.add(new_vote)
-        # 좋아요는 +1, 싫어요는 -1
-        if vote_data.vote_type == 'like':
-            target.votes += 1
-        else:
-            target.votes -= 1
+    # 대상별 (대상, 주장 여부, 처음 votes, 투표 수 증감)
+    touched: Dict[Tuple[bool, int], list] = {}
+    targets = []
+    try:
+        begin_immediate(db)
+        for index, action in enumerate(batch.actions):
+            if action.vote_type is not None and action.vote_type not in VOTE_TYPES:
+                raise HTTPException(status_code=400, detail=f"{index}번 항목: vote_type은 like, dislike, null 중 하나입니다")
+            try:
+                target, is_claim = _load_target(db, action.claim_id, action.rebuttal_id)
+            except HTTPException as e:
+                raise HTTPException(status_code=e.status_code, detail=f"{index}번 항목: {e.detail}")
+            entry = touched.setdefault((is_claim, target.id), [target, is_claim, target.votes, 0])
+            # 같은 대상이 뒤에 다시 나오면 바뀐 투표를 찾도록 항목마다 flush됨 (autoflush 꺼짐)
+            entry[3] += _change_vote(db, current_user, target, is_claim, action.vote_type)[2]
+            targets.append((target, is_claim))
         db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    
+    for target, is_claim, votes_before, activity in touched.values():
         db.refresh(target)
-        return {"message": "투표가 완료되었습니다", "votes": target.votes, "user_vote": vote_data.vote_type}
+        if target.votes != votes_before or activity:
+            _record_vote(target, is_claim, target.votes - votes_before, activity=activity)
+    claim_votes, rebuttal_votes = viewer_votes(
+        db, current_user.id,
+        [target.id for target, is_claim in targets if is_claim],
+        [target.id for target, is_claim in targets if not is_claim],
+    )
+    return {"results": [
+        {
+            "claim_id": target.id if is_claim else None,
+            "rebuttal_id": None if is_claim else target.id,
+            "votes": target.votes,
+            "user_vote": (claim_votes if is_claim else rebuttal_votes).get(target.id),
+        }
+        for target, is_claim in targets
+    ]}
 
 @router.get("/claim/{claim_id}")
-def get_user_vote_for_claim(claim_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    """주장에 대한 현재 사용자의 투표 정보"""
-    vote = db.query(models.Vote).filter(
-        and_(
-            models.Vote.user_id == current_user.id,
-            models.Vote.claim_id == claim_id
-        )
-    ).first()
+def get_user_vote_for_claim(claim_id: int, db: Session = Depends(get_db), current_user: Optional[models.User] = Depends(get_current_user)):
+    """주장에 대한 현재 사용자의 투표 정보 (비로그인이면 null)"""
+    if not current_user:
+        return {"user_vote": None}
+    vote = vote_log.find(db, current_user.id, claim_id=claim_id)
     return {"user_vote": vote.vote_type if vote else None}
 
 @router.get("/rebuttal/{rebuttal_id}")
-def get_user_vote_for_rebuttal(rebuttal_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    """반박에 대한 현재 사용자의 투표 정보"""
-    vote = db.query(models.Vote).filter(
-        and_(
-            models.Vote.user_id == current_user.id,
-            models.Vote.rebuttal_id == rebuttal_id
-        )
-    ).first()
+def get_user_vote_for_rebuttal(rebuttal_id: int, db: Session = Depends(get_db), current_user: Optional[models.User] = Depends(get_current_user)):
+    """반박에 대한 현재 사용자의 투표 정보 (비로그인이면 null)"""
+    if not current_user:
+        return {"user_vote": None}
+    vote = vote_log.find(db, current_user.id, rebuttal_id=rebuttal_id)
     return {"user_vote": vote.vote_type if vote else None}
-
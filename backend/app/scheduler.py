@@ -0,0 +1,101 @@
+"""주기적 백그라운드 작업 스케줄러
+
+모듈에서 `@periodic(...)`으로 동기 함수를 등록하면 앱 lifespan 동안
+각 작업이 별도 스레드에서 주기적으로 실행됩니다. (BACKGROUND_JOBS=0이면 비활성화)
+
+메모리 캐시를 채우는 작업은 워커마다 돌아야 하지만, DB 전체를 고치는 작업(점수 갱신, 압축, 보관 등)은
+`single=True`로 등록해 같은 호스트의 워커 중 잠금 파일을 잡은 하나만 실행합니다. 잠금은 프로세스가 끝나면
+풀리고, 다른 워커가 다음 주기에 이어받습니다. 잠금 파일은 SCHEDULER_LOCK_DIR(기본: 임시 디렉터리)에
+DB URL별로 만들어집니다.
+"""
+import asyncio
+import fcntl
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import IO, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_JOBS = os.getenv("BACKGROUND_JOBS", "1") == "1"
+LOCK_DIR = os.getenv("SCHEDULER_LOCK_DIR", "")
+
+
+@dataclass
+class PeriodicJob:
+    name: str
+    interval: float
+    func: Callable[[], None]
+    run_on_start: bool = True
+    single: bool = False
+
+
+_jobs: List[PeriodicJob] = []
+_tasks: List[asyncio.Task] = []
+_lock_files: Dict[str, IO] = {}
+
+
+def periodic(name: str, interval: float, run_on_start: bool = True, single: bool = False):
+    """`interval`초마다 실행될 작업을 등록하는 데코레이터 (single=True면 워커 하나만 실행)"""
+    def decorator(func):
+        _jobs.append(PeriodicJob(name, interval, func, run_on_start, single))
+        return func
+    return decorator
+
+
+def _lock_path(name: str) -> str:
+    from app.database import DATABASE_URL
+
+    digest = blake2b(DATABASE_URL.encode(), digest_size=6).hexdigest()
+    return os.path.join(LOCK_DIR or tempfile.gettempdir(), f"debate-{digest}-{name}.lock")
+
+
+def _owns(job: PeriodicJob) -> bool:
+    """작업 잠금을 잡은 워커만 실행 (프로세스가 끝나면 잠금이 풀림)"""
+    if job.name in _lock_files:
+        return True
+    lock_file = open(_lock_path(job.name), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+    _lock_files[job.name] = lock_file
+    return True
+
+
+async def _run(job: PeriodicJob):
+    if not job.run_on_start:
+        await asyncio.sleep(job.interval)
+    while True:
+        try:
+            if not job.single or _owns(job):
+                await asyncio.to_thread(job.func)
+        except Exception:
+            logger.exception("periodic job %s failed", job.name)
+        await asyncio.sleep(job.interval)
+
+
+def start():
+    if not BACKGROUND_JOBS:
+        return
+    for job in _jobs:
+        _tasks.append(asyncio.create_task(_run(job), name=f"periodic:{job.name}"))
+
+
+async def stop():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    for lock_file in _lock_files.values():
+        lock_file.close()
+    _lock_files.clear()
+
+
+def run_all():
+    """등록된 모든 작업을 한 번씩 즉시 실행합니다. (관리 명령/벤치마크용)"""
+    for job in _jobs:
+        job.func()
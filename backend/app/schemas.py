@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -13,6 +13,9 @@ class UserLogin(BaseModel):
     username: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class UserResponse(BaseModel):
     id: int
     username: str
@@ -45,7 +48,8 @@ class EvidenceResponse(BaseModel):
     id: int
     source: str
     publisher: str
-    text: str
+    text: Optional[str] = None
+    summary: Optional[str] = None  # 본문의 추출 요약
     url: Optional[str] = None
     
     model_config = {"from_attributes": True}
@@ -97,11 +101,66 @@ class RebuttalResponse(BaseModel):
     
     model_config = {"from_attributes": True}
 
+class ClaimImport(ClaimCreate):
+    username: Optional[str] = None  # 작성자 (없으면 가져오기를 실행한 관리자)
+
+class BulkImportError(BaseModel):
+    line: int
+    error: str
+
+class BulkImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[BulkImportError] = []
+
 class VoteCreate(BaseModel):
     claim_id: Optional[int] = None
     rebuttal_id: Optional[int] = None
     vote_type: str  # like, dislike
 
+class VoteStateRequest(BaseModel):
+    claim_ids: List[int] = []
+    rebuttal_ids: List[int] = []
+
+class VoteState(BaseModel):
+    """요청한 id마다 현재 사용자의 투표 (없거나 비로그인이면 null)"""
+    claims: Dict[int, Optional[str]] = {}
+    rebuttals: Dict[int, Optional[str]] = {}
+
+class VoteAction(BaseModel):
+    claim_id: Optional[int] = None
+    rebuttal_id: Optional[int] = None
+    vote_type: Optional[str] = None  # 원하는 최종 상태: like, dislike, null(취소)
+
+class VoteBatch(BaseModel):
+    actions: List[VoteAction]
+
+class VoteActionResult(BaseModel):
+    claim_id: Optional[int] = None
+    rebuttal_id: Optional[int] = None
+    votes: int
+    user_vote: Optional[str] = None
+
+class VoteBatchResult(BaseModel):
+    results: List[VoteActionResult]
+
+class DuplicateClaim(BaseModel):
+    id: int
+    title: str
+    similarity: float  # 추정 자카드 유사도 (0~1)
+
+class DuplicateCluster(BaseModel):
+    claims: List[DuplicateClaim]  # similarity는 그룹 첫 주장과의 유사도
+
+class PartyVoteCount(BaseModel):
+    party: str
+    like: int = 0
+    dislike: int = 0
+
+class ClaimPartyVotes(BaseModel):
+    claim_id: int
+    parties: List[PartyVoteCount]
+
 class ClaimResponse(BaseModel):
     id: int
     topic_id: int
@@ -114,6 +173,125 @@ class ClaimResponse(BaseModel):
     created_at: datetime
     author: Optional[dict] = None  # 사용자 정보
     user_vote: Optional[str] = None  # 현재 사용자의 투표 (like, dislike)
+    party_votes: Optional[List[PartyVoteCount]] = None  # 정당별 투표 (include_parties=true일 때)
+    duplicates: Optional[List[DuplicateClaim]] = None  # 작성 시 찾은 유사한 기존 주장
     
     model_config = {"from_attributes": True}
 
+class ArgumentThread(BaseModel):
+    rebuttal_id: int  # 주장에 직접 단 반박
+    size: int  # 재반박을 포함한 노드 수
+    depth: int  # 가장 깊은 재반박까지의 단계 수
+    net_support: int  # 주장 편 무게 - 반대 편 무게
+    unanswered: bool
+
+class ArgumentMetrics(BaseModel):
+    claim_id: int
+    rebuttals: int  # 모든 단계의 반박 수
+    direct_rebuttals: int
+    unanswered: int  # 재반박이 달리지 않은 반박 수
+    unanswered_direct: int  # 그중 주장에 직접 단 반박
+    max_depth: int  # 가장 깊은 반박 사슬
+    support: int  # 주장 편(짝수 단계) 무게 합계, 노드마다 1 + max(votes, 0)
+    opposition: int  # 반대 편(홀수 단계) 무게 합계
+    net_support: int
+    types: Dict[str, int]  # rebuttal, counter
+    threads: List[ArgumentThread]  # 큰 반박 스레드부터
+
+class RegionResponse(BaseModel):
+    id: int
+    parent_id: Optional[int] = None
+    code: str  # seoul, seoul/강동구
+    name: str
+    path: str  # 서울 강동구
+    level: int  # 1 광역, 2 기초
+    topic_count: int = 0  # 하위 지역 포함
+    claim_count: int = 0
+    activity: int = 0  # 최근 REGION_ACTIVITY_DAYS일의 새 주장, 반박, 주장 투표 수
+    children: List["RegionResponse"] = []
+
+class TimeSeriesPoint(BaseModel):
+    bucket: datetime  # 구간 시작 시각 (UTC)
+    likes: int = 0
+    dislikes: int = 0
+    rebuttals: int = 0
+    claims: int = 0
+
+class TimeSeriesResponse(BaseModel):
+    scope: str  # claim, topic
+    target_id: int
+    granularity: str  # hour, day
+    points: List[TimeSeriesPoint]
+
+class TopicPageRebuttal(RebuttalResponse):
+    reply_count: int = 0  # 전체 재반박 수 (replies에는 앞쪽 일부만 포함)
+    replies: List["TopicPageRebuttal"] = []
+
+class TopicPageClaim(ClaimResponse):
+    evidence: List[EvidenceResponse] = []
+    rebuttal_count: int = 0  # 모든 단계의 반박 수
+    reply_count: int = 0  # 첫 단계 반박 수
+    rebuttals: List[TopicPageRebuttal] = []
+
+class TopicPageResponse(BaseModel):
+    topic: TopicResponse
+    claims: List[TopicPageClaim]
+    depth: int
+
+class JobHandlerStats(BaseModel):
+    name: str
+    statuses: Dict[str, int]  # queued, running, done, failed
+
+class JobStats(BaseModel):
+    depth: int  # 대기 중 + 실행 중
+    statuses: Dict[str, int]
+    handlers: List[JobHandlerStats]
+    oldest_ready_seconds: Optional[float] = None  # 실행 가능해진 뒤 가장 오래 기다린 작업
+    latency_p50_seconds: Optional[float] = None  # 등록부터 완료까지 (최근 완료 작업 기준)
+    latency_p95_seconds: Optional[float] = None
+    runtime_p50_seconds: Optional[float] = None  # 마지막 시도의 실행 시간
+    runtime_p95_seconds: Optional[float] = None
+    sample: int = 0
+
+class BusStatus(BaseModel):
+    origin: str  # 워커 식별자
+    version: Optional[int] = None  # 마지막으로 적용한 이벤트 버전
+    head: Optional[int] = None  # 전송 계층의 최신 버전
+    lag: Optional[int] = None
+    applied: int = 0  # 다른 워커에서 받아 적용한 이벤트 수
+    gaps: int = 0  # 놓친 구간 때문에 캐시를 다시 읽은 횟수
+    pending: int = 0  # 아직 보내지 않은 이벤트 수
+
+class UserStatsResponse(BaseModel):
+    claims: int = 0
+    rebuttals: int = 0
+    likes_received: int = 0
+    dislikes_received: int = 0
+    rebuttals_received: int = 0  # 다른 사용자가 단 반박 수
+    score: int = 0  # 레벨을 정하는 점수 (app/user_stats.py)
+    next_level_score: Optional[int] = None  # 다음 레벨까지 필요한 점수 (최고 레벨이면 None)
+
+class UserProfileResponse(BaseModel):
+    id: int
+    username: str
+    political_party: Optional[str] = None
+    affiliation: Optional[str] = None
+    level: int
+    created_at: Optional[datetime] = None
+    stats: UserStatsResponse
+
+class ActivityItem(BaseModel):
+    kind: str  # claim, rebuttal
+    id: int
+    topic_id: int
+    claim_id: int  # 주장이면 자기 id
+    parent_id: Optional[int] = None
+    title: Optional[str] = None
+    excerpt: str  # 본문 앞부분
+    type: Optional[str] = None
+    votes: int
+    created_at: datetime
+
+class ActivityPage(BaseModel):
+    items: List[ActivityItem]
+    next_cursor: Optional[str] = None  # 다음 페이지 요청에 cursor로 전달 (마지막 페이지면 None)
@@ -0,0 +1,283 @@
+"""로그인 세션: 짧은 액세스 토큰, 리프레시 토큰 회전, 토큰 폐기 목록
+
+- 로그인하면 ACCESS_TOKEN_MINUTES(기본 15분)짜리 액세스 토큰(JWT)과 REFRESH_TOKEN_DAYS(기본 14일)짜리
+  리프레시 토큰(임의 문자열, DB에는 해시만 저장)을 발급합니다. 로그인 한 번에서 이어지는 토큰들은 같은
+  세션(family)에 속하고, 액세스 토큰에는 토큰 id(`jti`)와 세션 id(`fam`)가 들어갑니다.
+- `POST /api/auth/refresh`는 리프레시 토큰을 한 번만 쓸 수 있게 새 토큰으로 바꿉니다. 새 토큰은 이전 토큰과
+  서버 비밀키로 정해지므로, 바꾼 지 REFRESH_REUSE_GRACE_SECONDS(기본 30초) 안에 같은 토큰이 다시 오면(다른 탭의
+  동시 갱신, 응답을 받지 못한 재시도) 같은 새 토큰을 다시 줍니다. 그 뒤에 다시 오면 탈취된 것으로 보고 세션
+  전체를 폐기합니다.
+- 폐기(로그아웃, 관리자 강제 로그아웃)는 `revoked_tokens`에 "fam:<세션 id>"/"jti:<토큰 id>"를 남깁니다.
+  이미 발급된 액세스 토큰이 만료될 때까지만 필요하므로 항목은 ACCESS_TOKEN_MINUTES 뒤에 지워집니다.
+- `get_current_user`는 매 요청 메모리의 블룸 필터(`revocations`)로 확인합니다. 필터에 없으면(거의 모든
+  요청) DB를 읽지 않고, 있을 때만(실제 폐기 또는 오탐) 테이블에서 확인합니다. 다른 워커의 폐기는
+  무효화 버스로 전달되고, REFRESH_SECONDS마다 테이블에서 다시 만들어 만료된 항목을 비웁니다.
+"""
+import base64
+import hashlib
+import hmac
+import math
+import os
+import secrets
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import exists, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from app import models
+from app.database import SessionLocal
+from app.invalidation import bus
+from app.scheduler import periodic
+
+ACCESS_TOKEN_MINUTES = float(os.getenv("ACCESS_TOKEN_MINUTES", "15"))
+REFRESH_TOKEN_DAYS = float(os.getenv("REFRESH_TOKEN_DAYS", "14"))
+# 블룸 필터 크기: 이 개수까지 폐기 항목이 있어도 오탐률이 FALSE_POSITIVE_RATE 이하
+REVOCATION_CAPACITY = int(os.getenv("REVOCATION_CAPACITY", "100000"))
+FALSE_POSITIVE_RATE = float(os.getenv("REVOCATION_FALSE_POSITIVE_RATE", "0.001"))
+REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "300"))
+REUSE_GRACE_SECONDS = float(os.getenv("REFRESH_REUSE_GRACE_SECONDS", "30"))
+SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
+
+
+class BloomFilter:
+    """문자열 키의 블룸 필터. 없는 키는 항상 없다고 답하고, 있는 키는 오탐률만큼 틀릴 수 있음"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # 해시 두 개로 k개의 위치를 만듦 (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+def token_keys(claims: dict) -> List[str]:
+    """액세스 토큰으로 확인할 폐기 목록 키"""
+    keys = []
+    if claims.get("jti"):
+        keys.append(f"jti:{claims['jti']}")
+    if claims.get("fam"):
+        keys.append(f"fam:{claims['fam']}")
+    return keys
+
+
+class RevocationList:
+    """`revoked_tokens` 앞에 둔 메모리 블룸 필터"""
+
+    def __init__(self, capacity: int = REVOCATION_CAPACITY, error_rate: float = FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.ready = False
+        self.db_checks = 0  # 필터가 양성이라 DB를 확인한 횟수
+        self._lock = threading.Lock()
+
+    def refresh(self, db) -> None:
+        """아직 유효한 폐기 항목으로 필터를 다시 만듦 (만료된 항목이 빠짐)"""
+        keys = [key for (key,) in db.query(models.RevokedToken.key).filter(
+            models.RevokedToken.expires_at > datetime.utcnow()
+        )]
+        bloom = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            self.bloom = bloom
+            self.ready = True
+
+    def add(self, key: str, broadcast: bool = True) -> None:
+        if broadcast:
+            bus.publish("revocations", {"key": key})
+        with self._lock:
+            self.bloom.add(key)
+
+    def is_revoked(self, db, claims: dict) -> bool:
+        if not self.ready:
+            self.refresh(db)
+        candidates = [key for key in token_keys(claims) if key in self.bloom]
+        if not candidates:
+            return False
+        # 필터 양성: 실제 폐기인지 오탐인지 테이블에서 확인
+        self.db_checks += 1
+        return db.query(exists().where(
+            models.RevokedToken.key.in_(candidates),
+            models.RevokedToken.expires_at > datetime.utcnow(),
+        )).scalar()
+
+    def revoke(self, db, keys: Iterable[str], user_id: Optional[int] = None, reason: Optional[str] = None,
+               expires_at: Optional[datetime] = None) -> None:
+        """폐기 항목을 저장하고 커밋한 뒤 필터에 추가. 기본 만료는 지금 발급된 액세스 토큰이 끝나는 시각"""
+        now = datetime.utcnow()
+        expires_at = expires_at or now + timedelta(minutes=ACCESS_TOKEN_MINUTES)
+        keys = list(keys)
+        if not keys:
+            return
+        stmt = insert(models.RevokedToken.__table__).values([
+            {"key": key, "user_id": user_id, "reason": reason, "expires_at": expires_at, "created_at": now}
+            for key in keys
+        ])
+        db.execute(stmt.on_conflict_do_update(index_elements=["key"], set_={"expires_at": stmt.excluded.expires_at}))
+        db.commit()
+        for key in keys:
+            self.add(key)
+
+
+revocations = RevocationList()
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _successor(token: str) -> str:
+    """회전할 때 줄 새 리프레시 토큰 (같은 토큰이 다시 와도 같은 값)"""
+    digest = hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _issue(db, user_id: int, family: str, token: Optional[str] = None) -> str:
+    token = token or secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    db.add(models.RefreshToken(
+        user_id=user_id,
+        family=family,
+        token_hash=_hash(token),
+        created_at=now,
+        expires_at=now + timedelta(days=REFRESH_TOKEN_DAYS),
+    ))
+    return token
+
+
+def start(db, user: models.User) -> Tuple[str, str]:
+    """새 세션을 만들고 (세션 id, 리프레시 토큰)을 반환"""
+    family = uuid.uuid4().hex
+    token = _issue(db, user.id, family)
+    db.commit()
+    return family, token
+
+
+def rotate(db, token: str) -> Optional[Tuple[models.User, str, str]]:
+    """리프레시 토큰을 새 토큰으로 바꿈. (사용자, 세션 id, 새 리프레시 토큰) 또는 쓸 수 없는 토큰이면 None"""
+    row = db.query(models.RefreshToken).filter(models.RefreshToken.token_hash == _hash(token)).first()
+    now = datetime.utcnow()
+    if row is None or row.revoked_at is not None or row.expires_at <= now:
+        return None
+    # 동시에 같은 토큰으로 두 번 요청해도 한 번만 바뀌도록 조건부 UPDATE로 선점
+    claimed = db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.id == row.id, models.RefreshToken.rotated_at.is_(None))
+        .values(rotated_at=now)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        if _within_grace(db, row, token, now):
+            user = db.query(models.User).filter(models.User.id == row.user_id).first()
+            return user, row.family, _successor(token)
+        revoke_family(db, row.family, row.user_id, reason="reuse")
+        return None
+    new_token = _issue(db, row.user_id, row.family, _successor(token))
+    db.commit()
+    user = db.query(models.User).filter(models.User.id == row.user_id).first()
+    return user, row.family, new_token
+
+
+def _within_grace(db, row: models.RefreshToken, token: str, now: datetime) -> bool:
+    """방금 바꾼 토큰의 재사용인지 (유예 시간 안이고 그때 만든 새 토큰이 아직 유효함)"""
+    rotated_at = db.execute(
+        select(models.RefreshToken.rotated_at).where(models.RefreshToken.id == row.id)
+    ).scalar()
+    if rotated_at is None or now - rotated_at > timedelta(seconds=REUSE_GRACE_SECONDS):
+        return False
+    return db.query(exists().where(
+        models.RefreshToken.token_hash == _hash(_successor(token)),
+        models.RefreshToken.revoked_at.is_(None),
+    )).scalar()
+
+
+def revoke_family(db, family: str, user_id: Optional[int] = None, reason: str = "logout") -> None:
+    """세션의 리프레시 토큰과 이미 발급된 액세스 토큰을 모두 폐기"""
+    db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.family == family, models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    revocations.revoke(db, [f"fam:{family}"], user_id=user_id, reason=reason)
+
+
+def revoke_token(db, token: str) -> bool:
+    """리프레시 토큰이 속한 세션을 폐기 (로그아웃)"""
+    row = db.query(models.RefreshToken).filter(models.RefreshToken.token_hash == _hash(token)).first()
+    if row is None:
+        return False
+    revoke_family(db, row.family, row.user_id)
+    return True
+
+
+def revoke_user(db, user_id: int, reason: str = "admin") -> int:
+    """사용자의 모든 세션을 폐기. 폐기한 세션 수를 반환"""
+    families = [family for (family,) in db.query(models.RefreshToken.family).filter(
+        models.RefreshToken.user_id == user_id,
+        models.RefreshToken.revoked_at.is_(None),
+        models.RefreshToken.expires_at > datetime.utcnow(),
+    ).distinct()]
+    db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.user_id == user_id, models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    revocations.revoke(db, [f"fam:{family}" for family in families], user_id=user_id, reason=reason)
+    db.commit()
+    return len(families)
+
+
+def prune(db) -> int:
+    """만료된 폐기 항목과 리프레시 토큰을 지움. 지운 행 수를 반환"""
+    now = datetime.utcnow()
+    removed = db.query(models.RevokedToken).filter(models.RevokedToken.expires_at <= now).delete()
+    removed += db.query(models.RefreshToken).filter(models.RefreshToken.expires_at <= now).delete()
+    db.commit()
+    return removed
+
+
+@bus.on("revocations")
+def _apply_remote_revocation(data: dict):
+    revocations.add(data["key"], broadcast=False)
+
+
+@bus.on_gap
+def _refresh_after_gap():
+    refresh_revocations()
+
+
+@periodic("revocations", REFRESH_SECONDS)
+def refresh_revocations():
+    db = SessionLocal()
+    try:
+        prune(db)
+        revocations.refresh(db)
+    finally:
+        db.close()
@@ -0,0 +1,311 @@
+"""유사 주장 탐지 (MinHash + LSH)
+
+주장 제목과 본문을 정규화한 뒤 한글 문자 3-gram 집합으로 보고, 그 집합의 MinHash
+서명으로 자카드 유사도를 추정합니다.
+
+- 서명: one-permutation hashing. n-gram마다 해시를 한 번만 계산해 SIGNATURE_SIZE개 구간 중
+  하나에 넣고 구간별 최솟값을 취합니다. 빈 구간은 오른쪽 이웃 구간 값으로 채웁니다(densification).
+- 색인: 서명을 BANDS개 밴드로 나눠 밴드 해시가 같은 주장만 후보로 보고, 후보에 대해서만
+  서명 비교로 유사도를 계산합니다. 주제 안에서만 비교하므로 주제별로 색인을 나눕니다.
+- 저장: 서명은 `claim_signatures` 테이블에 주장과 같은 트랜잭션으로 저장되고, 메모리 색인은
+  주제를 처음 조회할 때 테이블에서 읽어 만듭니다. 이후에는 마지막으로 읽은 claim_id 이후의
+  행만 추가로 읽어서 다른 워커가 만든 주장도 반영합니다. 삭제/보관으로 빠지는 주장은
+  무효화 버스(app/invalidation.py)로 다른 워커의 색인에서도 지웁니다.
+"""
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app import models
+from app.invalidation import bus
+
+NGRAM = 3
+SIGNATURE_SIZE = 64
+BANDS = 16
+ROWS = SIGNATURE_SIZE // BANDS
+# 추정 유사도가 이 값 이상이면 중복 후보로 봄
+THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.7"))
+# 메모리에 유지할 주제 색인 수 (오래 쓰이지 않은 주제부터 내림)
+MAX_TOPICS = int(os.getenv("DUPLICATE_INDEX_TOPICS", "256"))
+
+_EMPTY = (1 << 64) - 1
+_MASK = (1 << 64) - 1
+_BIN_BITS = SIGNATURE_SIZE.bit_length() - 1
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """소문자로 바꾸고 공백/문장부호를 제거 (띄어쓰기 차이를 무시)"""
+    return _NON_WORD.sub("", (text or "").lower())
+
+
+def claim_text(title: Optional[str], content: Optional[str]) -> str:
+    return f"{title or ''} {content or ''}"
+
+
+def signature(text: str) -> Optional[bytes]:
+    """텍스트의 MinHash 서명 (SIGNATURE_SIZE개의 64비트 정수). 비교할 내용이 없으면 None"""
+    norm = normalize(text)
+    if not norm:
+        return None
+    if len(norm) <= NGRAM:
+        shingles = {norm}
+    else:
+        shingles = {norm[i:i + NGRAM] for i in range(len(norm) - NGRAM + 1)}
+
+    bins = [_EMPTY] * SIGNATURE_SIZE
+    for shingle in shingles:
+        h = int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        index, value = h & (SIGNATURE_SIZE - 1), h >> _BIN_BITS
+        if value < bins[index]:
+            bins[index] = value
+
+    # 빈 구간은 오른쪽으로 가장 가까운 구간 값을 거리와 섞어서 채움
+    filled = list(bins)
+    for i in range(SIGNATURE_SIZE):
+        if bins[i] != _EMPTY:
+            continue
+        distance = 1
+        while bins[(i + distance) % SIGNATURE_SIZE] == _EMPTY:
+            distance += 1
+        filled[i] = (bins[(i + distance) % SIGNATURE_SIZE] ^ (distance * 0x9E3779B97F4A7C15)) & _MASK
+    return array("Q", filled).tobytes()
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """두 서명의 추정 자카드 유사도"""
+    left, right = array("Q", a), array("Q", b)
+    return sum(1 for x, y in zip(left, right) if x == y) / SIGNATURE_SIZE
+
+
+def _band_keys(sig: bytes) -> List[int]:
+    step = ROWS * 8
+    return [hash(sig[i * step:(i + 1) * step]) for i in range(BANDS)]
+
+
+class TopicIndex:
+    """주제 하나의 LSH 색인"""
+
+    def __init__(self):
+        self.signatures: Dict[int, bytes] = {}
+        self.bands: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self.last_claim_id = 0
+
+    def add(self, claim_id: int, sig: bytes, loaded: bool = True):
+        """서명을 색인에 추가. loaded=False면 DB에서 읽은 위치(last_claim_id)는 그대로 둠"""
+        if loaded:
+            self.last_claim_id = max(self.last_claim_id, claim_id)
+        if claim_id in self.signatures:
+            return
+        self.signatures[claim_id] = sig
+        for band, key in zip(self.bands, _band_keys(sig)):
+            band.setdefault(key, []).append(claim_id)
+
+    def remove(self, claim_id: int):
+        sig = self.signatures.pop(claim_id, None)
+        if sig is None:
+            return
+        for band, key in zip(self.bands, _band_keys(sig)):
+            members = band.get(key)
+            if members and claim_id in members:
+                members.remove(claim_id)
+                if not members:
+                    del band[key]
+
+    def query(self, sig: bytes, threshold: float, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """유사도가 threshold 이상인 (claim_id, 유사도) 목록, 유사도 높은 순"""
+        candidates: Set[int] = set()
+        for band, key in zip(self.bands, _band_keys(sig)):
+            candidates.update(band.get(key, ()))
+        candidates.discard(exclude)
+        matches = []
+        for claim_id in candidates:
+            score = similarity(sig, self.signatures[claim_id])
+            if score >= threshold:
+                matches.append((claim_id, score))
+        matches.sort(key=lambda m: (-m[1], m[0]))
+        return matches
+
+    def clusters(self, threshold: float) -> List[List[int]]:
+        """유사한 주장끼리 묶은 그룹 (2개 이상인 것만, 큰 그룹부터)"""
+        parent = {claim_id: claim_id for claim_id in self.signatures}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        checked = set()
+        for band in self.bands:
+            for members in band.values():
+                if len(members) < 2:
+                    continue
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        pair = (a, b) if a < b else (b, a)
+                        if pair in checked:
+                            continue
+                        checked.add(pair)
+                        if find(a) != find(b) and similarity(self.signatures[a], self.signatures[b]) >= threshold:
+                            parent[find(a)] = find(b)
+
+        groups: Dict[int, List[int]] = {}
+        for claim_id in self.signatures:
+            groups.setdefault(find(claim_id), []).append(claim_id)
+        result = [sorted(g) for g in groups.values() if len(g) > 1]
+        result.sort(key=lambda g: (-len(g), g[0]))
+        return result
+
+
+class SimilarityIndex:
+    """주제별 색인을 필요할 때 읽어 두는 LRU 캐시"""
+
+    def __init__(self, max_topics: int = MAX_TOPICS):
+        self.max_topics = max_topics
+        self._topics: "OrderedDict[int, TopicIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def topic(self, db, topic_id: int) -> TopicIndex:
+        """주제 색인을 반환합니다. 처음이면 전부, 이후에는 새로 저장된 서명만 읽습니다."""
+        with self._lock:
+            index = self._topics.get(topic_id)
+            if index is None:
+                index = self._topics[topic_id] = TopicIndex()
+                while len(self._topics) > self.max_topics:
+                    self._topics.popitem(last=False)
+            else:
+                self._topics.move_to_end(topic_id)
+            table = models.ClaimSignature.__table__
+            rows = db.execute(
+                select(table.c.claim_id, table.c.signature)
+                .where(table.c.topic_id == topic_id, table.c.claim_id > index.last_claim_id)
+                .order_by(table.c.claim_id)
+            )
+            for claim_id, sig in rows:
+                index.add(claim_id, sig)
+            return index
+
+    def find(self, db, topic_id: int, sig: Optional[bytes], threshold: float = THRESHOLD,
+             exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        if sig is None:
+            return []
+        index = self.topic(db, topic_id)
+        with self._lock:
+            return index.query(sig, threshold, exclude)
+
+    def clusters(self, db, topic_id: int, threshold: float = THRESHOLD) -> List[List[Tuple[int, float]]]:
+        """유사 주장 그룹. 각 항목은 (claim_id, 그룹 첫 주장과의 유사도)"""
+        index = self.topic(db, topic_id)
+        with self._lock:
+            return [
+                [(claim_id, similarity(index.signatures[group[0]], index.signatures[claim_id])) for claim_id in group]
+                for group in index.clusters(threshold)
+            ]
+
+    def add(self, topic_id: int, claim_id: int, sig: Optional[bytes]):
+        if sig is None:
+            return
+        with self._lock:
+            index = self._topics.get(topic_id)
+            if index is not None:
+                # 다른 워커가 먼저 저장한 더 작은 id를 건너뛰지 않도록 읽은 위치는 옮기지 않음
+                index.add(claim_id, sig, loaded=False)
+
+    def remove(self, topic_id: int, claim_id: int, broadcast: bool = True):
+        if broadcast:
+            bus.publish("similarity.remove", {"topic_id": topic_id, "claim_id": claim_id})
+        with self._lock:
+            index = self._topics.get(topic_id)
+            if index is not None:
+                index.remove(claim_id)
+
+    def drop(self, topic_id: int, broadcast: bool = True):
+        if broadcast:
+            bus.publish("similarity.drop", {"topic_id": topic_id})
+        with self._lock:
+            self._topics.pop(topic_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._topics.clear()
+
+
+index = SimilarityIndex()
+
+
+@bus.on("similarity.remove")
+def _apply_remote_remove(data: dict):
+    index.remove(data["topic_id"], data["claim_id"], broadcast=False)
+
+
+@bus.on("similarity.drop")
+def _apply_remote_drop(data: dict):
+    index.drop(data["topic_id"], broadcast=False)
+
+
+@bus.on_gap
+def _clear_after_gap():
+    index.clear()
+
+
+# 작성 응답에 포함할 유사 주장 수
+MAX_DUPLICATES = 5
+
+
+def describe(db, matches: List[Tuple[int, float]], limit: int = MAX_DUPLICATES) -> List[dict]:
+    """(claim_id, 유사도) 목록에 제목을 붙임. 그 사이 삭제된 주장은 제외"""
+    matches = matches[:limit]
+    if not matches:
+        return []
+    titles = dict(db.query(models.Claim.id, models.Claim.title).filter(
+        models.Claim.id.in_([claim_id for claim_id, _ in matches])
+    ))
+    return [
+        {"id": claim_id, "title": titles[claim_id], "similarity": round(score, 3)}
+        for claim_id, score in matches if claim_id in titles
+    ]
+
+
+def store(db, claim: models.Claim, sig: Optional[bytes] = None) -> Optional[bytes]:
+    """주장의 서명을 저장합니다. (claim.id가 있어야 하며 커밋은 호출자가 수행)"""
+    if sig is None:
+        sig = signature(claim_text(claim.title, claim.content))
+    if sig is not None:
+        db.add(models.ClaimSignature(claim_id=claim.id, topic_id=claim.topic_id, signature=sig))
+    return sig
+
+
+def rebuild(db, batch_size: int = 2000) -> int:
+    """서명이 없는 주장의 서명을 id 순으로 배치 단위로 채웁니다. 저장한 개수를 반환합니다."""
+    claims = models.Claim.__table__
+    signatures = models.ClaimSignature.__table__
+    last_id = 0
+    total = 0
+    while True:
+        rows = db.execute(
+            select(claims.c.id, claims.c.topic_id, claims.c.title, claims.c.content)
+            .outerjoin(signatures, signatures.c.claim_id == claims.c.id)
+            .where(claims.c.id > last_id, signatures.c.claim_id.is_(None))
+            .order_by(claims.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        values = []
+        for claim_id, topic_id, title, content in rows:
+            sig = signature(claim_text(title, content))
+            if sig is not None:
+                values.append({"claim_id": claim_id, "topic_id": topic_id, "signature": sig})
+        if values:
+            db.execute(signatures.insert(), values)
+        db.commit()
+        last_id = rows[-1][0]
+        total += len(values)
+    index.clear()
+    return total
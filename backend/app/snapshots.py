@@ -0,0 +1,348 @@
+"""인기 주제의 정적 JSON 스냅샷
+
+선거 기간처럼 비로그인 조회가 몰리는 소수의 주제에 대해, 주장 목록과 토론 화면, 주제 목록을
+미리 JSON 파일로 만들어 두고 DB 조회 없이 파일 그대로 응답합니다. SNAPSHOT_DIR을 지정하면 켜집니다.
+
+- 대상: trend 랭킹 상위 HOT_TOPICS개 주제의 `claims/{id}`(기본 주장 목록), `pages/{id}`(기본 토론
+  화면)와 `topics/best`, `topics/trend`(주제 목록 앞쪽 LISTING_LIMIT개)
+- 파일: `키.내용해시.json`으로 쓰고(임시 파일 + os.replace), 현재 파일은 `manifest.json`이
+  가리킵니다. 매니페스트도 같은 방식으로 교체하므로 읽는 쪽은 항상 완성된 파일만 봅니다.
+  교체된 파일은 GRACE_SECONDS 뒤에 지웁니다. 큰 파일은 `.br`/`.gz`로 미리 압축해 두고
+  `Accept-Encoding`에 맞는 파일을 그대로 보냅니다.
+- 갱신: 쓰기 라우터가 `publisher.mark(topic_id)`로 주제가 바뀌었음을 알리면(다른 워커의 변경은
+  무효화 버스로 전달), 마지막 변경 후 DEBOUNCE_SECONDS 동안 조용하거나 첫 변경 후
+  MAX_DELAY_SECONDS가 지났을 때 그 주제만 다시 만듭니다. 내용이 같으면 파일을 쓰지 않습니다.
+- 워커가 여러 개면 디렉터리 잠금을 잡은 워커 하나만 만들고, 모든 워커가 매니페스트를 읽어 응답합니다.
+
+비로그인 사용자의 기본 주장 목록/토론 화면 요청은 라우터에서 스냅샷이 있으면 바로 파일로 응답하고,
+`GET /api/snapshots/{키}`로 직접 받을 수도 있습니다(ETag 지원).
+"""
+import fcntl
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from hashlib import blake2b
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.responses import FileResponse, Response
+from pydantic import TypeAdapter
+
+from app import archive, encoding, models, schemas, topic_page
+from app.database import SessionLocal
+from app.invalidation import bus
+from app.leaderboards import bucket_key, leaderboard
+from app.scheduler import periodic
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "1"))
+DEBOUNCE_SECONDS = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "2"))
+MAX_DELAY_SECONDS = float(os.getenv("SNAPSHOT_MAX_DELAY_SECONDS", "10"))
+HOT_TOPICS = int(os.getenv("SNAPSHOT_HOT_TOPICS", "30"))
+LISTING_LIMIT = int(os.getenv("SNAPSHOT_LISTING_LIMIT", "100"))
+# 응답의 Cache-Control max-age (스냅샷은 최대 이만큼 + 디바운스만큼 늦을 수 있음)
+CACHE_SECONDS = int(os.getenv("SNAPSHOT_CACHE_SECONDS", "2"))
+GRACE_SECONDS = 60
+# 다른 워커가 바꾼 매니페스트를 확인하는 간격
+MANIFEST_CHECK_SECONDS = 0.5
+
+MANIFEST = "manifest.json"
+LOCK_FILE = ".publisher.lock"
+LISTING_SORTS = ("best", "trend")
+# 미리 압축해 둘 인코딩 (Content-Encoding -> 파일 확장자). 발행할 때 한 번만 압축하므로 높은 압축률 사용
+# (brotli 11은 9보다 1% 작은 대신 20배 이상 느려서 다시 발행하는 시간이 길어짐)
+PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+BROTLI_QUALITY = 9
+
+_claims_adapter = TypeAdapter(List[schemas.ClaimResponse])
+_topics_adapter = TypeAdapter(List[schemas.TopicResponse])
+_page_adapter = TypeAdapter(schemas.TopicPageResponse)
+
+
+def _dump(adapter: TypeAdapter, value) -> bytes:
+    """라우터의 response_model과 같은 검증/직렬화를 거친 JSON"""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class SnapshotStore:
+    """매니페스트를 읽어 키에 해당하는 현재 파일을 찾습니다. 모든 워커에서 사용"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._entries: Dict[str, dict] = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < MANIFEST_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(os.path.join(self.directory, MANIFEST)).st_mtime_ns
+        except FileNotFoundError:
+            self._entries, self._mtime = {}, None
+            return
+        if mtime == self._mtime:
+            return
+        with open(os.path.join(self.directory, MANIFEST), "rb") as f:
+            self._entries = json.loads(f.read())["keys"]
+        self._mtime = mtime
+
+    def set_entries(self, entries: Dict[str, dict]) -> None:
+        """같은 프로세스의 발행 결과를 바로 반영"""
+        with self._lock:
+            self._entries = dict(entries)
+            self._checked_at = 0.0
+
+    def lookup(self, key: str) -> Optional[Tuple[str, dict]]:
+        if not self.directory:
+            return None
+        with self._lock:
+            self._reload()
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return os.path.join(self.directory, entry["file"]), entry
+
+
+class SnapshotPublisher:
+    """인기 주제의 스냅샷을 만들고 바뀐 주제만 다시 만듭니다."""
+
+    def __init__(self, directory: str, store: SnapshotStore):
+        self.directory = directory
+        self.store = store
+        self.entries: Dict[str, dict] = {}
+        self.rendered = 0
+        self.skipped = 0  # 내용이 같아서 쓰지 않은 횟수
+        self._dirty: Dict[int, Tuple[float, float]] = {}  # topic_id -> (첫 변경, 마지막 변경)
+        self._listings_dirty_at: Optional[float] = None
+        self._retired: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._lock_file = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def mark(self, topic_id: int, broadcast: bool = True) -> None:
+        """주제의 내용(주장, 반박, 투표)이나 주제 목록이 바뀌었음을 알림"""
+        if not self.enabled:
+            return
+        if broadcast:
+            bus.publish("snapshots.dirty", {"topic_id": topic_id})
+        now = time.monotonic()
+        with self._lock:
+            first, _ = self._dirty.get(topic_id, (now, now))
+            self._dirty[topic_id] = (first, now)
+            if self._listings_dirty_at is None:
+                self._listings_dirty_at = now
+
+    def _owns_directory(self) -> bool:
+        """디렉터리 잠금을 잡은 워커만 발행 (프로세스가 끝나면 잠금이 풀림)"""
+        if self._lock_file is not None:
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, LOCK_FILE), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self._load_manifest()
+        return True
+
+    def _load_manifest(self) -> None:
+        try:
+            with open(os.path.join(self.directory, MANIFEST), "rb") as f:
+                self.entries = json.loads(f.read())["keys"]
+        except FileNotFoundError:
+            self.entries = {}
+        # 매니페스트에 없는 파일은 이전 발행 워커가 남긴 것
+        current = {entry["file"] for entry in self.entries.values()}
+        for name in os.listdir(self.directory):
+            base = name
+            for suffix in PRECOMPRESSED.values():
+                base = base.removesuffix(suffix)
+            if base.endswith(".json") and base != MANIFEST and base not in current:
+                self._retired.append((time.monotonic(), name))
+
+    # 발행 ---------------------------------------------------------------
+
+    def _due(self, first: float, last: float, now: float) -> bool:
+        return now - last >= DEBOUNCE_SECONDS or now - first >= MAX_DELAY_SECONDS
+
+    def publish(self, db, force: bool = False) -> Optional[dict]:
+        """한 번의 발행 주기. 발행 워커가 아니거나 랭킹이 아직 없으면 None"""
+        if not self.enabled or not self._owns_directory() or not leaderboard.ready:
+            return None
+        now = time.monotonic()
+        hot = [t["id"] for t in leaderboard.top(bucket_key(), "trend", 0, HOT_TOPICS)]
+        with self._lock:
+            dirty = self._dirty
+            due = {
+                topic_id for topic_id, (first, last) in dirty.items()
+                if force or self._due(first, last, now)
+            }
+            self._dirty = {topic_id: marks for topic_id, marks in dirty.items() if topic_id not in due}
+            listings_due = force or (
+                self._listings_dirty_at is not None and now - self._listings_dirty_at >= DEBOUNCE_SECONDS
+            )
+            if listings_due:
+                self._listings_dirty_at = None
+
+        before = dict(self.entries)
+        written = 0
+        for sort in LISTING_SORTS:
+            key = f"topics/{sort}"
+            if listings_due or key not in self.entries:
+                items = leaderboard.top(bucket_key(), sort, 0, LISTING_LIMIT)
+                written += self._write(key, _dump(_topics_adapter, items))
+
+        hot_set = set(hot)
+        for topic_id in hot:
+            keys = (f"claims/{topic_id}", f"pages/{topic_id}")
+            if topic_id in due or any(key not in self.entries for key in keys):
+                try:
+                    written += self._render_topic(db, topic_id)
+                except Exception:
+                    # 한 주제가 실패해도 나머지 주제와 매니페스트는 갱신
+                    logger.exception("snapshot render failed: topic %s", topic_id)
+                    db.rollback()
+        # 인기 주제에서 빠진 주제는 API로 응답하도록 매니페스트에서 뺌
+        for key in list(self.entries):
+            kind, _, topic_id = key.partition("/")
+            if kind in ("claims", "pages") and int(topic_id) not in hot_set:
+                self._retire(self.entries.pop(key)["file"])
+
+        if self.entries != before:
+            _write_atomic(os.path.join(self.directory, MANIFEST), json.dumps(
+                {"keys": self.entries}, ensure_ascii=False
+            ).encode())
+            self.store.set_entries(self.entries)
+        self._cleanup()
+        return {"hot_topics": len(hot), "rendered": written, "files": len(self.entries)}
+
+    def _render_topic(self, db, topic_id: int) -> int:
+        from app.routers.claims import list_claims_by_topic
+
+        topic = db.query(models.Topic).filter(models.Topic.id == topic_id).first()
+        if topic is None:
+            return 0
+        claims = list_claims_by_topic(db, topic_id)
+        written = self._write(f"claims/{topic_id}", _dump(_claims_adapter, claims))
+
+        options = dict(sort_by="best", skip=0, limit=topic_page.DEFAULT_LIMIT,
+                       depth=topic_page.DEFAULT_DEPTH, replies=topic_page.DEFAULT_REPLIES)
+        archived = archive.load(db, topic_id) if topic.archived_at else None
+        if archived is not None:
+            page = topic_page.build_archived_page(archived, topic, **options)
+        else:
+            page = topic_page.build_topic_page(db, topic, None, **options)
+        written += self._write(f"pages/{topic_id}", _dump(_page_adapter, page))
+        db.expunge_all()
+        return written
+
+    def _write(self, key: str, data: bytes) -> int:
+        """내용이 바뀌었을 때만 새 버전 파일을 씀. 쓴 파일 수(0/1)를 반환"""
+        version = blake2b(data, digest_size=8).hexdigest()
+        current = self.entries.get(key)
+        if current is not None and current["version"] == version:
+            self.skipped += 1
+            return 0
+        name = f"{key.replace('/', '-')}.{version}.json"
+        _write_atomic(os.path.join(self.directory, name), data)
+        encodings = []
+        if len(data) >= encoding.COMPRESS_MIN_BYTES:
+            if encoding.brotli is not None:
+                _write_atomic(os.path.join(self.directory, name + PRECOMPRESSED["br"]), encoding.brotli.compress(data, quality=BROTLI_QUALITY))
+                encodings.append("br")
+            _write_atomic(os.path.join(self.directory, name + PRECOMPRESSED["gzip"]), gzip.compress(data, 9, mtime=0))
+            encodings.append("gzip")
+        self.entries[key] = {
+            "file": name, "version": version, "bytes": len(data), "encodings": encodings, "rendered_at": time.time()
+        }
+        if current is not None:
+            self._retire(current["file"])
+        self.rendered += 1
+        return 1
+
+    def _retire(self, name: str) -> None:
+        # 교체 직전에 매니페스트를 읽은 요청이 아직 보내는 중일 수 있으므로 바로 지우지 않음
+        self._retired.append((time.monotonic() + GRACE_SECONDS, name))
+
+    def _cleanup(self) -> None:
+        now = time.monotonic()
+        keep = []
+        for delete_at, name in self._retired:
+            if delete_at > now:
+                keep.append((delete_at, name))
+                continue
+            for path in (name, *(name + suffix for suffix in PRECOMPRESSED.values())):
+                try:
+                    os.unlink(os.path.join(self.directory, path))
+                except FileNotFoundError:
+                    pass
+        self._retired = keep
+
+
+store = SnapshotStore(SNAPSHOT_DIR)
+publisher = SnapshotPublisher(SNAPSHOT_DIR, store)
+
+
+def response(key: str, if_none_match: Optional[str] = None) -> Optional[Response]:
+    """스냅샷 파일 응답. 스냅샷이 없으면 None (호출한 쪽에서 DB로 응답)"""
+    found = store.lookup(key)
+    if found is None:
+        return None
+    path, entry = found
+    etag = entry["version"]
+    headers = {"Cache-Control": f"public, max-age={CACHE_SECONDS}", "Vary": encoding.VARY[1].decode()}
+    # 그대로 보낼 수 있는 JSON 요청이면 미리 압축한 파일을 보냄 (MessagePack 등은 미들웨어가 변환)
+    negotiation = encoding.current()
+    if negotiation.plain and negotiation.compression in entry.get("encodings", ()):
+        path += PRECOMPRESSED[negotiation.compression]
+        etag += "." + negotiation.compression
+        headers["Content-Encoding"] = negotiation.compression
+    etag = f'"{etag}"'
+    headers["ETag"] = etag
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    if not os.path.exists(path):
+        return None  # 매니페스트를 다시 읽기 직전에 지워진 파일
+    return FileResponse(path, media_type="application/json", headers=headers)
+
+
+@bus.on("snapshots.dirty")
+def _apply_remote_mark(data: dict):
+    publisher.mark(data["topic_id"], broadcast=False)
+
+
+if SNAPSHOT_DIR:
+    @periodic("snapshot-publisher", INTERVAL_SECONDS)
+    def publish_snapshots():
+        db = SessionLocal()
+        try:
+            publisher.publish(db)
+        finally:
+            db.close()
@@ -0,0 +1,298 @@
+"""근거 자료 요약 (오프라인 추출 요약)
+
+외부 API 없이 근거 본문에서 중요한 문장 몇 개를 골라 요약을 만듭니다. 한국어와 영어를 함께 다룹니다.
+
+1. 문장 분리: 줄바꿈과 문장 부호(. ! ? … 등) 뒤의 공백에서 나눕니다. 영어 약어(Mr., U.S.)와
+   이니셜, 소수점은 문장 끝으로 보지 않습니다.
+2. 단어 추출: 한글 어절은 끝의 조사를 떼고, 영어는 소문자로 바꿔 불용어를 뺍니다. 숫자도 단어로 셉니다.
+3. 점수: 문서 전체에서 자주 나오는 단어를 많이 담은 문장일수록 높고, 앞쪽 문장과 수치가 있는 문장에
+   가산점을 줍니다. 너무 짧거나 긴 문장은 감점합니다.
+4. 선택: 점수 순으로 고르되 이미 고른 문장과 단어가 많이 겹치면 건너뛰고(중복 제거),
+   SUMMARY_MAX_SENTENCES 문장 / SUMMARY_MAX_CHARS 글자 안에서 원래 순서대로 잇습니다.
+
+`summarize_many`는 같은 본문을 한 번만 계산하도록 결과를 메모리 LRU에 두고, 요약할 본문이
+SUMMARY_POOL_MIN_BATCH개 이상이면 프로세스 풀(SUMMARY_WORKERS개, 0이면 사용하지 않음)에 나눠 맡깁니다.
+이 모듈은 풀의 자식 프로세스에서도 import되므로 DB나 다른 app 모듈을 불러오지 않습니다.
+(DB의 근거 행과 연결하는 부분은 app/evidence.py)
+"""
+import atexit
+import hashlib
+import logging
+import math
+import multiprocessing
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# 알고리즘을 바꾸면 올려서 저장된 요약을 다시 만들게 함 (app/evidence.py)
+SUMMARY_VERSION = 1
+MAX_SENTENCES = int(os.getenv("SUMMARY_MAX_SENTENCES", "3"))
+MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "300"))
+WORKERS = int(os.getenv("SUMMARY_WORKERS", str(min(4, os.cpu_count() or 1))))
+POOL_MIN_BATCH = int(os.getenv("SUMMARY_POOL_MIN_BATCH", "32"))
+CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "4096"))
+
+# 이미 고른 문장과 단어가 이 비율 이상 겹치면 고르지 않음
+REDUNDANCY = 0.6
+# 첫 문장의 가산점 (n번째 문장은 1/n)
+LEAD_BONUS = 0.6
+MIN_SENTENCE_CHARS = 12
+
+_BOUNDARY = re.compile(r"[.!?…。！？]+[\"'”’)\]]*(?=\s)")
+_TOKEN = re.compile(r"[가-힣]+|[A-Za-z]+(?:'[A-Za-z]+)?|\d+(?:[.,]\d+)*%?")
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "u.s", "u.k", "u.n",
+    "inc", "ltd", "co", "corp", "no", "fig", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep",
+    "sept", "oct", "nov", "dec", "approx", "est", "dept", "gov", "p", "pp",
+}
+# 어절 끝에서 뗄 조사 (긴 것부터 확인)
+_PARTICLES = sorted(
+    "으로부터 에서부터 에서는 에게서 으로는 이라는 에서도 에서 에게 으로 까지 부터 보다 처럼 만큼 이라 "
+    "하고 이나 과 와 은 는 이 가 을 를 에 의 도 만 로 께".split(),
+    key=len, reverse=True,
+)
+_STOPWORDS = {
+    # 한국어
+    "그리고", "하지만", "그러나", "또한", "또는", "그래서", "따라서", "때문", "것", "수", "등", "및", "이번",
+    "있다", "없다", "했다", "한다", "된다", "이다", "있는", "하는", "위해", "대한", "통해", "관련", "대해",
+    "있습니다", "합니다", "했습니다", "됩니다", "입니다", "그", "이", "저", "더", "또", "중",
+    # 영어
+    "the", "a", "an", "and", "or", "but", "of", "to", "in", "on", "for", "with", "at", "by", "from", "as",
+    "is", "are", "was", "were", "be", "been", "being", "it", "its", "this", "that", "these", "those",
+    "has", "have", "had", "will", "would", "can", "could", "should", "may", "might", "not", "no", "than",
+    "which", "who", "whom", "what", "when", "where", "while", "their", "they", "them", "he", "she", "his",
+    "her", "we", "our", "you", "your", "i", "said", "also", "about", "into", "more", "most", "such",
+}
+
+
+def normalize(text: str) -> str:
+    lines = (_SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _is_boundary(text: str, match: re.Match) -> bool:
+    """문장 부호 뒤가 실제 문장 끝인지 (약어, 이니셜이면 아님)"""
+    if not match.group().startswith("."):
+        return True
+    start = match.start()
+    word_start = start
+    while word_start > 0 and (text[word_start - 1].isalpha() or text[word_start - 1] == "."):
+        word_start -= 1
+    word = text[word_start:start]
+    if not word or not word.isascii():
+        return True
+    if word.lower() in _ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+        return False
+    # 다음 글자가 영어 소문자면 문장이 이어지는 것으로 봄 (예: "approx. five")
+    following = text[match.end():].lstrip()[:1]
+    return not (following.isascii() and following.islower())
+
+
+def split_sentences(text: Optional[str]) -> List[str]:
+    sentences = []
+    for line in normalize(text or "").split("\n"):
+        start = 0
+        for match in _BOUNDARY.finditer(line):
+            if _is_boundary(line, match):
+                sentence = line[start:match.end()].strip()
+                if sentence:
+                    sentences.append(sentence)
+                start = match.end()
+        rest = line[start:].strip()
+        if rest:
+            sentences.append(rest)
+    return sentences
+
+
+def _strip_particle(word: str) -> str:
+    for particle in _PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 2:
+            return word[:-len(particle)]
+    return word
+
+
+def tokens(sentence: str) -> List[str]:
+    result = []
+    for token in _TOKEN.findall(sentence):
+        first = token[0]
+        if "가" <= first <= "힣":
+            token = _strip_particle(token)
+            if len(token) < 2 or token in _STOPWORDS:
+                continue
+        elif first.isdigit():
+            pass
+        else:
+            token = token.lower()
+            if token.endswith("'s"):
+                token = token[:-2]
+            if len(token) < 3 or token in _STOPWORDS:
+                continue
+            if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+        result.append(token)
+    return result
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def summarize(text: Optional[str], max_sentences: int = MAX_SENTENCES, max_chars: int = MAX_CHARS) -> str:
+    """본문에서 중요한 문장을 골라 원래 순서대로 이은 요약. 짧은 본문은 그대로 반환"""
+    normalized = normalize(text or "")
+    if len(normalized) <= max_chars:
+        return normalized.replace("\n", " ")
+    sentences = split_sentences(normalized)
+    if len(sentences) <= 1:
+        return _truncate(normalized.replace("\n", " "), max_chars)
+
+    words = [set(tokens(sentence)) for sentence in sentences]
+    frequency = Counter(word for sentence_words in words for word in sentence_words)
+    top = max(frequency.values(), default=1)
+    scores = []
+    for position, (sentence, sentence_words) in enumerate(zip(sentences, words)):
+        if not sentence_words:
+            scores.append(0.0)
+            continue
+        # 문서에서 두 번 이상 나온 단어의 비중 (한 번만 나온 단어는 주제어로 보지 않음)
+        weight = sum(frequency[word] for word in sentence_words if frequency[word] > 1) / top
+        score = weight / math.sqrt(len(sentence_words))
+        score += LEAD_BONUS / (1 + position)  # 앞쪽 문장 (뉴스/보고서는 핵심을 먼저 씀)
+        if any(word[0].isdigit() for word in sentence_words):
+            score += 0.1  # 수치가 있는 문장
+        if len(sentence) < MIN_SENTENCE_CHARS:
+            score *= 0.3
+        elif len(sentence) > max_chars:
+            score *= 0.5
+        scores.append(score)
+
+    chosen: List[int] = []
+    length = 0
+    for index in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        if len(chosen) >= max_sentences:
+            break
+        sentence_words = words[index]
+        if any(
+            sentence_words and len(sentence_words & words[other]) / len(sentence_words) >= REDUNDANCY
+            for other in chosen
+        ):
+            continue
+        extra = len(sentences[index]) + (1 if chosen else 0)
+        if chosen and length + extra > max_chars:
+            continue
+        chosen.append(index)
+        length += extra
+    return _truncate(" ".join(sentences[i] for i in sorted(chosen)), max_chars)
+
+
+def key(text: str) -> str:
+    """요약 결과 캐시 키: "버전:본문 해시" """
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{SUMMARY_VERSION}:{digest}"
+
+
+class _Cache:
+    """키 -> 요약 LRU"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.items: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, cache_key: str) -> Optional[str]:
+        with self._lock:
+            summary = self.items.get(cache_key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(cache_key)
+            self.hits += 1
+            return summary
+
+    def put(self, cache_key: str, summary: str) -> None:
+        with self._lock:
+            self.items[cache_key] = summary
+            self.items.move_to_end(cache_key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.items.clear()
+            self.hits = self.misses = 0
+
+
+cache = _Cache(CACHE_SIZE)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # 웹 워커는 스레드를 쓰므로 fork 대신 spawn으로 자식 프로세스를 만듦
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+@atexit.register
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _compute(texts: List[str]) -> List[str]:
+    pool = _get_pool() if len(texts) >= POOL_MIN_BATCH else None
+    if pool is None:
+        return [summarize(text) for text in texts]
+    chunksize = max(1, len(texts) // (WORKERS * 4))
+    try:
+        return list(pool.map(summarize, texts, chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.exception("summary pool broke; summarizing in process")
+        shutdown()
+        return [summarize(text) for text in texts]
+
+
+def summarize_many(texts: Sequence[Optional[str]], known: Optional[Dict[str, str]] = None) -> List[Optional[str]]:
+    """본문 목록의 요약 (본문이 없으면 None). 같은 본문과 캐시에 있는 본문은 다시 계산하지 않음
+
+    known: 호출자가 이미 알고 있는 {키: 요약} (예: DB에 저장된 같은 본문의 요약)
+    """
+    keys = [key(text) if text else None for text in texts]
+    results: Dict[str, str] = dict(known or {})
+    pending: Dict[str, str] = {}
+    for cache_key, text in zip(keys, texts):
+        if cache_key is None or cache_key in results or cache_key in pending:
+            continue
+        cached = cache.get(cache_key)
+        if cached is not None:
+            results[cache_key] = cached
+        else:
+            pending[cache_key] = text
+    if pending:
+        for cache_key, summary in zip(pending, _compute(list(pending.values()))):
+            results[cache_key] = summary
+            cache.put(cache_key, summary)
+    return [results[cache_key] if cache_key else None for cache_key in keys]
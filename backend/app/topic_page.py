@@ -0,0 +1,208 @@
+"""토론 화면 한 장에 필요한 데이터를 한 번에 조립
+
+주제, 진영별 주장 페이지와 근거, 각 주장의 반박 트리 앞쪽 몇 단계, 현재 사용자의 투표를
+주장/반박 수와 관계없이 고정된 개수의 쿼리로 읽습니다.
+
+    주제 1 + 주장(찬/반) 2 + 주장 근거 1 + 반박 단계별 1 + 마지막 단계 재반박 수 1
+    + 반박 근거 1 + 사용자 투표 1
+
+반박은 부모(주장 또는 반박)마다 앞쪽 `replies`개만 싣고, 전체 개수는 `reply_count`로 알려줍니다.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from app import archive, models, ranking
+from app.vote_store import viewer_votes
+
+DEFAULT_LIMIT = 20
+DEFAULT_DEPTH = 2
+MAX_DEPTH = 5
+DEFAULT_REPLIES = 10
+
+
+def _author(user) -> Optional[dict]:
+    if user is None:
+        return None
+    return {
+        "name": user.username,
+        "affiliation": user.affiliation or user.political_party or "",
+        "level": user.level,
+    }
+
+
+def _evidence_dict(e: models.Evidence) -> dict:
+    return {
+        "id": e.id,
+        "source": e.source,
+        "publisher": e.publisher,
+        "text": e.text,
+        "summary": e.summary,
+        "url": e.url,
+    }
+
+
+def _rebuttal_level(db, parent_column, parent_ids: List[int], replies: int, top_level: bool):
+    """부모마다 앞쪽 replies개의 반박과 부모별 전체 반박 수를 한 번에 조회"""
+    table = models.Rebuttal
+    condition = parent_column.in_(parent_ids)
+    if top_level:
+        condition = condition & table.parent_id.is_(None)
+    ranked = select(
+        table.id,
+        func.row_number().over(partition_by=parent_column, order_by=table.id).label("position"),
+        func.count().over(partition_by=parent_column).label("siblings"),
+    ).where(condition).subquery()
+    return db.query(table, ranked.c.siblings).options(joinedload(table.user)).join(
+        ranked, ranked.c.id == table.id
+    ).filter(ranked.c.position <= replies).order_by(table.id).all()
+
+
+def build_topic_page(
+    db,
+    topic: models.Topic,
+    viewer: Optional[models.User] = None,
+    sort_by: str = "best",
+    skip: int = 0,
+    limit: int = DEFAULT_LIMIT,
+    depth: int = DEFAULT_DEPTH,
+    replies: int = DEFAULT_REPLIES,
+) -> dict:
+    # 진영별로 따로 순위를 매기는 주장 목록과 같은 방식
+    query = ranking.order_claims(
+        db.query(models.Claim).options(joinedload(models.Claim.user)).filter(models.Claim.topic_id == topic.id),
+        sort_by,
+    )
+    claims = []
+    for side in ("pro", "con"):
+        claims.extend(query.filter(models.Claim.type == side).offset(skip).limit(limit).all())
+    claim_ids = [c.id for c in claims]
+
+    claim_evidence: Dict[int, List[dict]] = {}
+    if claim_ids:
+        for e in db.query(models.Evidence).filter(models.Evidence.claim_id.in_(claim_ids)).order_by(models.Evidence.id):
+            claim_evidence.setdefault(e.claim_id, []).append(_evidence_dict(e))
+
+    # 반박 트리를 단계별로 내려가며 읽음 (단계마다 쿼리 1번)
+    nodes: Dict[int, dict] = {}
+    top_level: Dict[int, List[dict]] = {}
+    top_level_counts: Dict[int, int] = {}
+    parent_ids = claim_ids
+    for level in range(depth):
+        if not parent_ids:
+            break
+        if level == 0:
+            rows = _rebuttal_level(db, models.Rebuttal.claim_id, parent_ids, replies, top_level=True)
+        else:
+            rows = _rebuttal_level(db, models.Rebuttal.parent_id, parent_ids, replies, top_level=False)
+        parent_ids = []
+        for rebuttal, siblings in rows:
+            node = {
+                "id": rebuttal.id,
+                "claim_id": rebuttal.claim_id,
+                "parent_id": rebuttal.parent_id,
+                "user_id": rebuttal.user_id,
+                "title": rebuttal.title,
+                "content": rebuttal.content,
+                "type": rebuttal.type,
+                "votes": rebuttal.votes,
+                "created_at": rebuttal.created_at,
+                "author": _author(rebuttal.user),
+                "user_vote": None,
+                "evidence": [],
+                "reply_count": 0,
+                "replies": [],
+            }
+            nodes[rebuttal.id] = node
+            parent_ids.append(rebuttal.id)
+            if level == 0:
+                top_level.setdefault(rebuttal.claim_id, []).append(node)
+                top_level_counts[rebuttal.claim_id] = siblings
+            else:
+                parent = nodes[rebuttal.parent_id]
+                parent["replies"].append(node)
+                parent["reply_count"] = siblings
+
+    # 마지막 단계 반박은 재반박을 싣지 않고 개수만 알려줌
+    if parent_ids:
+        counts = db.query(models.Rebuttal.parent_id, func.count(models.Rebuttal.id)).filter(
+            models.Rebuttal.parent_id.in_(parent_ids)
+        ).group_by(models.Rebuttal.parent_id)
+        for parent_id, count in counts:
+            nodes[parent_id]["reply_count"] = count
+
+    if nodes:
+        for e in db.query(models.Evidence).filter(models.Evidence.rebuttal_id.in_(list(nodes))).order_by(
+            models.Evidence.id
+        ):
+            nodes[e.rebuttal_id]["evidence"].append(_evidence_dict(e))
+
+    claim_votes: Dict[int, str] = {}
+    if viewer is not None:
+        claim_votes, rebuttal_votes = viewer_votes(db, viewer.id, claim_ids, list(nodes))
+        for rebuttal_id, vote_type in rebuttal_votes.items():
+            nodes[rebuttal_id]["user_vote"] = vote_type
+
+    return {
+        "topic": topic,
+        "claims": [
+            {
+                "id": claim.id,
+                "topic_id": claim.topic_id,
+                "user_id": claim.user_id,
+                "title": claim.title,
+                "content": claim.content,
+                "type": claim.type,
+                "votes": claim.votes,
+                "sticker": claim.sticker,
+                "created_at": claim.created_at,
+                "author": _author(claim.user),
+                "user_vote": claim_votes.get(claim.id),
+                "evidence": claim_evidence.get(claim.id, []),
+                "rebuttal_count": claim.rebuttal_count or 0,
+                "reply_count": top_level_counts.get(claim.id, 0),
+                "rebuttals": top_level.get(claim.id, []),
+            }
+            for claim in claims
+        ],
+        "depth": depth,
+    }
+
+
+def build_archived_page(
+    archived: "archive.ArchivedTopic",
+    topic: models.Topic,
+    sort_by: str = "best",
+    skip: int = 0,
+    limit: int = DEFAULT_LIMIT,
+    depth: int = DEFAULT_DEPTH,
+    replies: int = DEFAULT_REPLIES,
+) -> dict:
+    """보관된 주제의 화면 데이터를 스냅샷에서 같은 모양으로 조립 (쿼리 없음)"""
+    children: Dict[Optional[int], List[dict]] = {}
+    top_level: Dict[int, List[dict]] = {}
+    for rebuttal in archived.rebuttals.values():
+        if rebuttal["parent_id"] is None:
+            top_level.setdefault(rebuttal["claim_id"], []).append(rebuttal)
+        else:
+            children.setdefault(rebuttal["parent_id"], []).append(rebuttal)
+
+    def subtree(siblings: List[dict], level: int) -> List[dict]:
+        nodes = []
+        for rebuttal in siblings[:replies]:
+            node = archive.rebuttal_dict(archived, rebuttal)
+            below = children.get(rebuttal["id"], [])
+            node["reply_count"] = len(below)
+            node["replies"] = subtree(below, level + 1) if level + 1 < depth else []
+            nodes.append(node)
+        return nodes
+
+    claims = []
+    for claim in archive.claim_list(archived, sort_by, skip=skip, limit=limit):
+        siblings = top_level.get(claim["id"], [])
+        claim["evidence"] = archived.claim_evidence.get(claim["id"], [])
+        claim["reply_count"] = len(siblings)
+        claim["rebuttals"] = subtree(siblings, 0)
+        claims.append(claim)
+    return {"topic": topic, "claims": claims, "depth": depth}
@@ -0,0 +1,316 @@
+"""사용자 활동 통계와 레벨
+
+사용자별 작성 수와 받은 반응을 `user_stats` 테이블에 유지합니다.
+
+- claims, rebuttals: 작성한 주장/반박 수
+- likes_received, dislikes_received: 작성한 주장/반박이 받은 좋아요/싫어요 (본인 투표 제외)
+- rebuttals_received: 작성한 주장/반박에 다른 사용자가 단 반박 수
+
+글 작성/삭제와 투표 라우터가 같은 트랜잭션에서 `apply`로 증감하므로, 프로필을 볼 때
+claims/rebuttals/votes를 사용자별로 집계할 필요가 없습니다. 통계는 라이브 테이블에 있는 글 기준이라
+주장을 삭제하거나 주제를 보관하면 그 아래 글과 투표만큼 `remove`로 차감합니다.
+
+활동 피드(`feed`)는 사용자가 쓴 주장과 반박을 (user_id, created_at) 인덱스로 최신순으로 읽고,
+마지막 항목의 (작성 시각, 종류, id)를 커서로 넘겨 다음 페이지를 OFFSET 없이 이어서 읽습니다.
+
+`User.level`은 통계의 점수(`score`)로 정하며 통계가 바뀔 때 함께 갱신합니다. 관리자(ADMIN_LEVEL)는
+바꾸지 않습니다. 어긋난 통계는 `python manage.py rebuild-user-stats`로 다시 만듭니다.
+"""
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import aliased
+
+from app import models, vote_log
+
+ADMIN_LEVEL = 999
+FIELDS = ("claims", "rebuttals", "likes_received", "dislikes_received", "rebuttals_received")
+# 점수가 이 값 이상이면 다음 레벨 (레벨 1부터 시작)
+LEVEL_THRESHOLDS = (20, 50, 100, 200, 400, 800, 1600, 3200, 6400)
+# 활동 피드
+KINDS = ("claim", "rebuttal")
+FEED_LIMIT = 20
+EXCERPT_CHARS = 200
+
+
+def score(stats: Mapping[str, int]) -> int:
+    """글을 쓰고 반응을 받을수록 오르는 점수 (싫어요는 감점)"""
+    return (
+        5 * stats.get("claims", 0)
+        + 3 * stats.get("rebuttals", 0)
+        + 2 * stats.get("rebuttals_received", 0)
+        + stats.get("likes_received", 0)
+        - stats.get("dislikes_received", 0)
+    )
+
+
+def level_for(stats: Mapping[str, int]) -> int:
+    return 1 + bisect_right(LEVEL_THRESHOLDS, score(stats))
+
+
+def _set_level(db, user_id: int, level: int) -> None:
+    users = models.User.__table__
+    db.execute(
+        update(users)
+        .where(users.c.id == user_id, users.c.level != level, users.c.level < ADMIN_LEVEL)
+        .values(level=level)
+    )
+
+
+def apply(db, user_id: Optional[int], **deltas: int) -> None:
+    """통계를 deltas만큼 증감하고 레벨을 다시 정합니다. (커밋은 호출자가 수행)"""
+    deltas = {name: value for name, value in deltas.items() if value}
+    if user_id is None or not deltas:
+        return
+    table = models.UserStats.__table__
+    now = datetime.utcnow()
+    row = db.execute(
+        update(table)
+        .where(table.c.user_id == user_id)
+        .values(updated_at=now, **{name: table.c[name] + value for name, value in deltas.items()})
+        .returning(*(table.c[name] for name in FIELDS))
+    ).first()
+    if row is None:
+        # SQLite에서는 위 UPDATE가 쓰기 잠금을 잡으므로 동시에 같은 행을 INSERT하는 경우는 없음
+        db.execute(insert(table).values(user_id=user_id, updated_at=now, **deltas))
+        stats = deltas
+    else:
+        stats = dict(zip(FIELDS, row))
+    _set_level(db, user_id, level_for(stats))
+
+
+def record_vote(db, voter_id: int, target, vote_type: str, delta: int) -> None:
+    """주장/반박 작성자가 받은 투표를 증감 (본인 투표는 세지 않음)"""
+    if target.user_id == voter_id:
+        return
+    apply(db, target.user_id, **{f"{vote_type}s_received": delta})
+
+
+def record_rebuttal(db, rebuttal: models.Rebuttal, claim: models.Claim, delta: int) -> None:
+    """반박 작성자의 작성 수와 반박받은 글(상위 반박 또는 주장) 작성자의 받은 반박 수를 증감"""
+    apply(db, rebuttal.user_id, rebuttals=delta)
+    if rebuttal.parent_id is not None:
+        parent_author = db.query(models.Rebuttal.user_id).filter(models.Rebuttal.id == rebuttal.parent_id).scalar()
+    else:
+        parent_author = claim.user_id
+    if parent_author is not None and parent_author != rebuttal.user_id:
+        apply(db, parent_author, rebuttals_received=delta)
+
+
+def tally(db, scope=None) -> Dict[int, Counter]:
+    """주장 조건(scope, 없으면 전체)에 속한 글과 투표를 사용자별로 집계: {user_id: Counter(필드별 값)}"""
+    result: Dict[int, Counter] = defaultdict(Counter)
+    claim, rebuttal, vote, ledger = models.Claim, models.Rebuttal, models.Vote, models.VoteLedger
+    parent = aliased(models.Rebuttal)
+
+    def where(query):
+        return query.where(scope) if scope is not None else query
+
+    def add(field, query):
+        for user_id, count in db.execute(query):
+            if user_id is not None:
+                result[user_id][field] += count
+
+    def add_votes(query):
+        for user_id, vote_type, count in db.execute(query):
+            if user_id is not None:
+                result[user_id][f"{vote_type}s_received"] += count
+
+    add("claims", where(select(claim.user_id, func.count()).group_by(claim.user_id)))
+    add("rebuttals", where(
+        select(rebuttal.user_id, func.count()).select_from(rebuttal).join(claim, claim.id == rebuttal.claim_id)
+        .group_by(rebuttal.user_id)
+    ))
+    add_votes(where(
+        select(claim.user_id, vote.vote_type, func.count())
+        .select_from(vote)
+        .join(claim, claim.id == vote.claim_id)
+        .where(vote.user_id != claim.user_id)
+        .group_by(claim.user_id, vote.vote_type)
+    ))
+    add_votes(where(
+        select(rebuttal.user_id, vote.vote_type, func.count())
+        .select_from(vote)
+        .join(rebuttal, rebuttal.id == vote.rebuttal_id)
+        .join(claim, claim.id == rebuttal.claim_id)
+        .where(vote.user_id != rebuttal.user_id)
+        .group_by(rebuttal.user_id, vote.vote_type)
+    ))
+    # 압축된 오래된 투표 (app/vote_log.py)
+    add_votes(where(
+        select(claim.user_id, vote_log.ledger_vote_type, func.count())
+        .select_from(ledger)
+        .join(claim, claim.id == ledger.target_id)
+        .where(ledger.kind == ledger.CLAIM, ledger.user_id != claim.user_id)
+        .group_by(claim.user_id, vote_log.ledger_vote_type)
+    ))
+    add_votes(where(
+        select(rebuttal.user_id, vote_log.ledger_vote_type, func.count())
+        .select_from(ledger)
+        .join(rebuttal, rebuttal.id == ledger.target_id)
+        .join(claim, claim.id == rebuttal.claim_id)
+        .where(ledger.kind == ledger.REBUTTAL, ledger.user_id != rebuttal.user_id)
+        .group_by(rebuttal.user_id, vote_log.ledger_vote_type)
+    ))
+    # 주장에 직접 단 반박과 반박에 단 재반박
+    add("rebuttals_received", where(
+        select(claim.user_id, func.count())
+        .select_from(rebuttal)
+        .join(claim, claim.id == rebuttal.claim_id)
+        .where(rebuttal.parent_id.is_(None), rebuttal.user_id != claim.user_id)
+        .group_by(claim.user_id)
+    ))
+    add("rebuttals_received", where(
+        select(parent.user_id, func.count())
+        .select_from(rebuttal)
+        .join(parent, parent.id == rebuttal.parent_id)
+        .join(claim, claim.id == parent.claim_id)
+        .where(rebuttal.user_id != parent.user_id)
+        .group_by(parent.user_id)
+    ))
+    return result
+
+
+def remove(db, scope) -> None:
+    """삭제/보관할 주장들(scope)의 글과 투표만큼 통계를 차감 (행을 지우기 전에 호출)"""
+    for user_id, counts in tally(db, scope).items():
+        apply(db, user_id, **{name: -value for name, value in counts.items()})
+
+
+def remove_rebuttal(db, rebuttal: models.Rebuttal, claim: models.Claim) -> None:
+    """반박 하나를 지울 때 차감: 작성 수, 받은 투표, 상위 글 작성자의 받은 반박, 이 반박에 달린 재반박"""
+    record_rebuttal(db, rebuttal, claim, -1)
+    vote, ledger = models.Vote, models.VoteLedger
+    votes = Counter(dict(db.execute(
+        select(vote.vote_type, func.count())
+        .where(vote.rebuttal_id == rebuttal.id, vote.user_id != rebuttal.user_id)
+        .group_by(vote.vote_type)
+    ).all()))
+    votes.update(dict(db.execute(
+        select(vote_log.ledger_vote_type, func.count())
+        .where(ledger.kind == ledger.REBUTTAL, ledger.target_id == rebuttal.id, ledger.user_id != rebuttal.user_id)
+        .group_by(vote_log.ledger_vote_type)
+    ).all()))
+    replies = db.query(func.count(models.Rebuttal.id)).filter(
+        models.Rebuttal.parent_id == rebuttal.id, models.Rebuttal.user_id != rebuttal.user_id
+    ).scalar()
+    apply(
+        db, rebuttal.user_id,
+        likes_received=-votes.get("like", 0),
+        dislikes_received=-votes.get("dislike", 0),
+        rebuttals_received=-replies,
+    )
+
+
+def summary(db, user_id: int) -> dict:
+    """프로필에 보여줄 통계, 점수, 다음 레벨까지 남은 점수 (행 하나 조회)"""
+    row = db.query(models.UserStats).filter(models.UserStats.user_id == user_id).first()
+    stats = {name: (getattr(row, name) or 0) if row else 0 for name in FIELDS}
+    stats["score"] = score(stats)
+    index = bisect_right(LEVEL_THRESHOLDS, stats["score"])
+    stats["next_level_score"] = LEVEL_THRESHOLDS[index] - stats["score"] if index < len(LEVEL_THRESHOLDS) else None
+    return stats
+
+
+def rebuild(db) -> int:
+    """라이브 테이블에서 통계 전체와 레벨을 다시 계산합니다. 만든 행 수를 반환합니다."""
+    counts = tally(db)
+    table = models.UserStats.__table__
+    now = datetime.utcnow()
+    db.execute(delete(table))
+    rows = [
+        {"user_id": user_id, "updated_at": now, **{name: values.get(name, 0) for name in FIELDS}}
+        for user_id, values in counts.items()
+    ]
+    if rows:
+        db.execute(insert(table), rows)
+    users = models.User.__table__
+    changes = [
+        {"uid": user_id, "new_level": level_for(counts.get(user_id, {}))}
+        for user_id, level in db.execute(select(users.c.id, users.c.level).where(users.c.level < ADMIN_LEVEL))
+        if level != level_for(counts.get(user_id, {}))
+    ]
+    if changes:
+        db.execute(
+            update(users).where(users.c.id == bindparam("uid")).values(level=bindparam("new_level")),
+            changes,
+        )
+    db.commit()
+    return len(rows)
+
+
+def encode_cursor(created_at: datetime, kind: str, item_id: int) -> str:
+    return f"{created_at.isoformat()}|{kind}|{item_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, int]:
+    try:
+        created_at, kind, item_id = cursor.split("|")
+        if kind not in KINDS:
+            raise ValueError(kind)
+        return datetime.fromisoformat(created_at), kind, int(item_id)
+    except ValueError:
+        raise ValueError("잘못된 커서입니다")
+
+
+def _older_than(model, kind: str, cursor: Tuple[datetime, str, int]):
+    """(created_at, kind, id) 내림차순에서 커서보다 뒤에 오는 행의 조건"""
+    created_at, cursor_kind, item_id = cursor
+    if kind < cursor_kind:
+        return model.created_at <= created_at
+    if kind > cursor_kind:
+        return model.created_at < created_at
+    # (user_id, created_at) 인덱스에는 id(rowid)가 붙어 있어 정렬 없이 이어서 읽음
+    return tuple_(model.created_at, model.id) < (created_at, item_id)
+
+
+def feed(db, user_id: int, kind: Optional[str] = None, cursor: Optional[str] = None,
+         limit: int = FEED_LIMIT) -> dict:
+    """사용자가 쓴 주장과 반박을 최신순으로 (키셋 페이지네이션). {"items", "next_cursor"}"""
+    if kind is not None and kind not in KINDS:
+        raise ValueError("kind는 claim 또는 rebuttal이어야 합니다")
+    position = decode_cursor(cursor) if cursor else None
+    items = []
+    if kind in (None, "claim"):
+        query = db.query(
+            models.Claim.id, models.Claim.topic_id, models.Claim.title, models.Claim.content,
+            models.Claim.type, models.Claim.votes, models.Claim.created_at,
+        ).filter(models.Claim.user_id == user_id)
+        if position:
+            query = query.filter(_older_than(models.Claim, "claim", position))
+        for row in query.order_by(models.Claim.created_at.desc(), models.Claim.id.desc()).limit(limit + 1):
+            items.append({
+                "kind": "claim", "id": row.id, "topic_id": row.topic_id, "claim_id": row.id, "parent_id": None,
+                "title": row.title, "excerpt": _excerpt(row.content), "type": row.type, "votes": row.votes or 0,
+                "created_at": row.created_at,
+            })
+    if kind in (None, "rebuttal"):
+        query = db.query(
+            models.Rebuttal.id, models.Claim.topic_id, models.Rebuttal.claim_id, models.Rebuttal.parent_id,
+            models.Rebuttal.title, models.Rebuttal.content, models.Rebuttal.type, models.Rebuttal.votes,
+            models.Rebuttal.created_at,
+        ).join(models.Claim, models.Claim.id == models.Rebuttal.claim_id).filter(models.Rebuttal.user_id == user_id)
+        if position:
+            query = query.filter(_older_than(models.Rebuttal, "rebuttal", position))
+        for row in query.order_by(models.Rebuttal.created_at.desc(), models.Rebuttal.id.desc()).limit(limit + 1):
+            items.append({
+                "kind": "rebuttal", "id": row.id, "topic_id": row.topic_id, "claim_id": row.claim_id,
+                "parent_id": row.parent_id, "title": row.title, "excerpt": _excerpt(row.content), "type": row.type,
+                "votes": row.votes or 0, "created_at": row.created_at,
+            })
+    # 두 목록을 같은 순서로 합쳐 앞의 limit개만 사용
+    items.sort(key=lambda item: (item["created_at"], item["kind"], item["id"]), reverse=True)
+    page = items[:limit]
+    next_cursor = None
+    if len(items) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last["created_at"], last["kind"], last["id"])
+    return {"items": page, "next_cursor": next_cursor}
+
+
+def _excerpt(content: Optional[str]) -> str:
+    content = content or ""
+    return content if len(content) <= EXCERPT_CHARS else content[:EXCERPT_CHARS].rstrip() + "…"
@@ -0,0 +1,120 @@
+"""투표 기록 압축 (단계별 보관)
+
+투표는 두 단계로 보관합니다.
+
+- `votes`: 최근 투표. 행마다 rowid, 문자열 vote_type, 전체 시각과 인덱스 네 개를 가집니다.
+- `vote_ledger`: VOTE_COMPACT_AFTER_DAYS일보다 오래된 투표. (종류, 대상, 사용자) 키의 WITHOUT ROWID
+  테이블에 정수로만 남기고 시각은 시간 단위로 줄입니다. 시간/일 단위 추이는 이미 `activity_rollups`에
+  있고(app/rollups.py), 트렌드 점수는 최근 TREND_WINDOW만 보므로 잃는 정보가 없습니다.
+
+`compact`가 오래된 votes 행을 id 순서로 VOTE_COMPACT_BATCH개씩 옮기고 배치마다 커밋합니다.
+VOTE_COMPACT_INTERVAL_SECONDS마다 주기 작업으로 돌고, `python manage.py compact-votes`로도 실행합니다.
+같은 사용자가 같은 대상에 남긴 중복 행은 마지막 투표 하나로 합쳐집니다.
+
+투표 조회(`find`, vote_store.viewer_votes)와 집계(party_votes, user_stats, rollups.backfill,
+debate_export)는 두 테이블을 함께 읽습니다.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from app import models
+from app.database import SessionLocal, begin_immediate
+from app.scheduler import periodic
+
+COMPACT_AFTER_DAYS = float(os.getenv("VOTE_COMPACT_AFTER_DAYS", "30"))
+COMPACT_BATCH = int(os.getenv("VOTE_COMPACT_BATCH", "5000"))
+COMPACT_INTERVAL_SECONDS = float(os.getenv("VOTE_COMPACT_INTERVAL_SECONDS", "3600"))
+
+Ledger = models.VoteLedger
+# 장부 행의 vote_type (SQL 식)
+ledger_vote_type = case((Ledger.value > 0, "like"), else_="dislike")
+
+
+def hour_of(when: Optional[datetime]) -> Optional[int]:
+    if when is None:
+        return None
+    return int((when - Ledger.EPOCH).total_seconds() // 3600)
+
+
+def find(db, user_id: int, claim_id: Optional[int] = None, rebuttal_id: Optional[int] = None):
+    """사용자의 대상 투표 (Vote 또는 VoteLedger, 없으면 None)"""
+    if claim_id is not None:
+        vote = db.query(models.Vote).filter(
+            models.Vote.user_id == user_id, models.Vote.claim_id == claim_id
+        ).first()
+        kind, target_id = Ledger.CLAIM, claim_id
+    else:
+        vote = db.query(models.Vote).filter(
+            models.Vote.user_id == user_id, models.Vote.rebuttal_id == rebuttal_id
+        ).first()
+        kind, target_id = Ledger.REBUTTAL, rebuttal_id
+    if vote is not None:
+        return vote
+    return db.get(Ledger, (kind, target_id, user_id))
+
+
+def compact(db, before: Optional[datetime] = None, batch: int = COMPACT_BATCH, limit: int = 0) -> int:
+    """before(기본: 지금 - VOTE_COMPACT_AFTER_DAYS일)보다 오래된 투표를 장부로 옮기고 옮긴 행 수를 반환합니다.
+
+    limit개(0이면 전부)까지 처리합니다. votes를 id 순서로 이어 읽으므로 created_at 인덱스가 필요 없습니다.
+    """
+    if before is None:
+        before = datetime.utcnow() - timedelta(days=COMPACT_AFTER_DAYS)
+    vote = models.Vote
+    stmt = insert(Ledger.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["kind", "target_id", "user_id"],
+        set_={"value": stmt.excluded.value, "hour": stmt.excluded.hour},
+    )
+    done, last_id = 0, 0
+    while not limit or done < limit:
+        size = min(batch, limit - done) if limit else batch
+        # 읽은 투표가 옮겨지기 전에 투표 요청이 바꾸거나 지우지 못하도록 배치마다 쓰기 잠금을 먼저 잡음
+        begin_immediate(db)
+        rows = db.execute(
+            select(vote.id, vote.user_id, vote.claim_id, vote.rebuttal_id, vote.vote_type, vote.created_at)
+            .where(vote.id > last_id, vote.created_at < before)
+            .order_by(vote.id).limit(size)
+        ).all()
+        if not rows:
+            db.rollback()
+            break
+        ledger_rows = [
+            {
+                "kind": Ledger.CLAIM if claim_id is not None else Ledger.REBUTTAL,
+                "target_id": claim_id if claim_id is not None else rebuttal_id,
+                "user_id": user_id,
+                "value": 1 if vote_type == "like" else -1,
+                "hour": hour_of(created_at),
+            }
+            for _, user_id, claim_id, rebuttal_id, vote_type, created_at in rows
+            if claim_id is not None or rebuttal_id is not None
+        ]
+        if ledger_rows:
+            db.execute(stmt, ledger_rows)
+        db.execute(delete(vote).where(vote.id.in_([row[0] for row in rows])))
+        db.commit()
+        done += len(rows)
+        last_id = rows[-1][0]
+    return done
+
+
+def counts(db) -> dict:
+    """단계별 행 수"""
+    return {
+        "votes": db.query(func.count(models.Vote.id)).scalar(),
+        "ledger": db.query(func.count()).select_from(Ledger).scalar(),
+    }
+
+
+@periodic("vote-compaction", COMPACT_INTERVAL_SECONDS, single=True)
+def compact_votes():
+    db = SessionLocal()
+    try:
+        compact(db, limit=COMPACT_BATCH * 20)
+    finally:
+        db.close()
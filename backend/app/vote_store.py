@@ -0,0 +1,46 @@
+"""사용자 투표 조회 도우미
+
+화면 하나에 보이는 여러 주장/반박에 대한 현재 사용자의 투표를 대상마다 따로 조회하지 않고
+한 번의 쿼리로 가져옵니다. 오래되어 `vote_ledger`로 옮긴 투표(app/vote_log.py)도 같은 쿼리에서
+장부의 기본 키로 찾습니다.
+"""
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import literal, select, union_all
+
+from app import models
+from app.vote_log import ledger_vote_type
+
+
+def viewer_votes(
+    db, user_id: int, claim_ids: Iterable[int] = (), rebuttal_ids: Iterable[int] = ()
+) -> Tuple[Dict[int, str], Dict[int, str]]:
+    """({claim_id: vote_type}, {rebuttal_id: vote_type}) 를 반환"""
+    claim_ids, rebuttal_ids = list(claim_ids), list(rebuttal_ids)
+    claim_votes: Dict[int, str] = {}
+    rebuttal_votes: Dict[int, str] = {}
+    if user_id is None or not (claim_ids or rebuttal_ids):
+        return claim_votes, rebuttal_votes
+
+    # 종류별로 (user_id, 대상) 인덱스/기본 키를 타는 SELECT를 UNION ALL로 묶어 한 번에 실행
+    vote, ledger = models.Vote, models.VoteLedger
+    arms = []
+    for kind, column, ids in ((ledger.CLAIM, vote.claim_id, claim_ids), (ledger.REBUTTAL, vote.rebuttal_id, rebuttal_ids)):
+        if not ids:
+            continue
+        arms.append(
+            select(literal(kind), column, vote.vote_type, literal(True))
+            .where(vote.user_id == user_id, column.in_(ids))
+        )
+        arms.append(
+            select(ledger.kind, ledger.target_id, ledger_vote_type, literal(False))
+            .where(ledger.kind == kind, ledger.target_id.in_(ids), ledger.user_id == user_id)
+        )
+    for kind, target_id, vote_type, recent in db.execute(union_all(*arms)):
+        votes = claim_votes if kind == ledger.CLAIM else rebuttal_votes
+        # 같은 대상이 두 곳에 있으면 최근 투표가 우선
+        if recent:
+            votes[target_id] = vote_type
+        else:
+            votes.setdefault(target_id, vote_type)
+    return claim_votes, rebuttal_votes
@@ -0,0 +1,120 @@
+"""오래된 주제 보관(압축 스냅샷) 벤치마크
+
+시드 데이터를 만든 뒤 `pledge` 주제를 모두 보관하고 다음을 측정합니다.
+
+- 보관 전후 DB 파일 크기 (VACUUM 후)와 스냅샷 압축률
+- 보관하지 않은 주제의 주장 목록 조회 시간 (p50/p99), 보관 전후 비교
+- 보관된 주제의 주장 목록 조회 시간: 압축을 처음 푸는 경우(cold)와 캐시된 경우(warm)
+
+    cd backend
+    python -m benchmarks.archival --topics 200 --claims-per-topic 20
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+from benchmarks import seed
+
+
+def _pct(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _vacuumed_size(path: str) -> int:
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def _timed(fn, topic_ids, rounds: int):
+    samples = []
+    for _ in range(rounds):
+        for topic_id in topic_ids:
+            started = time.perf_counter()
+            fn(topic_id)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="주제 보관 벤치마크")
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--out", default=None)
+    seed.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="debate-archive-"), "archive.db")
+    started = time.perf_counter()
+    seed.create_database(path, seed.config_from_args(args))
+    seed_seconds = time.perf_counter() - started
+
+    from app import archive, models
+    from app.database import SessionLocal
+    from app.routers.claims import get_claims_by_topic
+
+    db = SessionLocal()
+    try:
+        pledge_ids = [t for (t,) in db.query(models.Topic.id).filter(models.Topic.topic_type == "pledge")]
+        active_ids = [t for (t,) in db.query(models.Topic.id).filter(models.Topic.topic_type != "pledge")]
+
+        def read(topic_id):
+            return get_claims_by_topic(topic_id, sort_by="best", side=None, skip=0, limit=20,
+                                       include_parties=False, db=db, current_user=None)
+
+        size_before = _vacuumed_size(path)
+        hot_before = _timed(read, active_ids, args.rounds)
+
+        started = time.perf_counter()
+        results = archive.archive_cold_topics(db, inactive_days=0, topic_types=["pledge"])
+        archive_seconds = time.perf_counter() - started
+
+        size_after = _vacuumed_size(path)
+        hot_after = _timed(read, active_ids, args.rounds)
+
+        cold = []
+        for topic_id in pledge_ids:
+            archive._cache.clear()
+            started = time.perf_counter()
+            read(topic_id)
+            cold.append(time.perf_counter() - started)
+        archive._cache.clear()
+        warm = _timed(read, pledge_ids, args.rounds)
+    finally:
+        db.close()
+
+    raw = sum(r["raw_bytes"] for r in results)
+    compressed = sum(r["compressed_bytes"] for r in results)
+    report = {
+        "topics": len(pledge_ids) + len(active_ids),
+        "archived_topics": len(results),
+        "archived_claims": sum(r["claims"] for r in results),
+        "archived_rebuttals": sum(r["rebuttals"] for r in results),
+        "seed_seconds": round(seed_seconds, 2),
+        "archive_seconds": round(archive_seconds, 3),
+        "db_bytes_before": size_before,
+        "db_bytes_after": size_after,
+        "snapshot_raw_bytes": raw,
+        "snapshot_compressed_bytes": compressed,
+        "compression_ratio": round(raw / compressed, 2) if compressed else None,
+        "hot_read_p50_ms_before": round(_pct(hot_before, 50) * 1000, 3),
+        "hot_read_p99_ms_before": round(_pct(hot_before, 99) * 1000, 3),
+        "hot_read_p50_ms_after": round(_pct(hot_after, 50) * 1000, 3),
+        "hot_read_p99_ms_after": round(_pct(hot_after, 99) * 1000, 3),
+        "archived_read_cold_p50_ms": round(_pct(cold, 50) * 1000, 3) if cold else None,
+        "archived_read_warm_p50_ms": round(_pct(warm, 50) * 1000, 3) if warm else None,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""반박 트리 지표 벤치마크 (배열 그래프 vs ORM 순회)
+
+반박이 --nodes개(기본 10만) 달린 주장 하나를 만들고 같은 지표를 두 방식으로 계산합니다.
+
+- orm: 주장의 `Rebuttal` ORM 객체를 모두 읽은 뒤 parent_id를 따라 파이썬 dict로 순회
+- graph: 네 컬럼만 읽어 `ClaimGraph`(app/argument_graph.py)를 만든 뒤 배열을 두 번 훑음
+
+각 방식의 읽기+계산 시간과 tracemalloc 최대/유지 메모리, 그래프의 증분 삽입/삭제 시간을
+측정하고, 증분으로 고친 그래프의 지표가 새로 읽은 그래프와 같은지 확인합니다.
+
+    cd backend
+    python -m benchmarks.argument_graph --nodes 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+SCALAR_METRICS = ("rebuttals", "direct_rebuttals", "unanswered", "unanswered_direct",
+                  "max_depth", "support", "opposition", "net_support")
+
+
+def build_database(path: str, nodes: int, seed: int) -> None:
+    """주장 하나에 nodes개의 반박 트리. 일부는 긴 사슬, 나머지는 앞선 반박에 무작위로 달림"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app.database import init_db
+
+    init_db()
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO users (id, username, password_hash, level) VALUES (1, 'bench', '!', 1)")
+    conn.execute("INSERT INTO topics (id, title, topic_type) VALUES (1, 'graph', 'topic')")
+    conn.execute("INSERT INTO claims (id, topic_id, user_id, title, content, type, votes) "
+                 "VALUES (1, 1, 1, 'claim', 'claim', 'pro', 0)")
+    rows = []
+    for rebuttal_id in range(1, nodes + 1):
+        roll = rng.random()
+        if rebuttal_id == 1 or roll < 0.05:
+            parent_id = None
+        elif roll < 0.35:
+            parent_id = rebuttal_id - 1  # 바로 앞 반박에 이어 달아 긴 사슬을 만듦
+        else:
+            parent_id = rng.randint(max(1, rebuttal_id - 5000), rebuttal_id - 1)
+        kind = "rebuttal" if parent_id is None or rng.random() < 0.5 else "counter"
+        rows.append((rebuttal_id, 1, parent_id, 1, "반박 제목", "반박 본문 " * 20, kind, rng.randint(-3, 20)))
+    conn.executemany(
+        "INSERT INTO rebuttals (id, claim_id, parent_id, user_id, title, content, type, votes) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def orm_metrics(db, claim_id: int) -> dict:
+    """지금까지의 방식: ORM 객체를 모두 읽고 parent_id를 따라 순회"""
+    from app import models
+
+    rebuttals = db.query(models.Rebuttal).filter(models.Rebuttal.claim_id == claim_id).all()
+    by_id = {r.id: r for r in rebuttals}
+    children = {}
+    for r in rebuttals:
+        parent = r.parent_id if r.parent_id in by_id else None
+        children.setdefault(parent, []).append(r)
+
+    depth = {}
+    support = opposition = 0
+    stack = [(r, 1) for r in children.get(None, [])]
+    while stack:
+        r, d = stack.pop()
+        depth[r.id] = d
+        weight = 1 + max(r.votes or 0, 0)
+        if d % 2:
+            opposition += weight
+        else:
+            support += weight
+        stack.extend((child, d + 1) for child in children.get(r.id, []))
+    roots = children.get(None, [])
+    return {
+        "rebuttals": len(rebuttals),
+        "direct_rebuttals": len(roots),
+        "unanswered": sum(1 for r in rebuttals if r.id not in children),
+        "unanswered_direct": sum(1 for r in roots if r.id not in children),
+        "max_depth": max(depth.values(), default=0),
+        "support": support,
+        "opposition": opposition,
+        "net_support": support - opposition,
+    }
+
+
+def graph_metrics(db, claim_id: int):
+    from app.argument_graph import ClaimGraph, load_rows
+
+    graph = ClaimGraph(load_rows(db, claim_id))
+    return graph, graph.metrics()
+
+
+def _measure(fn, rounds: int):
+    """(중앙값 시간, tracemalloc 최대 메모리, 마지막 결과가 유지하는 메모리)"""
+    times = []
+    for _ in range(rounds):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(times), peak, retained
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="반박 트리 지표 벤치마크")
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--updates", type=int, default=1000, help="증분 삽입/삭제 횟수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="debate-graph-"), "graph.db")
+    started = time.perf_counter()
+    build_database(path, args.nodes, args.seed)
+    build_seconds = time.perf_counter() - started
+
+    from app.argument_graph import ClaimGraph, load_rows
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        def run_orm():
+            db.expunge_all()
+            return orm_metrics(db, 1)
+
+        orm_seconds, orm_peak, orm_retained = _measure(run_orm, args.rounds)
+        graph_seconds, graph_peak, graph_retained = _measure(lambda: graph_metrics(db, 1), args.rounds)
+
+        graph, metrics = graph_metrics(db, 1)
+        expected = run_orm()
+        matches = all(metrics[key] == expected[key] for key in SCALAR_METRICS)
+
+        graph._metrics = None
+        started = time.perf_counter()
+        graph.metrics()
+        compute_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        graph.metrics()
+        cached_seconds = time.perf_counter() - started
+
+        # 증분: 끝에 새 반박 삽입, 무작위 반박 삭제, 투표 수 변경. 같은 변경을 행 목록에도 반영해
+        # 마지막에 새로 만든 그래프와 비교
+        rows = {row[0]: list(row) for row in load_rows(db, 1)}
+        rng = random.Random(args.seed)
+        added = [(args.nodes + 1 + i, rng.randint(1, args.nodes + i)) for i in range(args.updates)]
+        started = time.perf_counter()
+        for rebuttal_id, parent_id in added:
+            graph.add(rebuttal_id, parent_id, 0, "counter")
+        add_seconds = time.perf_counter() - started
+        for rebuttal_id, parent_id in added:
+            rows[rebuttal_id] = [rebuttal_id, parent_id, 0, "counter"]
+
+        removed = rng.sample(sorted(rows), args.updates)
+        started = time.perf_counter()
+        for rebuttal_id in removed:
+            graph.remove(rebuttal_id)
+        remove_seconds = time.perf_counter() - started
+        for rebuttal_id in removed:
+            del rows[rebuttal_id]
+
+        voted = [(rebuttal_id, rng.randint(-3, 20)) for rebuttal_id in rng.sample(sorted(rows), args.updates)]
+        started = time.perf_counter()
+        for rebuttal_id, votes in voted:
+            graph.set_votes(rebuttal_id, votes)
+        vote_seconds = time.perf_counter() - started
+        for rebuttal_id, votes in voted:
+            rows[rebuttal_id][2] = votes
+
+        incremental_matches = ClaimGraph(rows.values()).metrics() == graph.metrics()
+    finally:
+        db.close()
+
+    report = {
+        "nodes": args.nodes,
+        "build_db_seconds": round(build_seconds, 2),
+        "max_depth": metrics["max_depth"],
+        "orm": {
+            "seconds": round(orm_seconds, 3),
+            "peak_mb": round(orm_peak / 2**20, 1),
+            "retained_mb": round(orm_retained / 2**20, 1),
+        },
+        "graph": {
+            "seconds": round(graph_seconds, 3),
+            "peak_mb": round(graph_peak / 2**20, 1),
+            "retained_mb": round(graph_retained / 2**20, 2),
+            "array_bytes": graph.nbytes,
+            "bytes_per_node": round(graph.nbytes / len(graph), 1),
+            "metrics_ms": round(compute_seconds * 1000, 1),
+            "metrics_cached_ms": round(cached_seconds * 1000, 4),
+            "add_us": round(add_seconds / args.updates * 1e6, 1),
+            "remove_us": round(remove_seconds / args.updates * 1e6, 1),
+            "set_votes_us": round(vote_seconds / args.updates * 1e6, 1),
+        },
+        "speedup": round(orm_seconds / graph_seconds, 1),
+        "metrics_match_orm": matches,
+        "incremental_matches_rebuild": incremental_matches,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""요청당 인증 비용 벤치마크 (토큰 폐기 확인)
+
+`revoked_tokens`에 --revoked개(기본 10만)의 폐기 항목을 넣고, `get_current_user`가 매 요청 하는 일을
+단계별로 잽니다.
+
+- decode: JWT 서명/만료 확인만
+- bloom: 메모리 블룸 필터로 폐기 여부 확인 (app/sessions.py)
+- db: 같은 확인을 매 요청 `revoked_tokens` 조회로 하는 경우
+- get_current_user: 전체 의존성 (decode + 폐기 확인 + 사용자 조회)과 폐기 확인을 뺀 경우
+
+폐기되지 않은 키로 블룸 필터의 실제 오탐률을, 폐기된 토큰이 거부되는지도 함께 확인합니다.
+
+    cd backend
+    python -m benchmarks.auth --revoked 100000 --iterations 20000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+def _per_call_us(fn, iterations: int, rounds: int = 5) -> float:
+    """호출 한 번당 시간(µs) 중앙값"""
+    results = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        results.append((time.perf_counter() - started) / iterations * 1e6)
+    return round(statistics.median(results), 2)
+
+
+def _run(coro):
+    """await 없이 끝나는 코루틴을 이벤트 루프 없이 실행"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="요청당 인증 비용 벤치마크")
+    parser.add_argument("--revoked", type=int, default=100_000, help="폐기 목록 항목 수")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--probes", type=int, default=200_000, help="오탐률 측정에 쓸 키 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="debate-auth-"), "auth.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("REVOCATION_CAPACITY", str(args.revoked))
+    from app.database import init_db
+
+    init_db()
+    rng = random.Random(args.seed)
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    revoked_keys = [f"fam:{uuid.UUID(int=rng.getrandbits(128)).hex}" for _ in range(args.revoked)]
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO users (id, username, password_hash, level) VALUES (1, 'bench', '!', 1)")
+    conn.executemany(
+        "INSERT INTO revoked_tokens (key, user_id, reason, expires_at, created_at) VALUES (?, 1, 'bench', ?, ?)",
+        [(key, expires_at, datetime.utcnow()) for key in revoked_keys],
+    )
+    conn.commit()
+    conn.close()
+
+    from fastapi.security import HTTPAuthorizationCredentials
+    from jose import jwt
+
+    from app import models, sessions
+    from app.database import SessionLocal
+    from app.dependencies import ALGORITHM, SECRET_KEY, get_current_user
+    from app.routers.auth import create_access_token
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        sessions.revocations.refresh(db)
+        refresh_seconds = time.perf_counter() - started
+        bloom = sessions.revocations.bloom
+
+        family = uuid.uuid4().hex
+        token = create_access_token("bench", family)
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        def db_check():
+            keys = sessions.token_keys(claims)
+            return db.query(models.RevokedToken.key).filter(
+                models.RevokedToken.key.in_(keys), models.RevokedToken.expires_at > datetime.utcnow()
+            ).first() is not None
+
+        def without_revocation():
+            # 이전 get_current_user와 같은 일: decode + 사용자 조회
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            return db.query(models.User).filter(models.User.username == payload["sub"]).first()
+
+        timings = {
+            "decode_us": _per_call_us(lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]), args.iterations),
+            "bloom_check_us": _per_call_us(lambda: sessions.revocations.is_revoked(db, claims), args.iterations),
+            "db_check_us": _per_call_us(db_check, args.iterations // 4),
+            "get_current_user_us": _per_call_us(lambda: _run(get_current_user(credentials, db)), args.iterations // 4),
+            "without_revocation_us": _per_call_us(without_revocation, args.iterations // 4),
+        }
+        db_checks = sessions.revocations.db_checks
+
+        probes = [f"jti:{uuid.UUID(int=rng.getrandbits(128)).hex}" for _ in range(args.probes)]
+        false_positives = sum(1 for key in probes if key in bloom)
+        missing = sum(1 for key in revoked_keys if key not in bloom)
+
+        # 실제로 폐기한 세션의 토큰은 거부되어야 함
+        sessions.revocations.revoke(db, [f"fam:{family}"], user_id=1, reason="bench")
+        rejected = _run(get_current_user(credentials, db)) is None
+    finally:
+        db.close()
+
+    report = {
+        "revoked": args.revoked,
+        "bloom": {
+            "bytes": bloom.nbytes,
+            "hashes": bloom.hashes,
+            "target_false_positive_rate": sessions.FALSE_POSITIVE_RATE,
+            "measured_false_positive_rate": round(false_positives / args.probes, 5),
+            "missing_revoked_keys": missing,
+            "rebuild_seconds": round(refresh_seconds, 3),
+        },
+        "per_request": timings,
+        "revocation_overhead_us": round(timings["get_current_user_us"] - timings["without_revocation_us"], 2),
+        "db_checks_during_benchmark": db_checks,
+        "revoked_token_rejected": rejected,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""온라인 백업 벤치마크
+
+지정한 크기(기본 2GB)의 DB를 만든 뒤, 쓰기 부하(투표 삽입 + 주장 votes 갱신, 요청마다 커밋)를
+계속 주면서 전체 스냅샷과 증분 스냅샷을 만들고 복원합니다. 측정 항목:
+
+- 스냅샷 처리량(MB/s), 단계 복사를 다시 시작한 횟수, 한 단계 복사로 전환했는지 여부
+- 증분 스냅샷의 페이지 수와 크기
+- 백업 중/평소 쓰기 지연 시간 (p50/p99/최대) - 백업이 쓰기를 막지 않는지 확인
+- 복원 시간과 복원한 DB의 행 수 확인
+
+    cd backend
+    python -m benchmarks.backup --size-mb 2048 --write-rate 200
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+def build_database(path: str, size_mb: int, seed: int) -> int:
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app.database import init_db
+
+    init_db()
+    rng = random.Random(seed)
+    syllables = [chr(0xAC00 + rng.randrange(11172)) for _ in range(2000)]
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("INSERT INTO users (id, username, password_hash, level) VALUES (1, 'bench', '!', 1)")
+    conn.execute("INSERT INTO topics (id, title, topic_type) VALUES (1, 'backup', 'topic')")
+    conn.commit()
+    claim_id = 0
+    target = size_mb * 1024 * 1024
+    while os.path.getsize(path) + os.path.getsize(path + "-wal") < target:
+        rows = []
+        for _ in range(5000):
+            claim_id += 1
+            content = "".join(rng.choices(syllables, k=600))
+            rows.append((claim_id, 1, 1, f"claim {claim_id}", content, "pro", 0))
+        conn.executemany(
+            "INSERT INTO claims (id, topic_id, user_id, title, content, type, votes) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return claim_id
+
+
+class Writer(threading.Thread):
+    """요청 하나마다 커밋하는 쓰기 부하. 구간별 지연 시간을 기록"""
+
+    def __init__(self, path: str, claims: int, rate: float, seed: int):
+        super().__init__(daemon=True)
+        self.path, self.claims, self.rate = path, claims, rate
+        self.rng = random.Random(seed)
+        self.phase = "idle"
+        self.samples = {}
+        self.errors = 0
+        self.stop = threading.Event()
+
+    def run(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        interval = 1.0 / self.rate
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            claim_id = self.rng.randint(1, self.claims)
+            try:
+                conn.execute("INSERT INTO votes (user_id, claim_id, vote_type) VALUES (1, ?, 'like')", (claim_id,))
+                conn.execute("UPDATE claims SET votes = votes + 1 WHERE id = ?", (claim_id,))
+                conn.commit()
+            except sqlite3.OperationalError:
+                self.errors += 1
+                conn.rollback()
+            elapsed = time.perf_counter() - started
+            self.samples.setdefault(self.phase, []).append(elapsed)
+            time.sleep(max(0.0, interval - elapsed))
+        conn.close()
+
+
+def _latency(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="온라인 백업 벤치마크")
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--write-rate", type=float, default=200, help="초당 쓰기 요청 수")
+    parser.add_argument("--incremental-after", type=float, default=5.0, help="증분 스냅샷 전 쓰기 시간(초)")
+    parser.add_argument("--dir", default=None, help="DB와 백업을 만들 디렉터리")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    directory = args.dir or tempfile.mkdtemp(prefix="debate-backup-")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "live.db")
+    backup_dir = os.path.join(directory, "backups")
+    started = time.perf_counter()
+    claims = build_database(path, args.size_mb, args.seed)
+    build_seconds = time.perf_counter() - started
+    db_bytes = os.path.getsize(path)
+
+    from app import backup
+
+    writer = Writer(path, claims, args.write_rate, args.seed)
+    writer.start()
+    time.sleep(2)
+
+    writer.phase = "full"
+    full = backup.snapshot(backup_dir, source_path=path, full=True)
+    writer.phase = "idle"
+    time.sleep(args.incremental_after)
+    writer.phase = "incremental"
+    incremental = backup.snapshot(backup_dir, source_path=path)
+    writer.phase = "idle"
+    time.sleep(1)
+    writer.stop.set()
+    writer.join()
+
+    restored = os.path.join(directory, "restored.db")
+    result = backup.restore(restored, directory=backup_dir)
+    conn = sqlite3.connect(restored)
+    restored_votes = conn.execute("SELECT count(*) FROM votes").fetchone()[0]
+    conn.close()
+
+    mb = db_bytes / (1024 * 1024)
+    report = {
+        "db_mb": round(mb, 1),
+        "claims": claims,
+        "build_seconds": round(build_seconds, 1),
+        "write_rate": args.write_rate,
+        "full": {
+            "seconds": full["seconds"],
+            "copy_seconds": full["copy_seconds"],
+            "mb_per_second": round(mb / full["copy_seconds"], 1),
+            "restarts": full["copy_restarts"],
+            "single_step": full["single_step"],
+            "bytes": full["bytes"],
+        },
+        "incremental": {
+            "seconds": incremental["seconds"],
+            "pages": incremental["pages"],
+            "page_count": incremental["page_count"],
+            "bytes": incremental["bytes"],
+            "restarts": incremental["copy_restarts"],
+            "single_step": incremental["single_step"],
+        },
+        "restore_seconds": result["seconds"],
+        "restored_votes": restored_votes,
+        "write_errors": writer.errors,
+        "write_latency": {phase: _latency(samples) for phase, samples in writer.samples.items()},
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
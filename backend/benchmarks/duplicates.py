@@ -0,0 +1,140 @@
+"""유사 주장 탐지(MinHash/LSH) 벤치마크
+
+한 주제에 N개의 합성 주장을 색인하고, 그중 일부를 살짝 바꾼(띄어쓰기, 문장부호, 단어 하나
+삭제/교체) 근중복 주장으로 조회해서 다음을 측정합니다.
+
+- 서명 계산 시간, 색인 조회 시간 (p50/p99)
+- 같은 조회를 주제의 모든 주장과 실제 자카드 유사도로 비교했을 때의 시간
+- 심어 둔 근중복의 재현율과, 실제 유사도가 기준보다 많이 낮은 오탐 수
+- 주제 전체 군집화 시간
+
+DB 없이 app.similarity의 색인만 사용합니다. 시드 데이터의 20단어 어휘로는 모든 글이
+서로 비슷해지므로, 한글 음절로 만든 어휘에서 Zipf 분포로 단어를 뽑아 글을 만듭니다.
+
+    cd backend
+    python -m benchmarks.duplicates --claims 20000
+"""
+import argparse
+import json
+import random
+import time
+
+from app import similarity
+
+
+def _vocabulary(rng: random.Random, size: int):
+    syllables = [chr(0xAC00 + rng.randrange(11172)) for _ in range(400)]
+    words = ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))) for _ in range(size)]
+    weights = [1.0 / rank for rank in range(1, size + 1)]
+    return words, weights
+
+
+def _text(rng: random.Random, words, weights, length: int) -> str:
+    return " ".join(rng.choices(words, weights, k=length)) + "."
+
+
+def _mutate(rng: random.Random, text: str, vocabulary) -> str:
+    words = text.split(" ")
+    choice = rng.randrange(3)
+    if choice == 0 and len(words) > 3:
+        del words[rng.randrange(len(words))]
+    elif choice == 1:
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    # 띄어쓰기/문장부호 차이는 정규화로 사라져야 함
+    return "".join(w + rng.choice((" ", "  ", ", ", "")) for w in words) + "!"
+
+
+def _shingles(text: str) -> set:
+    norm = similarity.normalize(text)
+    n = similarity.NGRAM
+    return {norm} if len(norm) <= n else {norm[i:i + n] for i in range(len(norm) - n + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _pct(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="유사 주장 탐지 벤치마크")
+    parser.add_argument("--claims", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--words", type=int, default=40, help="주장 하나의 단어 수")
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--threshold", type=float, default=similarity.THRESHOLD)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    vocabulary, weights = _vocabulary(rng, args.vocabulary)
+    texts = [_text(rng, vocabulary, weights, args.words) for _ in range(args.claims)]
+
+    started = time.perf_counter()
+    signatures = [similarity.signature(t) for t in texts]
+    signature_ms = (time.perf_counter() - started) * 1000 / len(texts)
+
+    index = similarity.TopicIndex()
+    started = time.perf_counter()
+    for claim_id, sig in enumerate(signatures, 1):
+        index.add(claim_id, sig)
+    index_seconds = time.perf_counter() - started
+
+    shingles = [_shingles(t) for t in texts]
+    lookup, naive = [], []
+    found = eligible = false_positives = 0
+    for _ in range(args.queries):
+        original = rng.randrange(len(texts))
+        query = _mutate(rng, texts[original], vocabulary)
+        sig = similarity.signature(query)
+
+        started = time.perf_counter()
+        matches = index.query(sig, args.threshold)
+        lookup.append(time.perf_counter() - started)
+
+        query_shingles = _shingles(query)
+        started = time.perf_counter()
+        exact = {i + 1 for i, s in enumerate(shingles) if _jaccard(query_shingles, s) >= args.threshold}
+        naive.append(time.perf_counter() - started)
+
+        ids = {claim_id for claim_id, _ in matches}
+        # 바꾼 결과가 실제로도 기준 이상으로 비슷한 경우만 재현율에 포함
+        if original + 1 in exact:
+            eligible += 1
+            found += original + 1 in ids
+        false_positives += sum(
+            1 for claim_id in ids if _jaccard(query_shingles, shingles[claim_id - 1]) < args.threshold - 0.15
+        )
+
+    started = time.perf_counter()
+    clusters = index.clusters(args.threshold)
+    cluster_seconds = time.perf_counter() - started
+
+    report = {
+        "claims": args.claims,
+        "queries": args.queries,
+        "threshold": args.threshold,
+        "signature_ms": round(signature_ms, 4),
+        "index_build_seconds": round(index_seconds, 3),
+        "lookup_p50_ms": round(_pct(lookup, 50) * 1000, 4),
+        "lookup_p99_ms": round(_pct(lookup, 99) * 1000, 4),
+        "naive_scan_p50_ms": round(_pct(naive, 50) * 1000, 2),
+        "recall": round(found / eligible, 4) if eligible else None,
+        "recall_queries": eligible,
+        "false_positives": false_positives,
+        "clusters": len(clusters),
+        "cluster_seconds": round(cluster_seconds, 3),
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""응답 인코딩 벤치마크 (가장 큰 스레드의 전송 크기와 인코딩 CPU 시간)
+
+합성 데이터로 채운 DB에서 가장 큰 응답 세 가지를 API로 받아 인코딩 방식별로 비교합니다.
+
+- page: 주장이 가장 많은 주제의 토론 화면 (`limit=100&depth=5&replies=100`)
+- claims: 같은 주제의 주장 전체 목록
+- rebuttals: 반박이 가장 많은 주장의 반박 목록
+
+방식: stdlib(json.dumps, FastAPI 기본 JSONResponse와 같은 설정), orjson, msgpack과 각각에 작성자 표를
+적용한 경우. 각 방식마다 무압축/gzip/brotli의 바이트 수와 인코딩+압축 CPU 시간을 재고,
+마지막으로 같은 요청을 `Accept`/`Accept-Encoding` 조합별로 앱에 보내 실제 전송 크기와 지연 시간을 잽니다.
+
+    cd backend
+    python -m benchmarks.encoding --topics 3 --claims-per-topic 200 --rebuttals-per-claim 80
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks import seed as seed_module
+
+# (이름, Accept, Accept-Encoding, X-Author-Table)
+WIRE_VARIANTS = [
+    ("json", "application/json", "identity", ""),
+    ("json+gzip", "application/json", "gzip", ""),
+    ("json+br", "application/json", "br", ""),
+    ("json+authors+br", "application/json", "br", "1"),
+    ("msgpack", "application/msgpack", "identity", ""),
+    ("msgpack+br", "application/msgpack", "br", ""),
+    ("msgpack+authors+br", "application/msgpack", "br", "1"),
+]
+
+
+def _cpu_ms(fn, rounds: int, setup=None) -> float:
+    """CPU 시간 중앙값(ms). setup이 있으면 그 결과를 인자로 넘기고 setup 시간은 재지 않음"""
+    times = []
+    for _ in range(rounds):
+        arg = setup() if setup else None
+        started = time.process_time()
+        fn(arg) if setup else fn()
+        times.append(time.process_time() - started)
+    return round(statistics.median(times) * 1000, 2)
+
+
+def encoders() -> dict:
+    """이름 -> (본문을 바이트로 만드는 함수, 작성자 표 적용 여부)"""
+    from app import encoding
+
+    stdlib = lambda value: json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+    result = {
+        "stdlib": (stdlib, False),
+        "orjson": (encoding.orjson.dumps, False),
+        "orjson+authors": (encoding.orjson.dumps, True),
+    }
+    if encoding.msgpack is not None:
+        result["msgpack"] = (encoding.msgpack.packb, False)
+        result["msgpack+authors"] = (encoding.msgpack.packb, True)
+    return result
+
+
+def measure_payload(payload, rounds: int) -> dict:
+    from app import encoding
+
+    compressions = [None, "gzip"] + (["br"] if encoding.brotli is not None else [])
+    report = {}
+    for name, (dump, authors) in encoders().items():
+        if authors:
+            # 작성자 표는 본문을 바꾸므로 매번 복사본에 적용 (복사 시간은 재지 않음)
+            body = dump(encoding.dedupe_authors(copy.deepcopy(payload)))
+            encode_ms = _cpu_ms(
+                lambda value: dump(encoding.dedupe_authors(value)), rounds, setup=lambda: copy.deepcopy(payload)
+            )
+        else:
+            body = dump(payload)
+            encode_ms = _cpu_ms(lambda: dump(payload), rounds)
+        row = {}
+        for compression in compressions:
+            compressed, _ = encoding.compress(body, compression)
+            compress_ms = _cpu_ms(lambda: encoding.compress(body, compression), rounds) if compression else 0.0
+            row[compression or "none"] = {
+                "bytes": len(compressed),
+                "cpu_ms": round(encode_ms + compress_ms, 2),
+            }
+        report[name] = row
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="응답 인코딩 벤치마크")
+    seed_module.add_arguments(parser)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--out", default=None)
+    parser.set_defaults(topics=3, claims_per_topic=200, rebuttals_per_claim=80, votes=5000)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="debate-encoding-")
+    started = time.perf_counter()
+    data = seed_module.create_database(os.path.join(directory, "bench.db"), seed_module.config_from_args(args))
+    build_seconds = time.perf_counter() - started
+
+    import httpx
+    from sqlalchemy import func
+
+    from app import models
+    from app.database import SessionLocal
+    from main import app
+
+    db = SessionLocal()
+    try:
+        topic_id = db.query(models.Claim.topic_id).group_by(models.Claim.topic_id).order_by(
+            func.count(models.Claim.id).desc()
+        ).first()[0]
+        claim_id = db.query(models.Rebuttal.claim_id).group_by(models.Rebuttal.claim_id).order_by(
+            func.count(models.Rebuttal.id).desc()
+        ).first()[0]
+    finally:
+        db.close()
+    paths = {
+        "page": f"/api/topics/{topic_id}/page?limit=100&depth=5&replies=100",
+        "claims": f"/api/claims/topic/{topic_id}",
+        "rebuttals": f"/api/rebuttals/claim/{claim_id}",
+    }
+
+    async def fetch():
+        payloads, wire = {}, {}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for name, path in paths.items():
+                response = await client.get(path, headers={"Accept-Encoding": "identity"})
+                payloads[name] = response.json()
+                wire[name] = {}
+                for variant, accept, accept_encoding, authors in WIRE_VARIANTS:
+                    headers = {"Accept": accept, "Accept-Encoding": accept_encoding, "X-Author-Table": authors}
+                    latencies = []
+                    for _ in range(args.rounds):
+                        started = time.perf_counter()
+                        response = await client.get(path, headers=headers)
+                        latencies.append(time.perf_counter() - started)
+                    wire[name][variant] = {
+                        "bytes": int(response.headers["content-length"]),
+                        "content_type": response.headers["content-type"],
+                        "content_encoding": response.headers.get("content-encoding"),
+                        "latency_ms": round(statistics.median(latencies) * 1000, 1),
+                    }
+        return payloads, wire
+
+    payloads, wire = asyncio.run(fetch())
+    report = {
+        "seed": {
+            "topics": len(data.topic_ids),
+            "claims": len(data.claim_ids),
+            "rebuttals": len(data.rebuttal_ids),
+            "build_seconds": round(build_seconds, 1),
+        },
+        "payloads": {
+            name: {"path": paths[name], "encoders": measure_payload(payload, args.rounds)}
+            for name, payload in payloads.items()
+        },
+        "wire": wire,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
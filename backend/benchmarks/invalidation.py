@@ -0,0 +1,164 @@
+"""워커 간 캐시 무효화 수렴 테스트
+
+같은 SQLite DB에 uvicorn 워커 프로세스 여러 개를 띄우고, 쓰기 요청(투표, 주장 작성/삭제,
+주제 생성)을 워커들에 돌아가며 보낸 뒤 모든 워커의 인기순 주제 목록(메모리 랭킹)이 DB에서
+계산한 순서와 같아질 때까지 걸리는 시간을 측정합니다. 랭킹의 주기적 전체 갱신은 꺼 두므로
+워커들이 맞춰지는 것은 무효화 버스 덕분입니다.
+
+    cd backend
+    python -m benchmarks.invalidation --workers 4 --writes 400
+
+제한 시간 안에 수렴하지 않으면 종료 코드 1로 끝납니다.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks import seed
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def expected_order(path: str):
+    """DB 기준 인기순(주장 votes 합계 내림차순, 같으면 id 내림차순) 주제 id"""
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        "SELECT t.id FROM topics t LEFT JOIN claims c ON c.topic_id = t.id "
+        "GROUP BY t.id ORDER BY coalesce(sum(c.votes), 0) DESC, t.id DESC"
+    ).fetchall()
+    conn.close()
+    return [topic_id for (topic_id,) in rows]
+
+
+def start_workers(count: int, base_port: int, env: dict):
+    processes = []
+    for i in range(count):
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(base_port + i), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env,
+        ))
+    urls = [f"http://127.0.0.1:{base_port + i}" for i in range(count)]
+    deadline = time.time() + 30
+    for url in urls:
+        while True:
+            try:
+                if httpx.get(url + "/api/topics/?limit=1").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError(f"worker {url} did not start")
+            time.sleep(0.1)
+    return processes, urls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="워커 간 캐시 무효화 수렴 테스트")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=400)
+    parser.add_argument("--port", type=int, default=18100)
+    parser.add_argument("--poll-seconds", type=float, default=0.2, help="INVALIDATION_POLL_SECONDS")
+    parser.add_argument("--transport", default="sqlite", help="INVALIDATION_TRANSPORT")
+    parser.add_argument("--timeout", type=float, default=15.0)
+    parser.add_argument("--out", default=None)
+    seed.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="debate-bus-"), "bus.db")
+    data = seed.create_database(path, seed.config_from_args(args))
+    from app import bootstrap
+
+    bootstrap.seed_admin()
+
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{path}",
+        "AUTO_MIGRATE": "0",
+        # 주기적 전체 갱신 대신 버스로만 맞춰지는지 확인
+        "LEADERBOARD_REFRESH_SECONDS": "86400",
+        "INVALIDATION_POLL_SECONDS": str(args.poll_seconds),
+        "INVALIDATION_TRANSPORT": args.transport,
+    })
+    processes, urls = start_workers(args.workers, args.port, env)
+    rng = random.Random(args.seed)
+    try:
+        clients = [httpx.Client(base_url=url, timeout=30) for url in urls]
+        login = clients[0].post("/api/auth/login", json={"username": data.usernames[0], "password": seed.BENCH_PASSWORD})
+        user = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        login = clients[0].post("/api/auth/login", json={"username": "admin", "password": bootstrap.ADMIN_PASSWORD})
+        admin = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        created = []
+        started = time.perf_counter()
+        for i in range(args.writes):
+            client = clients[i % len(clients)]
+            roll = rng.random()
+            if roll < 0.75:
+                body = {"claim_id": rng.choice(data.claim_ids), "vote_type": rng.choice(["like", "like", "dislike"])}
+                client.post("/api/votes/", json=body, headers=user).raise_for_status()
+            elif roll < 0.9 or not created:
+                body = {"topic_id": rng.choice(data.topic_ids), "title": seed._sentence(rng, 5),
+                        "content": seed._text(rng, 2), "type": rng.choice(["pro", "con"])}
+                claim = client.post("/api/claims/", json=body, headers=user)
+                claim.raise_for_status()
+                created.append(claim.json()["id"])
+                # 새 주장에 투표해서 삭제 시 주제 점수가 바뀌게 함
+                client.post("/api/votes/", json={"claim_id": created[-1], "vote_type": "like"}, headers=user)
+            elif roll < 0.97:
+                client.delete(f"/api/claims/{created.pop(rng.randrange(len(created)))}", headers=user).raise_for_status()
+            else:
+                body = {"title": seed._sentence(rng, 4), "topic_type": "topic", "category": rng.choice(seed.CATEGORIES)}
+                topic = client.post("/api/topics/", json=body, headers=admin)
+                topic.raise_for_status()
+                data.topic_ids.append(topic.json()["id"])
+        write_seconds = time.perf_counter() - started
+
+        expected = expected_order(path)
+        converged_at = {}
+        started = time.perf_counter()
+        while len(converged_at) < len(clients) and time.perf_counter() - started < args.timeout:
+            for i, client in enumerate(clients):
+                if i in converged_at:
+                    continue
+                listing = [t["id"] for t in client.get("/api/topics/", params={"sort_by": "best"}).json()]
+                if listing == expected:
+                    converged_at[i] = time.perf_counter() - started
+            time.sleep(0.02)
+        statuses = [client.get("/api/admin/bus", headers=admin).json() for client in clients]
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    report = {
+        "workers": args.workers,
+        "writes": args.writes,
+        "transport": args.transport,
+        "poll_seconds": args.poll_seconds,
+        "write_seconds": round(write_seconds, 2),
+        "converged": len(converged_at) == len(urls),
+        "converged_workers": len(converged_at),
+        "convergence_max_ms": round(max(converged_at.values()) * 1000, 1) if converged_at else None,
+        "events_applied": [s["applied"] for s in statuses],
+        "versions": [s["version"] for s in statuses],
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if not report["converged"]:
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""실시간 채널 유휴 구독자 부하 테스트
+
+uvicorn 워커 하나를 띄우고 한 주제에 N개의 WebSocket 연결을 맺은 뒤,
+- 연결 전후 서버 프로세스의 RSS (구독자당 메모리)
+- 투표/주장 쓰기 후 모든 구독자가 프레임을 받기까지 걸린 시간 (fan-out 지연)
+을 측정합니다.
+
+    cd backend
+    python -m benchmarks.live_subscribers --connections 20000
+
+파일 디스크립터를 연결 수만큼 쓰므로 `ulimit -n`이 충분해야 합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import seed as seed_module
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+async def _wait_ready(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def run(args, env, data):
+    import httpx
+    import websockets
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--ws", "websockets-sansio", "--ws-ping-interval", "0"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        await _wait_ready(port)
+        topic_id = data.topic_ids[0]
+        claim_id = next(c for c, t in data.claim_topic.items() if t == topic_id)
+        base_rss = _rss_kb(server.pid)
+
+        url = f"ws://127.0.0.1:{port}/api/live/topics/{topic_id}"
+        connections = []
+        started = time.perf_counter()
+        for offset in range(0, args.connections, args.connect_batch):
+            batch = min(args.connect_batch, args.connections - offset)
+            connections.extend(await asyncio.gather(*(
+                websockets.connect(url, ping_interval=None, max_queue=None, open_timeout=120) for _ in range(batch)
+            )))
+        connect_seconds = time.perf_counter() - started
+        await asyncio.sleep(1.0)
+        subscribed_rss = _rss_kb(server.pid)
+
+        from app.routers.auth import create_access_token
+
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            stats = (await client.get("/api/live/stats")).json()
+            fanout = []
+            for i in range(args.rounds):
+                username = data.usernames[i % len(data.usernames)]
+                headers = {"Authorization": f"Bearer {create_access_token(username)}"}
+                started = time.perf_counter()
+                if i % 2 == 0:
+                    await client.post("/api/votes/", json={"claim_id": claim_id, "vote_type": "like"}, headers=headers)
+                else:
+                    await client.post("/api/claims/", headers=headers, json={
+                        "topic_id": topic_id, "title": "live", "content": "live bench", "type": "pro",
+                    })
+                # 모든 구독자가 다음 프레임(ping 제외)을 받을 때까지 대기
+                async def receive(ws):
+                    while True:
+                        frame = json.loads(await ws.recv())
+                        if frame.get("type") != "ping":
+                            return
+                await asyncio.gather(*(receive(ws) for ws in connections))
+                fanout.append(time.perf_counter() - started)
+
+        for offset in range(0, len(connections), args.connect_batch):
+            await asyncio.gather(*(ws.close() for ws in connections[offset:offset + args.connect_batch]))
+
+        fanout.sort()
+        return {
+            "connections": args.connections,
+            "server_subscribers": stats["subscribers"],
+            "connect_seconds": round(connect_seconds, 2),
+            "server_rss_base_mb": round(base_rss / 1024, 1),
+            "server_rss_subscribed_mb": round(subscribed_rss / 1024, 1),
+            "server_kb_per_subscriber": round((subscribed_rss - base_rss) / max(args.connections, 1), 2),
+            "fanout_rounds": args.rounds,
+            "fanout_p50_ms": round(fanout[len(fanout) // 2] * 1000, 1),
+            "fanout_max_ms": round(fanout[-1] * 1000, 1),
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="실시간 채널 유휴 구독자 부하 테스트")
+    parser.add_argument("--connections", type=int, default=20000)
+    parser.add_argument("--connect-batch", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    limit = _raise_fd_limit()
+    if args.connections + 100 > limit:
+        parser.error(f"--connections가 파일 디스크립터 한도({limit})를 넘습니다")
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="debate-live-"), "live.db")
+    data = seed_module.create_database(db_path, seed_module.SeedConfig(
+        users=50, topics=5, claims_per_topic=5, rebuttals_per_claim=5, votes=100,
+    ))
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", AUTO_MIGRATE="0", BACKGROUND_JOBS="0",
+               LIVE_QUEUE_SIZE=os.getenv("LIVE_QUEUE_SIZE", "64"))
+
+    report = asyncio.run(run(args, env, data))
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
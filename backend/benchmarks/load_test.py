@@ -0,0 +1,343 @@
+"""인프로세스 부하 테스트
+
+합성 데이터로 채운 SQLite DB에 대해 모든 라우터의 읽기/쓰기 요청을 섞어서
+ASGI 클라이언트(httpx.ASGITransport)로 재생하고, 엔드포인트별 처리량과
+p50/p95/p99 지연 시간을 JSON 파일로 저장합니다.
+
+    cd backend
+    python -m benchmarks.load_test --requests 5000 --concurrency 8 --out results/run.json
+
+같은 `--seed`와 옵션이면 같은 요청 순서가 재생되므로 실행 결과를 서로 비교할 수 있습니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from benchmarks import seed as seed_module
+
+# (가중치, 시나리오 이름) - 읽기 위주의 실제 트래픽 비율을 흉내냄
+DEFAULT_MIX = [
+    (15, "list_topics"),
+    (8, "get_topic"),
+    (5, "topic_page"),
+    (20, "list_claims"),
+    (6, "get_claim"),
+    (5, "claim_evidence"),
+    (15, "list_rebuttals"),
+    (3, "get_rebuttal"),
+    (3, "my_claim_vote"),
+    (2, "my_rebuttal_vote"),
+    (9, "vote"),
+    (2, "create_claim"),
+    (4, "create_rebuttal"),
+    (1, "delete_own"),
+    (0.3, "create_topic"),
+    (0.3, "login"),
+    (0.2, "register"),
+    (0.2, "ai_improve_text"),
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """nearest-rank 방식의 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Scenario:
+    """요청 하나를 (엔드포인트 라벨, 메서드, 경로, 옵션)으로 만들어내는 생성기 모음"""
+
+    def __init__(self, data: seed_module.SeedResult, rng: random.Random, tokens: Dict[str, str],
+                 admin_token: str, rebuttal_claims: Dict[int, int]):
+        self.data = data
+        self.rebuttal_claims = rebuttal_claims
+        self.rng = rng
+        self.tokens = tokens
+        self.admin_token = admin_token
+        self.usernames = list(tokens)
+        self.created: List[Tuple[str, int, str]] = []  # (kind, id, username)
+        self.registered = 0
+
+    def _user(self) -> Tuple[str, Dict[str, str]]:
+        username = self.rng.choice(self.usernames)
+        return username, {"Authorization": f"Bearer {self.tokens[username]}"}
+
+    def _maybe_auth(self) -> Dict[str, str]:
+        # 읽기 요청의 절반은 비로그인 사용자
+        return self._user()[1] if self.rng.random() < 0.5 else {}
+
+    def build(self, name: str):
+        rng, data = self.rng, self.data
+        if name == "list_topics":
+            params = {"sort_by": rng.choice(["best", "trend", "new"])}
+            if rng.random() < 0.5:
+                params["category"] = rng.choice(seed_module.CATEGORIES)
+            else:
+                region = rng.choice(list(seed_module.REGIONS))
+                params["region"] = region
+                params["topic_type"] = rng.choice(["region", "pledge"])
+                if rng.random() < 0.5:
+                    params["district"] = rng.choice(seed_module.REGIONS[region])
+            return "GET /api/topics/", "GET", "/api/topics/", {"params": params}
+        if name == "get_topic":
+            topic_id = rng.choice(data.topic_ids)
+            return "GET /api/topics/{topic_id}", "GET", f"/api/topics/{topic_id}", {}
+        if name == "topic_page":
+            topic_id = rng.choice(data.topic_ids)
+            params = {"sort_by": rng.choice(["best", "trend", "new"])}
+            return ("GET /api/topics/{topic_id}/page", "GET", f"/api/topics/{topic_id}/page",
+                    {"params": params, "headers": self._maybe_auth()})
+        if name == "list_claims":
+            topic_id = rng.choice(data.topic_ids)
+            params = {"sort_by": rng.choice(["best", "trend", "new"])}
+            return ("GET /api/claims/topic/{topic_id}", "GET", f"/api/claims/topic/{topic_id}",
+                    {"params": params, "headers": self._maybe_auth()})
+        if name == "get_claim":
+            claim_id = rng.choice(data.claim_ids)
+            return "GET /api/claims/{claim_id}", "GET", f"/api/claims/{claim_id}", {"headers": self._maybe_auth()}
+        if name == "claim_evidence":
+            claim_id = rng.choice(data.claim_ids)
+            return "GET /api/claims/{claim_id}/evidence", "GET", f"/api/claims/{claim_id}/evidence", {}
+        if name == "list_rebuttals":
+            claim_id = rng.choice(data.claim_ids)
+            return ("GET /api/rebuttals/claim/{claim_id}", "GET", f"/api/rebuttals/claim/{claim_id}",
+                    {"headers": self._maybe_auth()})
+        if name == "get_rebuttal":
+            rebuttal_id = rng.choice(data.rebuttal_ids)
+            return "GET /api/rebuttals/{rebuttal_id}", "GET", f"/api/rebuttals/{rebuttal_id}", {}
+        if name == "my_claim_vote":
+            claim_id = rng.choice(data.claim_ids)
+            return ("GET /api/votes/claim/{claim_id}", "GET", f"/api/votes/claim/{claim_id}",
+                    {"headers": self._user()[1]})
+        if name == "my_rebuttal_vote":
+            rebuttal_id = rng.choice(data.rebuttal_ids)
+            return ("GET /api/votes/rebuttal/{rebuttal_id}", "GET", f"/api/votes/rebuttal/{rebuttal_id}",
+                    {"headers": self._user()[1]})
+        if name == "vote":
+            body = {"vote_type": "like" if rng.random() < 0.65 else "dislike"}
+            if rng.random() < 0.4:
+                body["claim_id"] = rng.choice(data.claim_ids)
+            else:
+                body["rebuttal_id"] = rng.choice(data.rebuttal_ids)
+            return "POST /api/votes/", "POST", "/api/votes/", {"json": body, "headers": self._user()[1]}
+        if name == "create_claim":
+            username, headers = self._user()
+            body = {
+                "topic_id": rng.choice(data.topic_ids),
+                "title": seed_module._sentence(rng, 5),
+                "content": seed_module._text(rng, 3),
+                "type": rng.choice(["pro", "con"]),
+                "evidence": [{"source": "벤치마크", "publisher": "User", "text": seed_module._text(rng, 2)}]
+                if rng.random() < 0.3 else [],
+            }
+            return "POST /api/claims/", "POST", "/api/claims/", {"json": body, "headers": headers, "owner": username}
+        if name == "create_rebuttal":
+            username, headers = self._user()
+            parent_id = rng.choice(data.rebuttal_ids) if rng.random() < 0.5 else None
+            body = {
+                # 재반박은 부모 반박과 같은 주장에 달아야 트리가 일관됨
+                "claim_id": self.rebuttal_claims[parent_id] if parent_id else rng.choice(data.claim_ids),
+                "parent_id": parent_id,
+                "title": seed_module._sentence(rng, 4),
+                "content": seed_module._text(rng, 2),
+                "type": "counter" if parent_id else "rebuttal",
+            }
+            return ("POST /api/rebuttals/", "POST", "/api/rebuttals/",
+                    {"json": body, "headers": headers, "owner": username})
+        if name == "delete_own":
+            if not self.created:
+                return self.build("get_topic")
+            kind, target_id, username = self.created.pop(rng.randrange(len(self.created)))
+            headers = {"Authorization": f"Bearer {self.tokens[username]}"}
+            if kind == "claim":
+                return "DELETE /api/claims/{claim_id}", "DELETE", f"/api/claims/{target_id}", {"headers": headers}
+            return "DELETE /api/rebuttals/{rebuttal_id}", "DELETE", f"/api/rebuttals/{target_id}", {"headers": headers}
+        if name == "create_topic":
+            region = rng.choice(list(seed_module.REGIONS))
+            body = {
+                "title": seed_module._sentence(rng, 4),
+                "region": region,
+                "district": rng.choice(seed_module.REGIONS[region]),
+                "topic_type": "pledge",
+            }
+            return ("POST /api/topics/", "POST", "/api/topics/",
+                    {"json": body, "headers": {"Authorization": f"Bearer {self.admin_token}"}})
+        if name == "login":
+            body = {"username": rng.choice(self.usernames), "password": seed_module.BENCH_PASSWORD}
+            return "POST /api/auth/login", "POST", "/api/auth/login", {"json": body}
+        if name == "register":
+            self.registered += 1
+            body = {
+                "username": f"bench_new_{self.rng.getrandbits(32)}_{self.registered}",
+                "password": seed_module.BENCH_PASSWORD,
+                "political_party": rng.choice(seed_module.PARTIES),
+            }
+            return "POST /api/auth/register", "POST", "/api/auth/register", {"json": body}
+        if name == "ai_improve_text":
+            body = {"text": seed_module._text(rng, 3)}
+            return "POST /api/ai/improve-text", "POST", "/api/ai/improve-text", {"json": body}
+        raise ValueError(f"unknown scenario: {name}")
+
+
+async def run(app, scenario: Scenario, plan: List[str], concurrency: int):
+    import httpx
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    queue: asyncio.Queue = asyncio.Queue()
+    for name in plan:
+        queue.put_nowait(name)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while True:
+                try:
+                    name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                label, method, path, options = scenario.build(name)
+                owner = options.pop("owner", None)
+                started = time.perf_counter()
+                response = await client.request(method, path, **options)
+                elapsed = time.perf_counter() - started
+                samples[label].append(elapsed)
+                statuses[label][response.status_code] += 1
+                if owner and response.status_code == 200:
+                    kind = "claim" if path.startswith("/api/claims") else "rebuttal"
+                    scenario.created.append((kind, response.json()["id"], owner))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    return samples, statuses, wall
+
+
+def summarize(samples, statuses, wall: float) -> Dict:
+    endpoints = {}
+    total = 0
+    for label in sorted(samples):
+        values = sorted(samples[label])
+        total += len(values)
+        ok = sum(c for code, c in statuses[label].items() if code < 500)
+        endpoints[label] = {
+            "count": len(values),
+            "throughput_rps": round(len(values) / wall, 2) if wall else 0.0,
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+            "error_rate": round(1 - ok / len(values), 4),
+            "status_codes": {str(code): count for code, count in sorted(statuses[label].items())},
+        }
+    return {
+        "total_requests": total,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_plan(rng: random.Random, count: int, mix) -> List[str]:
+    weights = [w for w, _ in mix]
+    names = [n for _, n in mix]
+    return rng.choices(names, weights=weights, k=count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="인프로세스 부하 테스트")
+    parser.add_argument("--db", default=None, help="사용할 SQLite 파일 (기본: 임시 파일)")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=100, help="측정에서 제외할 워밍업 요청 수")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: benchmarks/results/)")
+    seed_module.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = seed_module.config_from_args(args)
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="debate-bench-"), "loadtest.db")
+
+    seed_started = time.perf_counter()
+    data = seed_module.create_database(db_path, config)
+    seed_seconds = time.perf_counter() - seed_started
+
+    # DATABASE_URL 설정 이후에 앱을 import 해야 벤치마크 DB를 사용함
+    from main import app
+    from app.database import SessionLocal
+    from app import models
+    from app.routers.auth import create_access_token
+
+    db = SessionLocal()
+    try:
+        rebuttal_claims = dict(db.query(models.Rebuttal.id, models.Rebuttal.claim_id).all())
+        admin = db.query(models.User).filter(models.User.username == "admin").first()
+        if admin is None:
+            db.add(models.User(username="admin", password_hash="!", political_party="None", level=999))
+            db.commit()
+    finally:
+        db.close()
+
+    rng = random.Random(config.seed)
+    tokens = {name: create_access_token(name) for name in data.usernames}
+    scenario = Scenario(data, rng, tokens, create_access_token("admin"), rebuttal_claims)
+
+    async def session():
+        if args.warmup:
+            await run(app, scenario, build_plan(rng, args.warmup, DEFAULT_MIX), args.concurrency)
+        return await run(app, scenario, build_plan(rng, args.requests, DEFAULT_MIX), args.concurrency)
+
+    samples, statuses, wall = asyncio.run(session())
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "db_path": db_path,
+            "seed_seconds": round(seed_seconds, 3),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed_config": vars(config),
+            "mix": {name: weight for weight, name in DEFAULT_MIX},
+        },
+        **summarize(samples, statuses, wall),
+    }
+
+    out = args.out or os.path.join(
+        os.path.dirname(__file__), "results", f"loadtest-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{report['total_requests']} requests in {report['wall_seconds']}s ({report['throughput_rps']} req/s)")
+    print(f"{'endpoint':45} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>6}")
+    for label, stats in report["endpoints"].items():
+        print(f"{label:45} {stats['count']:>6} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f} {stats['error_rate']:>6.2%}")
+    print(f"report written to {out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
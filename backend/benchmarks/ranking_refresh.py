@@ -0,0 +1,120 @@
+"""주장 hot 점수 일괄 갱신 작업의 오프라인 벤치마크
+
+N개(기본 100만)의 주장을 가진 SQLite DB를 만들고 `ranking.refresh_scores`의
+처리 시간(전체 / 주기 작업이 다루는 최근 활동 주장만)과, 인덱스를 사용하는 정렬 페이지 조회 시간을 측정합니다.
+
+    cd backend
+    python -m benchmarks.ranking_refresh --claims 1000000 --topics 2000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def build_database(path: str, claims: int, topics: int, seed: int) -> None:
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app.database import init_db
+
+    init_db()
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("INSERT INTO users (id, username, password_hash, level) VALUES (1, 'bench', '!', 1)")
+    conn.executemany(
+        "INSERT INTO topics (id, title, topic_type, created_at) VALUES (?, ?, 'topic', ?)",
+        ((i, f"topic {i}", now.isoformat(sep=" ")) for i in range(1, topics + 1)),
+    )
+
+    def rows():
+        for i in range(1, claims + 1):
+            created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+            activity = created + timedelta(minutes=rng.randint(0, 60 * 24 * 3))
+            yield (
+                i, rng.randint(1, topics), 1, "t", "c", rng.choice(("pro", "con")),
+                rng.randint(-20, 200), rng.randint(0, 50),
+                created.isoformat(sep=" "), min(activity, now).isoformat(sep=" "),
+            )
+
+    conn.executemany(
+        "INSERT INTO claims (id, topic_id, user_id, title, content, type, votes, rebuttal_count, "
+        "created_at, last_activity_at, hot_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+        rows(),
+    )
+    conn.commit()
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="주장 랭킹 갱신 벤치마크")
+    parser.add_argument("--claims", type=int, default=1_000_000)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="debate-ranking-"), "ranking.db")
+    if os.path.exists(path):
+        os.remove(path)
+
+    started = time.perf_counter()
+    build_database(path, args.claims, args.topics, args.seed)
+    build_seconds = time.perf_counter() - started
+
+    from app import models, ranking
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        updated = ranking.refresh_scores(db, batch_size=args.batch_size, horizon_hours=0)
+        refresh_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        active = ranking.refresh_scores(db, batch_size=args.batch_size)
+        active_seconds = time.perf_counter() - started
+
+        rng = random.Random(args.seed)
+        samples = []
+        for _ in range(200):
+            topic_id = rng.randint(1, args.topics)
+            started = time.perf_counter()
+            db.query(models.Claim.id).filter(
+                models.Claim.topic_id == topic_id, models.Claim.type == "pro"
+            ).order_by(models.Claim.hot_score.desc(), models.Claim.id.desc()).limit(args.page_size).all()
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+    finally:
+        db.close()
+
+    report = {
+        "claims": args.claims,
+        "topics": args.topics,
+        "batch_size": args.batch_size,
+        "build_seconds": round(build_seconds, 2),
+        "refresh_seconds": round(refresh_seconds, 2),
+        "refresh_rows_per_second": round(updated / refresh_seconds) if refresh_seconds else None,
+        "horizon_hours": ranking.HORIZON_HOURS,
+        "periodic_refresh_rows": active,
+        "periodic_refresh_seconds": round(active_seconds, 2),
+        "page_read_p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "page_read_p99_ms": round(samples[int(len(samples) * 0.99) - 1] * 1000, 3),
+        "db_bytes": os.path.getsize(path),
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""벤치마크용 합성 데이터 생성기
+
+기존 `app.models`를 그대로 사용하여 SQLite 데이터베이스에 사용자, 주제, 주장,
+깊은 반박 트리, 투표, 근거를 채웁니다. 같은 `--seed` 값이면 항상 같은 데이터가 만들어집니다.
+
+    python -m benchmarks.seed --db /tmp/bench.db --users 500 --topics 100
+"""
+import argparse
+import os
+import random
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+CATEGORIES = ["politics", "economy", "society", "culture", "it", "world"]
+REGIONS = {
+    "seoul": ["강동구", "강북구", "강남구", "관악구", "마포구", "송파구", "종로구"],
+    "gyeonggi": ["고양시", "수원시", "성남시", "부천시", "용인시", "파주시"],
+    "gangwon": ["춘천시", "원주시", "강릉시", "속초시"],
+}
+PARTIES = ["더불어민주당", "국민의힘", "조국혁신당", "개혁신당", "진보당", "None"]
+WORDS = [
+    "정책", "예산", "교통", "주거", "교육", "복지", "일자리", "환경", "안전", "청년",
+    "세금", "규제", "지원", "개발", "공약", "지역", "시민", "효과", "비용", "미래",
+]
+BENCH_PASSWORD = "bench-pass-1!"
+
+
+@dataclass
+class SeedConfig:
+    users: int = 200
+    topics: int = 60
+    claims_per_topic: int = 10
+    rebuttals_per_claim: int = 20
+    rebuttal_depth: int = 6
+    votes: int = 5000
+    evidence_ratio: float = 0.3
+    seed: int = 42
+
+
+@dataclass
+class SeedResult:
+    """생성된 데이터의 id 목록 (부하 테스트에서 대상 선택에 사용)"""
+    usernames: List[str] = field(default_factory=list)
+    topic_ids: List[int] = field(default_factory=list)
+    claim_ids: List[int] = field(default_factory=list)
+    rebuttal_ids: List[int] = field(default_factory=list)
+    claim_topic: Dict[int, int] = field(default_factory=dict)
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)) + "."
+
+
+def _text(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng, rng.randint(5, 12)) for _ in range(sentences))
+
+
+def seed(db, config: SeedConfig) -> SeedResult:
+    """세션 `db`에 합성 데이터를 채우고 생성된 id들을 반환합니다."""
+    from sqlalchemy import func
+    from app import models, ranking, party_votes, rollups, similarity, user_stats
+    from app.routers.auth import get_password_hash
+
+    rng = random.Random(config.seed)
+    now = datetime.utcnow()
+    result = SeedResult()
+
+    # bcrypt 해시는 비싸므로 한 번만 계산해서 모든 사용자에게 재사용
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    users = []
+    for i in range(config.users):
+        user = models.User(
+            username=f"bench_user_{i}",
+            password_hash=password_hash,
+            political_party=rng.choice(PARTIES),
+            created_at=now - timedelta(days=rng.randint(0, 365)),
+        )
+        users.append(user)
+    db.add_all(users)
+    db.flush()
+    result.usernames = [u.username for u in users]
+
+    topics = []
+    for i in range(config.topics):
+        topic_type = rng.choices(["topic", "region", "pledge"], weights=[3, 2, 1])[0]
+        if topic_type == "topic":
+            category, region, district = rng.choice(CATEGORIES), None, None
+        else:
+            category = None
+            region = rng.choice(list(REGIONS))
+            district = rng.choice(REGIONS[region] + [None])
+        topics.append(models.Topic(
+            title=f"{_sentence(rng, 4)} ({i})",
+            category=category,
+            region=region,
+            district=district,
+            topic_type=topic_type,
+            created_at=now - timedelta(hours=rng.randint(0, 24 * 30)),
+        ))
+    db.add_all(topics)
+    db.flush()
+    result.topic_ids = [t.id for t in topics]
+
+    claims = []
+    for topic in topics:
+        for _ in range(config.claims_per_topic):
+            claims.append(models.Claim(
+                topic_id=topic.id,
+                user_id=rng.choice(users).id,
+                title=_sentence(rng, 5),
+                content=_text(rng, rng.randint(2, 6)),
+                type=rng.choice(["pro", "con"]),
+                votes=0,
+                created_at=topic.created_at + timedelta(minutes=rng.randint(1, 60 * 24 * 7)),
+            ))
+    db.add_all(claims)
+    db.flush()
+    result.claim_ids = [c.id for c in claims]
+    result.claim_topic = {c.id: c.topic_id for c in claims}
+
+    # 반박 트리: 각 노드는 이미 생성된 노드 중 하나를 부모로 선택하되 깊이 제한을 지킴
+    rebuttals = []
+    # 부모 id를 flush 없이 참조할 수 있도록 id를 직접 할당
+    next_id = (db.query(func.max(models.Rebuttal.id)).scalar() or 0) + 1
+    for claim in claims:
+        nodes = []  # (rebuttal, depth)
+        for _ in range(config.rebuttals_per_claim):
+            candidates = [n for n in nodes if n[1] < config.rebuttal_depth]
+            parent, depth = (None, 1)
+            if candidates and rng.random() < 0.7:
+                # 최근 노드를 선호해서 깊은 체인이 만들어지도록 함
+                parent_node = candidates[-1] if rng.random() < 0.5 else rng.choice(candidates)
+                parent, depth = parent_node[0], parent_node[1] + 1
+            rebuttal = models.Rebuttal(
+                id=next_id,
+                claim_id=claim.id,
+                parent_id=parent.id if parent else None,
+                user_id=rng.choice(users).id,
+                title=_sentence(rng, 4),
+                content=_text(rng, rng.randint(1, 4)),
+                type="rebuttal" if depth % 2 else "counter",
+                votes=0,
+                created_at=claim.created_at + timedelta(minutes=rng.randint(1, 60 * 24)),
+            )
+            next_id += 1
+            nodes.append((rebuttal, depth))
+            rebuttals.append(rebuttal)
+            claim.rebuttal_count = (claim.rebuttal_count or 0) + 1
+            claim.last_activity_at = max(claim.last_activity_at or claim.created_at, rebuttal.created_at)
+    db.add_all(rebuttals)
+    db.flush()
+    result.rebuttal_ids = [r.id for r in rebuttals]
+
+    evidence = []
+    for target in claims + rebuttals:
+        if rng.random() >= config.evidence_ratio:
+            continue
+        is_claim = isinstance(target, models.Claim)
+        evidence.append(models.Evidence(
+            claim_id=target.id if is_claim else None,
+            rebuttal_id=None if is_claim else target.id,
+            source=_sentence(rng, 3),
+            publisher=rng.choice(["연합뉴스", "통계청", "KDI", "User"]),
+            text=_text(rng, rng.randint(3, 10)),
+            url=f"https://example.com/{rng.randint(1, 10 ** 6)}",
+            created_at=target.created_at,
+        ))
+    db.add_all(evidence)
+
+    # 투표: (사용자, 대상)당 하나만 존재하도록 하고 대상의 votes 합계를 맞춤
+    seen = set()
+    votes = []
+    targets = [("claim", c) for c in claims] + [("rebuttal", r) for r in rebuttals]
+    attempts = 0
+    while len(votes) < config.votes and attempts < config.votes * 3 and targets:
+        attempts += 1
+        kind, target = rng.choice(targets)
+        user = rng.choice(users)
+        key = (kind, target.id, user.id)
+        if key in seen:
+            continue
+        seen.add(key)
+        vote_type = "like" if rng.random() < 0.65 else "dislike"
+        target.votes += 1 if vote_type == "like" else -1
+        votes.append(models.Vote(
+            user_id=user.id,
+            claim_id=target.id if kind == "claim" else None,
+            rebuttal_id=target.id if kind == "rebuttal" else None,
+            vote_type=vote_type,
+            created_at=target.created_at + timedelta(minutes=rng.randint(1, 60 * 24 * 3)),
+        ))
+    db.add_all(votes)
+
+    # 비정규화된 랭킹 컬럼을 실제 데이터와 맞춤
+    for claim in claims:
+        ranking.rescore(claim, now)
+
+    db.commit()
+    party_votes.rebuild(db)
+    rollups.backfill(db)
+    similarity.rebuild(db)
+    user_stats.rebuild(db)
+    return result
+
+
+def create_database(path: str, config: SeedConfig) -> SeedResult:
+    """`path`에 새 SQLite DB를 만들고 합성 데이터를 채웁니다.
+
+    `DATABASE_URL`은 `app.database`가 처음 import되기 전에 설정되어야 하므로
+    이 함수는 app 모듈을 import하기 전에 호출해야 합니다.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app.database import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        return seed(db, config)
+    finally:
+        db.close()
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    defaults = SeedConfig()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+
+
+def config_from_args(args) -> SeedConfig:
+    return SeedConfig(**{name: getattr(args, name) for name in asdict(SeedConfig())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 데이터 생성")
+    parser.add_argument("--db", default="bench.db", help="생성할 SQLite 파일 경로")
+    add_arguments(parser)
+    args = parser.parse_args()
+    result = create_database(args.db, config_from_args(args))
+    print(
+        f"seeded {args.db}: {len(result.usernames)} users, {len(result.topic_ids)} topics, "
+        f"{len(result.claim_ids)} claims, {len(result.rebuttal_ids)} rebuttals"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""정적 스냅샷 벤치마크 (비로그인 인기 주제 조회)
+
+합성 데이터로 채운 DB에서 인기 주제 스냅샷을 만든 뒤, 비로그인 사용자의 기본 주장 목록과
+토론 화면 요청을 ASGI 클라이언트로 보내 두 경우를 비교합니다.
+
+- snapshot: `app/snapshots.py`의 스냅샷 파일로 응답
+- db: 스냅샷을 끈 상태(지금까지의 방식)로 라우터가 DB에서 조회
+
+요청당 SQL 쿼리 수, 지연 시간(p50/p99), 동시 요청 처리량과 함께 전체 발행 시간,
+주제 하나가 바뀐 뒤 다시 발행하는 시간(바뀐 주제만 다시 만드는지), 파일 크기를 측정합니다.
+
+    cd backend
+    python -m benchmarks.snapshots --topics 60 --requests 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from benchmarks import seed as seed_module
+
+
+def _latency(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+    }
+
+
+async def _run(client, paths, requests: int, concurrency: int, queries: list) -> dict:
+    samples = []
+    before = queries[0]
+    next_index = iter(range(requests))
+
+    async def worker():
+        for i in next_index:
+            started = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            samples.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.status_code
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "queries_per_request": round((queries[0] - before) / requests, 2),
+        **_latency(samples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="정적 스냅샷 벤치마크")
+    seed_module.add_arguments(parser)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--hot", type=int, default=30, help="스냅샷을 만들 인기 주제 수")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="debate-snapshots-")
+    os.environ["SNAPSHOT_DIR"] = os.path.join(directory, "snapshots")
+    os.environ["SNAPSHOT_HOT_TOPICS"] = str(args.hot)
+    data = seed_module.create_database(os.path.join(directory, "bench.db"), seed_module.config_from_args(args))
+
+    import httpx
+    from sqlalchemy import event
+
+    from app import models, snapshots
+    from app.database import SessionLocal, engine
+    from app.leaderboards import leaderboard
+    from main import app
+
+    queries = [0]
+
+    def count(*_):
+        queries[0] += 1
+
+    db = SessionLocal()
+    try:
+        leaderboard.refresh(db)
+        started = time.perf_counter()
+        snapshots.publisher.publish(db, force=True)
+        publish_seconds = time.perf_counter() - started
+
+        # 주제 하나의 주장 점수가 바뀐 경우: 디바운스를 건너뛰고 바로 발행
+        hot = [int(key.split("/")[1]) for key in snapshots.publisher.entries if key.startswith("claims/")]
+        claim = db.query(models.Claim).filter(models.Claim.topic_id == hot[0]).first()
+        claim.votes += 5
+        db.commit()
+        rendered = snapshots.publisher.rendered
+        with snapshots.publisher._lock:
+            snapshots.publisher._dirty[hot[0]] = (0.0, 0.0)
+        started = time.perf_counter()
+        snapshots.publisher.publish(db)
+        republish_seconds = time.perf_counter() - started
+        republished = snapshots.publisher.rendered - rendered
+    finally:
+        db.close()
+
+    sizes = [entry["bytes"] for entry in snapshots.publisher.entries.values()]
+    paths = []
+    for topic_id in hot:
+        paths.append(f"/api/claims/topic/{topic_id}")
+        paths.append(f"/api/topics/{topic_id}/page")
+
+    async def measure():
+        event.listen(engine, "before_cursor_execute", count)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for path in paths:  # 워밍업
+                await client.get(path)
+            with_snapshots = await _run(client, paths, args.requests, args.concurrency, queries)
+            directory = snapshots.store.directory
+            snapshots.store.directory = ""  # 스냅샷을 끄면 라우터가 DB에서 조회
+            without = await _run(client, paths, args.requests, args.concurrency, queries)
+            snapshots.store.directory = directory
+        event.remove(engine, "before_cursor_execute", count)
+        return with_snapshots, without
+
+    with_snapshots, without = asyncio.run(measure())
+    report = {
+        "topics": len(data.topic_ids),
+        "claims": len(data.claim_ids),
+        "rebuttals": len(data.rebuttal_ids),
+        "hot_topics": len(hot),
+        "files": len(sizes),
+        "total_kb": round(sum(sizes) / 1024, 1),
+        "publish_all_seconds": round(publish_seconds, 3),
+        "republish_one_topic_seconds": round(republish_seconds, 3),
+        "republish_files_written": republished,
+        "snapshot": with_snapshots,
+        "db": without,
+        "speedup": round(with_snapshots["requests_per_second"] / without["requests_per_second"], 1),
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
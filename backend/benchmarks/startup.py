@@ -0,0 +1,85 @@
+"""워커 기동 시간 벤치마크
+
+새 파이썬 프로세스에서 `main` 모듈 import와 lifespan 시작까지 걸리는 시간을
+여러 번 측정합니다. 워커를 늘릴 때의 콜드 스타트 비용에 해당합니다.
+기본값으로는 AUTO_MIGRATE를 지정하지 않고 띄우므로 운영 기본 경로를 측정합니다.
+
+    cd backend
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --runs 10 --auto-migrate   # 기동 시 마이그레이션 포함
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행되는 측정 코드
+PROBE = r"""
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def boot():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({"import_ms": (imported - started) * 1000, "lifespan_ms": (ready - imported) * 1000,
+                  "total_ms": (ready - started) * 1000}))
+"""
+
+
+def measure(runs: int, env: dict) -> dict:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, text=True)
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    summary = {}
+    for key in ("import_ms", "lifespan_ms", "total_ms"):
+        values = sorted(s[key] for s in samples)
+        summary[key] = {
+            "min": round(values[0], 2),
+            "median": round(statistics.median(values), 2),
+            "max": round(values[-1], 2),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="워커 기동 시간 측정")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--auto-migrate", action="store_true", help="AUTO_MIGRATE=1로 기동")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    db_dir = tempfile.mkdtemp(prefix="debate-startup-")
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'startup.db')}"
+
+    # 스키마와 관리자 계정은 미리 준비해서 "이미 배포된 DB에 워커가 붙는" 상황을 재현
+    env["AUTO_MIGRATE"] = "0"
+    for command in ("migrate", "seed-admin"):
+        subprocess.check_call([sys.executable, "manage.py", command], cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL)
+
+    if args.auto_migrate:
+        env["AUTO_MIGRATE"] = "1"
+    else:
+        env.pop("AUTO_MIGRATE", None)
+    summary = measure(args.runs, env)
+    report = {"runs": args.runs, "auto_migrate": args.auto_migrate, **summary}
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""근거 자료 요약 처리량 벤치마크
+
+한국어/영어 문장을 섞은 합성 근거 본문 --texts개(일부는 같은 기사를 다시 인용한 중복)를 만들어 비교합니다.
+
+- naive: 이전 `improve_text` 방식 (`split('.')`로 앞 3문장 + 200자 자르기)
+- inline: `summarizer.summarize`를 한 프로세스에서 차례로 실행
+- pool: `summarizer.summarize_many`가 프로세스 풀(--workers개)에 나눠 맡기는 경우 (캐시 비움)
+- cached: 같은 목록을 다시 요약 (메모리 LRU에서 응답)
+- backfill: 근거 행으로 DB에 넣은 뒤 `evidence.backfill`로 채우는 경우 (같은 본문은 DB의 요약을 재사용)
+
+    cd backend
+    python -m benchmarks.summaries --texts 2000 --workers 4
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.seed import WORDS
+
+ENGLISH = [
+    "budget", "policy", "housing", "transport", "education", "welfare", "jobs", "tax", "regulation", "growth",
+    "inflation", "government", "council", "report", "survey", "residents", "program", "funding", "rate", "market",
+]
+
+
+def _sentence(rng: random.Random, korean: bool) -> str:
+    number = f"{rng.randint(1, 99)}.{rng.randint(0, 9)}%" if rng.random() < 0.3 else ""
+    if korean:
+        words = [rng.choice(WORDS) + rng.choice(["은", "을", "이", "의", "에서", ""]) for _ in range(rng.randint(5, 12))]
+        return " ".join(words + ([number] if number else [])) + rng.choice(["했다.", "이다.", "밝혔다.", "합니다."])
+    words = [rng.choice(ENGLISH) for _ in range(rng.randint(6, 14))]
+    if number:
+        words.insert(rng.randrange(len(words)), number)
+    return words[0].capitalize() + " " + " ".join(words[1:]) + rng.choice([".", ".", "!", "?"])
+
+
+def corpus(count: int, duplicates: float, seed: int):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        if texts and rng.random() < duplicates:
+            texts.append(rng.choice(texts))
+            continue
+        korean = rng.random() < 0.6
+        paragraphs = [
+            " ".join(_sentence(rng, korean) for _ in range(rng.randint(2, 6)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        texts.append("\n\n".join(paragraphs))
+    return texts
+
+
+def naive(text: str) -> str:
+    sentences = [s.strip() for s in text.split('.') if s.strip()][:3]
+    summary = '. '.join(sentences)
+    return summary[:200] + "..." if len(summary) > 200 else summary
+
+
+def _rate(fn, texts) -> dict:
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    return {
+        "seconds": round(elapsed, 3),
+        "texts_per_second": round(len(texts) / elapsed, 1),
+        "mb_per_second": round(sum(len(t.encode()) for t in texts) / elapsed / 1e6, 2),
+    }, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="근거 자료 요약 처리량 벤치마크")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--duplicates", type=float, default=0.3, help="이미 나온 본문을 다시 인용하는 비율")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="debate-summaries-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app import evidence, models, summarizer
+    from app.database import SessionLocal, init_db
+
+    texts = corpus(args.texts, args.duplicates, args.seed)
+    unique = list(dict.fromkeys(texts))
+    report = {
+        "cpus": os.cpu_count(),
+        "texts": len(texts),
+        "unique_texts": len(unique),
+        "avg_chars": round(sum(map(len, texts)) / len(texts)),
+    }
+
+    report["naive"], _ = _rate(lambda: [naive(t) for t in texts], texts)
+    report["inline"], summaries = _rate(lambda: [summarizer.summarize(t) for t in texts], texts)
+    report["avg_summary_chars"] = round(sum(map(len, summaries)) / len(summaries))
+
+    summarizer.WORKERS = args.workers
+    summarizer.POOL_MIN_BATCH = 1
+    summarizer.summarize_many(["워밍업 문장입니다. " * 40] * 2)  # 풀의 프로세스 기동은 재지 않음
+    summarizer.cache.clear()
+    report["pool"], pooled = _rate(lambda: summarizer.summarize_many(texts), texts)
+    report["pool"]["workers"] = args.workers
+    assert pooled == summaries, "pool results differ from inline"
+    report["pool"]["computed"] = summarizer.cache.misses
+    report["cached"], _ = _rate(lambda: summarizer.summarize_many(texts), texts)
+
+    # DB 근거 행으로 넣고 채우기 (LRU를 비워서 같은 본문은 DB에 저장된 요약을 재사용하는지 확인)
+    init_db()
+    db = SessionLocal()
+    try:
+        db.add_all(models.Evidence(source="bench", publisher="bench", text=text) for text in texts)
+        db.commit()
+        summarizer.cache.clear()
+        report["backfill"], rows = _rate(lambda: evidence.backfill(db), texts)
+        report["backfill"]["rows"] = rows
+        report["backfill"]["computed"] = summarizer.cache.misses
+    finally:
+        db.close()
+    summarizer.shutdown()
+
+    report["speedup"] = {
+        "pool_vs_inline": round(report["pool"]["texts_per_second"] / report["inline"]["texts_per_second"], 2),
+        "cached_vs_inline": round(report["cached"]["texts_per_second"] / report["inline"]["texts_per_second"], 1),
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""사용자 활동 피드/프로필 통계 벤치마크
+
+합성 데이터로 채운 DB에서 글을 가장 많이 쓴 사용자의 활동 피드와 프로필 통계를 읽는 비용을 잽니다.
+
+- 피드: 첫 페이지와 마지막 페이지를
+  - offset_scan: (user_id, created_at) 인덱스 없이 UNION + ORDER BY + OFFSET (이전 스키마에서 만들 경우)
+  - offset_indexed: 인덱스는 있지만 OFFSET으로 건너뛰는 경우
+  - keyset: `user_stats.feed`에 커서를 넘기는 경우 (app/user_stats.py)
+- 통계: 받은 좋아요/싫어요와 반박 수를 claims/rebuttals/votes에서 집계하는 경우(인덱스 없음/있음)와
+  쓰기 시점에 갱신한 `user_stats` 행을 읽는 경우
+
+쓰기 쪽 비용으로 투표 한 번에 통계를 갱신하는 시간(`user_stats.record_vote`)도 함께 잽니다.
+
+    cd backend
+    python -m benchmarks.user_activity --users 50 --topics 200 --votes 200000
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks import seed as seed_module
+
+# 이 변경에서 추가한 인덱스 (이전 스키마를 재현할 때 지움)
+NEW_INDEXES = ("ix_claims_user_created", "ix_rebuttals_user_created", "ix_votes_claim", "ix_votes_rebuttal")
+
+OFFSET_SQL = """
+SELECT * FROM (
+    SELECT 'claim' AS kind, id, created_at FROM claims WHERE user_id = :user
+    UNION ALL
+    SELECT 'rebuttal', r.id, r.created_at FROM rebuttals r JOIN claims c ON c.id = r.claim_id WHERE r.user_id = :user
+)
+ORDER BY created_at DESC, kind DESC, id DESC LIMIT :limit OFFSET :offset
+"""
+
+AGGREGATE_SQL = [
+    "SELECT count(*) FROM claims WHERE user_id = :user",
+    "SELECT count(*) FROM rebuttals r JOIN claims c ON c.id = r.claim_id WHERE r.user_id = :user",
+    "SELECT v.vote_type, count(*) FROM votes v JOIN claims c ON c.id = v.claim_id"
+    " WHERE c.user_id = :user AND v.user_id != :user GROUP BY v.vote_type",
+    "SELECT v.vote_type, count(*) FROM votes v JOIN rebuttals r ON r.id = v.rebuttal_id"
+    " JOIN claims c ON c.id = r.claim_id WHERE r.user_id = :user AND v.user_id != :user GROUP BY v.vote_type",
+    "SELECT count(*) FROM rebuttals r JOIN claims c ON c.id = r.claim_id"
+    " WHERE c.user_id = :user AND r.parent_id IS NULL AND r.user_id != :user",
+    "SELECT count(*) FROM rebuttals r JOIN rebuttals p ON p.id = r.parent_id"
+    " JOIN claims c ON c.id = p.claim_id WHERE p.user_id = :user AND r.user_id != :user",
+]
+
+
+def _per_call_ms(fn, rounds: int) -> float:
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사용자 활동 피드/통계 벤치마크")
+    seed_module.add_arguments(parser)
+    parser.add_argument("--limit", type=int, default=20, help="피드 페이지 크기")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--out", default=None)
+    parser.set_defaults(users=50, topics=200, claims_per_topic=20, votes=200_000)
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="debate-users-"), "bench.db")
+    started = time.perf_counter()
+    data = seed_module.create_database(path, seed_module.config_from_args(args))
+    build_seconds = time.perf_counter() - started
+
+    from sqlalchemy import text
+
+    from app import models, user_stats
+    from app.database import SessionLocal
+
+    # 세 방식 모두 같은 세션으로 실행해 드라이버/세션 비용을 맞춤
+    db = SessionLocal()
+    user_id, posts = db.execute(text(
+        "SELECT user_id, count(*) FROM (SELECT user_id FROM claims UNION ALL SELECT user_id FROM rebuttals)"
+        " GROUP BY user_id ORDER BY count(*) DESC LIMIT 1"
+    )).one()
+    limit = args.limit
+    offset_sql = text(OFFSET_SQL)
+    aggregate_sql = [text(sql) for sql in AGGREGATE_SQL]
+
+    def offset_page(offset):
+        return db.execute(offset_sql, {"user": user_id, "limit": limit, "offset": offset}).all()
+
+    def aggregate():
+        return [db.execute(sql, {"user": user_id}).all() for sql in aggregate_sql]
+
+    try:
+        # 커서로 끝까지 읽어 마지막 페이지의 커서와 OFFSET을 구함
+        cursor, last_cursor, pages = None, None, 0
+        while True:
+            page = user_stats.feed(db, user_id, cursor=cursor, limit=limit)
+            pages += 1
+            if page["next_cursor"] is None:
+                break
+            last_cursor = cursor = page["next_cursor"]
+        last_offset = (pages - 1) * limit
+        assert [(kind, item_id) for kind, item_id, _ in offset_page(last_offset)] == [
+            (item["kind"], item["id"]) for item in page["items"]
+        ], "keyset and offset pages differ"
+
+        def keyset(cursor):
+            return lambda: user_stats.feed(db, user_id, cursor=cursor, limit=limit)
+
+        feed = {"offset_indexed": {
+            "first_page_ms": _per_call_ms(lambda: offset_page(0), args.rounds),
+            "last_page_ms": _per_call_ms(lambda: offset_page(last_offset), args.rounds),
+        }, "keyset": {
+            "first_page_ms": _per_call_ms(keyset(None), args.rounds),
+            "last_page_ms": _per_call_ms(keyset(last_cursor), args.rounds),
+        }}
+        stats = {
+            "aggregate_indexed_ms": _per_call_ms(aggregate, args.rounds),
+            "counters_ms": _per_call_ms(lambda: user_stats.summary(db, user_id), args.rounds),
+        }
+        # 집계 결과와 통계 행이 같은지 확인
+        counted = user_stats.tally(db)[user_id]
+        summary = user_stats.summary(db, user_id)
+        assert all(summary[name] == counted.get(name, 0) for name in user_stats.FIELDS), "counters drifted"
+
+        # 투표 한 번에 통계를 갱신하는 비용 (롤백해서 데이터는 그대로 둠)
+        target = db.query(models.Claim).filter(models.Claim.user_id != user_id).first()
+        write_ms = _per_call_ms(lambda: (user_stats.record_vote(db, user_id, target, "like", 1), db.rollback()),
+                                args.rounds)
+
+        # 인덱스가 없던 이전 스키마
+        for name in NEW_INDEXES:
+            db.execute(text(f"DROP INDEX {name}"))
+        db.commit()
+        scan_rounds = max(3, args.rounds // 4)
+        feed["offset_scan"] = {
+            "first_page_ms": _per_call_ms(lambda: offset_page(0), scan_rounds),
+            "last_page_ms": _per_call_ms(lambda: offset_page(last_offset), scan_rounds),
+        }
+        stats["aggregate_scan_ms"] = _per_call_ms(aggregate, scan_rounds)
+        plan = [row[-1] for row in db.execute(
+            text("EXPLAIN QUERY PLAN " + OFFSET_SQL), {"user": user_id, "limit": limit, "offset": 0}
+        )]
+    finally:
+        db.close()
+
+    report = {
+        "seed": {
+            "claims": len(data.claim_ids),
+            "rebuttals": len(data.rebuttal_ids),
+            "votes": args.votes,
+            "build_seconds": round(build_seconds, 1),
+        },
+        "user": {"id": user_id, "posts": posts, "pages": pages, "page_size": limit},
+        "feed": feed,
+        "stats": stats,
+        "vote_counter_update_ms": write_ms,
+        "offset_scan_plan": plan,
+        "speedup": {
+            "last_page_vs_offset_scan": round(feed["offset_scan"]["last_page_ms"] / feed["keyset"]["last_page_ms"], 1),
+            "stats_vs_aggregate_scan": round(stats["aggregate_scan_ms"] / stats["counters_ms"], 1),
+        },
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+if __name__ == "__main__":
+    main()
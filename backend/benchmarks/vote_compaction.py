@@ -0,0 +1,149 @@
+"""투표 기록 압축 벤치마크
+
+합성 데이터로 채운 DB에서 투표를 모두 `vote_ledger`로 옮기기(`vote_log.compact`) 전후를 비교합니다.
+
+- 크기: 투표 테이블과 인덱스가 차지하는 바이트(dbstat)와 VACUUM 후 DB 파일 크기
+- 조회: 한 화면(주장 --page개)의 사용자 투표 조회(`viewer_votes`)와 투표 하나 확인(`vote_log.find`)의 p50/p99
+- 집계: 정당별 투표/사용자 통계/추이 집계를 다시 만든 결과가 압축 전과 같은지 확인
+
+    cd backend
+    python -m benchmarks.vote_compaction --votes 200000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks import seed
+
+VOTE_OBJECTS = ("votes", "ix_votes_user_claim", "ix_votes_user_rebuttal", "ix_votes_claim", "ix_votes_rebuttal",
+                "ix_votes_id", "vote_ledger")
+
+
+def _pct(values, pct):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000, 3)
+
+
+def _sizes(path: str) -> dict:
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    rows = dict(conn.execute("SELECT name, sum(pgsize) FROM dbstat GROUP BY name").fetchall())
+    conn.close()
+    objects = {name: rows[name] for name in VOTE_OBJECTS if name in rows}
+    return {"file_bytes": os.path.getsize(path), "vote_bytes": sum(objects.values()), "objects": objects}
+
+
+def _latency(fn, cases) -> dict:
+    samples = []
+    for case in cases:
+        started = time.perf_counter()
+        fn(*case)
+        samples.append(time.perf_counter() - started)
+    return {"p50_ms": _pct(samples, 50), "p99_ms": _pct(samples, 99)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="투표 기록 압축 벤치마크")
+    parser.add_argument("--page", type=int, default=20, help="화면 하나에 보이는 주장 수")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--out", default=None)
+    seed.add_arguments(parser)
+    parser.set_defaults(users=500, topics=200, claims_per_topic=20, votes=200_000)
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="debate-votes-"), "bench.db")
+    started = time.perf_counter()
+    data = seed.create_database(path, seed.config_from_args(args))
+    build_seconds = time.perf_counter() - started
+
+    from app import models, party_votes, rollups, user_stats, vote_log
+    from app.database import SessionLocal, engine
+    from app.vote_store import viewer_votes
+
+    rng = random.Random(7)
+    db = SessionLocal()
+    try:
+        user_ids = [user_id for (user_id,) in db.query(models.User.id)]
+        pages = [
+            (rng.choice(user_ids), rng.sample(data.claim_ids, min(args.page, len(data.claim_ids))))
+            for _ in range(args.lookups // 10)
+        ]
+        voted = db.query(models.Vote.user_id, models.Vote.claim_id).filter(models.Vote.claim_id.is_not(None)).all()
+        singles = [(user_id, claim_id) for user_id, claim_id in rng.sample(voted, min(args.lookups, len(voted)))]
+
+        def page(user_id, claim_ids):
+            return viewer_votes(db, user_id, claim_ids=claim_ids)
+
+        def single(user_id, claim_id):
+            return vote_log.find(db, user_id, claim_id=claim_id)
+
+        def aggregates():
+            party_votes.rebuild(db)
+            rollups.backfill(db)
+            party = sorted(tuple(row) for row in db.query(
+                models.ClaimPartyVote.claim_id, models.ClaimPartyVote.party,
+                models.ClaimPartyVote.vote_type, models.ClaimPartyVote.count,
+            ))
+            trend = sorted(tuple(row) for row in db.query(
+                models.ActivityRollup.scope, models.ActivityRollup.target_id, models.ActivityRollup.granularity,
+                models.ActivityRollup.bucket_start, models.ActivityRollup.likes, models.ActivityRollup.dislikes,
+            ))
+            stats = {user_id: dict(counts) for user_id, counts in user_stats.tally(db).items()}
+            return party, trend, stats
+
+        answers = [page(*case) for case in pages]
+        before = {"page_lookup": _latency(page, pages), "single_lookup": _latency(single, singles)}
+        # VACUUM은 다른 연결이 없을 때 실행
+        db.close()
+        engine.dispose()
+        before["sizes"] = _sizes(path)
+        expected = aggregates()
+
+        started = time.perf_counter()
+        moved = vote_log.compact(db, before=datetime.max)  # 합성 투표 시각은 미래일 수도 있음
+        compact_seconds = time.perf_counter() - started
+
+        db.close()
+        engine.dispose()
+        after = {"sizes": _sizes(path)}
+        after.update(page_lookup=_latency(page, pages), single_lookup=_latency(single, singles))
+        assert [page(*case) for case in pages] == answers, "viewer votes differ after compaction"
+        assert all(single(*case) is not None for case in singles), "compacted vote not found"
+        assert aggregates() == expected, "aggregates differ after compaction"
+        tiers = vote_log.counts(db)
+    finally:
+        db.close()
+
+    report = {
+        "seed": {"votes": args.votes, "build_seconds": round(build_seconds, 1)},
+        "compaction": {
+            "moved": moved,
+            "seconds": round(compact_seconds, 2),
+            "votes_per_second": round(moved / compact_seconds),
+            "tiers": tiers,
+        },
+        "before": before,
+        "after": after,
+        "vote_bytes_per_row": {
+            "before": round(before["sizes"]["vote_bytes"] / max(moved, 1), 1),
+            "after": round(after["sizes"]["vote_bytes"] / max(moved, 1), 1),
+        },
+        "reduction": {
+            "vote_bytes": round(before["sizes"]["vote_bytes"] / after["sizes"]["vote_bytes"], 2),
+            "file_bytes": round(before["sizes"]["file_bytes"] / after["sizes"]["file_bytes"], 2),
+        },
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
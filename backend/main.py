@@ -1,15 +1,47 @@
+from pathlib import Path
+from dotenv import load_dotenv
+
+# .env는 app 모듈이 설정(DATABASE_URL, AUTO_MIGRATE, BACKUP_DIR 등)을 읽기 전에 한 번 로드
+load_dotenv(dotenv_path=Path(__file__).parent / ".env")
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, SessionLocal
-from app import models, schemas
-from app.routers import auth, topics, claims, rebuttals, votes, ai
-from passlib.context import CryptContext
+from app.routers import auth, topics, claims, rebuttals, votes, ai, bulk, live, admin, regions, snapshots, users
+from app import scheduler, backup  # backup: BACKUP_DIR가 설정되면 주기 백업 등록
+from app.regions import refresh_regions
+from app.realtime import hub
+from app.encoding import CompactEncodingMiddleware, CompactResponse
 import os
 
-# DB 테이블 생성
-models.Base.metadata.create_all(bind=engine)
+# 개발 환경에서는 AUTO_MIGRATE=1로 기동 시 스키마 생성/관리자 시드를 자동으로 수행
+# 운영 환경(기본값)은 배포 시 `python manage.py migrate && python manage.py seed-admin`을 한 번 실행
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "0") == "1"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AUTO_MIGRATE:
+        from app import bootstrap
+        bootstrap.migrate()
+        if bootstrap.seed_admin():
+            print(f"Admin user created: {bootstrap.ADMIN_USERNAME}")
+    # 지역 색인은 요청 전에 채움 (GET /api/regions는 준비되기 전까지 503)
+    await asyncio.to_thread(refresh_regions)
+    # 랭킹 갱신 등 주기적 백그라운드 작업
+    scheduler.start()
+    # 실시간 채널의 투표 묶음 전송
+    hub.start()
+    yield
+    await hub.stop()
+    await scheduler.stop()
 
-app = FastAPI()
+# Default(...)로 감싸야 response_model이 있는 라우터는 pydantic이 바로 JSON 바이트를 만드는 경로를 그대로 사용
+app = FastAPI(lifespan=lifespan, default_response_class=Default(CompactResponse))
+
+# MessagePack 협상, 작성자 표, gzip/brotli 압축 (app/encoding.py)
+app.add_middleware(CompactEncodingMiddleware)
 
 # CORS 설정
 app.add_middleware(
@@ -27,35 +59,13 @@ app.include_router(claims.router)
 app.include_router(rebuttals.router)
 app.include_router(votes.router)
 app.include_router(ai.router)
-
-# [추가] 관리자 계정 자동 생성 함수
-def create_admin_user():
-    db = SessionLocal()
-    try:
-        admin_user = db.query(models.User).filter(models.User.username == "admin").first()
-        if not admin_user:
-            pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-            # 비밀번호 해시 생성 (auth.py의 로직과 동일하게)
-            # 여기서는 간단히 bcrypt로 바로 해시 (실제 auth.py에 맞춰 조정 가능)
-            hashed_password = pwd_context.hash("1234qwer!")
-            
-            admin = models.User(
-                username="admin",
-                password_hash=hashed_password,
-                political_party="None",
-                level=999 # 관리자 레벨
-            )
-            db.add(admin)
-            db.commit()
-            print("Admin user created: admin / 1234qwer!")
-    except Exception as e:
-        print(f"Error creating admin user: {e}")
-    finally:
-        db.close()
-
-create_admin_user()
+app.include_router(bulk.router)
+app.include_router(live.router)
+app.include_router(admin.router)
+app.include_router(regions.router)
+app.include_router(snapshots.router)
+app.include_router(users.router)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Debate API"}
-
@@ -0,0 +1,275 @@
+"""관리 명령
+
+    python manage.py migrate      # 테이블/컬럼/인덱스 생성
+    python manage.py seed-admin   # 관리자 계정 생성
+    python manage.py rebuild-rankings   # 주장 반박 수/hot 점수 재계산
+    python manage.py rebuild-party-votes   # 정당별 투표 집계 재계산
+    python manage.py rebuild-user-stats   # 사용자 활동 통계와 레벨 재계산
+    python manage.py backfill-rollups   # 시간·일 단위 활동 집계를 이력에서 다시 채움 (그동안 쓰기는 대기)
+    python manage.py rebuild-signatures   # 서명이 없는 주장의 유사 주장 탐지용 서명 생성
+    python manage.py summarize-evidence   # 요약이 없거나 오래된 근거 자료 요약
+    python manage.py compact-votes [--days N]   # N일(기본 VOTE_COMPACT_AFTER_DAYS)보다 오래된 투표를 vote_ledger로 압축
+    python manage.py backfill-regions   # 기존 주제를 지역 계층(regions)에 연결
+    python manage.py archive-topics   # 오래된 주제를 압축 스냅샷으로 보관
+    python manage.py worker   # 백그라운드 작업 큐 워커 (종료할 때까지 실행)
+    python manage.py backup [--full]   # BACKUP_DIR에 온라인 스냅샷 생성 (기본: 증분)
+    python manage.py restore --to restored.db [--snapshot ID]   # 스냅샷 복원
+    python manage.py revoke-sessions USERNAME   # 사용자의 모든 로그인 세션 강제 종료
+"""
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# 명령이 app 모듈을 import하기 전에 .env 설정(ADMIN_PASSWORD 등)을 로드
+load_dotenv(dotenv_path=Path(__file__).parent / ".env")
+
+
+def cmd_migrate(args):
+    from app import bootstrap
+
+    actions = bootstrap.migrate()
+    for action in actions:
+        print(action)
+    print(f"migrate: {len(actions)} change(s)")
+
+
+def cmd_seed_admin(args):
+    from app import bootstrap
+
+    if bootstrap.seed_admin():
+        print(f"Admin user created: {bootstrap.ADMIN_USERNAME}")
+    else:
+        print("Admin user already exists")
+
+
+def cmd_rebuild_rankings(args):
+    from app import ranking
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        ranking.rebuild_counters(db)
+        count = ranking.refresh_scores(db, horizon_hours=0)
+    finally:
+        db.close()
+    print(f"rebuild-rankings: {count} claim(s) rescored")
+
+
+def cmd_rebuild_party_votes(args):
+    from app import party_votes
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = party_votes.rebuild(db)
+    finally:
+        db.close()
+    print(f"rebuild-party-votes: {count} row(s)")
+
+
+def cmd_rebuild_user_stats(args):
+    from app import user_stats
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = user_stats.rebuild(db)
+    finally:
+        db.close()
+    print(f"rebuild-user-stats: {count} user(s)")
+
+
+def cmd_backfill_rollups(args):
+    from app import rollups
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = rollups.backfill(db)
+    finally:
+        db.close()
+    print(f"backfill-rollups: {count} row(s) of history processed")
+
+
+def cmd_rebuild_signatures(args):
+    from app import similarity
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = similarity.rebuild(db)
+    finally:
+        db.close()
+    print(f"rebuild-signatures: {count} signature(s) stored")
+
+
+def cmd_summarize_evidence(args):
+    from app import evidence
+    from app.database import SessionLocal
+    from app.invalidation import bus
+
+    db = SessionLocal()
+    try:
+        count = evidence.backfill(db)
+    finally:
+        db.close()
+    # 요약이 바뀐 주제의 스냅샷을 다시 만들도록 알림
+    bus.pump()
+    print(f"summarize-evidence: {count} row(s) summarized")
+
+
+def cmd_compact_votes(args):
+    from datetime import datetime, timedelta
+
+    from app import vote_log
+    from app.database import SessionLocal
+
+    days = vote_log.COMPACT_AFTER_DAYS if args.days is None else args.days
+    db = SessionLocal()
+    try:
+        count = vote_log.compact(db, before=datetime.utcnow() - timedelta(days=days))
+        tiers = vote_log.counts(db)
+    finally:
+        db.close()
+    print(f"compact-votes: {count} vote(s) compacted ({tiers['votes']} recent, {tiers['ledger']} in ledger)")
+
+
+def compact_votes_arguments(parser):
+    parser.add_argument("--days", type=float, default=None)
+
+
+def cmd_backfill_regions(args):
+    from app import regions
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        regions.ensure_provinces(db)
+        count = regions.backfill(db)
+    finally:
+        db.close()
+    print(f"backfill-regions: {count} topic(s) linked")
+
+
+def cmd_archive_topics(args):
+    from app import archive
+    from app.database import SessionLocal
+    from app.invalidation import bus
+
+    db = SessionLocal()
+    try:
+        results = archive.archive_cold_topics(db)
+    finally:
+        db.close()
+    # 실행 중인 워커들의 캐시 무효화 이벤트 전송
+    bus.pump()
+    for result in results:
+        print(f"topic {result['topic_id']}: {result['claims']} claim(s), {result['rebuttals']} rebuttal(s), "
+              f"{result['raw_bytes']} -> {result['compressed_bytes']} bytes")
+    print(f"archive-topics: {len(results)} topic(s) archived")
+
+
+def cmd_worker(args):
+    import logging
+    import signal
+    import threading
+
+    from app import jobs
+    # 라우터 모듈을 import해야 작업 핸들러가 등록됨
+    import main  # noqa: F401
+
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    print("worker: started (Ctrl+C to stop)")
+    try:
+        jobs.work(stop)
+    except KeyboardInterrupt:
+        pass
+    print("worker: stopped")
+
+
+def cmd_backup(args):
+    from app import backup
+
+    entry = backup.snapshot(full=args.full)
+    print(f"backup: {entry['kind']} snapshot {entry['id']}, {entry['pages']}/{entry['page_count']} page(s), "
+          f"{entry['bytes']} bytes in {entry['seconds']}s")
+
+
+def backup_arguments(parser):
+    parser.add_argument("--full", action="store_true", help="증분 대신 전체 스냅샷")
+
+
+def cmd_restore(args):
+    from app import backup
+
+    result = backup.restore(args.to, args.snapshot)
+    print(f"restore: snapshot {result['snapshot']} ({result['chain']} file(s)) -> {args.to} in {result['seconds']}s")
+
+
+def restore_arguments(parser):
+    parser.add_argument("--to", required=True, help="복원할 파일 경로 (실행 중인 DB 파일이 아닌 곳)")
+    parser.add_argument("--snapshot", default=None, help="스냅샷 id (기본: 가장 최근)")
+
+
+def cmd_revoke_sessions(args):
+    from app import models, sessions
+    from app.database import SessionLocal
+    from app.invalidation import bus
+
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.username == args.username).first()
+        if user is None:
+            raise SystemExit(f"revoke-sessions: no such user: {args.username}")
+        count = sessions.revoke_user(db, user.id, reason="manage")
+    finally:
+        db.close()
+    # 실행 중인 워커들의 폐기 목록에 전달
+    bus.pump()
+    print(f"revoke-sessions: {count} session(s) revoked for {args.username}")
+
+
+def revoke_sessions_arguments(parser):
+    parser.add_argument("username")
+
+
+COMMANDS = {
+    "migrate": (cmd_migrate, "스키마 생성 및 누락된 컬럼/인덱스 추가"),
+    "seed-admin": (cmd_seed_admin, "관리자 계정 생성"),
+    "rebuild-rankings": (cmd_rebuild_rankings, "주장 반박 수와 hot 점수 재계산"),
+    "rebuild-party-votes": (cmd_rebuild_party_votes, "정당별 투표 집계 재계산"),
+    "rebuild-user-stats": (cmd_rebuild_user_stats, "사용자 활동 통계와 레벨 재계산"),
+    "backfill-rollups": (cmd_backfill_rollups, "시간·일 단위 활동 집계를 이력에서 다시 채움"),
+    "rebuild-signatures": (cmd_rebuild_signatures, "서명이 없는 주장의 유사 주장 탐지용 서명 생성"),
+    "summarize-evidence": (cmd_summarize_evidence, "요약이 없거나 오래된 근거 자료 요약"),
+    "compact-votes": (cmd_compact_votes, "오래된 투표를 vote_ledger로 압축", compact_votes_arguments),
+    "backfill-regions": (cmd_backfill_regions, "기존 주제를 지역 계층에 연결"),
+    "archive-topics": (cmd_archive_topics, "오래된 주제를 압축 스냅샷으로 보관"),
+    "worker": (cmd_worker, "백그라운드 작업 큐 워커 실행"),
+    "backup": (cmd_backup, "BACKUP_DIR에 온라인 스냅샷 생성", backup_arguments),
+    "restore": (cmd_restore, "스냅샷 복원", restore_arguments),
+    "revoke-sessions": (cmd_revoke_sessions, "사용자의 모든 로그인 세션 강제 종료", revoke_sessions_arguments),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Debate API 관리 명령")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (func, help_text, *arguments) in COMMANDS.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        for add_arguments in arguments:
+            add_arguments(sub)
+        sub.set_defaults(func=func)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
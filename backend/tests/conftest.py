@@ -0,0 +1,63 @@
+"""테스트 공통 설정
+
+벤치마크와 같은 방식(benchmarks/seed.py)으로 임시 디렉터리에 SQLite DB를 만들고 합성 데이터를 채웁니다.
+`app.database`는 처음 import될 때 DATABASE_URL로 엔진을 만들므로 app 모듈보다 먼저 환경 변수를 설정합니다.
+
+    cd backend
+    python -m pytest
+"""
+import os
+import tempfile
+
+import pytest
+
+DB_DIR = tempfile.mkdtemp(prefix="debate-tests-")
+DB_PATH = os.path.join(DB_DIR, "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["BACKGROUND_JOBS"] = "0"
+os.environ["INVALIDATION_TRANSPORT"] = "memory"
+os.environ["SCHEDULER_LOCK_DIR"] = DB_DIR
+
+from benchmarks import seed  # noqa: E402
+
+CONFIG = seed.SeedConfig(users=20, topics=4, claims_per_topic=4, rebuttals_per_claim=4, votes=300)
+
+
+@pytest.fixture
+def data():
+    """테스트마다 새로 만든 DB의 합성 데이터 id 목록"""
+    from app.database import engine
+
+    engine.dispose()
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    return seed.create_database(DB_PATH, CONFIG)
+
+
+@pytest.fixture
+def db(data):
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(data):
+    """앱 테스트 클라이언트 (lifespan을 실행하지 않으므로 주기 작업은 돌지 않음)"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def login(client):
+    """합성 사용자로 로그인한 응답(JSON)을 반환하는 함수"""
+    def do_login(username: str) -> dict:
+        response = client.post("/api/auth/login", json={"username": username, "password": seed.BENCH_PASSWORD})
+        assert response.status_code == 200, response.text
+        return response.json()
+    return do_login
@@ -0,0 +1,46 @@
+from app import archive, models
+
+
+def _ids(items):
+    return sorted(item["id"] for item in items)
+
+
+def test_archived_topic_is_read_through(client, db, data):
+    topic_id = data.topic_ids[0]
+    claim_id = next(c for c, t in data.claim_topic.items() if t == topic_id)
+    claims = client.get(f"/api/claims/topic/{topic_id}").json()
+    claim = client.get(f"/api/claims/{claim_id}").json()
+    rebuttals = client.get(f"/api/rebuttals/claim/{claim_id}").json()
+    assert claims and rebuttals
+
+    result = archive.archive_topic(db, topic_id)
+    assert result is not None
+    assert db.query(models.Claim).filter(models.Claim.topic_id == topic_id).count() == 0
+    assert db.query(models.Rebuttal).filter(models.Rebuttal.claim_id == claim_id).count() == 0
+
+    archived_claims = client.get(f"/api/claims/topic/{topic_id}").json()
+    assert _ids(archived_claims) == _ids(claims)
+    archived_claim = client.get(f"/api/claims/{claim_id}").json()
+    assert (archived_claim["title"], archived_claim["votes"]) == (claim["title"], claim["votes"])
+    assert _ids(client.get(f"/api/rebuttals/claim/{claim_id}").json()) == _ids(rebuttals)
+    rebuttal_id = rebuttals[0]["id"]
+    assert client.get(f"/api/rebuttals/{rebuttal_id}").json()["id"] == rebuttal_id
+
+
+def test_archive_topic_twice_is_noop(db, data):
+    topic_id = data.topic_ids[1]
+    assert archive.archive_topic(db, topic_id) is not None
+    assert archive.archive_topic(db, topic_id) is None
+    assert db.query(models.TopicArchive).filter(models.TopicArchive.topic_id == topic_id).count() == 1
+
+
+def test_writes_to_archived_topic_are_rejected(client, login, db, data):
+    topic_id = data.topic_ids[2]
+    archive.archive_topic(db, topic_id)
+    tokens = login(data.usernames[0])
+    response = client.post(
+        "/api/claims/", json={"topic_id": topic_id, "title": "t", "content": "c", "type": "pro"},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert response.status_code == 409
+    assert db.query(models.Claim).filter(models.Claim.topic_id == topic_id).count() == 0
@@ -0,0 +1,49 @@
+from app.argument_graph import ClaimGraph
+
+# (id, parent_id, votes, type)
+ROWS = [
+    (1, None, 2, "rebuttal"),
+    (2, 1, 0, "counter"),
+    (3, 2, 5, "rebuttal"),
+    (4, None, -1, "rebuttal"),
+    (6, 1, 1, "counter"),
+]
+
+
+def test_compute_tree_metrics():
+    metrics = ClaimGraph(ROWS).metrics()
+    # 깊이 1, 3은 반대(1 + max(votes, 0)), 깊이 2는 주장 편
+    assert (metrics["opposition"], metrics["support"]) == (3 + 6 + 1, 1 + 2)
+    assert metrics["net_support"] == -7
+    assert metrics["max_depth"] == 3
+    assert (metrics["rebuttals"], metrics["direct_rebuttals"]) == (5, 2)
+    assert (metrics["unanswered"], metrics["unanswered_direct"]) == (3, 1)
+    assert metrics["types"] == {"rebuttal": 3, "counter": 2}
+    assert metrics["threads"] == [
+        {"rebuttal_id": 1, "size": 4, "depth": 3, "net_support": -3 + 1 - 6 + 2, "unanswered": False},
+        {"rebuttal_id": 4, "size": 1, "depth": 1, "net_support": -1, "unanswered": True},
+    ]
+
+
+def test_add_matches_full_load():
+    graph = ClaimGraph([row for row in ROWS if row[0] != 3])
+    before = graph.metrics()
+    # 다른 워커의 더 작은 id가 늦게 도착해도 뒤쪽 노드의 부모가 유지됨
+    assert graph.add(3, 2, 5, "rebuttal")
+    assert not graph.add(3, 2, 5, "rebuttal")
+    assert graph.metrics() != before
+    assert graph.metrics() == ClaimGraph(ROWS).metrics()
+
+
+def test_remove_orphans_children_and_compacts():
+    graph = ClaimGraph(ROWS)
+    assert graph.remove(2)
+    assert 2 not in graph and len(graph) == 4
+    expected = ClaimGraph([row for row in ROWS if row[0] != 2]).metrics()
+    assert graph.metrics() == expected
+    assert expected["direct_rebuttals"] == 3  # 부모가 삭제된 반박은 주장에 직접 단 반박
+
+    assert graph.remove(6)
+    assert graph.deleted == 0 and len(graph.ids) == 3  # 4분의 1을 넘어 배열을 당김
+    assert graph.metrics() == ClaimGraph([row for row in ROWS if row[0] not in (2, 6)]).metrics()
+    assert not graph.remove(6)
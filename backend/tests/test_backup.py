@@ -0,0 +1,67 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app import backup, models
+
+
+def _titles(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {title for (title,) in conn.execute("SELECT title FROM topics")}
+    finally:
+        conn.close()
+
+
+def test_incremental_snapshot_restores_round_trip(db, tmp_path):
+    directory = str(tmp_path / "backups")
+    first = backup.snapshot(directory)
+    assert first["kind"] == "full"
+    before = _titles(backup.database_path())
+
+    db.add(models.Topic(title="백업 이후 주제", topic_type="topic"))
+    db.commit()
+    second = backup.snapshot(directory)
+    assert second["kind"] == "incremental" and second["parent"] == first["id"]
+    assert second["pages"] < first["pages"]
+
+    latest = str(tmp_path / "latest.db")
+    result = backup.restore(latest, directory=directory)
+    assert result["snapshot"] == second["id"] and result["chain"] == 2
+    assert _titles(latest) == _titles(backup.database_path())
+
+    older = str(tmp_path / "older.db")
+    backup.restore(older, snapshot_id=first["id"], directory=directory)
+    assert _titles(older) == before
+    assert "백업 이후 주제" not in before
+
+
+def test_restore_rejects_corrupted_delta(db, tmp_path):
+    directory = str(tmp_path / "backups")
+    backup.snapshot(directory)
+    db.add(models.Topic(title="변경", topic_type="topic"))
+    db.commit()
+    second = backup.snapshot(directory)
+
+    delta = tmp_path / "backups" / second["file"]
+    delta.write_bytes(delta.read_bytes()[:-16])
+    dest = tmp_path / "restored.db"
+    with pytest.raises(backup.BackupError):
+        backup.restore(str(dest), directory=directory)
+    assert not dest.exists()
+
+
+def test_concurrent_due_checks_make_one_snapshot(data, tmp_path):
+    directory = str(tmp_path / "backups")
+    backup.snapshot(directory)
+    snapshots = backup.list_snapshots(directory)
+    snapshots[-1]["created_at"] = "2000-01-01T00:00:00"
+    backup._save_manifest(directory, snapshots)
+    # 간격이 지난 시점에 여러 워커가 동시에 확인해도 스냅샷은 하나만 추가됨
+    threads = [threading.Thread(target=backup.snapshot_if_due, args=(directory, 3600)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(backup.list_snapshots(directory)) == 2
@@ -0,0 +1,16 @@
+from app import schemas
+from app.routers import bulk
+
+
+def test_failed_chunk_reports_each_line_once(db):
+    def persist(session, items, errors):
+        # 일부 행을 건너뛴다고 기록한 뒤 청크 저장이 실패
+        errors.append(schemas.BulkImportError(line=items[0][0], error="존재하지 않는 주제입니다: 1"))
+        raise RuntimeError("disk I/O error")
+
+    rows = [(line_no, {"title": f"주제 {line_no}", "topic_type": "topic"}) for line_no in (1, 2, 3)]
+    result = bulk._run_import(db, iter(rows), schemas.TopicCreate, persist, chunk_size=10)
+    assert result.imported == 0
+    assert [error.line for error in result.errors] == [1, 2, 3]
+    assert all(error.error.startswith("저장 실패") for error in result.errors)
+    assert result.failed == 3
@@ -0,0 +1,57 @@
+import gzip
+
+import orjson
+
+from app import encoding
+
+
+def test_negotiate_format_compression_and_authors():
+    assert encoding.negotiate() == encoding.PLAIN
+    assert encoding.negotiate(accept="application/msgpack").format == "msgpack"
+    assert encoding.negotiate(accept="application/json, application/msgpack;q=0.5").format == "json"
+    assert encoding.negotiate(accept="application/x-msgpack, */*;q=0.1").format == "msgpack"
+    assert encoding.negotiate(accept="application/msgpack;q=0").format == "json"
+    assert encoding.negotiate(accept_encoding="gzip, br").compression == "br"
+    assert encoding.negotiate(accept_encoding="gzip, br;q=0").compression == "gzip"
+    assert encoding.negotiate(accept_encoding="identity").compression is None
+    assert encoding.negotiate(author_table=" 1 ").authors
+    assert not encoding.negotiate(author_table="0").authors
+
+
+def test_negotiate_without_optional_packages(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", None)
+    monkeypatch.setattr(encoding, "brotli", None)
+    negotiation = encoding.negotiate(accept="application/msgpack", accept_encoding="br, gzip")
+    assert (negotiation.format, negotiation.compression) == ("json", "gzip")
+
+
+def test_dedupe_authors_builds_table():
+    alice = {"id": 1, "username": "alice"}
+    bob = {"id": 2, "username": "bob"}
+    payload = [
+        {"id": 10, "author": dict(alice), "rebuttals": [{"id": 20, "author": dict(bob)}]},
+        {"id": 11, "author": dict(alice), "author_note": None},
+    ]
+    result = encoding.dedupe_authors(payload)
+    assert result["authors"] == [alice, bob]
+    assert [row["author"] for row in result["data"]] == [0, 0]
+    assert result["data"][0]["rebuttals"][0]["author"] == 1
+
+
+def test_author_table_and_gzip_over_http(client, data):
+    claim_id = data.claim_ids[0]
+    plain = client.get(f"/api/rebuttals/claim/{claim_id}").json()
+    response = client.get(
+        f"/api/rebuttals/claim/{claim_id}", headers={"X-Author-Table": "1", "Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    authors = body["authors"]
+    assert len(authors) <= len(body["data"])
+    restored = [dict(row, author=authors[row["author"]]) for row in body["data"]]
+    assert restored == plain
+
+    big = orjson.dumps(list(range(2000)))
+    compressed, content_encoding = encoding.compress(big, "gzip")
+    assert content_encoding == "gzip" and gzip.decompress(compressed) == big
+    assert encoding.compress(b"{}", "gzip") == (b"{}", None)
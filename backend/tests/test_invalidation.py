@@ -0,0 +1,41 @@
+import pytest
+
+from app.invalidation import InvalidationBus, MemoryTransport, Transport
+
+
+def _bus(transport):
+    bus = InvalidationBus(transport)
+    bus.pump()
+    gaps = []
+    bus.on_gap(lambda: gaps.append(bus.version))
+    return bus, gaps
+
+
+def test_transport_requires_all_methods():
+    class Partial(Transport):
+        def send(self, origin, events):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_gap_when_every_missed_event_was_pruned():
+    transport = MemoryTransport()
+    bus, gaps = _bus(transport)
+    transport.send("other", [("channel", {}), ("channel", {})])
+    transport._events.clear()  # 보관 기간이 지나 모두 지워짐
+
+    bus.pump()
+    assert gaps == [2]
+    assert bus.version == transport.head() == 2
+
+
+def test_no_gap_when_caught_up():
+    transport = MemoryTransport()
+    bus, gaps = _bus(transport)
+    transport.send("other", [("channel", {})])
+    bus.pump()
+    transport._events.clear()
+    bus.pump()
+    assert gaps == [] and bus.version == 1
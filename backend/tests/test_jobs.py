@@ -0,0 +1,100 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from app import backup, jobs, models
+
+calls = []
+
+
+@jobs.handler("test.record")
+def record_call(db, payload):
+    calls.append(payload["n"])
+
+
+@jobs.handler("test.fail", max_attempts=2)
+def always_fail(db, payload):
+    raise RuntimeError("boom")
+
+
+def _job(db, name):
+    db.expire_all()
+    return db.query(models.Job).filter(models.Job.name == name).one()
+
+
+def _make_ready(db, job_id):
+    db.query(models.Job).filter(models.Job.id == job_id).update({"run_at": datetime.utcnow()})
+    db.commit()
+
+
+def test_enqueue_is_idempotent_by_key(db):
+    jobs.enqueue(db, "test.record", {"n": 1}, key="once")
+    jobs.enqueue(db, "test.record", {"n": 2}, key="once")
+    db.commit()
+    assert db.query(models.Job).filter(models.Job.idempotency_key == "once").count() == 1
+
+
+def test_run_next_completes_job(db):
+    calls.clear()
+    jobs.enqueue(db, "test.record", {"n": 7})
+    db.commit()
+    assert jobs.run_next(db) == "done"
+    assert calls == [7]
+    job = _job(db, "test.record")
+    assert job.status == "done" and job.locked_by is None and job.attempts == 1
+    assert jobs.run_next(db) is None
+
+
+def test_failed_job_is_retried_with_backoff_then_fails(db):
+    jobs.enqueue(db, "test.fail", {})
+    db.commit()
+    assert jobs.run_next(db) == "queued"
+    job = _job(db, "test.fail")
+    assert job.attempts == 1 and job.run_at > datetime.utcnow()
+    assert "boom" in job.last_error
+    # 백오프가 끝나기 전에는 가져가지 않음
+    assert jobs.run_next(db) is None
+
+    _make_ready(db, job.id)
+    assert jobs.run_next(db) == "failed"
+    job = _job(db, "test.fail")
+    assert job.status == "failed" and job.attempts == 2
+
+
+def test_expired_lease_is_taken_over_and_old_worker_loses_result(db):
+    calls.clear()
+    jobs.enqueue(db, "test.record", {"n": 1})
+    db.commit()
+    first = jobs._claim(db, "worker-a")
+    assert first is not None
+    # 워커 a가 가시성 타임아웃 안에 끝내지 못함
+    db.query(models.Job).filter(models.Job.id == first[0]).update(
+        {"locked_until": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+
+    assert jobs.run_next(db, worker_id="worker-b") == "done"
+    assert calls == [1]
+    assert not jobs._release(db, first[0], "worker-a", status="done")
+    db.rollback()
+    job = _job(db, "test.record")
+    assert job.status == "done" and job.attempts == 2
+
+
+def test_backoff_grows_and_is_capped():
+    assert jobs.backoff(1) <= jobs.RETRY_BASE_SECONDS
+    assert jobs.backoff(3) >= jobs.RETRY_BASE_SECONDS * 2
+    assert jobs.backoff(100) <= jobs.RETRY_MAX_SECONDS
+
+
+def test_empty_queue_poll_does_not_take_write_lock(db):
+    # 다른 연결이 쓰기 잠금을 잡고 있어도 빈 큐 확인은 기다리지 않음
+    writer = sqlite3.connect(backup.database_path(), isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        assert jobs.run_next(db) is None
+        assert time.perf_counter() - started < 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
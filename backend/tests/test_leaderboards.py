@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from app import models
+from app.leaderboards import TopicEntry, TopicLeaderboard, bucket_key
+
+
+def _during_refresh(monkeypatch, board, action):
+    recent_activity = board._recent_activity
+
+    def activity_then_action(db, since):
+        # DB를 다 읽은 뒤 교체하기 전에 증분이 들어온 상황
+        yield from recent_activity(db, since)
+        action()
+
+    monkeypatch.setattr(board, "_recent_activity", activity_then_action)
+
+
+def test_updates_during_refresh_survive_swap(db, data, monkeypatch):
+    board = TopicLeaderboard()
+    board.refresh(db)
+    topic_id = data.topic_ids[0]
+    vote_sum = board._topics[topic_id].vote_sum
+
+    _during_refresh(monkeypatch, board, lambda: board.record_vote(topic_id, claim_vote_delta=1000))
+    board.refresh(db)
+    assert board._topics[topic_id].vote_sum == vote_sum + 1000
+    assert board.top(bucket_key(), "best", limit=1)[0]["id"] == topic_id
+
+
+def test_topic_added_during_first_refresh_is_kept(db, data, monkeypatch):
+    board = TopicLeaderboard()
+    entry = TopicEntry(10_000, "새 주제", None, None, None, "topic", datetime.utcnow())
+    _during_refresh(monkeypatch, board, lambda: board._add_entry(entry))
+    board.refresh(db)
+    assert 10_000 in {item["id"] for item in board.top(bucket_key(), "trend")}
+    assert len(board.top(bucket_key(), "best")) == db.query(models.Topic).count() + 1
+    assert board._pending is None
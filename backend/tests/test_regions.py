@@ -0,0 +1,34 @@
+from app import models, regions
+
+
+def _topic(db, region, district):
+    topic = models.Topic(title="지역 주제", topic_type="region", region=region, district=district)
+    topic.region_id = regions.resolve(db, region, district)[-1]["id"]
+    db.add(topic)
+    db.commit()
+    return topic.id
+
+
+def test_topic_list_filters_by_normalized_region(client, db, monkeypatch):
+    monkeypatch.setattr("app.leaderboards.leaderboard.ready", False)
+    district_id = _topic(db, "서울특별시", "강동구")
+    province_id = _topic(db, "seoul", "서울 전체")
+    other_id = _topic(db, "부산", "중구")
+
+    def ids(**params):
+        return {topic["id"] for topic in client.get("/api/topics/", params={"sort_by": "latest", **params}).json()}
+
+    assert {district_id, province_id} <= ids(region="서울")
+    assert other_id not in ids(region="서울")
+    assert district_id in ids(region="seoul", district="강동구")
+    assert province_id not in ids(region="seoul", district="강동구")
+    assert ids(district="중구") >= {other_id}
+
+
+def test_regions_wait_for_startup_refresh(client, db, monkeypatch):
+    monkeypatch.setattr(regions, "index", regions.RegionIndex())
+    assert client.get("/api/regions/").status_code == 503
+
+    regions.index.refresh(db)
+    names = {item["name"] for item in client.get("/api/regions/").json()}
+    assert names >= {name for (name,) in db.query(models.Region.name).filter(models.Region.level == 1)}
@@ -0,0 +1,52 @@
+from app import models, sessions
+
+
+def _refresh(client, token):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def _vote(client, access_token, claim_id):
+    return client.post(
+        "/api/votes/", json={"claim_id": claim_id, "vote_type": "like"},
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+def test_refresh_rotates_token(client, login, data):
+    tokens = login(data.usernames[0])
+    response = _refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert _refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_reuse_within_grace_returns_same_successor(client, login, data):
+    tokens = login(data.usernames[0])
+    first = _refresh(client, tokens["refresh_token"]).json()
+    again = _refresh(client, tokens["refresh_token"])
+    assert again.status_code == 200
+    assert again.json()["refresh_token"] == first["refresh_token"]
+
+
+def test_reuse_after_grace_revokes_family(client, login, data, db, monkeypatch):
+    monkeypatch.setattr(sessions, "REUSE_GRACE_SECONDS", 0)
+    tokens = login(data.usernames[0])
+    rotated = _refresh(client, tokens["refresh_token"]).json()
+
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    # 탈취로 보고 세션 전체를 폐기: 새 리프레시 토큰과 이미 받은 액세스 토큰도 쓸 수 없음
+    assert _refresh(client, rotated["refresh_token"]).status_code == 401
+    assert _vote(client, rotated["access_token"], data.claim_ids[0]).status_code == 401
+    family_tokens = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == sessions._hash(rotated["refresh_token"])
+    ).one()
+    assert family_tokens.revoked_at is not None
+
+
+def test_logout_revokes_access_token(client, login, data):
+    tokens = login(data.usernames[1])
+    assert _vote(client, tokens["access_token"], data.claim_ids[0]).status_code == 200
+    client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert _vote(client, tokens["access_token"], data.claim_ids[0]).status_code == 401
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+from app import models, user_stats
+
+
+def _pages(db, user_id, kind=None, limit=3):
+    items, cursor = [], None
+    while True:
+        page = user_stats.feed(db, user_id, kind=kind, cursor=cursor, limit=limit)
+        items += [(item["created_at"], item["kind"], item["id"]) for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_feed_pages_cover_everything_once_with_ties(db):
+    user_id = db.query(models.Rebuttal.user_id).group_by(models.Rebuttal.user_id).order_by(
+        models.Rebuttal.user_id).first()[0]
+    # 주장과 반박이 같은 시각을 공유해도 (created_at, kind, id) 순서로 이어짐
+    same = datetime(2024, 1, 1, 12)
+    for model in (models.Claim, models.Rebuttal):
+        ids = [item_id for (item_id,) in db.query(model.id).filter(model.user_id == user_id)]
+        db.query(model).filter(model.id.in_(ids[::2])).update({"created_at": same}, synchronize_session=False)
+    db.commit()
+
+    expected = sorted(
+        [(c.created_at, "claim", c.id) for c in db.query(models.Claim).filter(models.Claim.user_id == user_id)]
+        + [(r.created_at, "rebuttal", r.id) for r in db.query(models.Rebuttal).filter(models.Rebuttal.user_id == user_id)],
+        reverse=True,
+    )
+    assert len(expected) >= 6
+    assert _pages(db, user_id, limit=2) == expected
+    assert _pages(db, user_id, kind="rebuttal", limit=2) == [item for item in expected if item[1] == "rebuttal"]
+
+
+def test_older_than_orders_kinds_at_same_time(db):
+    at = datetime(2024, 1, 1)
+    claim_id = db.query(models.Claim.id).first()[0]
+    rebuttal_id = db.query(models.Rebuttal.id).first()[0]
+    db.query(models.Claim).filter(models.Claim.id == claim_id).update({"created_at": at})
+    db.query(models.Rebuttal).filter(models.Rebuttal.id == rebuttal_id).update({"created_at": at})
+    db.commit()
+
+    def after(model, kind, cursor):
+        return {item_id for (item_id,) in db.query(model.id).filter(user_stats._older_than(model, kind, cursor))}
+
+    # 같은 시각이면 내림차순에서 rebuttal이 claim보다 앞에 옴
+    assert claim_id in after(models.Claim, "claim", (at, "rebuttal", 0))
+    assert rebuttal_id not in after(models.Rebuttal, "rebuttal", (at, "claim", 10 ** 9))
+    assert claim_id not in after(models.Claim, "claim", (at, "claim", claim_id))
+    assert claim_id in after(models.Claim, "claim", (at, "claim", claim_id + 1))
+
+
+def test_bad_cursor_is_rejected(db):
+    with pytest.raises(ValueError):
+        user_stats.feed(db, 1, cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        user_stats.feed(db, 1, cursor=user_stats.encode_cursor(datetime(2024, 1, 1), "vote", 1))
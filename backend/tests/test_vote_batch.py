@@ -0,0 +1,69 @@
+from app import models
+from app.routers import votes
+
+
+def _headers(login, username):
+    return {"Authorization": f"Bearer {login(username)['access_token']}"}
+
+
+def _batch(client, headers, *actions):
+    return client.post("/api/votes/batch", json={"actions": list(actions)}, headers=headers)
+
+
+def _state(db, user_id, claim_id):
+    db.expire_all()
+    vote = db.query(models.Vote).filter(models.Vote.user_id == user_id, models.Vote.claim_id == claim_id).first()
+    return db.get(models.Claim, claim_id).votes, vote.vote_type if vote else None
+
+
+def test_batch_applies_final_states_and_is_idempotent(client, login, db, data):
+    headers = _headers(login, data.usernames[0])
+    user_id = db.query(models.User.id).filter(models.User.username == data.usernames[0]).scalar()
+    claim_id, rebuttal_id = data.claim_ids[0], data.rebuttal_ids[0]
+    actions = [
+        {"claim_id": claim_id, "vote_type": "like"},
+        {"rebuttal_id": rebuttal_id, "vote_type": "dislike"},
+        {"claim_id": claim_id, "vote_type": "dislike"},  # 같은 대상은 마지막 상태가 남음
+    ]
+    response = _batch(client, headers, *actions)
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["user_vote"] for result in results] == ["dislike", "dislike", "dislike"]
+    after = _state(db, user_id, claim_id)
+    assert after[1] == "dislike" and results[-1]["votes"] == after[0]
+
+    assert _batch(client, headers, *actions).json()["results"] == results
+    assert _state(db, user_id, claim_id) == after
+
+    response = _batch(client, headers, {"claim_id": claim_id, "vote_type": None})
+    assert response.json()["results"][0]["user_vote"] is None
+    assert _state(db, user_id, claim_id)[1] is None
+
+
+def test_batch_is_all_or_nothing(client, login, db, data):
+    headers = _headers(login, data.usernames[1])
+    user_id = db.query(models.User.id).filter(models.User.username == data.usernames[1]).scalar()
+    claim_id = data.claim_ids[1]
+    before = _state(db, user_id, claim_id)
+    wanted = "dislike" if before[1] == "like" else "like"
+
+    response = _batch(
+        client, headers, {"claim_id": claim_id, "vote_type": wanted}, {"claim_id": 10 ** 9, "vote_type": "like"},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"].startswith("1번 항목")
+    assert _state(db, user_id, claim_id) == before
+
+    response = _batch(
+        client, headers, {"claim_id": claim_id, "vote_type": wanted}, {"claim_id": claim_id, "vote_type": "love"},
+    )
+    assert response.status_code == 400
+    assert _state(db, user_id, claim_id) == before
+
+
+def test_batch_limits(client, login, data):
+    headers = _headers(login, data.usernames[2])
+    assert _batch(client, headers).status_code == 400
+    too_many = [{"claim_id": data.claim_ids[0], "vote_type": "like"}] * (votes.MAX_BATCH_ACTIONS + 1)
+    assert _batch(client, headers, *too_many).status_code == 400
+    assert client.post("/api/votes/batch", json={"actions": too_many[:1]}).status_code == 401
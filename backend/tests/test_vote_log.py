@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+from app import models, party_votes, user_stats, vote_log
+from app.vote_store import viewer_votes
+
+
+def _party_counts(db):
+    party_votes.rebuild(db)
+    return sorted(tuple(row) for row in db.query(
+        models.ClaimPartyVote.claim_id, models.ClaimPartyVote.party,
+        models.ClaimPartyVote.vote_type, models.ClaimPartyVote.count,
+    ))
+
+
+def _stats(db):
+    return {user_id: dict(counts) for user_id, counts in user_stats.tally(db).items()}
+
+
+def test_compact_moves_votes_and_keeps_answers(db, data):
+    user_ids = [user_id for (user_id,) in db.query(models.User.id)]
+    voted = db.query(models.Vote.user_id, models.Vote.claim_id, models.Vote.rebuttal_id, models.Vote.vote_type).all()
+    views = {user_id: viewer_votes(db, user_id, data.claim_ids, data.rebuttal_ids) for user_id in user_ids}
+    party, stats = _party_counts(db), _stats(db)
+
+    moved = vote_log.compact(db, before=datetime.max)
+    assert moved == len(voted)
+    assert vote_log.counts(db)["votes"] == 0
+
+    for user_id, claim_id, rebuttal_id, vote_type in voted:
+        found = vote_log.find(db, user_id, claim_id=claim_id, rebuttal_id=rebuttal_id)
+        assert found is not None and found.vote_type == vote_type
+    assert {user_id: viewer_votes(db, user_id, data.claim_ids, data.rebuttal_ids) for user_id in user_ids} == views
+    assert _party_counts(db) == party
+    assert _stats(db) == stats
+
+
+def test_compact_only_moves_votes_older_than_cutoff(db):
+    cutoff = datetime.utcnow() - timedelta(days=vote_log.COMPACT_AFTER_DAYS)
+    old_ids = [vote_id for (vote_id,) in db.query(models.Vote.id).order_by(models.Vote.id).limit(50)]
+    db.query(models.Vote).filter(models.Vote.id.in_(old_ids)).update(
+        {"created_at": cutoff - timedelta(days=1)}, synchronize_session=False
+    )
+    db.commit()
+    total = db.query(models.Vote).count()
+
+    assert vote_log.compact(db) == len(old_ids)
+    assert vote_log.counts(db) == {"votes": total - len(old_ids), "ledger": len(old_ids)}
+    assert db.query(models.Vote).filter(models.Vote.created_at < cutoff).count() == 0
+
+
+def test_duplicate_votes_collapse_to_last(db, data):
+    user_id = db.query(models.User.id).first()[0]
+    claim_id = data.claim_ids[0]
+    db.query(models.Vote).filter(models.Vote.user_id == user_id, models.Vote.claim_id == claim_id).delete()
+    old = datetime(2020, 1, 1)
+    db.add_all([
+        models.Vote(user_id=user_id, claim_id=claim_id, vote_type="like", created_at=old),
+        models.Vote(user_id=user_id, claim_id=claim_id, vote_type="dislike", created_at=old + timedelta(hours=3)),
+    ])
+    db.commit()
+
+    vote_log.compact(db, before=datetime(2021, 1, 1))
+    entry = vote_log.find(db, user_id, claim_id=claim_id)
+    assert isinstance(entry, models.VoteLedger)
+    assert entry.vote_type == "dislike"
+    assert entry.created_at == old + timedelta(hours=3)
+
+
+def test_vote_on_compacted_vote_toggles_it(client, login, db, data):
+    tokens = login(data.usernames[0])
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    claim_id = data.claim_ids[0]
+    client.post("/api/votes/", json={"claim_id": claim_id, "vote_type": "like"}, headers=headers)
+    assert client.get(f"/api/votes/claim/{claim_id}", headers=headers).json()["user_vote"] == "like"
+
+    vote_log.compact(db, before=datetime.max)
+    assert client.get(f"/api/votes/claim/{claim_id}", headers=headers).json()["user_vote"] == "like"
+    response = client.post("/api/votes/", json={"claim_id": claim_id, "vote_type": "like"}, headers=headers)
+    assert response.json()["user_vote"] is None
+    assert client.get(f"/api/votes/claim/{claim_id}", headers=headers).json()["user_vote"] is None
+
+
+def test_vote_retries_when_row_is_compacted_meanwhile(client, login, db, data, monkeypatch):
+    from app.routers import votes
+
+    tokens = login(data.usernames[0])
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    claim_id = data.claim_ids[0]
+    client.post("/api/votes/", json={"claim_id": claim_id, "vote_type": "like"}, headers=headers)
+    if client.get(f"/api/votes/claim/{claim_id}", headers=headers).json()["user_vote"] != "like":
+        client.post("/api/votes/", json={"claim_id": claim_id, "vote_type": "like"}, headers=headers)
+    votes_before = db.get(models.Claim, claim_id).votes
+
+    find = votes._find_vote
+    calls = []
+
+    def find_then_compact(session, user_id, target, is_claim):
+        # 기존 투표를 찾은 직후 압축이 그 행을 장부로 옮긴 상황
+        found = find(session, user_id, target, is_claim)
+        if not calls:
+            session.execute(models.Vote.__table__.delete().where(models.Vote.id == found.id))
+            session.add(models.VoteLedger(kind=models.VoteLedger.CLAIM, target_id=claim_id,
+                                          user_id=user_id, value=1, hour=0))
+            session.flush()
+        calls.append(found)
+        return found
+
+    monkeypatch.setattr(votes, "_find_vote", find_then_compact)
+    response = client.post("/api/votes/", json={"claim_id": claim_id, "vote_type": "dislike"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["user_vote"] == "dislike"
+    assert isinstance(calls[-1], models.VoteLedger)
+    db.expire_all()
+    assert db.get(models.Claim, claim_id).votes == votes_before - 2
+    assert vote_log.find(db, tokens["user"]["id"], claim_id=claim_id).vote_type == "dislike"
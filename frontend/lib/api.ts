@@ -19,14 +19,81 @@ export const setToken = (token: string): void => {
 export const removeToken = (): void => {
   if (typeof window !== 'undefined') {
     localStorage.removeItem('token')
+    localStorage.removeItem('refresh_token')
+    localStorage.removeItem('token_expires_at')
   }
 }
 
+interface TokenResponse {
+  access_token: string
+  refresh_token?: string
+  expires_in?: number
+  user: any
+}
+
+// 로그인/토큰 갱신 응답 저장 (액세스 토큰은 짧게 유지되고 리프레시 토큰으로 갱신)
+const saveTokens = (data: TokenResponse): void => {
+  setToken(data.access_token)
+  if (typeof window !== 'undefined' && data.refresh_token && data.expires_in) {
+    localStorage.setItem('refresh_token', data.refresh_token)
+    localStorage.setItem('token_expires_at', String(Date.now() + data.expires_in * 1000))
+  }
+}
+
+// 동시에 여러 요청이 갱신하지 않도록 진행 중인 갱신을 공유 (리프레시 토큰은 한 번만 쓸 수 있음)
+let refreshing: Promise<boolean> | null = null
+
+// 같은 localStorage를 쓰는 다른 탭과도 갱신이 겹치지 않도록 Web Lock으로 한 번에 한 탭만 갱신
+const REFRESH_LOCK = 'debate-token-refresh'
+
+const requestRefresh = async (startedWith: string): Promise<boolean> => {
+  const refreshToken = localStorage.getItem('refresh_token')
+  if (!refreshToken) return false
+  // 기다리는 동안 다른 탭이 이미 갱신했으면 저장된 새 토큰을 그대로 사용
+  if (refreshToken !== startedWith) return true
+  const response = await fetch(`${API_BASE_URL}/api/auth/refresh`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ refresh_token: refreshToken }),
+  })
+  if (!response.ok) {
+    // 그사이 다른 탭이 새 토큰을 저장했다면 로그아웃하지 않음
+    if (localStorage.getItem('refresh_token') !== refreshToken) return true
+    removeToken()
+    removeUser()
+    return false
+  }
+  saveTokens(await response.json())
+  return true
+}
+
+const refreshTokens = (): Promise<boolean> => {
+  const refreshToken = typeof window !== 'undefined' ? localStorage.getItem('refresh_token') : null
+  if (!refreshToken) return Promise.resolve(false)
+  if (!refreshing) {
+    const locks = typeof navigator !== 'undefined' ? navigator.locks : undefined
+    const run = () => requestRefresh(refreshToken)
+    refreshing = (locks ? locks.request(REFRESH_LOCK, run) : run())
+      .catch(() => false)
+      .finally(() => {
+        refreshing = null
+      })
+  }
+  return refreshing
+}
+
 // API 요청 헬퍼
 async function apiRequest<T>(
   endpoint: string,
-  options: RequestInit = {}
+  options: RequestInit = {},
+  retried = false
 ): Promise<T> {
+  // 액세스 토큰이 곧 만료되면 미리 갱신
+  const expiresAt = typeof window !== 'undefined' ? Number(localStorage.getItem('token_expires_at')) : 0
+  if (expiresAt && expiresAt - Date.now() < 30_000) {
+    await refreshTokens()
+  }
+
   const token = getToken()
   const headers: HeadersInit = {
     'Content-Type': 'application/json',
@@ -42,6 +109,11 @@ async function apiRequest<T>(
     headers,
   })
 
+  // 만료/폐기된 토큰이면 한 번만 갱신 후 다시 시도
+  if (response.status === 401 && token && !retried && (await refreshTokens())) {
+    return apiRequest<T>(endpoint, options, true)
+  }
+
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: '알 수 없는 오류가 발생했습니다' }))
     throw new Error(error.detail || '요청에 실패했습니다')
@@ -67,12 +139,12 @@ export const authAPI = {
   },
 
   login: async (username: string, password: string) => {
-    const data = await apiRequest<{ access_token: string; user: any }>('/api/auth/login', {
+    const data = await apiRequest<TokenResponse>('/api/auth/login', {
       method: 'POST',
       body: JSON.stringify({ username, password }),
     })
     if (data.access_token) {
-      setToken(data.access_token)
+      saveTokens(data)
     }
     if (data.user) {
       setUser(data.user)
@@ -81,6 +153,15 @@ export const authAPI = {
   },
 
   logout: () => {
+    // 서버의 세션도 폐기 (실패해도 로컬 로그아웃은 진행)
+    const refreshToken = typeof window !== 'undefined' ? localStorage.getItem('refresh_token') : null
+    if (refreshToken) {
+      fetch(`${API_BASE_URL}/api/auth/logout`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch(() => {})
+    }
     removeToken()
     removeUser()
   },